@@ -349,6 +349,9 @@ ETH_INTERNAL_TXS_BLOCK_PROCESS_LIMIT = env.int(
     "ETH_INTERNAL_TXS_BLOCK_PROCESS_LIMIT", default=10000
 )
 ETH_INTERNAL_NO_FILTER = env.bool("ETH_INTERNAL_NO_FILTER", default=False)
+ETH_INTERNAL_TXS_DECODED_PROCESS_BATCH = env.int(
+    "ETH_INTERNAL_TXS_DECODED_PROCESS_BATCH", default=500
+)  # Number of decoded txs for a Safe replayed in memory and stored together
 ETH_L2_NETWORK = env.bool(
     "ETH_L2_NETWORK", default=not ETHEREUM_TRACING_NODE_URL
 )  # Use L2 event indexing
@@ -361,9 +364,27 @@ ETH_EVENTS_BLOCK_PROCESS_LIMIT_MAX = env.int(
 ETH_EVENTS_QUERY_CHUNK_SIZE = env.int(
     "ETH_EVENTS_QUERY_CHUNK_SIZE", default=0
 )  # Number of addresses 'almost updated' to update together. 0 == no limit
+ETH_EVENTS_BLOOM_FILTER = env.bool(
+    "ETH_EVENTS_BLOOM_FILTER", default=False
+)  # Use block headers `logsBloom` to skip block ranges without relevant events
 ETH_EVENTS_UPDATED_BLOCK_BEHIND = env.int(
     "ETH_EVENTS_UPDATED_BLOCK_BEHIND", default=24 * 60 * 60 // 15
 )  # Number of blocks to consider an address 'almost updated'.
+ETH_BLOCK_INGESTION = env.bool(
+    "ETH_BLOCK_INGESTION", default=False
+)  # Fetch new blocks once and share them between indexers using redis
+ETH_BLOCK_INGESTION_BLOCKS = env.int(
+    "ETH_BLOCK_INGESTION_BLOCKS", default=20
+)  # Number of most recent blocks kept by the block ingestion
+ETH_CHAIN_DATA_CACHE_DIR = env.str(
+    "ETH_CHAIN_DATA_CACHE_DIR", default=None
+)  # Folder to keep finalized blocks, txs, receipts and traces so they are not requested again when reindexing
+ETH_INDEXER_STORE_PROCESS_LIMIT = env.bool(
+    "ETH_INDEXER_STORE_PROCESS_LIMIT", default=True
+)  # Store auto adjusted block process limit on redis, so it's not lost when indexers are restarted
+ETH_INDEXER_PIPELINE_DEPTH = env.int(
+    "ETH_INDEXER_PIPELINE_DEPTH", default=0
+)  # Number of block ranges to fetch from the node while the current one is stored. 0 or 1 == disabled.
 
 # Safe
 # ------------------------------------------------------------------------------
@@ -371,6 +392,24 @@ ETH_EVENTS_UPDATED_BLOCK_BEHIND = env.int(
 ETH_REORG_BLOCKS = env.int(
     "ETH_REORG_BLOCKS", default=50 if ETH_L2_NETWORK else 10
 )  # L2 Networks have more reorgs
+ETH_BALANCES_LEDGER = env.bool(
+    "ETH_BALANCES_LEDGER", default=False
+)  # Get balances from a ledger built from indexed transfers and periodically reconciled, instead of the node
+TX_SERVICE_CACHE_TIMEOUT = env.int(
+    "TX_SERVICE_CACHE_TIMEOUT", default=60 * 60 * 24
+)  # Seconds to keep cached txs for a Safe not modified. Cached txs are removed when they are modified
+
+# Tx decoder
+# ------------------------------------------------------------------------------
+TX_DECODER_CACHE_SIZE = env.int(
+    "TX_DECODER_CACHE_SIZE", default=10000
+)  # Number of decoded calldatas kept in memory by the API tx decoder. 0 == disabled
+TX_DECODER_CACHE_REDIS = env.bool(
+    "TX_DECODER_CACHE_REDIS", default=False
+)  # Share decoded calldatas between processes using redis
+TX_DECODER_PERSISTED_INDEX = env.bool(
+    "TX_DECODER_PERSISTED_INDEX", default=True
+)  # Store function selectors for database ABIs on redis, so they are not generated again on every process
 
 # Tokens
 TOKENS_LOGO_BASE_URI = env(
@@ -410,3 +449,18 @@ AWS_CONFIGURED = bool(
 
 ETHERSCAN_API_KEY = env("ETHERSCAN_API_KEY", default=None)
 IPFS_GATEWAY = env("IPFS_GATEWAY", default="https://cloudflare-ipfs.com/")
+COLLECTIBLES_METADATA_MAX_CONNECTIONS = env.int(
+    "COLLECTIBLES_METADATA_MAX_CONNECTIONS", default=100
+)  # Max concurrent requests to retrieve collectibles metadata, shared by every request on the process
+COLLECTIBLES_METADATA_MAX_CONNECTIONS_PER_HOST = env.int(
+    "COLLECTIBLES_METADATA_MAX_CONNECTIONS_PER_HOST", default=10
+)  # Max concurrent requests to the same metadata host, the rest will wait for a connection on the pool
+COLLECTIBLES_METADATA_FAILING_HOST_TIMEOUT = env.int(
+    "COLLECTIBLES_METADATA_FAILING_HOST_TIMEOUT", default=60 * 10
+)  # Seconds to skip metadata hosts not reachable
+COLLECTIBLES_METADATA_FAILING_HOST_ERRORS = env.int(
+    "COLLECTIBLES_METADATA_FAILING_HOST_ERRORS", default=5
+)  # Connection errors for a metadata host to consider it not reachable
+COLLECTIBLES_METADATA_FAILING_HOST_ERRORS_WINDOW = env.int(
+    "COLLECTIBLES_METADATA_FAILING_HOST_ERRORS_WINDOW", default=60
+)  # Seconds to count connection errors for a metadata host
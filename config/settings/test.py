@@ -48,6 +48,10 @@ ETHEREUM_TEST_PRIVATE_KEY = (
     "6370fd033278c143179d81c5526140625662b8daa446c22ee2d73db3707e620c"
 )
 ETH_REORG_BLOCKS = 1
+ETH_INDEXER_STORE_PROCESS_LIMIT = False
+TX_DECODER_PERSISTED_INDEX = (
+    False  # Database is rolled back after every test, redis is not
+)
 
 # Fix error with `task_id` when running celery in eager mode
 LOGGING["formatters"]["celery_verbose"] = LOGGING["formatters"]["verbose"]  # noqa F405
@@ -0,0 +1,63 @@
+"""
+ABIs of well known contracts used by the `TxDecoder`. Some of the modules are really big (e.g. `maker_dao`), so
+they must not be imported directly: use `get_decoder_abis` and they will only be loaded by processes that decode
+transactions
+"""
+import importlib
+from typing import Dict, List, Tuple
+
+from web3.types import ABI
+
+# Protocol (module) -> ABI attributes of the module
+DECODER_ABIS: Dict[str, Tuple[str, ...]] = {
+    "aave": (
+        "aave_a_token",
+        "aave_lending_pool",
+        "aave_lending_pool_addresses_provider",
+        "aave_lending_pool_core",
+    ),
+    "admin_upgradeability_proxy": ("initializable_admin_upgradeability_proxy_abi",),
+    "balancer": ("balancer_bactions", "balancer_exchange_proxy"),
+    "chainlink": ("chainlink_token_abi",),
+    "compound": ("ctoken_abi", "comptroller_abi"),
+    "gnosis_protocol": (
+        "gnosis_protocol_abi",
+        "fleet_factory_deterministic_abi",
+        "fleet_factory_abi",
+    ),
+    "gnosis_safe": ("gnosis_safe_allowance_module_abi",),
+    "idle": ("idle_token_v3",),
+    "open_zeppelin": (
+        "open_zeppelin_admin_upgradeability_proxy",
+        "open_zeppelin_proxy_admin",
+    ),
+    "request": (
+        "request_erc20_proxy",
+        "request_erc20_swap_to_pay",
+        "request_ethereum_proxy",
+    ),
+    "sablier": ("sablier_ctoken_manager", "sablier_payroll", "sablier_abi"),
+    "sight": ("conditional_token_abi", "market_maker_abi", "market_maker_factory_abi"),
+    "snapshot": ("snapshot_delegate_registry_abi",),
+    "timelock": ("timelock_abi",),
+}
+
+# Protocol (module) -> Attributes of the module with a list of ABIs
+DECODER_ABIS_LISTS: Dict[str, Tuple[str, ...]] = {
+    "maker_dao": ("maker_dao_abis",),
+}
+
+
+def get_decoder_abis(*protocols: str) -> List[ABI]:
+    """
+    :param protocols: Names of the protocols, keys of `DECODER_ABIS` or `DECODER_ABIS_LISTS`
+    :return: ABIs for the protocols, in the same order. Modules are imported on first use
+    """
+    abis = []
+    for protocol in protocols:
+        module = importlib.import_module(f"{__name__}.{protocol}")
+        for attribute in DECODER_ABIS.get(protocol, ()):
+            abis.append(getattr(module, attribute))
+        for attribute in DECODER_ABIS_LISTS.get(protocol, ()):
+            abis.extend(getattr(module, attribute))
+    return abis
@@ -1,12 +1,15 @@
 import logging
 from typing import Type
 
+from django.conf import settings
 from django.db.models import Model
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 
+from safe_transaction_service.utils.redis import get_redis
+
 from .models import ContractAbi
-from .tx_decoder import get_db_tx_decoder, is_db_tx_decoder_loaded
+from .tx_decoder import DbTxDecoder, get_db_tx_decoder, is_db_tx_decoder_loaded
 
 logger = logging.getLogger(__name__)
 
@@ -26,6 +29,10 @@ def add_abi_in_tx_decoder(
     :return:
     """
 
+    if not created and settings.TX_DECODER_PERSISTED_INDEX:
+        # New `ContractAbi` are added to the persisted index when loading it, but not modified ones
+        DbTxDecoder.delete_persisted_index(get_redis())
+
     if instance.abi:
         if is_db_tx_decoder_loaded():
             db_tx_decoder = get_db_tx_decoder()
@@ -33,3 +40,22 @@ def add_abi_in_tx_decoder(
                 logger.info(
                     "ABI for ContractAbi %s was loaded on the TxDecoder", instance
                 )
+
+
+@receiver(
+    post_delete,
+    sender=ContractAbi,
+    dispatch_uid="contract_abi.delete_tx_decoder_persisted_index",
+)
+def delete_tx_decoder_persisted_index(
+    sender: Type[Model], instance: ContractAbi, **kwargs
+) -> None:
+    """
+    When a `ContractAbi` is deleted, persisted selectors index for the DbTxDecoder must be rebuilt
+    :param sender: ContractAbi
+    :param instance: Instance of ContractAbi
+    :param kwargs:
+    :return:
+    """
+    if settings.TX_DECODER_PERSISTED_INDEX:
+        DbTxDecoder.delete_persisted_index(get_redis())
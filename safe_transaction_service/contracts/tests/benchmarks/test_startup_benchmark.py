@@ -0,0 +1,77 @@
+"""
+Startup benchmarks for every process type, using `pytest-benchmark`. Every round starts a new python process,
+so they are skipped unless `BENCHMARK_STARTUP` is set:
+
+    BENCHMARK_STARTUP=1 pytest safe_transaction_service/contracts/tests/benchmarks
+
+Besides timings, `max_rss_mb` of the process and `loaded_modules` are reported as `extra_info`
+(use `--benchmark-json` to export them)
+"""
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROUNDS = int(os.environ.get("BENCHMARK_ROUNDS", 3))
+
+pytestmark = pytest.mark.skipif(
+    not os.environ.get("BENCHMARK_STARTUP"), reason="BENCHMARK_STARTUP is not set"
+)
+
+# Command line and code run by every process type after Django is set up. Command line is set before
+# `django.setup()`, as apps `ready()` depend on it: web processes started by `gunicorn` build the `DbTxDecoder`
+# (so database is required) and load every decoder ABI on startup, unlike worker processes
+PROCESS_TYPES = {
+    "web": (["gunicorn", "config.wsgi:application"], "import config.urls"),
+    "worker": (
+        ["celery", "-A", "config.celery_app", "worker"],
+        "from config.celery_app import app; app.loader.import_default_modules()",
+    ),
+    "tx_decoder": (
+        ["python"],
+        "from safe_transaction_service.contracts.tx_decoder import get_tx_decoder; "
+        "get_tx_decoder()",
+    ),
+}
+
+STARTUP_SCRIPT = """
+import json, resource, sys, time
+sys.argv = {argv!r}
+start = time.perf_counter()
+import django
+django.setup()
+{code}
+print(json.dumps({{
+    "seconds": time.perf_counter() - start,
+    "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    "loaded_modules": len(sys.modules),
+}}))
+"""
+
+
+def start_process(process_type: str):
+    """
+    :param process_type: Key of `PROCESS_TYPES`
+    :return: Startup stats reported by the process
+    """
+    argv, code = PROCESS_TYPES[process_type]
+    output = subprocess.run(
+        [sys.executable, "-c", STARTUP_SCRIPT.format(argv=argv, code=code)],
+        capture_output=True,
+        check=True,
+        text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+@pytest.mark.parametrize("process_type", PROCESS_TYPES)
+def test_startup(benchmark, process_type):
+    result = {}
+
+    def target():
+        result.update(start_process(process_type))
+
+    benchmark.pedantic(target, rounds=ROUNDS, iterations=1)
+    benchmark.extra_info.update(result)
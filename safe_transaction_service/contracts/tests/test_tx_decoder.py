@@ -1,6 +1,8 @@
 import logging
+import pickle
+from unittest import mock
 
-from django.test import TestCase
+from django.test import TestCase, override_settings
 
 from hexbytes import HexBytes
 from web3 import Web3
@@ -8,11 +10,15 @@ from web3 import Web3
 from gnosis.eth.constants import NULL_ADDRESS
 from gnosis.safe.multi_send import MultiSendOperation
 
+from safe_transaction_service.contracts.models import ContractAbi
 from safe_transaction_service.contracts.tests.factories import ContractAbiFactory
+from safe_transaction_service.utils.redis import get_redis
 
+from ..decoder_abis import DECODER_ABIS, DECODER_ABIS_LISTS, get_decoder_abis
 from ..tx_decoder import (
     CannotDecode,
     DbTxDecoder,
+    DecodedDataCache,
     SafeTxDecoder,
     TxDecoder,
     get_db_tx_decoder,
@@ -25,6 +31,15 @@ logger = logging.getLogger(__name__)
 
 
 class TestTxDecoder(TestCase):
+    def test_get_decoder_abis(self):
+        self.assertEqual(get_decoder_abis(), [])
+        timelock_abi = get_decoder_abis("timelock")
+        self.assertEqual(len(timelock_abi), 1)
+        self.assertGreater(len(get_decoder_abis("maker_dao")), 1)  # List of ABIs
+        self.assertEqual(get_decoder_abis("timelock", "chainlink")[0], timelock_abi[0])
+        for protocol in list(DECODER_ABIS) + list(DECODER_ABIS_LISTS):
+            self.assertTrue(get_decoder_abis(protocol))
+
     def test_singleton(self):
         self.assertTrue(isinstance(get_tx_decoder(), TxDecoder))
         self.assertTrue(isinstance(get_safe_tx_decoder(), SafeTxDecoder))
@@ -542,3 +557,143 @@ class TestTxDecoder(TestCase):
         fn_name, arguments = db_tx_decoder.decode_transaction(example_data)
         self.assertEqual(fn_name, "uxioSayHi")
         self.assertFalse(arguments)
+
+    def test_decoded_data_cache(self):
+        decoded_data_cache = DecodedDataCache(2)
+        tx_decoder = TxDecoder(decoded_data_cache=decoded_data_cache)
+        data = HexBytes(
+            "0xa9059cbb0000000000000000000000005aC255889882aCd3da2aA939679E3f3d4cea221e"
+            "0000000000000000000000000000000000000000000000000000000000000001"
+        )
+        expected = tx_decoder.decode_transaction_with_types(data)
+        self.assertEqual(expected[0], "transfer")
+        self.assertEqual(
+            decoded_data_cache.cache_info(),
+            {"hits": 0, "misses": 1, "size": 1, "max_size": 2},
+        )
+        decoded = tx_decoder.decode_transaction_with_types(data)
+        self.assertEqual(decoded, expected)
+        self.assertIsNot(decoded, expected)  # A copy is returned
+        self.assertEqual(decoded_data_cache.cache_info()["hits"], 1)
+
+        # Not supported selectors are not cached
+        with self.assertRaises(CannotDecode):
+            tx_decoder.decode_transaction_with_types(HexBytes("0x12345678"))
+        self.assertEqual(len(decoded_data_cache), 1)
+
+        # LRU
+        for value in range(2, 4):
+            tx_decoder.decode_transaction_with_types(data[:-1] + bytes([value]))
+        self.assertEqual(len(decoded_data_cache), 2)
+        self.assertIsNone(decoded_data_cache.get(tx_decoder._get_cache_key(data)))
+
+        # Adding an ABI changes the version and clears the cache
+        abis_version = tx_decoder.abis_version
+        example_abi = [
+            {
+                "inputs": [],
+                "name": "uxioSayHi",
+                "outputs": [],
+                "stateMutability": "nonpayable",
+                "type": "function",
+            },
+        ]
+        self.assertTrue(tx_decoder.add_abi(example_abi))
+        self.assertNotEqual(tx_decoder.abis_version, abis_version)
+        self.assertEqual(tx_decoder.abis_added, 1)
+        self.assertEqual(len(decoded_data_cache), 0)
+        self.assertFalse(tx_decoder.add_abi(example_abi))
+        self.assertEqual(tx_decoder.abis_added, 1)
+
+        # Every process adding the same ABIs gets the same version. It's only calculated once per process
+        with mock.patch.object(
+            TxDecoder, "_get_selectors_version"
+        ) as get_selectors_version_mock:
+            other_tx_decoder = TxDecoder()
+            get_selectors_version_mock.assert_not_called()
+        self.assertEqual(other_tx_decoder.abis_version, abis_version)
+        other_tx_decoder.add_abi(example_abi)
+        self.assertEqual(other_tx_decoder.abis_version, tx_decoder.abis_version)
+
+    @override_settings(TX_DECODER_PERSISTED_INDEX=True)
+    def test_db_tx_decoder_persisted_index(self):
+        redis = get_redis()
+        DbTxDecoder.delete_persisted_index(redis)
+        example_abi = [
+            {
+                "inputs": [],
+                "name": "uxioSayHi",
+                "outputs": [],
+                "stateMutability": "nonpayable",
+                "type": "function",
+            },
+        ]
+        example_data = HexBytes(
+            Web3.keccak(text="uxioSayHi()")[:4]
+        )  # Function selector
+
+        db_tx_decoder = DbTxDecoder(redis=redis)
+        self.assertTrue(redis.exists(DbTxDecoder.PERSISTED_INDEX_KEY))
+        self.assertEqual(
+            db_tx_decoder.fn_selectors_with_abis,
+            DbTxDecoder().fn_selectors_with_abis,
+        )
+        self.assertEqual(db_tx_decoder.abis_version, DbTxDecoder().abis_version)
+
+        # ABIs not stored in database are not loaded again if index is persisted
+        with mock.patch.object(
+            TxDecoder, "get_supported_abis"
+        ) as get_supported_abis_mock, mock.patch.object(
+            DbTxDecoder, "_get_selectors_version"
+        ) as get_selectors_version_mock:
+            self.assertEqual(
+                DbTxDecoder(redis=redis).abis_version, db_tx_decoder.abis_version
+            )
+            get_supported_abis_mock.assert_not_called()
+            get_selectors_version_mock.assert_not_called()
+        abis_version = db_tx_decoder.abis_version
+
+        # New ABIs are applied to the persisted index
+        ContractAbiFactory(abi=example_abi, id=10_000)
+        with mock.patch.object(
+            DbTxDecoder,
+            "_generate_selectors_with_abis_from_abi",
+            wraps=db_tx_decoder._generate_selectors_with_abis_from_abi,
+        ) as generate_mock:
+            db_tx_decoder = DbTxDecoder(redis=redis)
+            generate_mock.assert_called_once_with(example_abi)
+        self.assertEqual(db_tx_decoder.decode_transaction(example_data)[0], "uxioSayHi")
+        self.assertNotEqual(db_tx_decoder.abis_version, abis_version)
+        _, _, _, contract_abi_ids, persisted_abis_version = pickle.loads(
+            redis.get(DbTxDecoder.PERSISTED_INDEX_KEY)
+        )
+        self.assertEqual(contract_abi_ids, {10_000})
+        self.assertEqual(persisted_abis_version, db_tx_decoder.abis_version)
+
+        # ABIs with a lower id (committed out of order) and more relevance take preference, same as a full rebuild
+        example_abi_with_outputs = [
+            {
+                "inputs": [],
+                "name": "uxioSayHi",
+                "outputs": [{"internalType": "bool", "name": "", "type": "bool"}],
+                "stateMutability": "nonpayable",
+                "type": "function",
+            },
+        ]
+        ContractAbiFactory(abi=example_abi_with_outputs, id=9_999, relevance=1)
+        db_tx_decoder = DbTxDecoder(redis=redis)
+        self.assertEqual(
+            db_tx_decoder.fn_selectors_with_abis[example_data],
+            example_abi_with_outputs[0],
+        )
+        self.assertEqual(
+            db_tx_decoder.fn_selectors_with_abis,
+            DbTxDecoder().fn_selectors_with_abis,
+        )
+        ContractAbi.objects.filter(id=9_999).delete()
+
+        # Modifying a ContractAbi removes the persisted index
+        contract_abi = ContractAbi.objects.get()
+        contract_abi.description = "Modified"
+        contract_abi.save(update_fields=["description"])
+        self.assertFalse(redis.exists(DbTxDecoder.PERSISTED_INDEX_KEY))
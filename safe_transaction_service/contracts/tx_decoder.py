@@ -1,17 +1,41 @@
+import hashlib
+import json
+import pickle
+import threading
+from collections import OrderedDict
 from functools import cache, cached_property
+from itertools import chain
 from logging import getLogger
-from typing import Any, Dict, List, Sequence, Tuple, Type, Union, cast
+from pathlib import Path
+from typing import (
+    Any,
+    Collection,
+    Dict,
+    FrozenSet,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    Union,
+    cast,
+)
+
+from django.conf import settings
 
 import gevent
 from eth_abi.exceptions import DecodingError
 from eth_utils import function_abi_to_4byte_selector
 from hexbytes import HexBytes
+from redis import Redis
+from redis.exceptions import RedisError
 from web3 import Web3
 from web3._utils.abi import get_abi_input_names, get_abi_input_types, map_abi_data
 from web3._utils.normalizers import BASE_RETURN_NORMALIZERS
 from web3.contract import Contract
 from web3.types import ABI
 
+import gnosis.eth.contracts
 from gnosis.eth.contracts import (
     get_erc20_contract,
     get_erc721_contract,
@@ -26,48 +50,16 @@ from gnosis.eth.contracts import (
 from gnosis.safe.multi_send import MultiSend
 
 from safe_transaction_service.contracts.models import ContractAbi
+from safe_transaction_service.utils.redis import get_redis
 from safe_transaction_service.utils.utils import running_on_gevent
 
-from .decoder_abis.aave import (
-    aave_a_token,
-    aave_lending_pool,
-    aave_lending_pool_addresses_provider,
-    aave_lending_pool_core,
-)
-from .decoder_abis.admin_upgradeability_proxy import (
-    initializable_admin_upgradeability_proxy_abi,
-)
-from .decoder_abis.balancer import balancer_bactions, balancer_exchange_proxy
-from .decoder_abis.chainlink import chainlink_token_abi
-from .decoder_abis.compound import comptroller_abi, ctoken_abi
-from .decoder_abis.gnosis_protocol import (
-    fleet_factory_abi,
-    fleet_factory_deterministic_abi,
-    gnosis_protocol_abi,
-)
-from .decoder_abis.gnosis_safe import gnosis_safe_allowance_module_abi
-from .decoder_abis.idle import idle_token_v3
-from .decoder_abis.maker_dao import maker_dao_abis
-from .decoder_abis.open_zeppelin import (
-    open_zeppelin_admin_upgradeability_proxy,
-    open_zeppelin_proxy_admin,
-)
-from .decoder_abis.request import (
-    request_erc20_proxy,
-    request_erc20_swap_to_pay,
-    request_ethereum_proxy,
-)
-from .decoder_abis.sablier import sablier_abi, sablier_ctoken_manager, sablier_payroll
-from .decoder_abis.sight import (
-    conditional_token_abi,
-    market_maker_abi,
-    market_maker_factory_abi,
-)
-from .decoder_abis.snapshot import snapshot_delegate_registry_abi
-from .decoder_abis.timelock import timelock_abi
+from . import decoder_abis
+from .decoder_abis import get_decoder_abis
 
 logger = getLogger(__name__)
 
+AbiPriority = Tuple[int, int, int]
+
 
 class TxDecoderException(Exception):
     pass
@@ -81,10 +73,46 @@ class CannotDecode(TxDecoderException):
     pass
 
 
+@cache
+def get_code_abis_version() -> str:
+    """
+    ABIs not stored in database only change with the code, so instead of importing and hashing them, the files
+    defining them are hashed. It's way faster, so it can be used to check if a persisted index is still valid
+
+    :return: Hash of the source files for the ABIs not stored in database
+    """
+    paths = chain(
+        Path(decoder_abis.__file__).parent.glob("*.py"),
+        Path(gnosis.eth.contracts.__file__).parent.rglob("*.py"),
+        Path(gnosis.eth.contracts.__file__).parent.rglob("*.json"),
+        [Path(__file__)],  # Order of the ABIs is defined here
+    )
+    sha256 = hashlib.sha256()
+    for path in sorted(paths):
+        sha256.update(path.name.encode())
+        sha256.update(path.read_bytes())
+    return sha256.hexdigest()
+
+
+def get_decoded_data_cache() -> Optional["DecodedDataCache"]:
+    """
+    :return: Cache for decoders used by the API, `None` if disabled
+    """
+    if not settings.TX_DECODER_CACHE_SIZE:
+        return None
+    return DecodedDataCache(
+        settings.TX_DECODER_CACHE_SIZE,
+        redis=get_redis() if settings.TX_DECODER_CACHE_REDIS else None,
+    )
+
+
 @cache
 def get_db_tx_decoder() -> "DbTxDecoder":
     def _get_db_tx_decoder() -> "DbTxDecoder":
-        return DbTxDecoder()
+        return DbTxDecoder(
+            decoded_data_cache=get_decoded_data_cache(),
+            redis=get_redis() if settings.TX_DECODER_PERSISTED_INDEX else None,
+        )
 
     if running_on_gevent():
         # It's a very intensive CPU task, so to prevent blocking
@@ -101,7 +129,7 @@ def is_db_tx_decoder_loaded() -> bool:
 
 @cache
 def get_tx_decoder() -> "TxDecoder":
-    return TxDecoder()
+    return TxDecoder(decoded_data_cache=get_decoded_data_cache())
 
 
 @cache
@@ -109,22 +137,151 @@ def get_safe_tx_decoder() -> "SafeTxDecoder":
     return SafeTxDecoder()
 
 
+class DecodedDataCache:
+    """
+    LRU cache for decoded calldata, with an optional redis tier shared between processes. Values are stored
+    pickled, so every hit returns a new copy that can be safely modified
+    """
+
+    def __init__(
+        self, max_size: int, redis: Optional[Redis] = None, redis_timeout: int = 60 * 60
+    ):
+        """
+        :param max_size: Maximum number of elements kept in memory
+        :param redis: If provided, elements will be shared using redis
+        :param redis_timeout: Seconds to keep an element on redis
+        """
+        self.max_size = max_size
+        self.redis = redis
+        self.redis_timeout = redis_timeout
+        self.elements: OrderedDict[str, bytes] = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.elements)
+
+    def _set_in_memory(self, key: str, value: bytes) -> None:
+        with self.lock:
+            self.elements[key] = value
+            self.elements.move_to_end(key)
+            if len(self.elements) > self.max_size:
+                self.elements.popitem(last=False)
+
+    def get(self, key: str) -> Optional[Any]:
+        with self.lock:
+            value = self.elements.get(key)
+            if value is not None:
+                self.elements.move_to_end(key)
+        if value is None and self.redis:
+            try:
+                if value := self.redis.get(key):
+                    self._set_in_memory(key, value)
+            except RedisError:
+                logger.warning("Cannot get decoded data from redis", exc_info=True)
+
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return pickle.loads(value)
+
+    def set(self, key: str, value: Any) -> None:
+        value = pickle.dumps(value)
+        self._set_in_memory(key, value)
+        if self.redis:
+            try:
+                self.redis.set(key, value, ex=self.redis_timeout)
+            except RedisError:
+                logger.warning("Cannot store decoded data on redis", exc_info=True)
+
+    def clear(self) -> None:
+        """
+        Clear elements in memory. Elements on redis don't need to be removed, as keys are versioned
+        """
+        with self.lock:
+            self.elements.clear()
+
+    def cache_info(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self),
+            "max_size": self.max_size,
+        }
+
+
 class SafeTxDecoder:
     """
     Decode simple txs for Safe contracts. No multisend or nested transactions are decoded
     """
 
     dummy_w3 = Web3()
+    # Class -> Version of the ABIs loaded, ABIs for every class are the same for the whole process
+    _abis_versions: Dict[Type["SafeTxDecoder"], str] = {}
 
-    def __init__(self):
+    def __init__(self, decoded_data_cache: Optional[DecodedDataCache] = None):
+        """
+        :param decoded_data_cache: If provided, decoded data will be cached
+        """
         logger.info("%s: Loading contract ABIs for decoding", self.__class__.__name__)
         self.fn_selectors_with_abis: Dict[
             bytes, ABI
-        ] = self._generate_selectors_with_abis_from_abis(self.get_supported_abis())
+        ] = self._load_fn_selectors_with_abis()
+        self.decoded_data_cache = decoded_data_cache
+        self.abis_version = self._get_abis_version()
+        self.abis_added = 0  # Number of `add_abi` calls that updated the decoder
         logger.info(
             "%s: Contract ABIs for decoding were loaded", self.__class__.__name__
         )
 
+    def _load_fn_selectors_with_abis(self) -> Dict[bytes, ABI]:
+        """
+        :return: Dictionary with function selector as bytes and the function abi for the supported ABIs
+        """
+        return self._generate_selectors_with_abis_from_abis(self.get_supported_abis())
+
+    def _get_abis_version(self) -> str:
+        """
+        Only called when loading the decoder, `add_abi` derives the new version from the previous one. It's
+        calculated once per process, as loaded ABIs are always the same for the class
+
+        :return: Hash of the ABIs used for decoding. It will be the same for every process with the same ABIs
+        """
+        if (abis_version := self._abis_versions.get(self.__class__)) is None:
+            abis_version = self._get_selectors_version(self.fn_selectors_with_abis)
+            self._abis_versions[self.__class__] = abis_version
+        return abis_version
+
+    @staticmethod
+    def _get_selectors_version(
+        fn_selectors_with_abis: Dict[bytes, ABI], previous_version: str = ""
+    ) -> str:
+        """
+        :param fn_selectors_with_abis:
+        :param previous_version: Version the selectors are added to
+        :return: Hash of the `previous_version` and the provided selectors
+        """
+        return hashlib.sha256(
+            (
+                previous_version
+                + json.dumps(
+                    sorted(
+                        (selector.hex(), fn_abi)
+                        for selector, fn_abi in fn_selectors_with_abis.items()
+                    ),
+                    sort_keys=True,
+                )
+            ).encode()
+        ).hexdigest()[:16]
+
+    def _get_cache_key(self, data: bytes) -> str:
+        return (
+            f"tx-decoder:{self.__class__.__name__}:{self.abis_version}:"
+            f"{hashlib.sha256(data).hexdigest()}"
+        )
+
     def _decode_data(
         self, data: Union[bytes, str]
     ) -> Tuple[str, List[Tuple[str, str, Any]]]:
@@ -201,12 +358,26 @@ class SafeTxDecoder:
         Add a new abi without rebuilding the entire decoder
         :return: True if decoder updated, False otherwise
         """
-        updated = False
-        for selector, abi in self._generate_selectors_with_abis_from_abi(abi).items():
-            if selector not in self.fn_selectors_with_abis:
-                self.fn_selectors_with_abis[selector] = abi
-                updated = True
-        return updated
+        added_selectors_with_abis = {
+            selector: fn_abi
+            for selector, fn_abi in self._generate_selectors_with_abis_from_abi(
+                abi
+            ).items()
+            if selector not in self.fn_selectors_with_abis
+        }
+        if not added_selectors_with_abis:
+            return False
+
+        self.fn_selectors_with_abis.update(added_selectors_with_abis)
+        # Cached data could be decoded now in a different way. Version is chained from the previous one
+        # so only the added selectors are hashed, and processes adding different ABIs don't share cache keys
+        self.abis_added += 1
+        self.abis_version = self._get_selectors_version(
+            added_selectors_with_abis, previous_version=self.abis_version
+        )
+        if self.decoded_data_cache:
+            self.decoded_data_cache.clear()
+        return True
 
     def decode_parameters_data(
         self, data: bytes, parameters: Sequence[Dict[str, Any]]
@@ -231,6 +402,18 @@ class SafeTxDecoder:
         :raises: UnexpectedProblemDecoding if there's an unexpected problem decoding (it shouldn't happen)
         """
         data = HexBytes(data)
+        if not self.decoded_data_cache or data[:4] not in self.fn_selectors_with_abis:
+            return self._decode_transaction_with_types(data)
+
+        cache_key = self._get_cache_key(data)
+        if (decoded := self.decoded_data_cache.get(cache_key)) is None:
+            decoded = self._decode_transaction_with_types(data)
+            self.decoded_data_cache.set(cache_key, decoded)
+        return decoded
+
+    def _decode_transaction_with_types(
+        self, data: HexBytes
+    ) -> Tuple[str, List[Dict[str, Any]]]:
         fn_name, raw_parameters = self._decode_data(data)
         # Parameters are returned as tuple, convert it to a dictionary
         parameters = [
@@ -343,76 +526,35 @@ class TxDecoder(SafeTxDecoder):
     def get_supported_abis(self) -> List[ABI]:
         supported_abis = super().get_supported_abis()
 
-        aave_contracts = [
-            aave_a_token,
-            aave_lending_pool,
-            aave_lending_pool_addresses_provider,
-            aave_lending_pool_core,
-        ]
-        initializable_admin_upgradeability_proxy_contracts = [
-            initializable_admin_upgradeability_proxy_abi
-        ]
-        balancer_contracts = [balancer_bactions, balancer_exchange_proxy]
-        chainlink_contracts = [chainlink_token_abi]
-        compound_contracts = [ctoken_abi, comptroller_abi]
-        idle_contracts = [idle_token_v3]
-        maker_dao_contracts = maker_dao_abis
-        open_zeppelin_contracts = [
-            open_zeppelin_admin_upgradeability_proxy,
-            open_zeppelin_proxy_admin,
-        ]
-        request_contracts = [
-            request_erc20_proxy,
-            request_erc20_swap_to_pay,
-            request_ethereum_proxy,
-        ]
-        sablier_contracts = [sablier_ctoken_manager, sablier_payroll, sablier_abi]
-
-        snapshot_contracts = [snapshot_delegate_registry_abi]
-
         exchanges = [
             get_uniswap_exchange_contract(self.dummy_w3).abi,
             get_kyber_network_proxy_contract(self.dummy_w3).abi,
         ]
 
-        sight_contracts = [
-            conditional_token_abi,
-            market_maker_abi,
-            market_maker_factory_abi,
-        ]
-        gnosis_protocol = [
-            gnosis_protocol_abi,
-            fleet_factory_deterministic_abi,
-            fleet_factory_abi,
-        ]
-
-        gnosis_safe = [gnosis_safe_allowance_module_abi]
         erc_contracts = [
             get_erc721_contract(self.dummy_w3).abi,
             get_erc20_contract(self.dummy_w3).abi,
         ]
 
-        timelock_contracts = [timelock_abi]
-
         # Order is important. If signature is the same (e.g. renaming of `baseGas`) last elements in the list
         # will take preference
         return (
-            timelock_contracts
-            + initializable_admin_upgradeability_proxy_contracts
-            + aave_contracts
-            + balancer_contracts
-            + chainlink_contracts
-            + idle_contracts
-            + maker_dao_contracts
-            + request_contracts
-            + sablier_contracts
-            + snapshot_contracts
-            + open_zeppelin_contracts
-            + compound_contracts
+            get_decoder_abis(
+                "timelock",
+                "admin_upgradeability_proxy",
+                "aave",
+                "balancer",
+                "chainlink",
+                "idle",
+                "maker_dao",
+                "request",
+                "sablier",
+                "snapshot",
+                "open_zeppelin",
+                "compound",
+            )
             + exchanges
-            + sight_contracts
-            + gnosis_protocol
-            + gnosis_safe
+            + get_decoder_abis("sight", "gnosis_protocol", "gnosis_safe")
             + erc_contracts
             + self._get_multisend_abis()
             + supported_abis
@@ -449,14 +591,215 @@ class TxDecoder(SafeTxDecoder):
 
 class DbTxDecoder(TxDecoder):
     """
-    Decode contracts from ABIs in database
+    Decode contracts from ABIs in database.
+
+    Generating the selectors for every `ContractAbi` is slow, so if `redis` is provided the generated index is
+    persisted there and shared between processes. When loading it, only the `ContractAbi` not processed when the
+    index was stored are processed and added to the persisted index
     """
 
+    PERSISTED_INDEX_KEY = "tx-decoder:DbTxDecoder:selectors"
+
+    def __init__(
+        self,
+        decoded_data_cache: Optional[DecodedDataCache] = None,
+        redis: Optional[Redis] = None,
+    ):
+        """
+        :param decoded_data_cache: If provided, decoded data will be cached
+        :param redis: If provided, selectors index will be persisted on redis
+        """
+        self.redis = redis
+        # Set when loading the persisted index
+        self.persisted_abis_version: Optional[str] = None
+        super().__init__(decoded_data_cache=decoded_data_cache)
+
+    @classmethod
+    def delete_persisted_index(cls, redis: Redis) -> None:
+        """
+        Force a full rebuild of the persisted index next time a `DbTxDecoder` is loaded, for example if a stored
+        `ContractAbi` is modified
+        """
+        redis.delete(cls.PERSISTED_INDEX_KEY)
+
+    def _get_db_abis_with_priority(
+        self, ids: Optional[Collection[int]] = None
+    ) -> List[Tuple[AbiPriority, ABI]]:
+        """
+        :param ids: If provided, only return `ContractAbi` with those ids
+        :return: List of tuples with the priority and the ABI, sorted by priority. If there's a collision on the
+            selector the ABI with the highest priority is used: more relevant `ContractAbi` first, then the most
+            recent one
+        """
+        queryset = ContractAbi.objects.order_by("-relevance", "id")
+        if ids is not None:
+            queryset = queryset.filter(id__in=ids)
+        return [
+            ((0, -relevance, contract_abi_id), abi)
+            for contract_abi_id, relevance, abi in queryset.values_list(
+                "id", "relevance", "abi"
+            )
+        ]
+
+    def _get_db_abis(self) -> List[ABI]:
+        """
+        :return: ABIs stored in database sorted by priority
+        """
+        return [abi for _, abi in self._get_db_abis_with_priority()]
+
+    def _update_selectors_index(
+        self,
+        fn_selectors_with_abis: Dict[bytes, ABI],
+        fn_selectors_priorities: Dict[bytes, AbiPriority],
+        abis_with_priority: Sequence[Tuple[AbiPriority, ABI]],
+    ) -> Dict[bytes, ABI]:
+        """
+        Add ABIs to the index. The result is the same regardless of the order the ABIs are provided, so
+        updating a persisted index gives the same result as a full rebuild
+
+        :param fn_selectors_with_abis: Will be updated
+        :param fn_selectors_priorities: Will be updated
+        :param abis_with_priority:
+        :return: Selectors updated with their new ABI
+        """
+        updated_selectors_with_abis = {}
+        for priority, abi in abis_with_priority:
+            for fn_selector, fn_abi in self._generate_selectors_with_abis_from_abi(
+                abi
+            ).items():
+                if (
+                    fn_selector not in fn_selectors_priorities
+                    or priority >= fn_selectors_priorities[fn_selector]
+                ):
+                    fn_selectors_with_abis[fn_selector] = fn_abi
+                    fn_selectors_priorities[fn_selector] = priority
+                    updated_selectors_with_abis[fn_selector] = fn_abi
+        return updated_selectors_with_abis
+
+    def _get_persisted_index(
+        self, code_abis_version: str
+    ) -> Optional[
+        Tuple[Dict[bytes, ABI], Dict[bytes, AbiPriority], FrozenSet[int], str]
+    ]:
+        """
+        :param code_abis_version: Hash of the ABIs not stored in database
+        :return: Tuple with the persisted selectors index, the priority for every selector, the `ContractAbi`
+            ids processed and the ABIs version of the index, `None` if not found or if it was built with
+            different ABIs
+        """
+        try:
+            if persisted_index := self.redis.get(self.PERSISTED_INDEX_KEY):
+                (
+                    version,
+                    fn_selectors_with_abis,
+                    fn_selectors_priorities,
+                    contract_abi_ids,
+                    abis_version,
+                ) = pickle.loads(persisted_index)
+                if version == code_abis_version:
+                    return (
+                        fn_selectors_with_abis,
+                        fn_selectors_priorities,
+                        contract_abi_ids,
+                        abis_version,
+                    )
+        except (RedisError, pickle.UnpicklingError, ValueError):
+            logger.warning("Cannot load persisted selectors index", exc_info=True)
+        return None
+
+    def _set_persisted_index(
+        self,
+        code_abis_version: str,
+        fn_selectors_with_abis: Dict[bytes, ABI],
+        fn_selectors_priorities: Dict[bytes, AbiPriority],
+        contract_abi_ids: FrozenSet[int],
+        abis_version: str,
+    ) -> None:
+        try:
+            self.redis.set(
+                self.PERSISTED_INDEX_KEY,
+                pickle.dumps(
+                    (
+                        code_abis_version,
+                        fn_selectors_with_abis,
+                        fn_selectors_priorities,
+                        contract_abi_ids,
+                        abis_version,
+                    ),
+                    protocol=pickle.HIGHEST_PROTOCOL,
+                ),
+            )
+        except RedisError:
+            logger.warning("Cannot store persisted selectors index", exc_info=True)
+
+    def _load_fn_selectors_with_abis(self) -> Dict[bytes, ABI]:
+        if not self.redis:
+            return super()._load_fn_selectors_with_abis()
+
+        # ABIs not stored in database are only imported if the index must be rebuilt
+        code_abis_version = get_code_abis_version()
+        # Processed `ContractAbi` are tracked by id instead of keeping the last id processed, as ids are not
+        # guaranteed to be committed in order
+        contract_abi_ids = frozenset(ContractAbi.objects.values_list("id", flat=True))
+        persisted_index = self._get_persisted_index(code_abis_version)
+        if persisted_index and not (persisted_index[2] - contract_abi_ids):
+            (
+                fn_selectors_with_abis,
+                fn_selectors_priorities,
+                processed_ids,
+                abis_version,
+            ) = persisted_index
+            new_ids = contract_abi_ids - processed_ids
+            db_abis_with_priority = (
+                self._get_db_abis_with_priority(ids=new_ids) if new_ids else []
+            )
+            logger.info(
+                "%s: Loaded persisted selectors index, %d new ABIs found on database",
+                self.__class__.__name__,
+                len(db_abis_with_priority),
+            )
+            if updated_selectors_with_abis := self._update_selectors_index(
+                fn_selectors_with_abis, fn_selectors_priorities, db_abis_with_priority
+            ):
+                abis_version = self._get_selectors_version(
+                    updated_selectors_with_abis, previous_version=abis_version
+                )
+        else:
+            # Not persisted or some `ContractAbi` were deleted, rebuild it
+            new_ids = contract_abi_ids
+            fn_selectors_with_abis = {}
+            fn_selectors_priorities = {}
+            self._update_selectors_index(
+                fn_selectors_with_abis,
+                fn_selectors_priorities,
+                self._get_db_abis_with_priority()
+                + [
+                    ((1, i, 0), code_abi)
+                    for i, code_abi in enumerate(super().get_supported_abis())
+                ],
+            )
+            abis_version = self._get_selectors_version(fn_selectors_with_abis)
+
+        if new_ids or not persisted_index:
+            self._set_persisted_index(
+                code_abis_version,
+                fn_selectors_with_abis,
+                fn_selectors_priorities,
+                contract_abi_ids,
+                abis_version,
+            )
+        self.persisted_abis_version = abis_version
+        return fn_selectors_with_abis
+
+    def _get_abis_version(self) -> str:
+        """
+        :return: Version stored with the persisted index. If index is not persisted, ABIs depend on the database,
+            so version must be calculated every time
+        """
+        if self.persisted_abis_version:
+            return self.persisted_abis_version
+        return self._get_selectors_version(self.fn_selectors_with_abis)
+
     def get_supported_abis(self) -> List[Type[Contract]]:
         supported_abis = super().get_supported_abis()
-        db_abis = list(
-            ContractAbi.objects.all()
-            .order_by("-relevance")
-            .values_list("abi", flat=True)
-        )
-        return db_abis + supported_abis
+        return self._get_db_abis() + supported_abis
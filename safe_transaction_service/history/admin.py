@@ -11,6 +11,7 @@ from gnosis.eth import EthereumClientProvider
 
 from .models import (
     ERC20Transfer,
+    ERC721Ownership,
     ERC721Transfer,
     EthereumBlock,
     EthereumTx,
@@ -22,6 +23,7 @@ from .models import (
     ProxyFactory,
     SafeContract,
     SafeContractDelegate,
+    SafeLastStatus,
     SafeMasterCopy,
     SafeStatus,
     WebHook,
@@ -117,9 +119,13 @@ class ERC20TransferAdmin(TokenTransferAdmin):
     @admin.action(description="Convert to ERC721 Transfer")
     @atomic
     def to_erc721(self, request, queryset):
+        erc721_tokens = []
         for element in queryset:
-            element.to_erc721_transfer().save()
+            erc721_transfer = element.to_erc721_transfer()
+            erc721_transfer.save()
+            erc721_tokens.append((erc721_transfer.address, erc721_transfer.token_id))
         queryset.delete()
+        ERC721Ownership.objects.update_owners(erc721_tokens)
 
 
 @admin.register(ERC721Transfer)
@@ -129,9 +135,12 @@ class ERC721TransferAdmin(TokenTransferAdmin):
     @admin.action(description="Convert to ERC20 Transfer")
     @atomic
     def to_erc20(self, request, queryset):
+        erc721_tokens = []
         for element in queryset:
             element.to_erc20_transfer().save()
+            erc721_tokens.append((element.address, element.token_id))
         queryset.delete()
+        ERC721Ownership.objects.update_owners(erc721_tokens)
 
 
 @admin.register(EthereumTx)
@@ -550,6 +559,11 @@ class SafeStatusAdmin(admin.ModelAdmin):
         IndexServiceProvider().reprocess_addresses(safe_addresses)
 
 
+@admin.register(SafeLastStatus)
+class SafeLastStatusAdmin(SafeStatusAdmin):
+    ordering = ["address"]
+
+
 @admin.register(WebHook)
 class WebHookAdmin(admin.ModelAdmin):
     list_display = (
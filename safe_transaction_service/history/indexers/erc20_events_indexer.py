@@ -1,26 +1,60 @@
 import operator
 from collections import OrderedDict
+from functools import cached_property
 from logging import getLogger
-from typing import Iterator, List, Sequence
+from typing import Iterator, List, Optional, Sequence, Tuple
 
+import eth_abi
 from cache_memoize import cache_memoize
 from cachetools import cachedmethod
 from eth_abi.exceptions import DecodingError
 from eth_typing import ChecksumAddress
+from hexbytes import HexBytes
 from web3.contract import ContractEvent
 from web3.exceptions import BadFunctionCallOutput
-from web3.types import EventData, LogReceipt
+from web3.types import ABIEvent, EventData, FilterParams, LogReceipt
 
 from gnosis.eth import EthereumClient
+from gnosis.eth.constants import ERC20_721_TRANSFER_TOPIC
 
 from safe_transaction_service.tokens.models import Token
 
-from ..models import ERC20Transfer, ERC721Transfer, SafeContract, TokenTransfer
+from ..models import (
+    ERC20Transfer,
+    ERC721Ownership,
+    ERC721Transfer,
+    SafeContract,
+    TokenTransfer,
+)
 from .events_indexer import EventsIndexer
+from .log_decoder import LogDecoder
 
 logger = getLogger(__name__)
 
 
+def _get_transfer_event_abi(
+    third_argument_name: str, indexed: Tuple[bool, bool, bool]
+) -> ABIEvent:
+    return {
+        "anonymous": False,
+        "inputs": [
+            {"indexed": indexed[0], "name": "from", "type": "address"},
+            {"indexed": indexed[1], "name": "to", "type": "address"},
+            {"indexed": indexed[2], "name": third_argument_name, "type": "uint256"},
+        ],
+        "name": "Transfer",
+        "type": "event",
+    }
+
+
+# ERC20 and ERC721 `Transfer` events have the same topic, they can be told apart by the number of topics
+TRANSFER_EVENT_ABIS: List[ABIEvent] = [
+    _get_transfer_event_abi("value", (True, True, False)),  # ERC20
+    _get_transfer_event_abi("tokenId", (True, True, True)),  # ERC721
+    _get_transfer_event_abi("unknown", (False, False, False)),  # Not standard
+]
+
+
 class Erc20EventsIndexerProvider:
     def __new__(cls):
         if not hasattr(cls, "instance"):
@@ -59,6 +93,20 @@ class Erc20EventsIndexer(EventsIndexer):
     def database_queryset(self):
         return SafeContract.objects.all()
 
+    def _get_bloom_filter_values(
+        self, addresses: List[ChecksumAddress]
+    ) -> Tuple[List[bytes], List[bytes]]:
+        """
+        Transfer events have `from` and `to` as topics, so Safe addresses must be on the bloom as 32 bytes topics
+        instead of the address of the log
+        """
+        topics = [HexBytes(ERC20_721_TRANSFER_TOPIC)]
+        if len(addresses) > 300:  # Every transfer event will be retrieved
+            return topics, []
+        return topics, [
+            HexBytes(eth_abi.encode_single("address", address)) for address in addresses
+        ]
+
     def _do_node_query(
         self,
         addresses: List[ChecksumAddress],
@@ -74,9 +122,17 @@ class Erc20EventsIndexer(EventsIndexer):
         :return:
         """
         parameter_addresses = None if len(addresses) > 300 else addresses
-        transfer_events = self.ethereum_client.erc20.get_total_transfer_history(
-            parameter_addresses, from_block=from_block_number, to_block=to_block_number
-        )
+        if (
+            ingested_logs := self._get_ingested_logs(from_block_number, to_block_number)
+        ) is not None:
+            parameter_addresses = None  # Logs need to be filtered
+            transfer_events = self.log_decoder.decode_logs(
+                ingested_logs, include_log_fields=True
+            )
+        else:
+            transfer_events = self._get_transfer_events(
+                parameter_addresses, from_block_number, to_block_number
+            )
         if parameter_addresses:
             return transfer_events  # Results are already filtered
         else:
@@ -88,6 +144,55 @@ class Erc20EventsIndexer(EventsIndexer):
                 or transfer_event["args"]["from"] in addresses
             ]
 
+    @cached_property
+    def log_decoder(self) -> LogDecoder:
+        return LogDecoder(TRANSFER_EVENT_ABIS)
+
+    def _get_transfer_events(
+        self,
+        addresses: Optional[List[ChecksumAddress]],
+        from_block_number: int,
+        to_block_number: int,
+    ) -> List[EventData]:
+        """
+        Same as `Erc20Manager.get_total_transfer_history`, but decoding the logs with the `log_decoder`
+
+        :param addresses: If provided, only transfers from or to the addresses are returned
+        :param from_block_number:
+        :param to_block_number:
+        :return: Decoded ERC20 and ERC721 transfer events, keeping every log field, sorted by `blockNumber`
+            and `logIndex`
+        """
+        transfer_topic = HexBytes(ERC20_721_TRANSFER_TOPIC).hex()
+        if addresses:
+            addresses_encoded = [
+                HexBytes(eth_abi.encode_single("address", address)).hex()
+                for address in addresses
+            ]
+            all_topics = [
+                [transfer_topic, addresses_encoded],  # Transfers from the addresses
+                [transfer_topic, None, addresses_encoded],  # Transfers to the addresses
+            ]
+        else:
+            all_topics = [[transfer_topic]]
+
+        transfer_events = []
+        for topics in all_topics:
+            parameters: FilterParams = {
+                "fromBlock": from_block_number,
+                "toBlock": to_block_number,
+                "topics": topics,
+            }
+            transfer_events.extend(
+                self.log_decoder.decode_logs(
+                    self.ethereum_client.slow_w3.eth.get_logs(parameters),
+                    include_log_fields=True,
+                )
+            )
+        return sorted(
+            transfer_events, key=lambda event: (event["blockNumber"], event["logIndex"])
+        )
+
     @cachedmethod(cache=operator.attrgetter("_cache_is_erc20"))
     @cache_memoize(60 * 60 * 24, prefix="erc20-events-indexer-is-erc20")  # 1 day
     def _is_erc20(self, token_address: str) -> bool:
@@ -157,13 +262,25 @@ class Erc20EventsIndexer(EventsIndexer):
             logger.debug("End prefetching and storing of ethereum txs")
 
             logger.debug("Storing TokenTransfer objects")
-            result_erc20 = ERC20Transfer.objects.bulk_create_from_generator(
-                self.events_to_erc20_transfer(log_receipts), ignore_conflicts=True
+            result_erc20 = ERC20Transfer.objects.bulk_copy_from_generator(
+                self.events_to_erc20_transfer(log_receipts),
+                ["ethereum_tx", "log_index"],
+            )
+            erc721_transfers = list(self.events_to_erc721_transfer(log_receipts))
+            result_erc721 = ERC721Transfer.objects.bulk_copy_from_generator(
+                erc721_transfers,
+                ["ethereum_tx", "log_index"],
             )
-            result_erc721 = ERC721Transfer.objects.bulk_create_from_generator(
-                self.events_to_erc721_transfer(log_receipts), ignore_conflicts=True
+            ERC721Ownership.objects.update_owners(
+                (erc721_transfer.address, erc721_transfer.token_id)
+                for erc721_transfer in erc721_transfers
             )
             logger.debug("Stored TokenTransfer objects")
+            self.safe_data_version_service.increment_versions(
+                address
+                for log_receipt in log_receipts
+                for address in (log_receipt["args"]["from"], log_receipt["args"]["to"])
+            )
             return range(
                 result_erc20 + result_erc721
             )  # TODO Hack to prevent returning `TokenTransfer` and using too much RAM
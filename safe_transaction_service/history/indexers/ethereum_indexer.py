@@ -1,19 +1,35 @@
 import time
 from abc import ABC, abstractmethod
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from logging import getLogger
-from typing import Any, List, Optional, Sequence, Tuple
+from typing import Any, Deque, Dict, List, Optional, Sequence, Tuple
 
+from django.conf import settings
+from django.db import connection
 from django.db.models import Min
 
 from celery.exceptions import SoftTimeLimitExceeded
+from redis.exceptions import RedisError
 from web3 import Web3
 
 from gnosis.eth import EthereumClient
 
+from safe_transaction_service.utils.redis import get_redis
 from safe_transaction_service.utils.utils import chunks
 
 from ..models import MonitoredAddress
-from ..services import IndexingException, IndexService, IndexServiceProvider
+from ..services import (
+    BlockIngestionService,
+    BlockIngestionServiceProvider,
+    ChainDataCache,
+    ChainDataCacheProvider,
+    IndexingException,
+    IndexService,
+    IndexServiceProvider,
+    SafeDataVersionService,
+    SafeDataVersionServiceProvider,
+)
 
 logger = getLogger(__name__)
 
@@ -42,6 +58,9 @@ class EthereumIndexer(ABC):
         updated_blocks_behind: int = 20,
         query_chunk_size: int = 200,
         block_auto_process_limit: bool = True,
+        block_process_limit_target_seconds: float = 5.0,
+        block_process_limit_target_elements: int = 1000,
+        pipeline_depth: int = 0,
     ):
         """
         :param ethereum_client:
@@ -57,13 +76,23 @@ class EthereumIndexer(ABC):
         :param query_chunk_size: Number of addresses to query for relevant data in the same request. By testing,
             it seems that `200` can be a good value. If `0`, process all together
         :param block_auto_process_limit: Auto increase or decrease the `block_process_limit`
-            based on congestion algorithm
+            based on congestion algorithm. Learned value is stored on redis, so it's not lost when the
+            indexer is restarted
+        :param block_process_limit_target_seconds: Desired duration for a node query when using
+            `block_auto_process_limit`
+        :param block_process_limit_target_elements: Desired maximum number of elements returned by a node query
+            when using `block_auto_process_limit`. `0` == `No limit`
+        :param pipeline_depth: Number of block ranges to fetch from the node in advance while the current one
+            is processed and stored. `0` or `1` == `Disabled`, every range is fetched and then processed
         """
         self.ethereum_client = ethereum_client
         self.index_service: IndexService = IndexServiceProvider()
         self.index_service.ethereum_client = (
             self.ethereum_client
         )  # Use tracing ethereum client
+        self.safe_data_version_service: SafeDataVersionService = (
+            SafeDataVersionServiceProvider()
+        )
         self.confirmations = confirmations
         self.initial_block_process_limit = block_process_limit
         self.block_process_limit = block_process_limit
@@ -72,6 +101,22 @@ class EthereumIndexer(ABC):
         self.updated_blocks_behind = updated_blocks_behind
         self.query_chunk_size = query_chunk_size
         self.block_auto_process_limit = block_auto_process_limit
+        self.block_process_limit_target_seconds = block_process_limit_target_seconds
+        self.block_process_limit_target_elements = block_process_limit_target_elements
+        self.pipeline_depth = pipeline_depth
+        self._pipeline_executor: Optional[ThreadPoolExecutor] = None
+        # Blocks near the chain tip can be shared between indexers
+        self.block_ingestion_service: Optional[BlockIngestionService] = (
+            BlockIngestionServiceProvider() if settings.ETH_BLOCK_INGESTION else None
+        )
+        # Finalized data is kept locally so it's not requested again when reindexing
+        self.chain_data_cache: Optional[ChainDataCache] = (
+            ChainDataCacheProvider() if settings.ETH_CHAIN_DATA_CACHE_DIR else None
+        )
+        if self.block_auto_process_limit and settings.ETH_INDEXER_STORE_PROCESS_LIMIT:
+            self.block_process_limit = self.clamp_block_process_limit(
+                self.get_stored_block_process_limit() or self.block_process_limit
+            )
 
     @property
     @abstractmethod
@@ -175,6 +220,44 @@ class EthereumIndexer(ABC):
             self.database_field
         ]
 
+    def get_indexed_block_numbers(self, addresses: Sequence[str]) -> Dict[str, int]:
+        """
+        :param addresses:
+        :return: Dictionary of `address: last block number indexed`. Addresses never indexed are not returned
+        """
+        return dict(
+            self.database_queryset.filter(address__in=addresses)
+            .exclude(**{self.database_field: None})
+            .values_list("address", self.database_field)
+        )
+
+    def get_addresses_for_search(
+        self,
+        addresses: Sequence[str],
+        to_block_number: int,
+        indexed_block_numbers: Optional[Dict[str, int]] = None,
+    ) -> List[str]:
+        """
+        `from_block_number` for a search is the minimum block number indexed for all the `addresses`, so it could
+        happen that some addresses were already indexed until `to_block_number`. Querying them again would make
+        the node scan blocks already processed for those addresses, so they are left out of the search.
+        Addresses behind `to_block_number` are merged in the same query, so the node only scans again
+        at most `block_process_limit` blocks for them
+
+        :param addresses:
+        :param to_block_number: Ending block number of the search
+        :param indexed_block_numbers: Result of `get_indexed_block_numbers`, to prevent querying the database
+        :return: `addresses` not indexed until `to_block_number`, keeping the order
+        """
+        if indexed_block_numbers is None:
+            indexed_block_numbers = self.get_indexed_block_numbers(addresses)
+        return [
+            address
+            for address in addresses
+            if (block_number := indexed_block_numbers.get(address)) is not None
+            and block_number < to_block_number
+        ]
+
     def get_almost_updated_addresses(
         self, current_block_number: int
     ) -> List[MonitoredAddress]:
@@ -243,6 +326,185 @@ class EthereumIndexer(ABC):
 
         return updated_addresses
 
+    @property
+    def block_process_limit_redis_key(self) -> str:
+        return f"indexer:{self.__class__.__name__}:block-process-limit"
+
+    def get_stored_block_process_limit(self) -> Optional[int]:
+        """
+        :return: `block_process_limit` learned by a previous run of the indexer, `None` if not found
+        """
+        try:
+            if block_process_limit := get_redis().get(
+                self.block_process_limit_redis_key
+            ):
+                return int(block_process_limit)
+        except RedisError:
+            logger.warning(
+                "%s: Cannot retrieve stored block_process_limit",
+                self.__class__.__name__,
+                exc_info=True,
+            )
+        return None
+
+    def clamp_block_process_limit(self, block_process_limit: int) -> int:
+        """
+        :param block_process_limit:
+        :return: `block_process_limit` bounded between `1` and `block_process_limit_max`
+        """
+        block_process_limit = max(block_process_limit, 1)
+        if (
+            self.block_process_limit_max
+            and block_process_limit > self.block_process_limit_max
+        ):
+            logger.info(
+                "%s: block_process_limit %d is bigger than block_process_limit_max %d, reducing",
+                self.__class__.__name__,
+                block_process_limit,
+                self.block_process_limit_max,
+            )
+            block_process_limit = self.block_process_limit_max
+        return block_process_limit
+
+    def set_block_process_limit(self, block_process_limit: int) -> None:
+        """
+        Set a new `block_process_limit`, respecting `block_process_limit_max`, and store it so it's used
+        if the indexer is restarted
+
+        :param block_process_limit:
+        """
+        block_process_limit = self.clamp_block_process_limit(block_process_limit)
+        if block_process_limit == self.block_process_limit:
+            return None
+
+        logger.info(
+            "%s: block_process_limit changed from %d to %d",
+            self.__class__.__name__,
+            self.block_process_limit,
+            block_process_limit,
+        )
+        self.block_process_limit = block_process_limit
+        if settings.ETH_INDEXER_STORE_PROCESS_LIMIT:
+            try:
+                get_redis().set(
+                    self.block_process_limit_redis_key, self.block_process_limit
+                )
+            except RedisError:
+                logger.warning(
+                    "%s: Cannot store block_process_limit",
+                    self.__class__.__name__,
+                    exc_info=True,
+                )
+
+    def update_block_process_limit(
+        self, elapsed_seconds: float, number_elements: int
+    ) -> None:
+        """
+        Adjust `block_process_limit` so node queries take `block_process_limit_target_seconds` and
+        don't return more than `block_process_limit_target_elements`. Correction is proportional to the
+        error and it's bounded to halve or duplicate the current limit every time, so a single slow query
+        cannot make the limit collapse
+
+        :param elapsed_seconds: Duration of the node query for `block_process_limit` blocks
+        :param number_elements: Number of elements returned by the node query
+        """
+        factor = self.block_process_limit_target_seconds / max(elapsed_seconds, 0.01)
+        if 0 < self.block_process_limit_target_elements < number_elements:
+            factor = min(
+                factor, self.block_process_limit_target_elements / number_elements
+            )
+        if 0.8 <= factor <= 1.25:  # Close enough to the target, don't change it
+            return None
+        factor = min(max(factor, 0.5), 2.0)
+        self.set_block_process_limit(int(self.block_process_limit * factor))
+
+    def is_block_process_limit_measurable(
+        self, from_block_number: int, to_block_number: int
+    ) -> bool:
+        """
+        :param from_block_number:
+        :param to_block_number:
+        :return: `True` if a node query for the range can be used to adjust `block_process_limit`. Only queries
+            for the full `block_process_limit` are valid
+        """
+        return bool(
+            self.block_auto_process_limit
+            and self.block_process_limit
+            and (to_block_number - from_block_number) == self.block_process_limit
+        )
+
+    def reduce_block_process_limit_after_failure(
+        self, from_block_number: int, to_block_number: int
+    ) -> None:
+        """
+        Range could be too big for the node, halve `block_process_limit`
+
+        :param from_block_number: Starting block of the failed query
+        :param to_block_number: Ending block of the failed query
+        """
+        if self.block_auto_process_limit and self.block_process_limit:
+            self.set_block_process_limit(
+                min(self.block_process_limit, to_block_number - from_block_number) // 2
+            )
+
+    def find_relevant_elements_timed(
+        self,
+        addresses: Sequence[str],
+        from_block_number: int,
+        to_block_number: int,
+        current_block_number: Optional[int] = None,
+    ) -> Tuple[Sequence[Any], float]:
+        """
+        :return: Result of `find_relevant_elements` and the seconds it took
+        """
+        start = time.time()
+        elements = self.find_relevant_elements(
+            addresses,
+            from_block_number,
+            to_block_number,
+            current_block_number=current_block_number,
+        )
+        return elements, time.time() - start
+
+    def find_relevant_elements_with_auto_process_limit(
+        self,
+        addresses: Sequence[str],
+        from_block_number: int,
+        to_block_number: int,
+        current_block_number: Optional[int] = None,
+    ) -> Sequence[Any]:
+        """
+        Call `find_relevant_elements` and adjust `block_process_limit` depending on the time it took
+        and the number of elements returned
+
+        :param addresses:
+        :param from_block_number:
+        :param to_block_number:
+        :param current_block_number:
+        :return: Relevant elements found
+        """
+        # Optimize number of elements processed every time (block process limit)
+        measurable = self.is_block_process_limit_measurable(
+            from_block_number, to_block_number
+        )
+        try:
+            elements, elapsed_seconds = self.find_relevant_elements_timed(
+                addresses,
+                from_block_number,
+                to_block_number,
+                current_block_number=current_block_number,
+            )
+        except (FindRelevantElementsException, SoftTimeLimitExceeded) as e:
+            self.reduce_block_process_limit_after_failure(
+                from_block_number, to_block_number
+            )
+            raise e
+
+        if measurable:
+            self.update_block_process_limit(elapsed_seconds, len(elements))
+
+        return elements
+
     def process_addresses(
         self, addresses: Sequence[str], current_block_number: Optional[int] = None
     ) -> Tuple[Sequence[Any], bool]:
@@ -268,80 +530,180 @@ class EthereumIndexer(ABC):
 
         updated = to_block_number == (current_block_number - self.confirmations)
 
-        # Optimize number of elements processed every time (block process limit)
-        # Check that we are processing the `block_process_limit`, if not, measures are not valid
-        if (
-            self.block_auto_process_limit
-            and (to_block_number - from_block_number) == self.block_process_limit
-        ):
-            start = int(time.time())
-        else:
-            start = None
+        addresses = self.get_addresses_for_search(addresses, to_block_number)
+        elements = self.find_relevant_elements_with_auto_process_limit(
+            addresses,
+            from_block_number,
+            to_block_number,
+            current_block_number=current_block_number,
+        )
+
+        processed_elements = self.process_elements(elements)
 
+        self.update_monitored_address(addresses, from_block_number, to_block_number)
+        return processed_elements, updated
+
+    @property
+    def pipeline_executor(self) -> ThreadPoolExecutor:
+        """
+        :return: Executor for the pipelined mode. It's kept for the life of the indexer, so workers are
+            not created again every time addresses are processed
+        """
+        if self._pipeline_executor is None:
+            self._pipeline_executor = ThreadPoolExecutor(
+                max_workers=self.pipeline_depth,
+                thread_name_prefix=f"{self.__class__.__name__}-pipeline",
+            )
+        return self._pipeline_executor
+
+    def _find_relevant_elements_on_worker(
+        self,
+        addresses: Sequence[str],
+        from_block_number: int,
+        to_block_number: int,
+        current_block_number: Optional[int] = None,
+    ) -> Tuple[Sequence[Any], float]:
+        """
+        Run `find_relevant_elements_timed` on a pipeline worker. Indexer state (like `block_process_limit`)
+        must not be modified here, it's done by the coordinating thread when the result is consumed
+
+        :return: Result of `find_relevant_elements_timed`
+        """
         try:
-            elements = self.find_relevant_elements(
+            return self.find_relevant_elements_timed(
                 addresses,
                 from_block_number,
                 to_block_number,
                 current_block_number=current_block_number,
             )
-        except (FindRelevantElementsException, SoftTimeLimitExceeded) as e:
-            self.block_process_limit = 1  # Set back to the very minimum
-            logger.info(
-                "%s: block_process_limit set back to %d",
-                self.__class__.__name__,
-                self.block_process_limit,
-            )
-            raise e
+        finally:
+            # Database connections opened by the worker would be leaked, as the worker is not a request
+            connection.close()
 
-        if start:
-            delta = int(time.time()) - start
-            if delta > 30:
-                self.block_process_limit //= 2
-                logger.info(
-                    "%s: block_process_limit halved to %d",
-                    self.__class__.__name__,
-                    self.block_process_limit,
-                )
-            elif delta > 10:
-                new_block_process_limit = max(self.block_process_limit - 20, 1)
-                self.block_process_limit = new_block_process_limit
-                logger.info(
-                    "%s: block_process_limit decreased to %d",
-                    self.__class__.__name__,
-                    self.block_process_limit,
-                )
-            elif delta < 1:
-                self.block_process_limit *= 2
-                logger.info(
-                    "%s: block_process_limit duplicated to %d",
-                    self.__class__.__name__,
-                    self.block_process_limit,
-                )
-            elif delta < 3:
-                self.block_process_limit += 20
-                logger.info(
-                    "%s: block_process_limit increased to %d",
-                    self.__class__.__name__,
-                    self.block_process_limit,
+    def process_addresses_pipelined(
+        self, addresses: Sequence[str], current_block_number: Optional[int] = None
+    ) -> int:
+        """
+        Find and process relevant data for `addresses` until they are updated. Up to `pipeline_depth` block
+        ranges are requested to the node in advance while the current one is being processed and stored,
+        so node and database are not waiting for each other. Ranges are processed and monitored addresses
+        updated in order, so if something fails indexing will resume from the last range stored
+
+        :param addresses: Addresses to process
+        :param current_block_number: To prevent fetching it again
+        :return: Number of processed elements
+        """
+        assert addresses, "Addresses cannot be empty!"
+        assert all(
+            [Web3.isChecksumAddress(address) for address in addresses]
+        ), f"An address has invalid checksum: {addresses}"
+
+        current_block_number = (
+            current_block_number or self.ethereum_client.current_block_number
+        )
+        parameters = self.get_block_numbers_for_search(addresses, current_block_number)
+        if parameters is None:
+            return 0
+
+        last_block_number = current_block_number - self.confirmations
+        next_block_range: Optional[Tuple[int, int]] = parameters
+        # Keep track of indexed block numbers in memory, as ranges are planned before storing the previous ones
+        indexed_block_numbers = self.get_indexed_block_numbers(addresses)
+        pending: Deque[Tuple[Sequence[str], int, int, bool, Future]] = deque()
+        number_processed_elements = 0
+        try:
+            while next_block_range or pending:
+                # Fill the pipeline, `block_process_limit` could be modified by previous node queries
+                while next_block_range and len(pending) < self.pipeline_depth:
+                    from_block_number, to_block_number = next_block_range
+                    addresses_for_search = self.get_addresses_for_search(
+                        addresses,
+                        to_block_number,
+                        indexed_block_numbers=indexed_block_numbers,
+                    )
+                    for address in addresses_for_search:
+                        indexed_block_numbers[address] = to_block_number
+                    measurable = self.is_block_process_limit_measurable(
+                        from_block_number, to_block_number
+                    )
+                    future = self.pipeline_executor.submit(
+                        self._find_relevant_elements_on_worker,
+                        addresses_for_search,
+                        from_block_number,
+                        to_block_number,
+                        current_block_number=current_block_number,
+                    )
+                    pending.append(
+                        (
+                            addresses_for_search,
+                            from_block_number,
+                            to_block_number,
+                            measurable,
+                            future,
+                        )
+                    )
+                    if to_block_number >= last_block_number:
+                        next_block_range = None
+                    else:
+                        next_from_block_number = to_block_number + 1
+                        next_block_range = (
+                            next_from_block_number,
+                            min(
+                                next_from_block_number + self.block_process_limit,
+                                last_block_number,
+                            ),
+                        )
+
+                (
+                    addresses_for_search,
+                    from_block_number,
+                    to_block_number,
+                    measurable,
+                    future,
+                ) = pending.popleft()
+                try:
+                    elements, elapsed_seconds = future.result()
+                except (FindRelevantElementsException, SoftTimeLimitExceeded) as e:
+                    self.reduce_block_process_limit_after_failure(
+                        from_block_number, to_block_number
+                    )
+                    raise e
+                if measurable:
+                    # `block_process_limit` is only modified on this thread
+                    self.update_block_process_limit(elapsed_seconds, len(elements))
+                number_processed_elements += len(self.process_elements(elements))
+                self.update_monitored_address(
+                    addresses_for_search, from_block_number, to_block_number
                 )
+        finally:
+            # If something failed, don't wait for the node queries not needed anymore
+            for *_, future in pending:
+                future.cancel()
 
-        if (
-            self.block_process_limit_max
-            and self.block_process_limit > self.block_process_limit_max
-        ):
-            self.block_process_limit = self.block_process_limit_max
-            logger.info(
-                "%s: block_process_limit %d is bigger than block_process_limit_max %d, reducing",
-                self.__class__.__name__,
-                self.block_process_limit,
-                self.block_process_limit_max,
-            )
+        return number_processed_elements
 
-        processed_elements = self.process_elements(elements)
+    def process_addresses_until_updated(
+        self, addresses: Sequence[str], current_block_number: int
+    ) -> int:
+        """
+        Process `addresses` until they reach `current_block_number`, using the pipelined mode
+        if `pipeline_depth` is configured
 
-        self.update_monitored_address(addresses, from_block_number, to_block_number)
-        return processed_elements, updated
+        :param addresses: Addresses to process
+        :param current_block_number:
+        :return: Number of processed elements
+        """
+        if self.pipeline_depth > 1:
+            return self.process_addresses_pipelined(addresses, current_block_number)
+
+        number_processed_elements = 0
+        updated = False
+        while not updated:
+            processed_elements, updated = self.process_addresses(
+                addresses, current_block_number
+            )
+            number_processed_elements += len(processed_elements)
+        return number_processed_elements
 
     def start(self) -> int:
         """
@@ -374,16 +736,13 @@ class EthereumIndexer(ABC):
             almost_updated_monitored_addresses_chunks = []
 
         for almost_updated_addresses_chunk in almost_updated_monitored_addresses_chunks:
-            updated = False
-            while not updated:
-                almost_updated_addresses = [
-                    monitored_contract.address
-                    for monitored_contract in almost_updated_addresses_chunk
-                ]
-                processed_elements, updated = self.process_addresses(
-                    almost_updated_addresses, current_block_number
-                )
-                number_processed_elements += len(processed_elements)
+            almost_updated_addresses = [
+                monitored_contract.address
+                for monitored_contract in almost_updated_addresses_chunk
+            ]
+            number_processed_elements += self.process_addresses_until_updated(
+                almost_updated_addresses, current_block_number
+            )
 
         not_updated_addresses = self.get_not_updated_addresses(current_block_number)
         if not_updated_addresses:
@@ -393,10 +752,7 @@ class EthereumIndexer(ABC):
                 len(not_updated_addresses),
             )
         for monitored_contract in not_updated_addresses:
-            updated = False
-            while not updated:
-                processed_elements, updated = self.process_addresses(
-                    [monitored_contract.address], current_block_number
-                )
-                number_processed_elements += len(processed_elements)
+            number_processed_elements += self.process_addresses_until_updated(
+                [monitored_contract.address], current_block_number
+            )
         return number_processed_elements
@@ -1,7 +1,7 @@
 from abc import abstractmethod
 from functools import cached_property
 from logging import getLogger
-from typing import Any, Dict, List, Optional, OrderedDict, Sequence
+from typing import Any, Dict, List, Optional, OrderedDict, Sequence, Tuple
 
 from django.conf import settings
 
@@ -9,10 +9,13 @@ from eth_typing import ChecksumAddress
 from eth_utils import event_abi_to_log_topic
 from hexbytes import HexBytes
 from web3.contract import ContractEvent
-from web3.exceptions import LogTopicError
 from web3.types import EventData, FilterParams, LogReceipt
 
+from safe_transaction_service.utils.utils import chunks
+
+from ..utils import bloom_contains_any, get_bloom_bits
 from .ethereum_indexer import EthereumIndexer, FindRelevantElementsException
+from .log_decoder import LogDecoder
 
 logger = getLogger(__name__)
 
@@ -25,6 +28,10 @@ class EventsIndexer(EthereumIndexer):
     IGNORE_ADDRESSES_ON_LOG_FILTER: bool = (
         False  # If True, don't use addresses to filter logs
     )
+    BLOOM_FILTER_BATCH_SIZE: int = 500  # Number of block headers to request together
+    BLOOM_FILTER_MERGE_GAP: int = (
+        10  # Blocks matching the bloom filter closer than this will be queried together
+    )
 
     def __init__(self, *args, **kwargs):
         kwargs.setdefault(
@@ -43,6 +50,10 @@ class EventsIndexer(EthereumIndexer):
         kwargs.setdefault(
             "updated_blocks_behind", settings.ETH_EVENTS_UPDATED_BLOCK_BEHIND
         )  # For last x blocks, process `query_chunk_size` elements together
+        kwargs.setdefault("pipeline_depth", settings.ETH_INDEXER_PIPELINE_DEPTH)
+        self.use_bloom_filter = kwargs.pop(
+            "use_bloom_filter", settings.ETH_EVENTS_BLOOM_FILTER
+        )  # Use block `logsBloom` to skip blocks without relevant events
         super().__init__(*args, **kwargs)
 
     @property
@@ -60,6 +71,26 @@ class EventsIndexer(EthereumIndexer):
             for event in self.contract_events
         }
 
+    @cached_property
+    def log_decoder(self) -> LogDecoder:
+        return LogDecoder([event.abi for event in self.contract_events])
+
+    def _get_ingested_logs(
+        self,
+        from_block_number: int,
+        to_block_number: int,
+    ) -> Optional[List[LogReceipt]]:
+        """
+        :param from_block_number:
+        :param to_block_number:
+        :return: Every log for the block range if they were already fetched by the `BlockIngestionService`,
+            `None` otherwise
+        """
+        if self.block_ingestion_service:
+            return self.block_ingestion_service.get_logs(
+                from_block_number, to_block_number
+            )
+
     def _do_node_query(
         self,
         addresses: List[ChecksumAddress],
@@ -74,6 +105,21 @@ class EventsIndexer(EthereumIndexer):
         :param to_block_number:
         :return:
         """
+        if (
+            ingested_logs := self._get_ingested_logs(from_block_number, to_block_number)
+        ) is not None:
+            addresses_set = set(addresses)  # Faster to check with `in`
+            return [
+                log
+                for log in ingested_logs
+                if log["topics"]
+                and HexBytes(log["topics"][0]).hex() in self.events_to_listen
+                and (
+                    self.IGNORE_ADDRESSES_ON_LOG_FILTER
+                    or log["address"] in addresses_set
+                )
+            ]
+
         filter_topics = list(self.events_to_listen.keys())
         parameters: FilterParams = {
             "fromBlock": from_block_number,
@@ -86,6 +132,61 @@ class EventsIndexer(EthereumIndexer):
 
         return self.ethereum_client.slow_w3.eth.get_logs(parameters)
 
+    def _get_bloom_filter_values(
+        self, addresses: List[ChecksumAddress]
+    ) -> Tuple[List[bytes], List[bytes]]:
+        """
+        :param addresses:
+        :return: Tuple with the topics and the addresses to look for on the `logsBloom` of the blocks. A block
+            can contain relevant events only if one of the topics and one of the addresses are on the bloom.
+            An empty list matches every block
+        """
+        topics = [HexBytes(topic) for topic in self.events_to_listen.keys()]
+        if self.IGNORE_ADDRESSES_ON_LOG_FILTER:
+            return topics, []
+        return topics, [HexBytes(address) for address in addresses]
+
+    def _get_block_ranges_using_bloom_filter(
+        self,
+        addresses: List[ChecksumAddress],
+        from_block_number: int,
+        to_block_number: int,
+    ) -> List[Tuple[int, int]]:
+        """
+        Use `logsBloom` of the block headers to find the blocks that could contain relevant events
+
+        :param addresses:
+        :param from_block_number:
+        :param to_block_number:
+        :return: List of block ranges `(from_block_number, to_block_number)` (both included) that could contain
+            relevant events
+        """
+        topics, bloom_addresses = self._get_bloom_filter_values(addresses)
+        topics_bits = [get_bloom_bits(topic) for topic in topics]
+        addresses_bits = [get_bloom_bits(address) for address in bloom_addresses]
+        block_ranges: List[Tuple[int, int]] = []
+        for block_numbers in chunks(
+            list(range(from_block_number, to_block_number + 1)),
+            self.BLOOM_FILTER_BATCH_SIZE,
+        ):
+            for block_number, block in zip(
+                block_numbers, self.ethereum_client.get_blocks(block_numbers)
+            ):
+                if block and not (  # If block cannot be retrieved, query it
+                    bloom_contains_any(block["logsBloom"], topics_bits)
+                    and bloom_contains_any(block["logsBloom"], addresses_bits)
+                ):
+                    continue
+                if (
+                    block_ranges
+                    and (block_number - block_ranges[-1][1])
+                    <= self.BLOOM_FILTER_MERGE_GAP
+                ):
+                    block_ranges[-1] = (block_ranges[-1][0], block_number)
+                else:
+                    block_ranges.append((block_number, block_number))
+        return block_ranges
+
     def _find_elements_using_topics(
         self,
         addresses: List[ChecksumAddress],
@@ -102,7 +203,21 @@ class EventsIndexer(EthereumIndexer):
         """
 
         try:
-            return self._do_node_query(addresses, from_block_number, to_block_number)
+            if (
+                not self.use_bloom_filter
+                or self._get_ingested_logs(from_block_number, to_block_number)
+                is not None
+            ):
+                return self._do_node_query(
+                    addresses, from_block_number, to_block_number
+                )
+
+            log_receipts = []
+            for block_range in self._get_block_ranges_using_bloom_filter(
+                addresses, from_block_number, to_block_number
+            ):
+                log_receipts.extend(self._do_node_query(addresses, *block_range))
+            return log_receipts
         except IOError as e:
             raise FindRelevantElementsException(
                 f"Request error retrieving events "
@@ -129,6 +244,22 @@ class EventsIndexer(EthereumIndexer):
     def _process_decoded_element(self, decoded_element: EventData) -> Any:
         pass
 
+    def _process_decoded_elements(
+        self, decoded_elements: Sequence[EventData]
+    ) -> List[Any]:
+        """
+        Process decoded events one by one. Override it to process them in batch
+
+        :param decoded_elements:
+        :return: Processed elements, ignoring the ones that returned `None`
+        """
+        processed_elements = []
+        for decoded_element in decoded_elements:
+            processed_element = self._process_decoded_element(decoded_element)
+            if processed_element:
+                processed_elements.append(processed_element)
+        return processed_elements
+
     def find_relevant_elements(
         self,
         addresses: List[ChecksumAddress],
@@ -174,17 +305,12 @@ class EventsIndexer(EthereumIndexer):
     def decode_elements(self, log_receipts: Sequence[LogReceipt]) -> List[EventData]:
         decoded_elements = []
         for log_receipt in log_receipts:
-            try:
-                decoded_elements.append(
-                    self.events_to_listen[log_receipt["topics"][0].hex()].processLog(
-                        log_receipt
-                    )
-                )
-            except LogTopicError:
+            if decoded_element := self.log_decoder.decode_log(log_receipt):
+                decoded_elements.append(decoded_element)
+            else:
                 logger.error(
                     "Unexpected log format for log-receipt %s",
                     log_receipt,
-                    exc_info=True,
                 )
         return decoded_elements
 
@@ -206,10 +332,6 @@ class EventsIndexer(EthereumIndexer):
         self.index_service.txs_create_or_update_from_tx_hashes(tx_hashes)
         logger.debug("End prefetching and storing of ethereum txs")
         logger.debug("Processing %d decoded events", len(decoded_elements))
-        processed_elements = []
-        for decoded_element in decoded_elements:
-            processed_element = self._process_decoded_element(decoded_element)
-            if processed_element:
-                processed_elements.append(processed_element)
+        processed_elements = self._process_decoded_elements(decoded_elements)
         logger.debug("End processing %d decoded events", len(decoded_elements))
         return processed_elements
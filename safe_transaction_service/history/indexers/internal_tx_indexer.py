@@ -1,4 +1,5 @@
 from collections import OrderedDict
+from itertools import islice
 from logging import getLogger
 from typing import Generator, List, Optional, Sequence, Set
 
@@ -31,12 +32,14 @@ class InternalTxIndexerProvider:
                     EthereumClient(settings.ETHEREUM_TRACING_NODE_URL),
                     block_process_limit=min(block_process_limit, 500),
                     blocks_to_reindex_again=blocks_to_reindex_again,
+                    pipeline_depth=settings.ETH_INDEXER_PIPELINE_DEPTH,
                 )
             else:
                 cls.instance = InternalTxIndexer(
                     EthereumClient(settings.ETHEREUM_TRACING_NODE_URL),
                     block_process_limit=block_process_limit,
                     blocks_to_reindex_again=blocks_to_reindex_again,
+                    pipeline_depth=settings.ETH_INDEXER_PIPELINE_DEPTH,
                 )
         return cls.instance
 
@@ -47,6 +50,8 @@ class InternalTxIndexerProvider:
 
 
 class InternalTxIndexer(EthereumIndexer):
+    STORE_BATCH_SIZE = 5000  # Number of traces to store and decode at once
+
     def __init__(self, *args, **kwargs):
         self.tx_decoder = get_safe_tx_decoder()
         self.number_trace_blocks = (
@@ -119,7 +124,10 @@ class InternalTxIndexer(EthereumIndexer):
         addresses_set = set(addresses)  # More optimal to use with `in`
         try:
             block_numbers = list(range(from_block_number, to_block_number + 1))
-            traces = self.ethereum_client.parity.trace_blocks(block_numbers)
+            traces = (
+                self.block_ingestion_service
+                and self.block_ingestion_service.get_traces(block_numbers)
+            ) or self.ethereum_client.parity.trace_blocks(block_numbers)
             tx_hashes = []
             for block_number, trace_list in zip(block_numbers, traces):
                 if not trace_list:
@@ -189,25 +197,32 @@ class InternalTxIndexer(EthereumIndexer):
         return tx_hashes
 
     def _get_internal_txs_to_decode(
-        self, tx_hashes: Sequence[str]
+        self, internal_txs: Sequence[InternalTx]
     ) -> Generator[InternalTxDecoded, None, None]:
         """
         Use generator to be more RAM friendly
+
+        :param internal_txs: InternalTxs already stored on database (`pk` must be populated)
+        :return: InternalTxDecoded for the `internal_txs` that can be decoded and were not decoded before
         """
-        for internal_tx in InternalTx.objects.can_be_decoded().filter(
-            ethereum_tx__in=tx_hashes
-        ):
+        internal_txs = [
+            internal_tx for internal_tx in internal_txs if internal_tx.can_be_decoded
+        ]
+        if not internal_txs:
+            return
+
+        already_decoded_ids = set(
+            InternalTxDecoded.objects.filter(
+                internal_tx__in=[internal_tx.pk for internal_tx in internal_txs]
+            ).values_list("internal_tx_id", flat=True)
+        )
+        for internal_tx in internal_txs:
+            if internal_tx.pk in already_decoded_ids:
+                continue
             try:
                 function_name, arguments = self.tx_decoder.decode_transaction(
                     bytes(internal_tx.data)
                 )
-                if (
-                    internal_tx.pk is None
-                ):  # pk is not populated on `bulk_create ignore_conflicts=True`
-                    internal_tx = InternalTx.objects.get(
-                        ethereum_tx=internal_tx.ethereum_tx,
-                        trace_address=internal_tx.trace_address,
-                    )
                 yield InternalTxDecoded(
                     internal_tx=internal_tx,
                     function_name=function_name,
@@ -227,11 +242,15 @@ class InternalTxIndexer(EthereumIndexer):
         logger.debug("End prefetching and storing of ethereum txs")
 
         logger.debug("Prefetching of traces(internal txs)")
+        if self.chain_data_cache:
+            txs_traces = self.chain_data_cache.trace_transactions(
+                self.ethereum_client, tx_hashes
+            )
+        else:
+            txs_traces = self.ethereum_client.parity.trace_transactions(tx_hashes)
         internal_txs = (
             InternalTx.objects.build_from_trace(trace, ethereum_tx)
-            for ethereum_tx, traces in zip(
-                ethereum_txs, self.ethereum_client.parity.trace_transactions(tx_hashes)
-            )
+            for ethereum_tx, traces in zip(ethereum_txs, txs_traces)
             for trace in self.ethereum_client.parity.filter_out_errored_traces(traces)
         )
         revelant_internal_txs_batch = (
@@ -239,21 +258,35 @@ class InternalTxIndexer(EthereumIndexer):
         )
         logger.debug("End prefetching of traces(internal txs)")
 
-        logger.debug("Storing traces")
+        logger.debug("Storing and decoding traces")
+        traces_stored = 0
+        internal_txs_decoded = 0
         with transaction.atomic():
-            traces_stored = InternalTx.objects.bulk_create_from_generator(
-                revelant_internal_txs_batch, ignore_conflicts=True
-            )
-            logger.debug("End storing of %d traces", traces_stored)
-
-            logger.debug("Start decoding and storing of decoded traces")
-            internal_txs_decoded = InternalTxDecoded.objects.bulk_create_from_generator(
-                self._get_internal_txs_to_decode(tx_hashes), ignore_conflicts=True
-            )
-            logger.debug(
-                "End decoding and storing of %d decoded traces", internal_txs_decoded
-            )
-            return tx_hashes
+            while internal_txs_batch := list(
+                islice(revelant_internal_txs_batch, self.STORE_BATCH_SIZE)
+            ):
+                self.safe_data_version_service.increment_versions(
+                    address
+                    for internal_tx in internal_txs_batch
+                    if internal_tx.is_ether_transfer
+                    for address in (internal_tx._from, internal_tx.to)
+                )
+                # Primary keys are populated, so there's no need to query the traces again for decoding them
+                traces_stored += InternalTx.objects.bulk_copy_from_generator(
+                    internal_txs_batch, ["ethereum_tx", "trace_address"]
+                )
+                internal_txs_decoded += (
+                    InternalTxDecoded.objects.bulk_create_from_generator(
+                        self._get_internal_txs_to_decode(internal_txs_batch),
+                        ignore_conflicts=True,
+                    )
+                )
+        logger.debug(
+            "End storing of %d traces and %d decoded traces",
+            traces_stored,
+            internal_txs_decoded,
+        )
+        return tx_hashes
 
 
 class InternalTxIndexerWithTraceBlock(InternalTxIndexer):
@@ -0,0 +1,189 @@
+from functools import lru_cache
+from logging import getLogger
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from eth_abi.decoding import ContextFramesBytesIO, TupleDecoder
+from eth_abi.exceptions import DecodingError
+from eth_abi.registry import registry
+from eth_utils import event_abi_to_log_topic, to_checksum_address
+from hexbytes import HexBytes
+from web3._utils.abi import map_abi_data
+from web3._utils.events import get_event_abi_types_for_decoding
+from web3._utils.normalizers import BASE_RETURN_NORMALIZERS
+from web3.types import ABIEvent, EventData, LogReceipt
+
+logger = getLogger(__name__)
+
+
+@lru_cache(maxsize=10_000)
+def _to_checksum_address(address: str) -> str:
+    return to_checksum_address(address)
+
+
+class EventAbiDecoder:
+    """
+    Decoder for one event ABI. `eth_abi` decoders for the topics and for the data are built only once, instead
+    of every time a log is decoded like `ContractEvent.processLog` does
+    """
+
+    def __init__(self, event_abi: ABIEvent):
+        self.name: str = event_abi["name"]
+        self.topic = bytes(event_abi_to_log_topic(event_abi))
+        indexed_inputs = [
+            event_input for event_input in event_abi["inputs"] if event_input["indexed"]
+        ]
+        data_inputs = [
+            event_input
+            for event_input in event_abi["inputs"]
+            if not event_input["indexed"]
+        ]
+        self.number_topics = len(indexed_inputs) + 1  # First topic is the event topic
+        self.indexed_names = [event_input["name"] for event_input in indexed_inputs]
+        self.data_names = [event_input["name"] for event_input in data_inputs]
+        indexed_types = list(get_event_abi_types_for_decoding(indexed_inputs))
+        data_types = list(get_event_abi_types_for_decoding(data_inputs))
+        self.indexed_decoder = self._build_decoder(indexed_types)
+        self.data_decoder = self._build_decoder(data_types)
+        self.indexed_normalizers = [self._get_normalizer(t) for t in indexed_types]
+        self.data_normalizers = [self._get_normalizer(t) for t in data_types]
+
+    @staticmethod
+    def _build_decoder(abi_types: Sequence[str]) -> TupleDecoder:
+        return TupleDecoder(
+            decoders=tuple(registry.get_decoder(abi_type) for abi_type in abi_types)
+        )
+
+    @staticmethod
+    def _get_normalizer(abi_type: str) -> Optional[Callable[[Any], Any]]:
+        """
+        :param abi_type:
+        :return: Function to normalize decoded values for `abi_type` as `web3` does (checksum addresses),
+            `None` if no normalization is required
+        """
+        if abi_type == "address":
+            return _to_checksum_address
+        elif "address" in abi_type:  # Arrays or tuples
+            return lambda value: map_abi_data(
+                BASE_RETURN_NORMALIZERS, [abi_type], [value]
+            )[0]
+        return None
+
+    @staticmethod
+    def _decode(
+        decoder: TupleDecoder,
+        names: Sequence[str],
+        normalizers: Sequence[Optional[Callable[[Any], Any]]],
+        data: bytes,
+        args: Dict[str, Any],
+    ) -> None:
+        values = decoder(ContextFramesBytesIO(data))
+        for name, normalizer, value in zip(names, normalizers, values):
+            args[name] = normalizer(value) if normalizer else value
+
+    def decode_args(self, log: LogReceipt) -> Dict[str, Any]:
+        """
+        :param log: Log with `number_topics` topics
+        :return: Decoded arguments
+        :raises: DecodingError
+        """
+        args: Dict[str, Any] = {}
+        if self.indexed_names:
+            self._decode(
+                self.indexed_decoder,
+                self.indexed_names,
+                self.indexed_normalizers,
+                b"".join(HexBytes(topic) for topic in log["topics"][1:]),
+                args,
+            )
+        if self.data_names:
+            self._decode(
+                self.data_decoder,
+                self.data_names,
+                self.data_normalizers,
+                HexBytes(log["data"]),
+                args,
+            )
+        return args
+
+
+class LogDecoder:
+    """
+    Decode logs for a set of event ABIs, dispatching them using the topic and the number of topics (so events
+    with the same signature but different indexed arguments, like ERC20 and ERC721 `Transfer`, are supported)
+    """
+
+    def __init__(self, event_abis: Sequence[ABIEvent]):
+        """
+        :param event_abis: If two ABIs have the same topic and number of indexed arguments, last one is used
+        """
+        self.decoders: Dict[bytes, Dict[int, EventAbiDecoder]] = {}
+        for event_abi in event_abis:
+            event_abi_decoder = EventAbiDecoder(event_abi)
+            self.decoders.setdefault(event_abi_decoder.topic, {})[
+                event_abi_decoder.number_topics
+            ] = event_abi_decoder
+
+    @property
+    def topics(self) -> List[bytes]:
+        return list(self.decoders.keys())
+
+    def get_decoder(self, log: LogReceipt) -> Optional[EventAbiDecoder]:
+        """
+        :param log:
+        :return: Decoder for the `log`, `None` if not supported
+        """
+        if not (topics := log["topics"]):
+            return None
+        topic = topics[0]
+        if not isinstance(topic, bytes):
+            topic = HexBytes(topic)
+        decoders_by_number_topics = self.decoders.get(topic)
+        if decoders_by_number_topics:
+            return decoders_by_number_topics.get(len(topics))
+
+    def decode_log(
+        self, log: LogReceipt, include_log_fields: bool = False
+    ) -> Optional[EventData]:
+        """
+        :param log:
+        :param include_log_fields: If `True`, every field in the log (e.g. `topics` and `data`) is kept. If not,
+            only the fields returned by `ContractEvent.processLog` are returned
+        :return: Decoded log, `None` if it cannot be decoded
+        """
+        if not (decoder := self.get_decoder(log)):
+            return None
+
+        try:
+            args = decoder.decode_args(log)
+        except (DecodingError, ValueError, OverflowError):
+            logger.warning("Cannot decode log %s", log, exc_info=True)
+            return None
+
+        if include_log_fields:
+            decoded_log = dict(log)
+        else:
+            decoded_log = {
+                "logIndex": log["logIndex"],
+                "transactionIndex": log["transactionIndex"],
+                "transactionHash": log["transactionHash"],
+                "address": log["address"],
+                "blockHash": log["blockHash"],
+                "blockNumber": log["blockNumber"],
+            }
+        decoded_log["args"] = args
+        decoded_log["event"] = decoder.name
+        return decoded_log
+
+    def decode_logs(
+        self, logs: Sequence[LogReceipt], include_log_fields: bool = False
+    ) -> List[EventData]:
+        """
+        :param logs:
+        :param include_log_fields: If `True`, every field in the log is kept
+        :return: Decoded logs. Logs that cannot be decoded are not returned
+        """
+        return [
+            decoded_log
+            for log in logs
+            if (decoded_log := self.decode_log(log, include_log_fields))
+        ]
@@ -1,8 +1,8 @@
 from functools import cached_property
 from logging import getLogger
-from typing import List, Optional
+from typing import Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
 
-from django.db import IntegrityError, transaction
+from django.db import transaction
 
 from eth_abi import decode_abi
 from eth_typing import ChecksumAddress
@@ -27,6 +27,12 @@ from .events_indexer import EventsIndexer
 logger = getLogger(__name__)
 
 
+class SafeEventInternalTxs(NamedTuple):
+    internal_tx: InternalTx
+    child_internal_tx: Optional[InternalTx]  # For Ether transfers
+    internal_tx_decoded: Optional[InternalTxDecoded]
+
+
 class SafeEventsIndexerProvider:
     def __new__(cls):
         if not hasattr(cls, "instance"):
@@ -183,10 +189,14 @@ class SafeEventsIndexer(EventsIndexer):
     def decode_elements(self, *args) -> List[EventData]:
         return super().decode_elements(*args)
 
-    @transaction.atomic
-    def _process_decoded_element(
-        self, decoded_element: EventData
-    ) -> Optional[InternalTx]:
+    def _get_internal_txs(self, decoded_element: EventData) -> SafeEventInternalTxs:
+        """
+        Build the models for an event, without checking or modifying the database. `ProxyCreation` and
+        `SafeSetup` events need extra processing, done by `_process_decoded_elements`
+
+        :param decoded_element:
+        :return: `InternalTx`, child `InternalTx` for ether transfers and `InternalTxDecoded`
+        """
         safe_address = decoded_element["address"]
         event_name = decoded_element["event"]
         # As log
@@ -218,39 +228,18 @@ class SafeEventsIndexer(EventsIndexer):
             arguments=args,
         )
         if event_name == "ProxyCreation":
-            # Should be the 2nd event to be indexed, after `SafeSetup`
-            safe_address = args.pop("proxy")
-
-            if self._is_setup_indexed(safe_address):
-                internal_tx = None
-            else:
-                new_trace_address = f"{trace_address},0"
-                to = args.pop("singleton")
-
-                # Try to update InternalTx created by SafeSetup (if Safe was created using the ProxyFactory) with
-                # the master copy used. Without tracing it cannot be detected otherwise
-                InternalTx.objects.filter(
-                    contract_address=safe_address, decoded_tx__function_name="setup"
-                ).update(to=to, contract_address=None, trace_address=new_trace_address)
-                # Add creation internal tx. _from is the address of the proxy instead of the safe_address
-                internal_tx.contract_address = safe_address
-                internal_tx.tx_type = InternalTxType.CREATE.value
-                internal_tx.call_type = None
-                internal_tx_decoded = None
+            # Add creation internal tx. _from is the address of the proxy instead of the safe_address
+            internal_tx.contract_address = args.pop("proxy")
+            internal_tx.tx_type = InternalTxType.CREATE.value
+            internal_tx.call_type = None
+            internal_tx_decoded = None
         elif event_name == "SafeSetup":
-            # Should be the 1st event to be indexed, unless custom `to` and `data` are set
-            if self._is_setup_indexed(safe_address):
-                internal_tx = None
-            else:
-                # Usually ProxyCreation is called before SafeSetup, but it can be the opposite if someone
-                # creates a Safe and configure it in the next transaction. Remove it if that's the case
-                InternalTx.objects.filter(contract_address=safe_address).delete()
-                internal_tx.contract_address = safe_address
-                internal_tx_decoded.function_name = "setup"
-                args["payment"] = 0
-                args["paymentReceiver"] = NULL_ADDRESS
-                args["_threshold"] = args.pop("threshold")
-                args["_owners"] = args.pop("owners")
+            internal_tx.contract_address = safe_address
+            internal_tx_decoded.function_name = "setup"
+            args["payment"] = 0
+            args["paymentReceiver"] = NULL_ADDRESS
+            args["_threshold"] = args.pop("threshold")
+            args["_owners"] = args.pop("owners")
         elif event_name == "SafeMultiSigTransaction":
             internal_tx_decoded.function_name = "execTransaction"
             data = HexBytes(args["data"])
@@ -317,22 +306,140 @@ class SafeEventsIndexer(EventsIndexer):
             # 'ExecutionFromModuleSuccess', 'ExecutionFromModuleFailure'
             internal_tx_decoded = None
 
-        if internal_tx:
-            with transaction.atomic():
-                try:
-                    internal_tx.save()
-                    if child_internal_tx:
-                        child_internal_tx.save()
-                    if internal_tx_decoded:
-                        internal_tx_decoded.save()
-                except IntegrityError as exc:
-                    logger.info(
-                        "Ignoring already processed event %s for Safe %s on tx-hash=%s: %s",
-                        event_name,
-                        safe_address,
-                        decoded_element["transactionHash"].hex(),
-                        exc,
-                    )
-                    return
-
-        return internal_tx
+        return SafeEventInternalTxs(internal_tx, child_internal_tx, internal_tx_decoded)
+
+    def _process_decoded_elements(
+        self, decoded_elements: Sequence[EventData]
+    ) -> List[InternalTx]:
+        """
+        Process every event at once. State for `ProxyCreation` and `SafeSetup` events is retrieved using set based
+        queries and then updated in memory, and every `InternalTx` and `InternalTxDecoded` is stored on the
+        same database transaction. Result is the same as processing the events one by one
+
+        :param decoded_elements:
+        :return: Stored `InternalTx`
+        """
+        creation_addresses = {
+            decoded_element["args"]["proxy"]
+            if decoded_element["event"] == "ProxyCreation"
+            else decoded_element["address"]
+            for decoded_element in decoded_elements
+            if decoded_element["event"] in ("ProxyCreation", "SafeSetup")
+        }
+        # `SafeSetup` + `ProxyCreation` events already processed
+        setup_indexed_addresses = set()
+        # `SafeSetup` processed but waiting for `ProxyCreation` to set the master copy
+        setup_not_indexed_addresses = set()
+        if creation_addresses:
+            setup_indexed_addresses = set(
+                InternalTxDecoded.objects.filter(
+                    function_name="setup",
+                    internal_tx___from__in=creation_addresses,
+                    internal_tx__contract_address=None,
+                ).values_list("internal_tx___from", flat=True)
+            )
+            setup_not_indexed_addresses = set(
+                InternalTxDecoded.objects.filter(
+                    function_name="setup",
+                    internal_tx__contract_address__in=creation_addresses,
+                ).values_list("internal_tx__contract_address", flat=True)
+            )
+
+        addresses_to_delete = set()
+        setups_to_update: Dict[ChecksumAddress, Tuple[ChecksumAddress, str]] = {}
+        elements: List[SafeEventInternalTxs] = []
+        for decoded_element in decoded_elements:
+            element = self._get_internal_txs(decoded_element)
+            event_name = decoded_element["event"]
+            if event_name == "ProxyCreation":
+                # Should be the 2nd event to be indexed, after `SafeSetup`
+                safe_address = element.internal_tx.contract_address
+                if safe_address in setup_indexed_addresses:
+                    continue
+
+                # Try to update InternalTx created by SafeSetup (if Safe was created using the ProxyFactory) with
+                # the master copy used. Without tracing it cannot be detected otherwise
+                to = decoded_element["args"]["singleton"]
+                new_trace_address = f"{decoded_element['logIndex']},0"
+                for pending_element in elements:
+                    if (
+                        pending_element.internal_tx.contract_address == safe_address
+                        and pending_element.internal_tx_decoded
+                        and pending_element.internal_tx_decoded.function_name == "setup"
+                    ):
+                        pending_element.internal_tx.to = to
+                        pending_element.internal_tx.contract_address = None
+                        pending_element.internal_tx.trace_address = new_trace_address
+                        setup_indexed_addresses.add(safe_address)
+                if safe_address in setup_not_indexed_addresses:
+                    setup_not_indexed_addresses.remove(safe_address)
+                    setups_to_update[safe_address] = (to, new_trace_address)
+                    setup_indexed_addresses.add(safe_address)
+            elif event_name == "SafeSetup":
+                # Should be the 1st event to be indexed, unless custom `to` and `data` are set
+                safe_address = element.internal_tx.contract_address
+                if safe_address in setup_indexed_addresses:
+                    continue
+
+                # Usually ProxyCreation is called before SafeSetup, but it can be the opposite if someone
+                # creates a Safe and configure it in the next transaction. Remove it if that's the case
+                elements = [
+                    pending_element
+                    for pending_element in elements
+                    if pending_element.internal_tx.contract_address != safe_address
+                ]
+                addresses_to_delete.add(safe_address)
+                setup_not_indexed_addresses.discard(safe_address)
+
+            elements.append(element)
+
+        with transaction.atomic():
+            if addresses_to_delete:
+                InternalTx.objects.filter(
+                    contract_address__in=addresses_to_delete
+                ).delete()
+            for safe_address, (to, trace_address) in setups_to_update.items():
+                InternalTx.objects.filter(
+                    contract_address=safe_address, decoded_tx__function_name="setup"
+                ).update(to=to, contract_address=None, trace_address=trace_address)
+            # Events already processed are ignored
+            InternalTx.objects.bulk_copy_from_generator(
+                (
+                    internal_tx
+                    for element in elements
+                    for internal_tx in (element.internal_tx, element.child_internal_tx)
+                    if internal_tx
+                ),
+                ["ethereum_tx", "trace_address"],
+            )
+            InternalTxDecoded.objects.bulk_create_from_generator(
+                self._get_internal_txs_decoded(elements), ignore_conflicts=True
+            )
+            self.safe_data_version_service.increment_versions(
+                address
+                for element in elements
+                for internal_tx in (element.internal_tx, element.child_internal_tx)
+                if internal_tx and internal_tx.is_ether_transfer
+                for address in (internal_tx._from, internal_tx.to)
+            )
+
+        return [element.internal_tx for element in elements]
+
+    def _get_internal_txs_decoded(
+        self, elements: Sequence[SafeEventInternalTxs]
+    ) -> Iterator[InternalTxDecoded]:
+        """
+        :param elements: With `InternalTx` already stored
+        :return: `InternalTxDecoded` with the `internal_tx_id` populated
+        """
+        for element in elements:
+            if element.internal_tx_decoded:
+                # `pk` of the InternalTx was not available when InternalTxDecoded was created
+                element.internal_tx_decoded.internal_tx = element.internal_tx
+                yield element.internal_tx_decoded
+
+    def _process_decoded_element(
+        self, decoded_element: EventData
+    ) -> Optional[InternalTx]:
+        processed_elements = self._process_decoded_elements([decoded_element])
+        return processed_elements[0] if processed_elements else None
@@ -1,9 +1,10 @@
 from abc import ABC, abstractmethod
 from functools import cache
 from logging import getLogger
-from typing import Dict, List, Optional, Sequence, Union
+from typing import Dict, List, Optional, Sequence, Tuple, Union
 
 from django.db import transaction
+from django.utils import timezone
 
 from eth_typing import ChecksumAddress
 from eth_utils import event_abi_to_log_topic
@@ -25,9 +26,13 @@ from ..models import (
     MultisigConfirmation,
     MultisigTransaction,
     SafeContract,
+    SafeLastStatus,
     SafeMasterCopy,
     SafeStatus,
+    SafeStatusIntegrity,
+    send_bulk_save_signals,
 )
+from ..services.safe_data_version_service import SafeDataVersionServiceProvider
 
 logger = getLogger(__name__)
 
@@ -40,6 +45,361 @@ class OwnerCannotBeRemoved(TxProcessorException):
     pass
 
 
+class SafeTxReplay:
+    """
+    Replay decoded transactions in memory. Last `SafeStatus` for every Safe is only retrieved once, and new
+    `SafeStatus`, `MultisigTransaction`, `MultisigConfirmation` and `ModuleTransaction` are buffered and
+    stored in bulk when `flush` is called, sending the same signals as `get_or_create` and `save` would.
+    Buffered models are not visible on the database until `flush` is called
+    """
+
+    def __init__(self, batch_size: int = 500):
+        """
+        :param batch_size: Batch size for bulk inserts and updates
+        """
+        self.batch_size = batch_size
+        self.safe_statuses: Dict[ChecksumAddress, Optional[SafeStatus]] = {}
+        self.safe_statuses_to_store: List[SafeStatus] = []
+        self.multisig_transactions: List[MultisigTransaction] = []
+        # Confirmations are stored with the signature provided on `execTransaction`, `None` for `approveHash`
+        self.multisig_confirmations: List[
+            Tuple[MultisigConfirmation, Optional[bytes]]
+        ] = []
+        self.module_transactions: List[ModuleTransaction] = []
+
+    def get_last_safe_status(self, address: ChecksumAddress) -> Optional[SafeStatus]:
+        """
+        :param address:
+        :return: Current `SafeStatus` for the Safe. It must not be stored, use `store_safe_status` instead
+        """
+        if address not in self.safe_statuses:
+            safe_last_status = SafeLastStatus.objects.get_or_generate(address)
+            self.safe_statuses[address] = (
+                safe_last_status.get_safe_status() if safe_last_status else None
+            )
+        safe_status = self.safe_statuses[address]
+        if not safe_status:
+            logger.error("SafeStatus not found for address=%s", address)
+        return safe_status
+
+    def store_safe_status(
+        self, safe_status: SafeStatus, internal_tx: InternalTx
+    ) -> SafeStatus:
+        """
+        Store a copy of `safe_status` for `internal_tx`, so `safe_status` can keep being modified
+
+        :param safe_status: Current `SafeStatus` for the Safe
+        :param internal_tx:
+        :return: `safe_status`
+        """
+        self.safe_statuses[safe_status.address] = safe_status
+        self.safe_statuses_to_store.append(
+            SafeStatus(
+                internal_tx=internal_tx,
+                address=safe_status.address,
+                owners=list(safe_status.owners),
+                threshold=safe_status.threshold,
+                nonce=safe_status.nonce,
+                master_copy=safe_status.master_copy,
+                fallback_handler=safe_status.fallback_handler,
+                guard=safe_status.guard,
+                enabled_modules=list(safe_status.enabled_modules),
+            )
+        )
+        return safe_status
+
+    def add_multisig_transaction(self, multisig_transaction: MultisigTransaction):
+        """
+        Same as `MultisigTransaction.objects.get_or_create` with `multisig_transaction` as defaults, and
+        setting execution fields if the existing transaction was not executed
+        """
+        self.multisig_transactions.append(multisig_transaction)
+
+    def add_multisig_confirmation(
+        self,
+        multisig_confirmation: MultisigConfirmation,
+        signature: Optional[bytes] = None,
+    ):
+        """
+        Same as `MultisigConfirmation.objects.get_or_create` with `multisig_confirmation` as defaults
+
+        :param multisig_confirmation:
+        :param signature: If provided (`execTransaction`), existing confirmation signature is updated if
+            different. If not (`approveHash`), `ethereum_tx` is set for existing confirmation if missing
+        """
+        self.multisig_confirmations.append((multisig_confirmation, signature))
+
+    def add_module_transaction(self, module_transaction: ModuleTransaction):
+        """
+        Same as `ModuleTransaction.objects.get_or_create` with `module_transaction` as defaults
+        """
+        self.module_transactions.append(module_transaction)
+
+    @staticmethod
+    def _update_multisig_transaction(
+        multisig_tx: MultisigTransaction, new_multisig_tx: MultisigTransaction
+    ) -> bool:
+        """
+        Set execution fields of `new_multisig_tx` if `multisig_tx` was not executed
+
+        :return: `True` if `multisig_tx` was updated, `False` otherwise
+        """
+        if multisig_tx.ethereum_tx_id:
+            return False
+        multisig_tx.ethereum_tx = new_multisig_tx.ethereum_tx
+        multisig_tx.failed = new_multisig_tx.failed
+        multisig_tx.signatures = new_multisig_tx.signatures
+        multisig_tx.trusted = True
+        multisig_tx.modified = timezone.now()
+        return True
+
+    @staticmethod
+    def _update_multisig_confirmation(
+        multisig_confirmation: MultisigConfirmation,
+        new_multisig_confirmation: MultisigConfirmation,
+        signature: Optional[bytes],
+    ) -> bool:
+        """
+        Check `add_multisig_confirmation`
+
+        :return: `True` if `multisig_confirmation` was updated, `False` otherwise
+        """
+        if signature is None:  # approveHash
+            if multisig_confirmation.ethereum_tx_id:
+                return False
+            multisig_confirmation.ethereum_tx = new_multisig_confirmation.ethereum_tx
+        elif multisig_confirmation.signature != signature:  # execTransaction
+            multisig_confirmation.signature = new_multisig_confirmation.signature
+            multisig_confirmation.signature_type = (
+                new_multisig_confirmation.signature_type
+            )
+        else:
+            return False
+        multisig_confirmation.modified = timezone.now()
+        return True
+
+    def _store_multisig_transactions(
+        self,
+    ) -> Tuple[List[MultisigTransaction], List[MultisigTransaction]]:
+        """
+        :return: Tuple of created and updated `MultisigTransactions`
+        """
+        multisig_txs: Dict[str, MultisigTransaction] = {
+            HexBytes(multisig_tx.safe_tx_hash).hex(): multisig_tx
+            for multisig_tx in MultisigTransaction.objects.filter(
+                safe_tx_hash__in={
+                    multisig_tx.safe_tx_hash
+                    for multisig_tx in self.multisig_transactions
+                }
+            )
+        }
+        created: Dict[str, MultisigTransaction] = {}
+        updated: Dict[str, MultisigTransaction] = {}
+        new_multisig_txs: Dict[str, List[MultisigTransaction]] = {}
+        for new_multisig_tx in self.multisig_transactions:
+            safe_tx_hash = HexBytes(new_multisig_tx.safe_tx_hash).hex()
+            new_multisig_txs.setdefault(safe_tx_hash, []).append(new_multisig_tx)
+            if not (multisig_tx := multisig_txs.get(safe_tx_hash)):
+                multisig_txs[safe_tx_hash] = created[safe_tx_hash] = new_multisig_tx
+            elif (
+                self._update_multisig_transaction(multisig_tx, new_multisig_tx)
+                and safe_tx_hash not in created
+            ):
+                updated[safe_tx_hash] = multisig_tx
+
+        # Transactions can be inserted by the API meanwhile. They are not replaced, but retrieved and
+        # updated as if they existed before
+        MultisigTransaction.objects.bulk_create(
+            created.values(), batch_size=self.batch_size, ignore_conflicts=True
+        )
+        for multisig_tx in MultisigTransaction.objects.filter(
+            safe_tx_hash__in=[
+                multisig_tx.safe_tx_hash for multisig_tx in created.values()
+            ]
+        ):
+            safe_tx_hash = HexBytes(multisig_tx.safe_tx_hash).hex()
+            if multisig_tx.ethereum_tx_id == created[safe_tx_hash].ethereum_tx_id:
+                continue  # Inserted now
+            del created[safe_tx_hash]
+            if any(
+                [
+                    self._update_multisig_transaction(multisig_tx, new_multisig_tx)
+                    for new_multisig_tx in new_multisig_txs[safe_tx_hash]
+                ]
+            ):
+                updated[safe_tx_hash] = multisig_tx
+
+        MultisigTransaction.objects.bulk_update(
+            updated.values(),
+            ["ethereum_tx", "failed", "signatures", "trusted", "modified"],
+            batch_size=self.batch_size,
+        )
+        return list(created.values()), list(updated.values())
+
+    def _store_multisig_confirmations(
+        self,
+    ) -> Tuple[List[MultisigConfirmation], List[MultisigConfirmation]]:
+        """
+        :return: Tuple of created and updated `MultisigConfirmations`
+        """
+        multisig_transaction_hashes = {
+            multisig_confirmation.multisig_transaction_hash
+            for multisig_confirmation, _ in self.multisig_confirmations
+        }
+        multisig_confirmations: Dict[Tuple[str, str], MultisigConfirmation] = {
+            (
+                HexBytes(multisig_confirmation.multisig_transaction_hash).hex(),
+                multisig_confirmation.owner,
+            ): multisig_confirmation
+            for multisig_confirmation in MultisigConfirmation.objects.filter(
+                multisig_transaction_hash__in=multisig_transaction_hashes
+            )
+        }
+        created: Dict[Tuple[str, str], MultisigConfirmation] = {}
+        updated: Dict[Tuple[str, str], MultisigConfirmation] = {}
+        new_multisig_confirmations: Dict[
+            Tuple[str, str], List[Tuple[MultisigConfirmation, Optional[bytes]]]
+        ] = {}
+        for new_multisig_confirmation, signature in self.multisig_confirmations:
+            key = (
+                HexBytes(new_multisig_confirmation.multisig_transaction_hash).hex(),
+                new_multisig_confirmation.owner,
+            )
+            new_multisig_confirmations.setdefault(key, []).append(
+                (new_multisig_confirmation, signature)
+            )
+            if not (multisig_confirmation := multisig_confirmations.get(key)):
+                multisig_confirmations[key] = created[key] = new_multisig_confirmation
+            elif (
+                self._update_multisig_confirmation(
+                    multisig_confirmation, new_multisig_confirmation, signature
+                )
+                and key not in created
+            ):
+                updated[key] = multisig_confirmation
+
+        # Confirmations can be inserted by the API meanwhile. They are not replaced, but retrieved and
+        # updated as if they existed before. Stored instances are used for the created ones, as `id` is not
+        # set when ignoring conflicts
+        MultisigConfirmation.objects.bulk_create(
+            created.values(), batch_size=self.batch_size, ignore_conflicts=True
+        )
+        for multisig_confirmation in MultisigConfirmation.objects.filter(
+            multisig_transaction_hash__in=multisig_transaction_hashes
+        ):
+            key = (
+                HexBytes(multisig_confirmation.multisig_transaction_hash).hex(),
+                multisig_confirmation.owner,
+            )
+            if not (new_multisig_confirmation := created.get(key)):
+                continue
+            if multisig_confirmation.ethereum_tx_id == (
+                new_multisig_confirmation.ethereum_tx_id
+            ) and HexBytes(multisig_confirmation.signature or b"") == HexBytes(
+                new_multisig_confirmation.signature or b""
+            ):
+                created[key] = multisig_confirmation  # Inserted now
+                continue
+            del created[key]
+            if any(
+                [
+                    self._update_multisig_confirmation(
+                        multisig_confirmation, new_multisig_confirmation, signature
+                    )
+                    for new_multisig_confirmation, signature in new_multisig_confirmations[
+                        key
+                    ]
+                ]
+            ):
+                updated[key] = multisig_confirmation
+
+        MultisigConfirmation.objects.bulk_update(
+            updated.values(),
+            ["ethereum_tx", "signature", "signature_type", "modified"],
+            batch_size=self.batch_size,
+        )
+        return list(created.values()), list(updated.values())
+
+    def _store_module_transactions(self) -> List[ModuleTransaction]:
+        """
+        :return: Created `ModuleTransactions`
+        """
+        existing_internal_tx_ids = set(
+            ModuleTransaction.objects.filter(
+                internal_tx_id__in={
+                    module_tx.internal_tx_id for module_tx in self.module_transactions
+                }
+            ).values_list("internal_tx_id", flat=True)
+        )
+        created: Dict[int, ModuleTransaction] = {}
+        for module_tx in self.module_transactions:
+            if (
+                module_tx.internal_tx_id not in existing_internal_tx_ids
+                and module_tx.internal_tx_id not in created
+            ):
+                created[module_tx.internal_tx_id] = module_tx
+        ModuleTransaction.objects.bulk_create(
+            created.values(), batch_size=self.batch_size
+        )
+        return list(created.values())
+
+    def flush(self) -> None:
+        """
+        Store buffered models on database and send `post_save` and `post_bulk_save` signals for them
+        """
+        SafeStatus.objects.bulk_create(
+            self.safe_statuses_to_store, batch_size=self.batch_size
+        )
+        nonces_by_address: Dict[ChecksumAddress, List[int]] = {}
+        last_safe_statuses: Dict[ChecksumAddress, SafeStatus] = {}
+        for safe_status in self.safe_statuses_to_store:
+            nonces_by_address.setdefault(safe_status.address, []).append(
+                safe_status.nonce
+            )
+            last_safe_statuses[safe_status.address] = safe_status
+        for address, nonces in nonces_by_address.items():
+            SafeStatusIntegrity.objects.add_nonces(address, nonces)
+            SafeLastStatus.objects.update_or_create_from_safe_status(
+                last_safe_statuses[address]
+            )
+        created_multisig_txs, updated_multisig_txs = (
+            self._store_multisig_transactions()
+            if self.multisig_transactions
+            else ([], [])
+        )
+        created_multisig_confirmations, updated_multisig_confirmations = (
+            self._store_multisig_confirmations()
+            if self.multisig_confirmations
+            else ([], [])
+        )
+        created_module_txs = (
+            self._store_module_transactions() if self.module_transactions else []
+        )
+        self.safe_statuses_to_store = []
+        self.multisig_transactions = []
+        self.multisig_confirmations = []
+        self.module_transactions = []
+
+        # Executions can transfer ether without emitting events or traces being indexed
+        SafeDataVersionServiceProvider().increment_versions(
+            [
+                multisig_tx.safe
+                for multisig_tx in created_multisig_txs + updated_multisig_txs
+                if multisig_tx.ethereum_tx_id
+            ]
+            + [module_tx.safe for module_tx in created_module_txs]
+        )
+
+        for model, objs, created in (
+            (MultisigTransaction, created_multisig_txs, True),
+            (MultisigTransaction, updated_multisig_txs, False),
+            (MultisigConfirmation, created_multisig_confirmations, True),
+            (MultisigConfirmation, updated_multisig_confirmations, False),
+            (ModuleTransaction, created_module_txs, True),
+        ):
+            send_bulk_save_signals(model, objs, created)
+
+
 class SafeTxProcessorProvider:
     def __new__(cls):
         if not hasattr(cls, "instance"):
@@ -99,19 +459,11 @@ class SafeTxProcessor(TxProcessor):
             event_abi_to_log_topic(event.abi)
             for event in self.safe_tx_module_failure_events
         }
-        self.safe_status_cache: Dict[str, SafeStatus] = {}
         self.signature_breaking_versions = (  # Versions where signing changed
             Version("1.0.0"),  # Safes >= 1.0.0 Renamed `baseGas` to `dataGas`
             Version("1.3.0"),  # ChainId was included
         )
 
-    def clear_cache(self, safe_address: Optional[str] = None):
-        if safe_address:
-            if safe_address in self.safe_status_cache:
-                del self.safe_status_cache[safe_address]
-        else:
-            self.safe_status_cache.clear()
-
     def is_failed(
         self, ethereum_tx: EthereumTx, safe_tx_hash: Union[str, bytes]
     ) -> bool:
@@ -165,16 +517,6 @@ class SafeTxProcessor(TxProcessor):
     def get_chain_id(self) -> int:
         return self.ethereum_client.w3.eth.chain_id
 
-    def get_last_safe_status_for_address(
-        self, address: ChecksumAddress
-    ) -> Optional[SafeStatus]:
-        safe_status = self.safe_status_cache.get(
-            address
-        ) or SafeStatus.objects.last_for_address(address)
-        if not safe_status:
-            logger.error("SafeStatus not found for address=%s", address)
-        return safe_status
-
     def is_version_breaking_signatures(
         self, old_safe_version: str, new_safe_version: str
     ) -> bool:
@@ -222,18 +564,15 @@ class SafeTxProcessor(TxProcessor):
             )
             raise OwnerCannotBeRemoved() from e
 
-    def store_new_safe_status(
-        self, safe_status: SafeStatus, internal_tx: InternalTx
-    ) -> SafeStatus:
-        safe_status.store_new(internal_tx)
-        self.safe_status_cache[safe_status.address] = safe_status
-        return self.safe_status_cache[safe_status.address]
-
     @transaction.atomic
     def process_decoded_transaction(
         self, internal_tx_decoded: InternalTxDecoded
     ) -> bool:
-        processed_successfully = self.__process_decoded_transaction(internal_tx_decoded)
+        replay = SafeTxReplay()
+        processed_successfully = self.__process_decoded_transaction(
+            internal_tx_decoded, replay
+        )
+        replay.flush()
         internal_tx_decoded.set_processed()
         return processed_successfully
 
@@ -242,14 +581,17 @@ class SafeTxProcessor(TxProcessor):
         self, internal_txs_decoded: Sequence[InternalTxDecoded]
     ) -> List[bool]:
         """
-        Optimize to process multiple transactions in a batch
+        Optimize to process multiple transactions in a batch. Transactions are replayed in memory and
+        resulting models are stored in bulk
         :param internal_txs_decoded:
         :return:
         """
+        replay = SafeTxReplay()
         results = [
-            self.__process_decoded_transaction(internal_tx_decoded)
+            self.__process_decoded_transaction(internal_tx_decoded, replay)
             for internal_tx_decoded in internal_txs_decoded
         ]
+        replay.flush()
 
         # Set all as decoded in the same batch
         internal_tx_ids = [
@@ -262,11 +604,12 @@ class SafeTxProcessor(TxProcessor):
         return results
 
     def __process_decoded_transaction(
-        self, internal_tx_decoded: InternalTxDecoded
+        self, internal_tx_decoded: InternalTxDecoded, replay: SafeTxReplay
     ) -> bool:
         """
         Decode internal tx and creates needed models
         :param internal_tx_decoded: InternalTxDecoded to process. It will be set as `processed`
+        :param replay: Models are buffered on it, they must be stored calling `replay.flush()`
         :return: True if tx could be processed, False otherwise
         """
         function_name = internal_tx_decoded.function_name
@@ -317,17 +660,19 @@ class SafeTxProcessor(TxProcessor):
                 )
                 logger.info("Found new Safe=%s", contract_address)
 
-            self.safe_status_cache[contract_address] = SafeStatus.objects.create(
-                internal_tx=internal_tx,
-                address=contract_address,
-                owners=owners,
-                threshold=threshold,
-                nonce=nonce,
-                master_copy=master_copy,
-                fallback_handler=fallback_handler,
+            replay.store_safe_status(
+                SafeStatus(
+                    address=contract_address,
+                    owners=owners,
+                    threshold=threshold,
+                    nonce=nonce,
+                    master_copy=master_copy,
+                    fallback_handler=fallback_handler,
+                ),
+                internal_tx,
             )
         else:
-            safe_status = self.get_last_safe_status_for_address(contract_address)
+            safe_status = replay.get_last_safe_status(contract_address)
             if not safe_status:
                 # Usually this happens from Safes coming from a not supported Master Copy
                 # TODO When archive node is available, build SafeStatus from blockchain status
@@ -345,19 +690,21 @@ class SafeTxProcessor(TxProcessor):
                 if function_name == "addOwnerWithThreshold":
                     safe_status.owners.append(owner)
                 else:  # removeOwner, removeOwnerWithThreshold
+                    replay.flush()  # Confirmations to remove could be buffered
                     self.remove_owner(internal_tx, safe_status, owner)
-                self.store_new_safe_status(safe_status, internal_tx)
+                replay.store_safe_status(safe_status, internal_tx)
             elif function_name == "swapOwner":
                 logger.debug("Processing owner swap")
                 old_owner = arguments["oldOwner"]
                 new_owner = arguments["newOwner"]
+                replay.flush()  # Confirmations to remove could be buffered
                 self.remove_owner(internal_tx, safe_status, old_owner)
                 safe_status.owners.append(new_owner)
-                self.store_new_safe_status(safe_status, internal_tx)
+                replay.store_safe_status(safe_status, internal_tx)
             elif function_name == "changeThreshold":
                 logger.debug("Processing threshold change")
                 safe_status.threshold = arguments["_threshold"]
-                self.store_new_safe_status(safe_status, internal_tx)
+                replay.store_safe_status(safe_status, internal_tx)
             elif function_name == "changeMasterCopy":
                 logger.debug("Processing master copy change")
                 # TODO Ban address if it doesn't have a valid master copy
@@ -376,12 +723,13 @@ class SafeTxProcessor(TxProcessor):
                     )
                 ):
                     # Transactions queued not executed are not valid anymore
+                    replay.flush()  # Executed transactions could be buffered
                     MultisigTransaction.objects.queued(contract_address).delete()
-                self.store_new_safe_status(safe_status, internal_tx)
+                replay.store_safe_status(safe_status, internal_tx)
             elif function_name == "setFallbackHandler":
                 logger.debug("Setting FallbackHandler")
                 safe_status.fallback_handler = arguments["handler"]
-                self.store_new_safe_status(safe_status, internal_tx)
+                replay.store_safe_status(safe_status, internal_tx)
             elif function_name == "setGuard":
                 safe_status.guard = (
                     arguments["guard"] if arguments["guard"] != NULL_ADDRESS else None
@@ -390,15 +738,15 @@ class SafeTxProcessor(TxProcessor):
                     logger.debug("Setting Guard")
                 else:
                     logger.debug("Unsetting Guard")
-                self.store_new_safe_status(safe_status, internal_tx)
+                replay.store_safe_status(safe_status, internal_tx)
             elif function_name == "enableModule":
                 logger.debug("Enabling Module")
                 safe_status.enabled_modules.append(arguments["module"])
-                self.store_new_safe_status(safe_status, internal_tx)
+                replay.store_safe_status(safe_status, internal_tx)
             elif function_name == "disableModule":
                 logger.debug("Disabling Module")
                 safe_status.enabled_modules.remove(arguments["module"])
-                self.store_new_safe_status(safe_status, internal_tx)
+                replay.store_safe_status(safe_status, internal_tx)
             elif function_name in {
                 "execTransactionFromModule",
                 "execTransactionFromModuleReturnData",
@@ -435,18 +783,18 @@ class SafeTxProcessor(TxProcessor):
                     ethereum_tx, module_address, contract_address
                 )
                 module_data = HexBytes(arguments["data"])
-                ModuleTransaction.objects.get_or_create(
-                    internal_tx=internal_tx,
-                    defaults={
-                        "created": internal_tx.ethereum_tx.block.timestamp,
-                        "safe": contract_address,
-                        "module": module_address,
-                        "to": arguments["to"],
-                        "value": arguments["value"],
-                        "data": module_data if module_data else None,
-                        "operation": arguments["operation"],
-                        "failed": failed,
-                    },
+                replay.add_module_transaction(
+                    ModuleTransaction(
+                        internal_tx=internal_tx,
+                        created=internal_tx.ethereum_tx.block.timestamp,
+                        safe=contract_address,
+                        module=module_address,
+                        to=arguments["to"],
+                        value=arguments["value"],
+                        data=module_data if module_data else None,
+                        operation=arguments["operation"],
+                        failed=failed,
+                    )
                 )
 
             elif function_name == "approveHash":
@@ -475,19 +823,16 @@ class SafeTxProcessor(TxProcessor):
                 safe_signature = SafeSignatureApprovedHash.build_for_owner(
                     owner, multisig_transaction_hash
                 )
-                (multisig_confirmation, _) = MultisigConfirmation.objects.get_or_create(
-                    multisig_transaction_hash=multisig_transaction_hash,
-                    owner=owner,
-                    defaults={
-                        "created": internal_tx.ethereum_tx.block.timestamp,
-                        "ethereum_tx": ethereum_tx,
-                        "signature": safe_signature.export_signature(),
-                        "signature_type": safe_signature.signature_type.value,
-                    },
+                replay.add_multisig_confirmation(
+                    MultisigConfirmation(
+                        multisig_transaction_hash=multisig_transaction_hash,
+                        owner=owner,
+                        created=internal_tx.ethereum_tx.block.timestamp,
+                        ethereum_tx=ethereum_tx,
+                        signature=safe_signature.export_signature(),
+                        signature_type=safe_signature.signature_type.value,
+                    )
                 )
-                if not multisig_confirmation.ethereum_tx_id:
-                    multisig_confirmation.ethereum_tx = ethereum_tx
-                    multisig_confirmation.save(update_fields=["ethereum_tx"])
             elif function_name == "execTransaction":
                 logger.debug("Processing transaction execution")
                 # Events for L2 Safes store information about nonce
@@ -527,66 +872,46 @@ class SafeTxProcessor(TxProcessor):
                 ethereum_tx = internal_tx.ethereum_tx
 
                 failed = self.is_failed(ethereum_tx, safe_tx_hash)
-                multisig_tx, _ = MultisigTransaction.objects.get_or_create(
-                    safe_tx_hash=safe_tx_hash,
-                    defaults={
-                        "created": internal_tx.ethereum_tx.block.timestamp,
-                        "safe": contract_address,
-                        "ethereum_tx": ethereum_tx,
-                        "to": safe_tx.to,
-                        "value": safe_tx.value,
-                        "data": safe_tx.data if safe_tx.data else None,
-                        "operation": safe_tx.operation,
-                        "safe_tx_gas": safe_tx.safe_tx_gas,
-                        "base_gas": safe_tx.base_gas,
-                        "gas_price": safe_tx.gas_price,
-                        "gas_token": safe_tx.gas_token,
-                        "refund_receiver": safe_tx.refund_receiver,
-                        "nonce": safe_tx.safe_nonce,
-                        "signatures": safe_tx.signatures,
-                        "failed": failed,
-                        "trusted": True,
-                    },
-                )
-                if not multisig_tx.ethereum_tx_id:
-                    multisig_tx.ethereum_tx = ethereum_tx
-                    multisig_tx.failed = failed
-                    multisig_tx.signatures = HexBytes(arguments["signatures"])
-                    multisig_tx.trusted = True
-                    multisig_tx.save(
-                        update_fields=["ethereum_tx", "failed", "signatures", "trusted"]
+                replay.add_multisig_transaction(
+                    MultisigTransaction(
+                        safe_tx_hash=safe_tx_hash,
+                        created=internal_tx.ethereum_tx.block.timestamp,
+                        safe=contract_address,
+                        ethereum_tx=ethereum_tx,
+                        to=safe_tx.to,
+                        value=safe_tx.value,
+                        data=safe_tx.data if safe_tx.data else None,
+                        operation=safe_tx.operation,
+                        safe_tx_gas=safe_tx.safe_tx_gas,
+                        base_gas=safe_tx.base_gas,
+                        gas_price=safe_tx.gas_price,
+                        gas_token=safe_tx.gas_token,
+                        refund_receiver=safe_tx.refund_receiver,
+                        nonce=safe_tx.safe_nonce,
+                        signatures=safe_tx.signatures,
+                        failed=failed,
+                        trusted=True,
                     )
+                )
 
                 for safe_signature in SafeSignature.parse_signature(
                     safe_tx.signatures, safe_tx_hash
                 ):
-                    (
-                        multisig_confirmation,
-                        _,
-                    ) = MultisigConfirmation.objects.get_or_create(
-                        multisig_transaction_hash=safe_tx_hash,
-                        owner=safe_signature.owner,
-                        defaults={
-                            "created": internal_tx.ethereum_tx.block.timestamp,
-                            "ethereum_tx": None,
-                            "multisig_transaction": multisig_tx,
-                            "signature": safe_signature.export_signature(),
-                            "signature_type": safe_signature.signature_type.value,
-                        },
+                    replay.add_multisig_confirmation(
+                        MultisigConfirmation(
+                            multisig_transaction_hash=safe_tx_hash,
+                            owner=safe_signature.owner,
+                            created=internal_tx.ethereum_tx.block.timestamp,
+                            ethereum_tx=None,
+                            multisig_transaction_id=safe_tx_hash,
+                            signature=safe_signature.export_signature(),
+                            signature_type=safe_signature.signature_type.value,
+                        ),
+                        signature=safe_signature.signature,
                     )
-                    if multisig_confirmation.signature != safe_signature.signature:
-                        multisig_confirmation.signature = (
-                            safe_signature.export_signature()
-                        )
-                        multisig_confirmation.signature_type = (
-                            safe_signature.signature_type.value
-                        )
-                        multisig_confirmation.save(
-                            update_fields=["signature", "signature_type"]
-                        )
 
                 safe_status.nonce = nonce + 1
-                self.store_new_safe_status(safe_status, internal_tx)
+                replay.store_safe_status(safe_status, internal_tx)
             elif function_name == "execTransactionFromModule":
                 logger.debug("Not processing execTransactionFromModule")
                 # No side effects or nonce increasing, but trace will be set as processed
@@ -6,7 +6,7 @@ from gnosis.eth import EthereumClientProvider
 from gnosis.eth.constants import NULL_ADDRESS
 from gnosis.safe import Safe
 
-from ...models import MultisigTransaction, SafeStatus
+from ...models import MultisigTransaction, SafeLastStatus, SafeStatusIntegrity
 from ...services import IndexServiceProvider
 
 
@@ -51,7 +51,7 @@ class Command(BaseCommand):
     def handle(self, *args, **options):
         fix = options["fix"]
 
-        queryset = SafeStatus.objects.last_for_every_address()
+        queryset = SafeLastStatus.objects.order_by("address")
         count = queryset.count()
         batch = 100
         ethereum_client = EthereumClientProvider()
@@ -68,13 +68,17 @@ class Command(BaseCommand):
                 blockchain_nonce_payloads, raise_exception=False
             )
 
+            safe_statuses_integrity = SafeStatusIntegrity.objects.get_for_addresses(
+                [safe_status.address for safe_status in safe_statuses_list]
+            )
+
             addresses_to_reindex = set()
             for safe_status, blockchain_nonce in zip(
                 safe_statuses_list, blockchain_nonces
             ):
                 address = safe_status.address
                 nonce = safe_status.nonce
-                if safe_status.is_corrupted():
+                if safe_statuses_integrity[address].is_corrupted():
                     self.stdout.write(
                         self.style.WARNING(
                             f"Safe={address} is corrupted, has some old "
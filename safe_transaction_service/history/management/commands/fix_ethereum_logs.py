@@ -1,8 +1,10 @@
+from django.conf import settings
 from django.core.management.base import BaseCommand
 
 from gnosis.eth import EthereumClientProvider
 
 from ...models import EthereumTx
+from ...services import ChainDataCacheProvider
 from ...utils import clean_receipt_log
 
 
@@ -12,6 +14,9 @@ class Command(BaseCommand):
     def handle(self, *args, **options):
         # We need to add `address` to the logs, so we exclude empty logs and logs already containing `address`
         ethereum_client = EthereumClientProvider()
+        chain_data_cache = (
+            ChainDataCacheProvider() if settings.ETH_CHAIN_DATA_CACHE_DIR else None
+        )
         queryset = EthereumTx.objects.exclude(logs__0__has_key="address").exclude(
             logs=[]
         )
@@ -27,7 +32,12 @@ class Command(BaseCommand):
 
             tx_hashes = [ethereum_tx.tx_hash for ethereum_tx in ethereum_txs]
             try:
-                tx_receipts = ethereum_client.get_transaction_receipts(tx_hashes)
+                if chain_data_cache:
+                    tx_receipts = chain_data_cache.get_transaction_receipts(
+                        ethereum_client, tx_hashes
+                    )
+                else:
+                    tx_receipts = ethereum_client.get_transaction_receipts(tx_hashes)
                 for ethereum_tx, tx_receipt in zip(ethereum_txs, tx_receipts):
                     ethereum_tx.logs = [
                         clean_receipt_log(log) for log in tx_receipt["logs"]
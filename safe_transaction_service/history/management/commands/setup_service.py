@@ -42,6 +42,13 @@ class CeleryTaskConfiguration:
 
 
 TASKS = [
+    CeleryTaskConfiguration(
+        "safe_transaction_service.history.tasks.ingest_new_blocks_task",
+        "Ingest new blocks",
+        5,
+        IntervalSchedule.SECONDS,
+        enabled=settings.ETH_BLOCK_INGESTION,
+    ),
     CeleryTaskConfiguration(
         "safe_transaction_service.history.tasks.index_internal_txs_task",
         "Index Internal Txs",
@@ -93,6 +100,19 @@ TASKS = [
         3,
         IntervalSchedule.MINUTES,
     ),
+    CeleryTaskConfiguration(
+        "safe_transaction_service.history.tasks.reconcile_balances_task",
+        "Reconcile balances ledger",
+        10,
+        IntervalSchedule.MINUTES,
+        enabled=settings.ETH_BALANCES_LEDGER,
+    ),
+    CeleryTaskConfiguration(
+        "safe_transaction_service.history.tasks.refresh_collectibles_metadata_task",
+        "Refresh collectibles metadata",
+        10,
+        IntervalSchedule.MINUTES,
+    ),
     CeleryTaskConfiguration(
         "safe_transaction_service.contracts.tasks.create_missing_contracts_with_metadata_task",
         "Index contract names and ABIs",
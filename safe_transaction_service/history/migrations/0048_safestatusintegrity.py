@@ -0,0 +1,37 @@
+# Generated by Django 3.2.9 on 2021-11-23 10:12
+
+import django.contrib.postgres.fields
+from django.db import migrations, models
+
+import gnosis.eth.django.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("history", "0047_auto_20211102_1659"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SafeStatusIntegrity",
+            fields=[
+                (
+                    "address",
+                    gnosis.eth.django.models.EthereumAddressField(
+                        primary_key=True, serialize=False
+                    ),
+                ),
+                ("contiguous_nonce", models.BigIntegerField(default=-1)),
+                (
+                    "nonces_after_gap",
+                    django.contrib.postgres.fields.ArrayField(
+                        base_field=models.BigIntegerField(), default=list, size=None
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name_plural": "Safe statuses integrity",
+            },
+        ),
+    ]
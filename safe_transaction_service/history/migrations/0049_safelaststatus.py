@@ -0,0 +1,77 @@
+# Generated by Django 3.2.9 on 2021-11-24 09:41
+
+import django.contrib.postgres.fields
+import django.db.models.deletion
+from django.db import migrations, models
+
+import gnosis.eth.django.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("history", "0048_safestatusintegrity"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SafeLastStatus",
+            fields=[
+                (
+                    "owners",
+                    django.contrib.postgres.fields.ArrayField(
+                        base_field=gnosis.eth.django.models.EthereumAddressField(),
+                        size=None,
+                    ),
+                ),
+                ("threshold", gnosis.eth.django.models.Uint256Field()),
+                ("nonce", gnosis.eth.django.models.Uint256Field(default=0)),
+                ("master_copy", gnosis.eth.django.models.EthereumAddressField()),
+                ("fallback_handler", gnosis.eth.django.models.EthereumAddressField()),
+                (
+                    "guard",
+                    gnosis.eth.django.models.EthereumAddressField(
+                        default=None, null=True
+                    ),
+                ),
+                (
+                    "enabled_modules",
+                    django.contrib.postgres.fields.ArrayField(
+                        base_field=gnosis.eth.django.models.EthereumAddressField(),
+                        default=list,
+                        size=None,
+                    ),
+                ),
+                (
+                    "address",
+                    gnosis.eth.django.models.EthereumAddressField(
+                        primary_key=True, serialize=False
+                    ),
+                ),
+                (
+                    "internal_tx",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="safe_last_status",
+                        to="history.internaltx",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name_plural": "Safe last statuses",
+            },
+        ),
+        migrations.RunSQL(
+            """
+            INSERT INTO history_safelaststatus(address, internal_tx_id, owners, threshold, nonce, master_copy,
+                                               fallback_handler, guard, enabled_modules)
+            SELECT DISTINCT ON (ss.address) ss.address, ss.internal_tx_id, ss.owners, ss.threshold, ss.nonce,
+                ss.master_copy, ss.fallback_handler, ss.guard, ss.enabled_modules
+            FROM history_safestatus ss
+            JOIN history_internaltx it ON ss.internal_tx_id = it.id
+            JOIN history_ethereumtx et ON it.ethereum_tx_id = et.tx_hash
+            ORDER BY ss.address, ss.nonce DESC, et.block_id DESC, et.transaction_index DESC, it.trace_address DESC
+            """,
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+    ]
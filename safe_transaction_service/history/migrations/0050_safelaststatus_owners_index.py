@@ -0,0 +1,20 @@
+# Generated by Django 3.2.9 on 2021-11-25 11:20
+
+import django.contrib.postgres.indexes
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("history", "0049_safelaststatus"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="safelaststatus",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["owners"], name="history_sls_owners_gin"
+            ),
+        ),
+    ]
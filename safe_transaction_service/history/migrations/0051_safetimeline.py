@@ -0,0 +1,68 @@
+# Generated by Django 3.2.9 on 2021-11-26 09:41
+
+from django.db import migrations, models
+
+import gnosis.eth.django.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("history", "0050_safelaststatus_owners_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SafeTimeline",
+            fields=[
+                (
+                    "address",
+                    gnosis.eth.django.models.EthereumAddressField(
+                        primary_key=True, serialize=False
+                    ),
+                ),
+            ],
+        ),
+        migrations.CreateModel(
+            name="SafeTimelineEntry",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("safe", gnosis.eth.django.models.EthereumAddressField()),
+                ("tx_hash", gnosis.eth.django.models.Sha3HashField()),
+                (
+                    "entry_type",
+                    models.PositiveSmallIntegerField(
+                        choices=[
+                            (0, "MULTISIG_TRANSACTION"),
+                            (1, "MODULE_TRANSACTION"),
+                            (2, "ETHEREUM_TRANSACTION"),
+                        ]
+                    ),
+                ),
+                ("execution_date", models.DateTimeField(null=True)),
+                ("safe_nonce", gnosis.eth.django.models.Uint256Field()),
+                ("block", models.PositiveIntegerField(null=True)),
+                ("created", models.DateTimeField()),
+                ("trusted", models.BooleanField(default=True)),
+            ],
+            options={
+                "verbose_name_plural": "Safe timeline entries",
+                "unique_together": {("safe", "tx_hash")},
+            },
+        ),
+        migrations.AddIndex(
+            model_name="safetimelineentry",
+            index=models.Index(
+                fields=["safe", "-execution_date", "-safe_nonce", "block", "-created"],
+                name="history_ste_timeline_idx",
+            ),
+        ),
+    ]
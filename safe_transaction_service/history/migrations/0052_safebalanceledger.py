@@ -0,0 +1,61 @@
+# Generated by Django 3.2.9 on 2021-11-29 10:12
+
+from django.db import migrations, models
+
+import gnosis.eth.django.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("history", "0051_safetimeline"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SafeBalanceLedger",
+            fields=[
+                (
+                    "address",
+                    gnosis.eth.django.models.EthereumAddressField(
+                        primary_key=True, serialize=False
+                    ),
+                ),
+                (
+                    "reconciled",
+                    models.DateTimeField(blank=True, db_index=True, null=True),
+                ),
+                (
+                    "reconciled_block_number",
+                    models.PositiveIntegerField(blank=True, null=True),
+                ),
+            ],
+        ),
+        migrations.CreateModel(
+            name="SafeTokenBalance",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("safe", gnosis.eth.django.models.EthereumAddressField()),
+                ("token_address", gnosis.eth.django.models.EthereumAddressField()),
+                (
+                    "transfers_balance",
+                    models.DecimalField(decimal_places=0, max_digits=79),
+                ),
+                (
+                    "adjustment",
+                    models.DecimalField(decimal_places=0, default=0, max_digits=79),
+                ),
+            ],
+            options={
+                "unique_together": {("safe", "token_address")},
+            },
+        ),
+    ]
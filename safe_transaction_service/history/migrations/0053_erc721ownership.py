@@ -0,0 +1,49 @@
+# Generated by Django 3.2.9 on 2021-11-30 09:41
+
+from django.db import migrations, models
+
+import gnosis.eth.django.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("history", "0052_safebalanceledger"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ERC721Ownership",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("token_address", gnosis.eth.django.models.EthereumAddressField()),
+                ("token_id", gnosis.eth.django.models.Uint256Field()),
+                (
+                    "owner",
+                    gnosis.eth.django.models.EthereumAddressField(db_index=True),
+                ),
+            ],
+            options={
+                "verbose_name": "ERC721 Ownership",
+                "verbose_name_plural": "ERC721 Ownerships",
+                "unique_together": {("token_address", "token_id")},
+            },
+        ),
+        migrations.RunSQL(
+            """
+            INSERT INTO history_erc721ownership(token_address, token_id, owner)
+            SELECT DISTINCT ON (T.address, T.token_id) T.address, T.token_id, T."to"
+            FROM history_erc721transfer T JOIN history_ethereumtx E ON T.ethereum_tx_id = E.tx_hash
+            ORDER BY T.address, T.token_id, E.block_id DESC, T.log_index DESC
+            """,
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+    ]
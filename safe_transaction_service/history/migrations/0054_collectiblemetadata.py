@@ -0,0 +1,60 @@
+# Generated by Django 3.2.9 on 2021-12-01 11:27
+
+import django.utils.timezone
+from django.db import migrations, models
+
+import model_utils.fields
+
+import gnosis.eth.django.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("history", "0053_erc721ownership"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CollectibleMetadata",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "created",
+                    model_utils.fields.AutoCreatedField(
+                        default=django.utils.timezone.now,
+                        editable=False,
+                        verbose_name="created",
+                    ),
+                ),
+                (
+                    "modified",
+                    model_utils.fields.AutoLastModifiedField(
+                        default=django.utils.timezone.now,
+                        editable=False,
+                        verbose_name="modified",
+                    ),
+                ),
+                ("token_address", gnosis.eth.django.models.EthereumAddressField()),
+                ("token_id", gnosis.eth.django.models.Uint256Field()),
+                ("uri", models.CharField(blank=True, max_length=2048)),
+                ("metadata", models.JSONField(blank=True, null=True)),
+            ],
+            options={
+                "verbose_name_plural": "Collectibles metadata",
+                "unique_together": {("token_address", "token_id", "uri")},
+            },
+        ),
+        migrations.AddIndex(
+            model_name="collectiblemetadata",
+            index=models.Index(fields=["modified"], name="history_collectible_mod_idx"),
+        ),
+    ]
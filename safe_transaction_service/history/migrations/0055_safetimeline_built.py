@@ -0,0 +1,24 @@
+# Generated by Django 3.2.9 on 2021-12-02 10:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("history", "0054_collectiblemetadata"),
+    ]
+
+    operations = [
+        # Existing timelines are already built
+        migrations.AddField(
+            model_name="safetimeline",
+            name="built",
+            field=models.BooleanField(default=True),
+        ),
+        migrations.AlterField(
+            model_name="safetimeline",
+            name="built",
+            field=models.BooleanField(default=False),
+        ),
+    ]
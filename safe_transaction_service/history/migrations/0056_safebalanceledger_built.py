@@ -0,0 +1,24 @@
+# Generated by Django 3.2.9 on 2021-12-02 11:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("history", "0055_safetimeline_built"),
+    ]
+
+    operations = [
+        # Existing ledgers are already built
+        migrations.AddField(
+            model_name="safebalanceledger",
+            name="built",
+            field=models.BooleanField(default=True),
+        ),
+        migrations.AlterField(
+            model_name="safebalanceledger",
+            name="built",
+            field=models.BooleanField(default=False),
+        ),
+    ]
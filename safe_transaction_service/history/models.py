@@ -1,4 +1,5 @@
 import datetime
+import uuid
 from decimal import Decimal
 from enum import Enum
 from itertools import islice
@@ -6,6 +7,7 @@ from logging import getLogger
 from typing import (
     Any,
     Dict,
+    Iterable,
     List,
     Optional,
     Sequence,
@@ -18,12 +20,14 @@ from typing import (
 
 from django.contrib.postgres.fields import ArrayField
 from django.contrib.postgres.indexes import GinIndex
+from django.core.cache import cache as django_cache
 from django.core.exceptions import ValidationError
-from django.db import IntegrityError, connection, models
-from django.db.models import Case, Count, Index, JSONField, Max, Q, QuerySet
+from django.db import IntegrityError, connection, models, transaction
+from django.db.models import Case, Count, Index, JSONField, Max, Q, QuerySet, Sum
 from django.db.models.expressions import F, OuterRef, RawSQL, Subquery, Value, When
 from django.db.models.functions import Coalesce
 from django.db.models.signals import post_save
+from django.dispatch import Signal
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
@@ -33,7 +37,7 @@ from model_utils.models import TimeStampedModel
 from packaging.version import Version
 from web3.types import EventData
 
-from gnosis.eth.constants import ERC20_721_TRANSFER_TOPIC
+from gnosis.eth.constants import ERC20_721_TRANSFER_TOPIC, NULL_ADDRESS
 from gnosis.eth.django.models import (
     EthereumAddressField,
     HexField,
@@ -44,6 +48,7 @@ from gnosis.safe import SafeOperation
 from gnosis.safe.safe_signature import SafeSignature, SafeSignatureType
 
 from safe_transaction_service.contracts.models import Contract
+from safe_transaction_service.utils.bulk_copy import copy_upsert
 
 from .utils import clean_receipt_log
 
@@ -112,6 +117,27 @@ class TransferDict(TypedDict):
     token_address: str
 
 
+# Sent once for every batch of objects stored in bulk with `instances` and `created`, besides a `post_save` for
+# every object sent with `bulk=True`. Receivers doing queries for every object should use it instead
+post_bulk_save = Signal()
+
+
+def send_bulk_save_signals(
+    sender: Type[models.Model], instances: Sequence[models.Model], created: bool
+) -> None:
+    """
+    Send `post_save` for every object and `post_bulk_save` for all of them
+
+    :param sender:
+    :param instances: Objects stored in bulk
+    :param created:
+    """
+    for instance in instances:
+        post_save.send(sender, instance=instance, created=created, bulk=True)
+    if instances:
+        post_bulk_save.send(sender, instances=instances, created=created)
+
+
 class BulkCreateSignalMixin:
     def bulk_create(
         self, objs, batch_size: Optional[int] = None, ignore_conflicts: bool = False
@@ -120,8 +146,7 @@ class BulkCreateSignalMixin:
         result = super().bulk_create(
             objs, batch_size=batch_size, ignore_conflicts=ignore_conflicts
         )
-        for obj in objs:
-            post_save.send(obj.__class__, instance=obj, created=True)
+        send_bulk_save_signals(self.model, objs, True)
         return result
 
     def bulk_create_from_generator(
@@ -144,14 +169,71 @@ class BulkCreateSignalMixin:
             else:
                 return total
 
+    def bulk_copy_from_generator(
+        self, objs, conflict_fields: Sequence[str], batch_size: int = 5000
+    ) -> int:
+        """
+        Same as `bulk_create_from_generator` with `ignore_conflicts=True`, but using Postgres `COPY`, so it's way
+        faster for big batches. Unlike `bulk_create` with `ignore_conflicts`, primary keys are populated
+
+        :param objs:
+        :param conflict_fields: Fields of the unique constraint used to ignore already inserted objects
+        :param batch_size:
+        :return: Count of processed elements
+        """
+        assert batch_size is not None and batch_size > 0
+        objs = iter(objs)
+        total = 0
+        while batch := list(islice(objs, batch_size)):
+            copy_upsert(self.model, batch, conflict_fields)
+            send_bulk_save_signals(self.model, batch, True)
+            total += len(batch)
+        return total
+
 
 class EthereumBlockManager(models.Manager):
+    @staticmethod
+    def _get_parameters_from_block(block: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "number": block["number"],
+            "gas_limit": block["gasLimit"],
+            "gas_used": block["gasUsed"],
+            "timestamp": datetime.datetime.fromtimestamp(
+                block["timestamp"], datetime.timezone.utc
+            ),
+            "block_hash": block["hash"],
+            "parent_hash": block["parentHash"],
+        }
+
     def get_or_create_from_block(self, block: Dict[str, Any], confirmed: bool = False):
         try:
             return self.get(number=block["number"])
         except self.model.DoesNotExist:
             return self.create_from_block(block, confirmed=confirmed)
 
+    def get_or_create_from_blocks(
+        self, blocks: Sequence[Dict[str, Any]], confirmed_block_number: int
+    ) -> Dict[int, "EthereumBlock"]:
+        """
+        Insert the blocks not in database using only a few queries
+
+        :param blocks: Block Dicts returned by Web3
+        :param confirmed_block_number: Blocks with number lower or equal will be stored as `confirmed`
+        :return: Dictionary of block number and EthereumBlock model, as stored on database
+        """
+        copy_upsert(
+            self.model,
+            [
+                self.model(
+                    confirmed=block["number"] <= confirmed_block_number,
+                    **self._get_parameters_from_block(block),
+                )
+                for block in blocks
+            ],
+            ["number"],
+        )
+        return self.in_bulk([block["number"] for block in blocks])
+
     def create_from_block(
         self, block: Dict[str, Any], confirmed: bool = False
     ) -> "EthereumBlock":
@@ -162,15 +244,7 @@ class EthereumBlockManager(models.Manager):
         """
         try:
             return super().create(
-                number=block["number"],
-                gas_limit=block["gasLimit"],
-                gas_used=block["gasUsed"],
-                timestamp=datetime.datetime.fromtimestamp(
-                    block["timestamp"], datetime.timezone.utc
-                ),
-                block_hash=block["hash"],
-                parent_hash=block["parentHash"],
-                confirmed=confirmed,
+                confirmed=confirmed, **self._get_parameters_from_block(block)
             )
         except IntegrityError:
             # The block could be created in the meantime by other task while the block was fetched from blockchain
@@ -225,12 +299,12 @@ class EthereumBlock(models.Model):
 
 
 class EthereumTxManager(models.Manager):
-    def create_from_tx_dict(
-        self,
+    @staticmethod
+    def _get_parameters_from_tx_dict(
         tx: Dict[str, Any],
         tx_receipt: Optional[Dict[str, Any]] = None,
         ethereum_block: Optional[EthereumBlock] = None,
-    ) -> "EthereumTx":
+    ) -> Dict[str, Any]:
         data = HexBytes(tx.get("data") or tx.get("input"))
         # Supporting EIP1559
         if "gasPrice" in tx:
@@ -240,23 +314,68 @@ class EthereumTxManager(models.Manager):
             gas_price = tx_receipt.get("effectiveGasPrice")
             assert gas_price is not None, f"Gas price for tx {tx} cannot be None"
             gas_price = int(gas_price, 0)
-        return super().create(
-            block=ethereum_block,
-            tx_hash=HexBytes(tx["hash"]).hex(),
-            _from=tx["from"],
-            gas=tx["gas"],
-            gas_price=gas_price,
-            gas_used=tx_receipt and tx_receipt["gasUsed"],
-            logs=tx_receipt
+        return {
+            "block": ethereum_block,
+            "tx_hash": HexBytes(tx["hash"]).hex(),
+            "_from": tx["from"],
+            "gas": tx["gas"],
+            "gas_price": gas_price,
+            "gas_used": tx_receipt and tx_receipt["gasUsed"],
+            "logs": tx_receipt
             and [clean_receipt_log(log) for log in tx_receipt.get("logs", list())],
-            status=tx_receipt and tx_receipt.get("status"),
-            transaction_index=tx_receipt and tx_receipt["transactionIndex"],
-            data=data if data else None,
-            nonce=tx["nonce"],
-            to=tx.get("to"),
-            value=tx["value"],
+            "status": tx_receipt and tx_receipt.get("status"),
+            "transaction_index": tx_receipt and tx_receipt["transactionIndex"],
+            "data": data if data else None,
+            "nonce": tx["nonce"],
+            "to": tx.get("to"),
+            "value": tx["value"],
+        }
+
+    def create_from_tx_dict(
+        self,
+        tx: Dict[str, Any],
+        tx_receipt: Optional[Dict[str, Any]] = None,
+        ethereum_block: Optional[EthereumBlock] = None,
+    ) -> "EthereumTx":
+        return super().create(
+            **self._get_parameters_from_tx_dict(
+                tx, tx_receipt=tx_receipt, ethereum_block=ethereum_block
+            )
         )
 
+    def create_or_update_from_tx_dicts(
+        self,
+        txs: Sequence[Dict[str, Any]],
+        tx_receipts: Sequence[Dict[str, Any]],
+        ethereum_blocks: Sequence[EthereumBlock],
+    ) -> List["EthereumTx"]:
+        """
+        Insert mined txs using only a few queries. Txs already stored without being mined are updated with
+        the block and receipt
+
+        :param txs:
+        :param tx_receipts: Receipts for `txs`
+        :param ethereum_blocks: Blocks for `txs`
+        :return: EthereumTx models
+        """
+        ethereum_txs = [
+            self.model(
+                **self._get_parameters_from_tx_dict(
+                    tx, tx_receipt=tx_receipt, ethereum_block=ethereum_block
+                )
+            )
+            for tx, tx_receipt, ethereum_block in zip(txs, tx_receipts, ethereum_blocks)
+        ]
+        table = connection.ops.quote_name(self.model._meta.db_table)
+        copy_upsert(
+            self.model,
+            ethereum_txs,
+            ["tx_hash"],
+            update_fields=["block", "gas_used", "logs", "status", "transaction_index"],
+            update_condition=f'{table}."block_id" IS NULL',  # For txs stored before being mined
+        )
+        return ethereum_txs
+
 
 class EthereumTx(TimeStampedModel):
     objects = EthereumTxManager()
@@ -401,6 +520,8 @@ class ERC20TransferQuerySet(TokenTransferQuerySet):
             execution_date=F("ethereum_tx__block__timestamp"),
             _token_id=RawSQL("NULL::numeric", ()),
             token_address=F("address"),
+            _log_index=F("log_index"),
+            _trace_address=RawSQL("NULL::text", (), output_field=models.CharField()),
         )
 
 
@@ -447,40 +568,6 @@ class ERC20Transfer(TokenTransfer):
         )
 
 
-class ERC721TransferManager(TokenTransferManager):
-    # TODO Optimize this
-    def erc721_owned_by(self, address: str) -> List[Tuple[str, int]]:
-        """
-        Returns erc721 owned by address, removing the ones sent
-        :return: List of tuples(token_address: str, token_id: int)
-        """
-        # Get all the token history
-        erc721_events = self.to_or_from(address)
-        # Get tokens received and remove tokens transferred
-        tokens_in: Tuple[str, int] = []
-        tokens_out: Tuple[str, int] = []
-        for erc721_event in erc721_events:
-            token_address = erc721_event.address
-            token_id = erc721_event.token_id
-            if token_id is None:
-                logger.error(
-                    "TokenId for ERC721 info token=%s with owner=%s can never be None",
-                    token_address,
-                    address,
-                )
-                continue
-            if erc721_event.to == address:
-                list_to_append = tokens_in
-            else:
-                list_to_append = tokens_out
-            list_to_append.append((token_address, token_id))
-
-        for token_out in tokens_out:  # Remove tokens sent from list
-            if token_out in tokens_in:
-                tokens_in.remove(token_out)
-        return tokens_in
-
-
 class ERC721TransferQuerySet(TokenTransferQuerySet):
     def token_txs(self):
         return self.annotate(
@@ -490,11 +577,13 @@ class ERC721TransferQuerySet(TokenTransferQuerySet):
             execution_date=F("ethereum_tx__block__timestamp"),
             _token_id=F("token_id"),
             token_address=F("address"),
+            _log_index=F("log_index"),
+            _trace_address=RawSQL("NULL::text", (), output_field=models.CharField()),
         )
 
 
 class ERC721Transfer(TokenTransfer):
-    objects = ERC721TransferManager.from_queryset(ERC721TransferQuerySet)()
+    objects = TokenTransferManager.from_queryset(ERC721TransferQuerySet)()
     token_id = Uint256Field()
 
     class Meta:
@@ -545,6 +634,174 @@ class ERC721Transfer(TokenTransfer):
         )
 
 
+class ERC721OwnershipManager(models.Manager):
+    def owned_by(self, address: ChecksumAddress) -> List[Tuple[str, int]]:
+        """
+        :param address:
+        :return: ERC721 currently owned by address, as a list of tuples(token_address: str, token_id: int)
+        """
+        return [
+            (token_address, int(token_id))
+            for token_address, token_id in self.filter(owner=address)
+            .values_list("token_address", "token_id")
+            .order_by("token_address", "token_id")
+        ]
+
+    def get_tokens_from_block_number(self, block_number: int) -> Set[Tuple[str, int]]:
+        """
+        :param block_number:
+        :return: ERC721 tokens with transfers on `block_number` or later, as a set of
+            tuples(token_address: str, token_id: int)
+        """
+        return {
+            (token_address, int(token_id))
+            for token_address, token_id in ERC721Transfer.objects.filter(
+                ethereum_tx__block__gte=block_number
+            )
+            .values_list("address", "token_id")
+            .distinct()
+        }
+
+    @transaction.atomic
+    def update_owners(
+        self, tokens: Iterable[Tuple[str, int]], batch_size: int = 500
+    ) -> int:
+        """
+        Set the owner of every token to the receiver of its last `ERC721Transfer` stored. Ownerships are
+        calculated again from the transfers, so it can be called more than once for the same transfers (e.g.
+        when reindexing) or after transfers are removed (reorgs)
+
+        :param tokens: Iterable of tuples(token_address: str, token_id: int)
+        :param batch_size:
+        :return: Number of ownerships stored
+        """
+        tokens = iter(set(tokens))
+        total = 0
+        while tokens_batch := list(islice(tokens, batch_size)):
+            transfers_query = Q()
+            ownerships_query = Q()
+            for token_address, token_id in tokens_batch:
+                transfers_query |= Q(address=token_address, token_id=token_id)
+                ownerships_query |= Q(token_address=token_address, token_id=token_id)
+
+            owners = (
+                ERC721Transfer.objects.filter(transfers_query)
+                .order_by("address", "token_id", "-ethereum_tx__block_id", "-log_index")
+                .distinct("address", "token_id")
+                .values_list("address", "token_id", "to")
+            )
+            self.filter(ownerships_query).delete()
+            total += len(
+                self.bulk_create(
+                    [
+                        ERC721Ownership(
+                            token_address=token_address, token_id=token_id, owner=owner
+                        )
+                        for token_address, token_id, owner in owners
+                    ]
+                )
+            )
+        return total
+
+
+class ERC721Ownership(models.Model):
+    """
+    Current owner of every ERC721 token with transfers indexed, so collectibles for an address can be
+    retrieved without going through all its transfers
+    """
+
+    objects = ERC721OwnershipManager()
+    token_address = EthereumAddressField()
+    token_id = Uint256Field()
+    owner = EthereumAddressField(db_index=True)
+
+    class Meta:
+        verbose_name = "ERC721 Ownership"
+        verbose_name_plural = "ERC721 Ownerships"
+        unique_together = (("token_address", "token_id"),)
+
+    def __str__(self):
+        return f"ERC721 token_address={self.token_address} token_id={self.token_id} owner={self.owner}"
+
+
+class CollectibleMetadataManager(models.Manager):
+    def get_metadata(
+        self, keys: Iterable[Tuple[str, int, str]], batch_size: int = 500
+    ) -> Dict[Tuple[str, int, str], Optional[Dict[str, Any]]]:
+        """
+        :param keys: Iterable of tuples(token_address: str, token_id: int, uri: str)
+        :param batch_size:
+        :return: Dictionary with the key and the stored metadata (`None` if it could not be retrieved) for
+            the keys found on database
+        """
+        keys = iter(set(keys))
+        stored_metadata = {}
+        while keys_batch := list(islice(keys, batch_size)):
+            query = Q()
+            for token_address, token_id, uri in keys_batch:
+                query |= Q(token_address=token_address, token_id=token_id, uri=uri)
+            for token_address, token_id, uri, metadata in self.filter(
+                query
+            ).values_list("token_address", "token_id", "uri", "metadata"):
+                stored_metadata[(token_address, int(token_id), uri)] = metadata
+        return stored_metadata
+
+    def store_metadata(
+        self, metadata: Dict[Tuple[str, int, str], Optional[Dict[str, Any]]]
+    ) -> int:
+        """
+        Store metadata not present on database. Metadata already stored is updated by the refresher
+
+        :param metadata: Dictionary with tuples(token_address: str, token_id: int, uri: str) and the
+            metadata, `None` if it could not be retrieved
+        :return: Number of elements processed
+        """
+        return len(
+            self.bulk_create(
+                [
+                    CollectibleMetadata(
+                        token_address=token_address,
+                        token_id=token_id,
+                        uri=uri,
+                        metadata=element_metadata,
+                    )
+                    for (
+                        token_address,
+                        token_id,
+                        uri,
+                    ), element_metadata in metadata.items()
+                ],
+                batch_size=500,
+                ignore_conflicts=True,
+            )
+        )
+
+
+class CollectibleMetadata(TimeStampedModel):
+    """
+    Metadata retrieved for ERC721 tokens, so it's not requested every time collectibles are listed. It's
+    periodically refreshed
+    """
+
+    objects = CollectibleMetadataManager()
+    token_address = EthereumAddressField()
+    token_id = Uint256Field()
+    uri = models.CharField(
+        max_length=2048, blank=True
+    )  # Empty if metadata is not retrieved from an uri (ENS)
+    metadata = JSONField(
+        null=True, blank=True
+    )  # `None` if it could not be retrieved, it will be retried by the refresher
+
+    class Meta:
+        verbose_name_plural = "Collectibles metadata"
+        unique_together = (("token_address", "token_id", "uri"),)
+        indexes = [Index(name="history_collectible_mod_idx", fields=["modified"])]
+
+    def __str__(self):
+        return f"Metadata for ERC721 token_address={self.token_address} token_id={self.token_id}"
+
+
 class InternalTxManager(BulkCreateSignalMixin, models.Manager):
     def _trace_address_to_str(self, trace_address: Sequence[int]) -> str:
         return ",".join([str(address) for address in trace_address])
@@ -619,6 +876,10 @@ class InternalTxQuerySet(models.QuerySet):
             execution_date=F("ethereum_tx__block__timestamp"),
             _token_id=RawSQL("NULL::numeric", ()),
             token_address=Value(None, output_field=EthereumAddressField()),
+            _log_index=RawSQL(
+                "NULL::integer", (), output_field=models.PositiveIntegerField()
+            ),
+            _trace_address=F("trace_address"),
         )
 
     def ether_txs_for_address(self, address: str):
@@ -696,6 +957,8 @@ class InternalTxQuerySet(models.QuerySet):
             "execution_date",
             "_token_id",
             "token_address",
+            "_log_index",  # `_log_index` and `_trace_address` identify a transfer inside a transaction
+            "_trace_address",
         ]
         return (
             ether_queryset.values(*values)
@@ -1474,7 +1737,27 @@ class SafeStatusQuerySet(models.QuerySet):
         return self.filter(address=address).sorted_by_mined().first()
 
 
-class SafeStatus(models.Model):
+class SafeStatusBase(models.Model):
+    owners = ArrayField(EthereumAddressField())
+    threshold = Uint256Field()
+    nonce = Uint256Field(default=0)
+    master_copy = EthereumAddressField()
+    fallback_handler = EthereumAddressField()
+    guard = EthereumAddressField(default=None, null=True)
+    enabled_modules = ArrayField(EthereumAddressField(), default=list)
+
+    class Meta:
+        abstract = True
+
+    def __str__(self):
+        return f"safe={self.address} threshold={self.threshold} owners={self.owners} nonce={self.nonce}"
+
+    @property
+    def block_number(self) -> int:
+        return self.internal_tx.ethereum_tx.block_id
+
+
+class SafeStatus(SafeStatusBase):
     objects = SafeStatusManager.from_queryset(SafeStatusQuerySet)()
     internal_tx = models.OneToOneField(
         InternalTx,
@@ -1483,13 +1766,6 @@ class SafeStatus(models.Model):
         primary_key=True,
     )
     address = EthereumAddressField(db_index=True)
-    owners = ArrayField(EthereumAddressField())
-    threshold = Uint256Field()
-    nonce = Uint256Field(default=0)
-    master_copy = EthereumAddressField()
-    fallback_handler = EthereumAddressField()
-    guard = EthereumAddressField(default=None, null=True)
-    enabled_modules = ArrayField(EthereumAddressField(), default=list)
 
     class Meta:
         indexes = [
@@ -1500,13 +1776,6 @@ class SafeStatus(models.Model):
         unique_together = (("internal_tx", "address"),)
         verbose_name_plural = "Safe statuses"
 
-    def __str__(self):
-        return f"safe={self.address} threshold={self.threshold} owners={self.owners} nonce={self.nonce}"
-
-    @property
-    def block_number(self) -> int:
-        return self.internal_tx.ethereum_tx.block_id
-
     def is_corrupted(self) -> bool:
         """
         SafeStatus nonce must be incremental. If current nonce is bigger than the number of SafeStatus for that Safe
@@ -1537,6 +1806,900 @@ class SafeStatus(models.Model):
         return self.save(force_insert=True)
 
 
+class SafeLastStatusManager(models.Manager):
+    OWNER_CACHE_TIMEOUT = 60 * 60  # 1 hour
+    OWNERS_CACHE_GENERATION_KEY = "safe-last-status:owners-generation"
+
+    @staticmethod
+    def _new_owner_cache_version() -> str:
+        return uuid.uuid4().hex
+
+    @staticmethod
+    def get_owner_cache_version_key(owner_address: str) -> str:
+        return f"safe-last-status:owner-version:{owner_address}"
+
+    def get_owner_cache_key(self, owner_address: str) -> str:
+        """
+        Cached Safes for an owner are not removed when invalidated, instead the key changes. Otherwise, a
+        query run before the invalidation could store its outdated result after it
+
+        :param owner_address:
+        :return: Cache key for the current version of the cached Safes for `owner_address`
+        """
+        version_key = self.get_owner_cache_version_key(owner_address)
+        versions = django_cache.get_many(
+            [self.OWNERS_CACHE_GENERATION_KEY, version_key]
+        )
+        if (generation := versions.get(self.OWNERS_CACHE_GENERATION_KEY)) is None:
+            generation = django_cache.get_or_set(
+                self.OWNERS_CACHE_GENERATION_KEY, self._new_owner_cache_version, None
+            )
+        if (version := versions.get(version_key)) is None:
+            version = django_cache.get_or_set(
+                version_key, self._new_owner_cache_version, self.OWNER_CACHE_TIMEOUT
+            )
+        return f"safe-last-status:owner:{owner_address}:{generation}:{version}"
+
+    def _invalidate_owners_cache(self, owners: Iterable[str]) -> None:
+        """
+        Invalidate cached Safes for `owners` when the transaction is committed
+
+        :param owners:
+        """
+        if owners := set(owners):
+            transaction.on_commit(
+                lambda: django_cache.set_many(
+                    {
+                        self.get_owner_cache_version_key(
+                            owner
+                        ): self._new_owner_cache_version()
+                        for owner in owners
+                    },
+                    self.OWNER_CACHE_TIMEOUT,
+                )
+            )
+
+    def _invalidate_all_owners_cache(self) -> None:
+        """
+        Invalidate cached Safes for every owner when the transaction is committed
+        """
+        transaction.on_commit(
+            lambda: django_cache.set(
+                self.OWNERS_CACHE_GENERATION_KEY, self._new_owner_cache_version(), None
+            )
+        )
+
+    def addresses_for_owner(self, owner_address: str) -> Set[str]:
+        """
+        :param owner_address:
+        :return: Safes where `owner_address` is currently an owner. Result is cached until owners for one of
+            the Safes are modified
+        """
+        cache_key = self.get_owner_cache_key(owner_address)
+        if (addresses := django_cache.get(cache_key)) is None:
+            addresses = set(
+                self.filter(owners__contains=[owner_address]).values_list(
+                    "address", flat=True
+                )
+            )
+            django_cache.set(cache_key, addresses, self.OWNER_CACHE_TIMEOUT)
+        return addresses
+
+    def get_or_generate(self, address: str) -> Optional["SafeLastStatus"]:
+        """
+        :param address:
+        :return: `SafeLastStatus` for the Safe, generated from the last `SafeStatus` if not stored yet.
+            `None` if there's no `SafeStatus` for the Safe
+        """
+        try:
+            return self.select_related("internal_tx__ethereum_tx").get(address=address)
+        except SafeLastStatus.DoesNotExist:
+            if safe_status := SafeStatus.objects.last_for_address(address):
+                safe_last_status, created = self.get_or_create(
+                    address=address,
+                    defaults=SafeLastStatus.get_fields_from_safe_status(safe_status),
+                )
+                if created:
+                    self._invalidate_owners_cache(safe_last_status.owners)
+                return safe_last_status
+
+    def update_or_create_from_safe_status(
+        self, safe_status: SafeStatus
+    ) -> "SafeLastStatus":
+        """
+        :param safe_status: Last `SafeStatus` stored for a Safe
+        :return: Updated `SafeLastStatus`
+        """
+        fields = SafeLastStatus.get_fields_from_safe_status(safe_status)
+        with transaction.atomic():
+            try:
+                safe_last_status = self.select_for_update().get(
+                    address=safe_status.address
+                )
+                previous_owners = safe_last_status.owners
+                for field, value in fields.items():
+                    setattr(safe_last_status, field, value)
+                safe_last_status.save()
+            except SafeLastStatus.DoesNotExist:
+                previous_owners = []
+                safe_last_status = self.create(address=safe_status.address, **fields)
+
+        # Owners added or removed
+        self._invalidate_owners_cache(
+            set(previous_owners).symmetric_difference(safe_last_status.owners)
+        )
+        return safe_last_status
+
+    def invalidate(self, addresses: Optional[Sequence[str]] = None) -> int:
+        """
+        Remove `SafeLastStatus`, they will be generated again from `SafeStatus` when requested. Must be called when
+        `SafeStatus` are deleted
+
+        :param addresses: If not provided, every `SafeLastStatus` is removed
+        :return: Number of `SafeLastStatus` removed
+        """
+        queryset = self.all()
+        if addresses is None:
+            self._invalidate_all_owners_cache()
+        else:
+            queryset = queryset.filter(address__in=addresses)
+            self._invalidate_owners_cache(
+                owner
+                for owners in queryset.values_list("owners", flat=True)
+                for owner in owners
+            )
+        return queryset.delete()[0]
+
+    def invalidate_from_block_number(self, block_number: int) -> int:
+        """
+        Remove `SafeLastStatus` for `InternalTx` on blocks that are going to be removed (reorgs), invalidating
+        cached Safes for their owners. Must be called before removing the blocks
+
+        :param block_number: First block number removed
+        :return: Number of `SafeLastStatus` removed
+        """
+        return self.invalidate(
+            self.filter(internal_tx__ethereum_tx__block__gte=block_number).values_list(
+                "address", flat=True
+            )
+        )
+
+
+class SafeLastStatus(SafeStatusBase):
+    """
+    Last `SafeStatus` for every Safe, so current state of a Safe can be retrieved without sorting its history.
+    It is removed with the `InternalTx` in case of a reorg (use `invalidate_from_block_number` before, so cached
+    Safes for the owners are invalidated)
+    """
+
+    objects = SafeLastStatusManager()
+    address = EthereumAddressField(primary_key=True)
+    internal_tx = models.OneToOneField(
+        InternalTx,
+        on_delete=models.CASCADE,
+        related_name="safe_last_status",
+    )
+
+    class Meta:
+        indexes = [
+            GinIndex(fields=["owners"], name="history_sls_owners_gin"),
+        ]
+        verbose_name_plural = "Safe last statuses"
+
+    @staticmethod
+    def get_fields_from_safe_status(safe_status: SafeStatusBase) -> Dict[str, Any]:
+        """
+        :param safe_status:
+        :return: Fields for a `SafeLastStatus` built from `safe_status`
+        """
+        return {
+            "internal_tx": safe_status.internal_tx,
+            "owners": safe_status.owners,
+            "threshold": safe_status.threshold,
+            "nonce": safe_status.nonce,
+            "master_copy": safe_status.master_copy,
+            "fallback_handler": safe_status.fallback_handler,
+            "guard": safe_status.guard,
+            "enabled_modules": safe_status.enabled_modules,
+        }
+
+    def get_safe_status(self) -> SafeStatus:
+        """
+        :return: `SafeStatus` with the same fields, not stored on database
+        """
+        return SafeStatus(
+            address=self.address,
+            **self.get_fields_from_safe_status(self),
+        )
+
+
+class SafeStatusIntegrityManager(models.Manager):
+    def build_for_address(self, address: str) -> "SafeStatusIntegrity":
+        """
+        Build integrity record from every `SafeStatus` stored for a Safe
+
+        :param address:
+        :return: Stored `SafeStatusIntegrity`
+        """
+        safe_status_integrity = SafeStatusIntegrity(address=address)
+        safe_status_integrity.add_nonces(
+            SafeStatus.objects.filter(address=address)
+            .order_by("nonce")
+            .values_list("nonce", flat=True)
+            .distinct()
+        )
+        safe_status_integrity.save()
+        return safe_status_integrity
+
+    def get_for_address(self, address: str) -> "SafeStatusIntegrity":
+        """
+        :param address:
+        :return: `SafeStatusIntegrity` for the Safe, built if not stored yet
+        """
+        try:
+            return self.get(address=address)
+        except SafeStatusIntegrity.DoesNotExist:
+            return self.build_for_address(address)
+
+    def get_for_addresses(
+        self, addresses: Sequence[str]
+    ) -> Dict[str, "SafeStatusIntegrity"]:
+        """
+        :param addresses:
+        :return: Dictionary of address and `SafeStatusIntegrity`, built if not stored yet
+        """
+        safe_statuses_integrity = self.in_bulk(addresses)
+        for address in addresses:
+            if address not in safe_statuses_integrity:
+                safe_statuses_integrity[address] = self.build_for_address(address)
+        return safe_statuses_integrity
+
+    def add_nonces(self, address: str, nonces: Sequence[int]) -> "SafeStatusIntegrity":
+        """
+        Update integrity record when new `SafeStatus` are stored for a Safe
+
+        :param address:
+        :param nonces: Nonces of the `SafeStatus` stored
+        :return: Updated `SafeStatusIntegrity`
+        """
+        safe_status_integrity = self.get_for_address(address)
+        if safe_status_integrity.add_nonces(nonces):
+            safe_status_integrity.save(
+                update_fields=["contiguous_nonce", "nonces_after_gap"]
+            )
+        return safe_status_integrity
+
+    def invalidate(self, addresses: Optional[Sequence[str]] = None) -> int:
+        """
+        Remove integrity records, they will be built again from database when requested. Must be called when
+        `SafeStatus` are deleted
+
+        :param addresses: If not provided, every record is removed
+        :return: Number of records removed
+        """
+        queryset = self.all()
+        if addresses is not None:
+            queryset = queryset.filter(address__in=addresses)
+        return queryset.delete()[0]
+
+
+class SafeStatusIntegrity(models.Model):
+    """
+    Keep track of the nonces stored as `SafeStatus` for every Safe, so missing nonces can be detected and
+    located without scanning every `SafeStatus`
+    """
+
+    objects = SafeStatusIntegrityManager()
+    address = EthereumAddressField(primary_key=True)
+    contiguous_nonce = models.BigIntegerField(
+        default=-1
+    )  # Highest nonce with every previous nonce stored, `-1` if nonce `0` is missing
+    nonces_after_gap = ArrayField(
+        models.BigIntegerField(), default=list
+    )  # Nonces stored after the first missing nonce
+
+    class Meta:
+        verbose_name_plural = "Safe statuses integrity"
+
+    def __str__(self):
+        return (
+            f"safe={self.address} contiguous-nonce={self.contiguous_nonce} "
+            f"first-gap={self.first_gap}"
+        )
+
+    @property
+    def first_gap(self) -> Optional[int]:
+        """
+        :return: First missing nonce if there are `SafeStatus` stored after it, `None` otherwise
+        """
+        if self.nonces_after_gap:
+            return self.contiguous_nonce + 1
+
+    def is_corrupted(self) -> bool:
+        """
+        Same as `SafeStatus.is_corrupted` for the last `SafeStatus` of the Safe
+
+        :return: `True` if there are `SafeStatus` stored after a missing nonce, `False` otherwise
+        """
+        return bool(self.nonces_after_gap)
+
+    def add_nonces(self, nonces: Sequence[int]) -> bool:
+        """
+        :param nonces: Nonces of new `SafeStatus` stored
+        :return: `True` if record was modified, `False` otherwise
+        """
+        contiguous_nonce = self.contiguous_nonce
+        nonces_after_gap = set(self.nonces_after_gap)
+        for nonce in nonces:
+            if nonce > contiguous_nonce + 1:
+                nonces_after_gap.add(nonce)
+            elif nonce == contiguous_nonce + 1:
+                contiguous_nonce = nonce
+                while contiguous_nonce + 1 in nonces_after_gap:
+                    contiguous_nonce += 1
+                    nonces_after_gap.remove(contiguous_nonce)
+
+        modified = contiguous_nonce != self.contiguous_nonce or nonces_after_gap != set(
+            self.nonces_after_gap
+        )
+        self.contiguous_nonce = contiguous_nonce
+        self.nonces_after_gap = sorted(nonces_after_gap)
+        return modified
+
+
+class SafeTimelineEntryType(Enum):
+    MULTISIG_TRANSACTION = 0
+    MODULE_TRANSACTION = 1
+    # Incoming/outgoing transfers not included on a Multisig or Module tx
+    ETHEREUM_TRANSACTION = 2
+
+
+class SafeTimelineManager(models.Manager):
+    def get_built_addresses(
+        self, addresses: Iterable[str], for_update: bool = False
+    ) -> Set[str]:
+        """
+        :param addresses:
+        :param for_update: Lock the timelines until the end of the transaction, so they cannot be built meanwhile
+        :return: Addresses with a timeline built or being built, the ones that must be kept updated
+        """
+        queryset = self.filter(address__in=addresses)
+        if for_update:
+            queryset = queryset.select_for_update().order_by("address")
+        return set(queryset.values_list("address", flat=True))
+
+    def build(self, address: str) -> Optional["SafeTimeline"]:
+        """
+        Build the timeline for a Safe from every transaction stored. Timeline is stored (and committed if not
+        inside a transaction) before building the entries, so transactions indexed meanwhile update it, and
+        it's locked while building, so updates wait for the entries to be built and are not lost
+
+        :param address:
+        :return: Stored `SafeTimeline`, `None` if `address` is not a known Safe
+        """
+        if not (
+            SafeContract.objects.filter(address=address).exists()
+            or MultisigTransaction.objects.filter(safe=address).exists()
+        ):
+            return None
+
+        self.get_or_create(address=address)
+        with transaction.atomic():
+            safe_timeline = self.select_for_update().get(address=address)
+            SafeTimelineEntry.objects.filter(safe=address).delete()
+            SafeTimelineEntry.objects.bulk_create(
+                SafeTimelineEntry.objects.build_entries(address),
+                batch_size=500,
+                ignore_conflicts=True,
+            )
+            safe_timeline.built = True
+            safe_timeline.save(update_fields=["built"])
+        return safe_timeline
+
+    def get_or_build(self, address: str) -> Optional["SafeTimeline"]:
+        """
+        :param address:
+        :return: `SafeTimeline` for the Safe, built if not stored yet. `None` if `address` is not a known Safe
+        """
+        try:
+            safe_timeline = self.get(address=address)
+            if safe_timeline.built:
+                return safe_timeline
+        except SafeTimeline.DoesNotExist:
+            pass
+        return self.build(address)
+
+    @transaction.atomic
+    def update_entries(
+        self, changes: Dict[str, Tuple[Iterable[str], Iterable[int]]]
+    ) -> Set[str]:
+        """
+        Update timeline entries when transactions are stored, modified or removed. Safes without a timeline
+        built are ignored, it will be built from database when requested
+
+        :param changes: Safes involved on the transactions, with the ethereum tx hashes and the nonces of the
+            `MultisigTransaction` modified for every Safe
+        :return: Addresses of the timelines updated
+        """
+        built_addresses = self.get_built_addresses(
+            [address for address in changes if address], for_update=True
+        )
+        for address in built_addresses:
+            ethereum_tx_hashes, nonces = changes[address]
+            if ethereum_tx_hashes or nonces:
+                SafeTimelineEntry.objects.update_entries(
+                    address,
+                    ethereum_tx_hashes=list(ethereum_tx_hashes),
+                    nonces=list(nonces),
+                )
+        return built_addresses
+
+    def invalidate(self, addresses: Optional[Sequence[str]] = None) -> int:
+        """
+        Remove timelines, they will be built again from database when requested. Must be called when
+        transactions are modified without using the ORM `save` (e.g. reorgs or reprocessing)
+
+        :param addresses: If not provided, every timeline is removed
+        :return: Number of timelines removed
+        """
+        queryset = self.all()
+        entries_queryset = SafeTimelineEntry.objects.all()
+        if addresses is not None:
+            addresses = list(addresses)
+            queryset = queryset.filter(address__in=addresses)
+            entries_queryset = entries_queryset.filter(safe__in=addresses)
+        entries_queryset.delete()
+        return queryset.delete()[0]
+
+
+class SafeTimeline(models.Model):
+    """
+    Safes with a `SafeTimelineEntry` for every transaction. Timelines are built when requested for the first
+    time (only for indexed Safes or Safes with Multisig txs) and kept updated from then on
+    """
+
+    objects = SafeTimelineManager()
+    address = EthereumAddressField(primary_key=True)
+    built = models.BooleanField(
+        default=False
+    )  # `False` while entries are being built for the first time
+
+    def __str__(self):
+        return f"Timeline for safe={self.address}"
+
+
+class SafeTimelineEntryManager(models.Manager):
+    def build_entries(
+        self,
+        address: str,
+        ethereum_tx_hashes: Optional[Sequence[str]] = None,
+        nonces: Optional[Sequence[int]] = None,
+    ) -> List["SafeTimelineEntry"]:
+        """
+        Build timeline entries from every transaction for a Safe:
+          - A `MultisigTransaction` entry for every multisig tx, using `SafeTxHash`. If tx is not executed, the
+          execution date of the executed tx with the same nonce is used
+          - A `ModuleTransaction` entry for every ethereum tx with module txs
+          - An `EthereumTx` entry for every ethereum tx with incoming ether or incoming/outgoing tokens not
+          included on a Multisig or Module tx
+
+        :param address:
+        :param ethereum_tx_hashes: If provided, only module and transfer entries for those ethereum txs are built
+        :param nonces: If provided, only multisig entries for those nonces are built
+        :return: Entries not stored on database
+        """
+        entries = []
+        if nonces is None or nonces:
+            # If tx is not mined, get the execution date of a tx mined with the same nonce
+            execution_date = Case(
+                When(
+                    ethereum_tx__block=None,
+                    then=MultisigTransaction.objects.filter(
+                        safe=OuterRef("safe"), nonce=OuterRef("nonce")
+                    )
+                    .exclude(ethereum_tx__block=None)
+                    .values("ethereum_tx__block__timestamp")[:1],
+                ),
+                default=F("ethereum_tx__block__timestamp"),
+            )
+            multisig_txs = MultisigTransaction.objects.filter(safe=address)
+            if nonces is not None:
+                multisig_txs = multisig_txs.filter(nonce__in=nonces)
+            entries.extend(
+                self.model(
+                    safe=address,
+                    tx_hash=multisig_tx["safe_tx_hash"],
+                    entry_type=SafeTimelineEntryType.MULTISIG_TRANSACTION.value,
+                    execution_date=multisig_tx["execution_date"],
+                    safe_nonce=multisig_tx["nonce"],
+                    block=multisig_tx["ethereum_tx__block_id"],
+                    created=multisig_tx["created"],
+                    trusted=multisig_tx["trusted"],
+                )
+                for multisig_tx in multisig_txs.annotate(
+                    execution_date=execution_date
+                ).values(
+                    "safe_tx_hash",
+                    "execution_date",
+                    "nonce",
+                    "ethereum_tx__block_id",
+                    "created",
+                    "trusted",
+                )
+            )
+
+        if ethereum_tx_hashes is None or ethereum_tx_hashes:
+            module_txs = ModuleTransaction.objects.filter(safe=address)
+            if ethereum_tx_hashes is not None:
+                module_txs = module_txs.filter(
+                    internal_tx__ethereum_tx__in=ethereum_tx_hashes
+                )
+            entries.extend(
+                self.model(
+                    safe=address,
+                    tx_hash=module_tx["internal_tx__ethereum_tx_id"],
+                    entry_type=SafeTimelineEntryType.MODULE_TRANSACTION.value,
+                    execution_date=module_tx[
+                        "internal_tx__ethereum_tx__block__timestamp"
+                    ],
+                    safe_nonce=0,
+                    block=module_tx["internal_tx__ethereum_tx__block_id"],
+                    created=module_tx["created"],
+                )
+                for module_tx in module_txs.order_by("created").values(
+                    "internal_tx__ethereum_tx_id",
+                    "internal_tx__ethereum_tx__block__timestamp",
+                    "internal_tx__ethereum_tx__block_id",
+                    "created",
+                )
+            )
+
+            # Transfers triggered by Multisig or Module txs are shown inside them. Outgoing tokens can be
+            # triggered by another user after the Safe calls `approve`, that's why they will not always appear
+            # as a MultisigTransaction
+            multisig_and_module_hashes = (
+                MultisigTransaction.objects.filter(safe=address)
+                .exclude(ethereum_tx=None)
+                .values("ethereum_tx_id")
+                .union(
+                    ModuleTransaction.objects.filter(safe=address).values(
+                        "internal_tx__ethereum_tx_id"
+                    )
+                )
+            )
+            for transfers in (
+                ERC20Transfer.objects.to_or_from(address),
+                ERC721Transfer.objects.to_or_from(address),
+                InternalTx.objects.filter(
+                    call_type=EthereumTxCallType.CALL.value,
+                    value__gt=0,
+                    to=address,
+                ),
+            ):
+                if ethereum_tx_hashes is not None:
+                    transfers = transfers.filter(ethereum_tx__in=ethereum_tx_hashes)
+                entries.extend(
+                    self.model(
+                        safe=address,
+                        tx_hash=transfer["ethereum_tx_id"],
+                        entry_type=SafeTimelineEntryType.ETHEREUM_TRANSACTION.value,
+                        execution_date=transfer["ethereum_tx__block__timestamp"],
+                        safe_nonce=0,
+                        block=transfer["ethereum_tx__block_id"],
+                        created=transfer["ethereum_tx__block__timestamp"],
+                    )
+                    for transfer in transfers.exclude(
+                        ethereum_tx__in=multisig_and_module_hashes
+                    )
+                    .values(
+                        "ethereum_tx_id",
+                        "ethereum_tx__block__timestamp",
+                        "ethereum_tx__block_id",
+                    )
+                    .distinct()
+                )
+        return entries
+
+    @transaction.atomic
+    def update_entries(
+        self,
+        address: str,
+        ethereum_tx_hashes: Sequence[str] = (),
+        nonces: Sequence[int] = (),
+    ):
+        """
+        Build again the entries for the provided ethereum txs and nonces. Entries for any other transaction
+        are not affected by the changes on those
+
+        :param address:
+        :param ethereum_tx_hashes: Module and transfer entries for these ethereum txs will be updated
+        :param nonces: Multisig entries for these nonces will be updated
+        """
+        queryset = self.filter(safe=address)
+        if nonces:
+            queryset.filter(
+                entry_type=SafeTimelineEntryType.MULTISIG_TRANSACTION.value,
+                safe_nonce__in=nonces,
+            ).delete()
+        if ethereum_tx_hashes:
+            queryset.exclude(
+                entry_type=SafeTimelineEntryType.MULTISIG_TRANSACTION.value
+            ).filter(tx_hash__in=ethereum_tx_hashes).delete()
+        self.bulk_create(
+            self.build_entries(
+                address, ethereum_tx_hashes=ethereum_tx_hashes, nonces=nonces
+            ),
+            ignore_conflicts=True,
+        )
+
+
+class SafeTimelineEntry(models.Model):
+    """
+    Denormalized timeline with every transaction for a Safe (multisig txs, module txs and incoming/outgoing
+    transfers), so Safe transactions can be paginated using an index
+    """
+
+    objects = SafeTimelineEntryManager()
+    safe = EthereumAddressField()
+    tx_hash = (
+        Sha3HashField()
+    )  # `SafeTxHash` for Multisig txs, `EthereumTx` hash otherwise
+    entry_type = models.PositiveSmallIntegerField(
+        choices=[(tag.value, tag.name) for tag in SafeTimelineEntryType]
+    )
+    execution_date = models.DateTimeField(null=True)
+    safe_nonce = Uint256Field()  # `0` if not a Multisig tx
+    block = models.PositiveIntegerField(null=True)
+    created = models.DateTimeField()
+    trusted = models.BooleanField(default=True)  # Only Multisig txs can be not trusted
+
+    class Meta:
+        indexes = [
+            Index(
+                fields=["safe", "-execution_date", "-safe_nonce", "block", "-created"],
+                name="history_ste_timeline_idx",
+            ),  # Same ordering used for pagination
+        ]
+        unique_together = (("safe", "tx_hash"),)
+        verbose_name_plural = "Safe timeline entries"
+
+    def __str__(self):
+        return (
+            f"safe={self.safe} type={SafeTimelineEntryType(self.entry_type).name} "
+            f"tx-hash={HexBytes(self.tx_hash).hex()}"
+        )
+
+
+class SafeBalanceLedgerManager(models.Manager):
+    def get_built_addresses(
+        self, addresses: Iterable[str], for_update: bool = False
+    ) -> Set[str]:
+        """
+        :param addresses:
+        :param for_update: Lock the ledgers until the end of the transaction, so they cannot be built meanwhile
+        :return: Addresses with a ledger built or being built, the ones that must be kept updated
+        """
+        queryset = self.filter(address__in=addresses)
+        if for_update:
+            queryset = queryset.select_for_update().order_by("address")
+        return set(queryset.values_list("address", flat=True))
+
+    def build(self, address: str) -> "SafeBalanceLedger":
+        """
+        Build the ledger for a Safe from every transfer stored. Ledger is not reconciled. Same as
+        `SafeTimeline`, ledger is stored before building the balances and locked while building them, so
+        transfers indexed meanwhile are not lost
+
+        :param address:
+        :return: Stored `SafeBalanceLedger`
+        """
+        self.get_or_create(address=address)
+        with transaction.atomic():
+            safe_balance_ledger = self.select_for_update().get(address=address)
+            transfers_balances = SafeTokenBalance.objects.get_transfers_balances(
+                address
+            )
+            SafeTokenBalance.objects.filter(safe=address).delete()
+            SafeTokenBalance.objects.bulk_create(
+                [
+                    SafeTokenBalance(
+                        safe=address,
+                        token_address=token_address,
+                        transfers_balance=transfers_balance,
+                    )
+                    for token_address, transfers_balance in transfers_balances.items()
+                ],
+                batch_size=500,
+            )
+            safe_balance_ledger.built = True
+            safe_balance_ledger.reconciled = None
+            safe_balance_ledger.reconciled_block_number = None
+            safe_balance_ledger.save(
+                update_fields=["built", "reconciled", "reconciled_block_number"]
+            )
+        return safe_balance_ledger
+
+    def get_or_build(self, address: str) -> "SafeBalanceLedger":
+        """
+        :param address:
+        :return: `SafeBalanceLedger` for the Safe, built if not stored yet
+        """
+        try:
+            safe_balance_ledger = self.get(address=address)
+            if safe_balance_ledger.built:
+                return safe_balance_ledger
+        except SafeBalanceLedger.DoesNotExist:
+            pass
+        return self.build(address)
+
+    @transaction.atomic
+    def update_balances(self, changes: Dict[str, Iterable[str]]) -> Set[str]:
+        """
+        Update ledgers when transfers are stored. Balances are calculated again from the transfers instead of
+        applying the transfer values, as the same transfer can be stored more than once (e.g. when reindexing).
+        Safes without a ledger built are ignored, it will be built from database when requested
+
+        :param changes: Addresses involved on the transfers, with the tokens transferred for every address
+            (`NULL_ADDRESS` for ether)
+        :return: Addresses of the ledgers updated
+        """
+        built_addresses = self.get_built_addresses(
+            [address for address in changes if address], for_update=True
+        )
+        for address in built_addresses:
+            token_addresses = list(changes[address])
+            transfers_balances = SafeTokenBalance.objects.get_transfers_balances(
+                address, token_addresses=token_addresses
+            )
+            for token_address in token_addresses:
+                SafeTokenBalance.objects.update_or_create(
+                    safe=address,
+                    token_address=token_address,
+                    defaults={
+                        "transfers_balance": transfers_balances.get(token_address, 0)
+                    },
+                )
+        return built_addresses
+
+    def invalidate(self, addresses: Optional[Sequence[str]] = None) -> int:
+        """
+        Remove ledgers, they will be built again from database when requested
+
+        :param addresses: If not provided, every ledger is removed
+        :return: Number of ledgers removed
+        """
+        queryset = self.all()
+        balances_queryset = SafeTokenBalance.objects.all()
+        if addresses is not None:
+            addresses = list(addresses)
+            queryset = queryset.filter(address__in=addresses)
+            balances_queryset = balances_queryset.filter(safe__in=addresses)
+        balances_queryset.delete()
+        return queryset.delete()[0]
+
+    def invalidate_from_block_number(self, block_number: int) -> int:
+        """
+        Remove ledgers with transfers or reconciled on blocks that are going to be removed (reorgs). Must be
+        called before removing the blocks
+
+        :param block_number: First block number removed
+        :return: Number of ledgers removed
+        """
+        ledger_addresses = self.values("address")
+        addresses = set(
+            self.filter(reconciled_block_number__gte=block_number).values_list(
+                "address", flat=True
+            )
+        )
+        for queryset in (
+            ERC20Transfer.objects.all(),
+            InternalTx.objects.filter(
+                call_type=EthereumTxCallType.CALL.value, value__gt=0
+            ),
+        ):
+            queryset = queryset.filter(ethereum_tx__block__gte=block_number)
+            addresses.update(
+                queryset.filter(to__in=ledger_addresses).values_list("to", flat=True)
+            )
+            addresses.update(
+                queryset.filter(_from__in=ledger_addresses).values_list(
+                    "_from", flat=True
+                )
+            )
+        return self.invalidate(addresses) if addresses else 0
+
+
+class SafeBalanceLedger(models.Model):
+    """
+    Safes with a `SafeTokenBalance` for every token (and ether) transferred. Ledgers are built when requested
+    for the first time and kept updated from then on
+    """
+
+    objects = SafeBalanceLedgerManager()
+    address = EthereumAddressField(primary_key=True)
+    built = models.BooleanField(
+        default=False
+    )  # `False` while balances are being built for the first time
+    reconciled = models.DateTimeField(
+        null=True, blank=True, db_index=True
+    )  # Last time balances were checked against the blockchain
+    reconciled_block_number = models.PositiveIntegerField(null=True, blank=True)
+
+    def __str__(self):
+        return f"Balance ledger for safe={self.address}"
+
+
+class SafeTokenBalanceManager(models.Manager):
+    def get_transfers_balances(
+        self,
+        address: str,
+        token_addresses: Optional[Sequence[str]] = None,
+        block_number: Optional[int] = None,
+    ) -> Dict[str, int]:
+        """
+        :param address: Safe address
+        :param token_addresses: If provided, only balances for these tokens are calculated. Use `NULL_ADDRESS`
+            for ether
+        :param block_number: If provided, only transfers until that block (included) are used
+        :return: Dictionary of token address and balance calculated from the indexed transfers, using
+            `NULL_ADDRESS` for ether. Balances can be negative if not every transfer was indexed
+        """
+        sums = {
+            "incoming": Sum("value", filter=Q(to=address)),
+            "outgoing": Sum("value", filter=Q(_from=address)),
+        }
+        erc20_queryset = ERC20Transfer.objects.to_or_from(address)
+        ether_queryset = InternalTx.objects.filter(
+            Q(to=address) | Q(_from=address),
+            call_type=EthereumTxCallType.CALL.value,
+            value__gt=0,
+        )
+        if block_number is not None:
+            erc20_queryset = erc20_queryset.filter(ethereum_tx__block__lte=block_number)
+            ether_queryset = ether_queryset.filter(ethereum_tx__block__lte=block_number)
+        if token_addresses is not None:
+            erc20_queryset = erc20_queryset.filter(address__in=token_addresses)
+
+        balances = {
+            row["address"]: int(row["incoming"] or 0) - int(row["outgoing"] or 0)
+            for row in erc20_queryset.values("address").annotate(**sums).order_by()
+        }
+        if token_addresses is None or NULL_ADDRESS in token_addresses:
+            ether = ether_queryset.aggregate(**sums)
+            balances[NULL_ADDRESS] = int(ether["incoming"] or 0) - int(
+                ether["outgoing"] or 0
+            )
+        return balances
+
+
+class SafeTokenBalance(models.Model):
+    """
+    Balance of a Safe for a token (`NULL_ADDRESS` for ether) calculated from the indexed transfers, plus an
+    adjustment with the blockchain balance calculated on reconciliation (for tokens not emitting standard
+    events, ether transfers not traced...)
+    """
+
+    objects = SafeTokenBalanceManager()
+    safe = EthereumAddressField()
+    token_address = EthereumAddressField()
+    transfers_balance = models.DecimalField(
+        max_digits=79, decimal_places=0
+    )  # Can be negative if not every transfer was indexed
+    adjustment = models.DecimalField(
+        max_digits=79, decimal_places=0, default=0
+    )  # Blockchain balance minus `transfers_balance` when reconciled
+
+    class Meta:
+        unique_together = (("safe", "token_address"),)
+
+    def __str__(self):
+        return f"safe={self.safe} token={self.token_address} balance={self.balance}"
+
+    @property
+    def balance(self) -> int:
+        return max(int(self.transfers_balance + self.adjustment), 0)
+
+
 class WebHookType(Enum):
     NEW_CONFIRMATION = 0
     PENDING_MULTISIG_TRANSACTION = 1
@@ -1,11 +1,208 @@
+import base64
+import binascii
+import datetime
+import json
+from collections import OrderedDict
+from decimal import Decimal
+from functools import reduce
+from operator import or_
+from typing import Any, List, Optional, Sequence
+
+from django.core.exceptions import ValidationError
+from django.db.models import Model, Q, QuerySet
+
+from hexbytes import HexBytes
+from rest_framework.compat import coreapi, coreschema
+from rest_framework.exceptions import NotFound
 from rest_framework.pagination import LimitOffsetPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPaginationMixin:
+    """
+    Opt-in keyset (cursor) pagination for `LimitOffsetPagination`. If `cursor` query parameter is provided (empty
+    for the first page), elements are filtered using the sort values of the last element of the previous page
+    instead of skipping `offset` rows, so every page costs the same no matter how deep it is. `count` is not
+    returned and only forward navigation is supported (`previous` is always `null`).
+
+    Views must define `keyset_ordering`, a unique ordering for the queryset. For nullable fields Postgres
+    default ordering is expected: `NULLS LAST` for ascending and `NULLS FIRST` for descending. Union querysets
+    cannot be filtered, so views must call `filter_keyset_queryset` on every queryset before the union
+    """
+
+    cursor_query_param = "cursor"
+    cursor_query_description = (
+        "Opaque cursor for keyset pagination. Use an empty cursor for the first page and then follow `next` "
+        "links. `offset` and `count` are not used"
+    )
+    invalid_cursor_message = "Invalid cursor"
+
+    def is_keyset_requested(self, request, view) -> bool:
+        return self.cursor_query_param in request.query_params and bool(
+            getattr(view, "keyset_ordering", None)
+        )
+
+    @staticmethod
+    def _encode_value(value: Any) -> Any:
+        if isinstance(value, (datetime.date, datetime.datetime)):
+            return value.isoformat()
+        elif isinstance(value, Decimal):
+            return int(value) if value == value.to_integral_value() else str(value)
+        elif isinstance(value, (bytes, memoryview)):
+            return HexBytes(value).hex()
+        return value
+
+    def encode_cursor(self, position: Sequence[Any]) -> str:
+        data = json.dumps([self._encode_value(value) for value in position])
+        return base64.urlsafe_b64encode(data.encode()).decode()
+
+    def decode_cursor(self, request, ordering: Sequence[str]) -> Optional[List[Any]]:
+        """
+        :param request:
+        :param ordering:
+        :return: Sort values of the last element of the previous page, `None` for the first page
+        :raises: NotFound if cursor is not valid
+        """
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            position = json.loads(base64.urlsafe_b64decode(encoded.encode()))
+        except (binascii.Error, UnicodeDecodeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(position, list) or len(position) != len(ordering):
+            raise NotFound(self.invalid_cursor_message)
+        return position
+
+    @staticmethod
+    def get_keyset_filter(ordering: Sequence[str], position: Sequence[Any]) -> Q:
+        """
+        :param ordering: Django ordering, e.g. `["-nonce", "safe_tx_hash"]`
+        :param position: Sort values of the last element returned
+        :return: Filter for the elements sorted after `position`
+        """
+        previous_equal = Q()
+        after_filters = []
+        for field, value in zip(ordering, position):
+            descending = field.startswith("-")
+            name = field.lstrip("-")
+            if value is None:
+                equal = Q(**{f"{name}__isnull": True})
+                # NULLs are sorted first on descending order and last on ascending order
+                after = Q(**{f"{name}__isnull": False}) if descending else None
+            else:
+                equal = Q(**{name: value})
+                after = Q(**{f"{name}__{'lt' if descending else 'gt'}": value})
+                if not descending:
+                    after |= Q(**{f"{name}__isnull": True})
+            if after is not None:
+                after_filters.append(previous_equal & after)
+            previous_equal &= equal
+
+        if not after_filters:
+            return Q(pk__in=[])
+        keyset_filter = reduce(or_, after_filters)
+
+        # Redundant range on the first field, so an index can be used
+        field, value = ordering[0], position[0]
+        if value is not None and field.startswith("-"):
+            keyset_filter &= Q(**{f"{field.lstrip('-')}__lte": value})
+        elif value is not None:
+            keyset_filter &= Q(**{f"{field}__gte": value}) | Q(
+                **{f"{field}__isnull": True}
+            )
+        return keyset_filter
+
+    def filter_keyset_queryset(self, queryset: QuerySet, request, view) -> QuerySet:
+        """
+        :param queryset:
+        :param request:
+        :param view:
+        :return: Queryset filtered to return the elements after the cursor, not modified if keyset
+            pagination was not requested
+        """
+        if not self.is_keyset_requested(request, view):
+            return queryset
+        ordering = view.keyset_ordering
+        position = self.decode_cursor(request, ordering)
+        if position is None:
+            return queryset
+        try:
+            return queryset.filter(self.get_keyset_filter(ordering, position))
+        except (ValidationError, ValueError, TypeError):
+            raise NotFound(self.invalid_cursor_message)
+
+    @staticmethod
+    def _get_position(element: Any, ordering: Sequence[str]) -> List[Any]:
+        names = [field.lstrip("-") for field in ordering]
+        if isinstance(element, Model):
+            return [getattr(element, name) for name in names]
+        return [element[name] for name in names]
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = self.is_keyset_requested(request, view)
+        if not self.keyset:
+            return super().paginate_queryset(queryset, request, view)
+
+        self.request = request
+        self.limit = self.get_limit(request)
+        if not queryset.query.combinator:
+            queryset = self.filter_keyset_queryset(queryset, request, view)
+        ordering = view.keyset_ordering
+        results = list(queryset.order_by(*ordering)[: self.limit + 1])
+        self.next_position = None
+        if len(results) > self.limit:
+            results = results[: self.limit]
+            self.next_position = self._get_position(results[-1], ordering)
+        return results
+
+    def get_next_link(self):
+        if not self.keyset:
+            return super().get_next_link()
+        if self.next_position is None:
+            return None
+        url = remove_query_param(
+            self.request.build_absolute_uri(), self.offset_query_param
+        )
+        return replace_query_param(
+            url, self.cursor_query_param, self.encode_cursor(self.next_position)
+        )
+
+    def get_paginated_response(self, data):
+        if not self.keyset:
+            return super().get_paginated_response(data)
+        return Response(
+            OrderedDict(
+                [
+                    ("next", self.get_next_link()),
+                    ("previous", None),
+                    ("results", data),
+                ]
+            )
+        )
+
+    def get_schema_fields(self, view):
+        fields = super().get_schema_fields(view)
+        if getattr(view, "keyset_ordering", None):
+            fields.append(
+                coreapi.Field(
+                    name=self.cursor_query_param,
+                    required=False,
+                    location="query",
+                    schema=coreschema.String(
+                        title="Cursor", description=self.cursor_query_description
+                    ),
+                )
+            )
+        return fields
 
 
-class DefaultPagination(LimitOffsetPagination):
+class DefaultPagination(KeysetPaginationMixin, LimitOffsetPagination):
     max_limit = 200
     default_limit = 100
 
 
-class SmallPagination(LimitOffsetPagination):
+class SmallPagination(KeysetPaginationMixin, LimitOffsetPagination):
     max_limit = 100
     default_limit = 20
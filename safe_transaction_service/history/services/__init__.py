@@ -1,7 +1,16 @@
 # flake8: noqa F401
 from .balance_service import BalanceService, BalanceServiceProvider
+from .block_ingestion_service import (
+    BlockIngestionService,
+    BlockIngestionServiceProvider,
+)
+from .chain_data_cache import ChainDataCache, ChainDataCacheProvider
 from .collectibles_service import CollectiblesService, CollectiblesServiceProvider
 from .index_service import IndexingException, IndexService, IndexServiceProvider
 from .reorg_service import ReorgService, ReorgServiceProvider
+from .safe_data_version_service import (
+    SafeDataVersionService,
+    SafeDataVersionServiceProvider,
+)
 from .safe_service import SafeService, SafeServiceProvider
 from .transaction_service import TransactionService, TransactionServiceProvider
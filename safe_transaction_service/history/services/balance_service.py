@@ -2,10 +2,12 @@ import logging
 import operator
 from dataclasses import dataclass
 from datetime import datetime
-from typing import List, Optional, Sequence
+from typing import Any, Dict, List, Optional, Sequence
 
 from django.core.cache import cache as django_cache
-from django.db.models import Q
+from django.db import transaction
+from django.db.models import Min, Q
+from django.utils import timezone
 
 from cache_memoize import cache_memoize
 from cachetools import TTLCache, cachedmethod
@@ -14,6 +16,8 @@ from redis import Redis
 from web3 import Web3
 
 from gnosis.eth import EthereumClient, EthereumClientProvider
+from gnosis.eth.constants import NULL_ADDRESS
+from gnosis.eth.contracts import get_erc20_contract
 
 from safe_transaction_service.tokens.clients import CannotGetPrice
 from safe_transaction_service.tokens.models import Token
@@ -25,11 +29,40 @@ from safe_transaction_service.tokens.services.price_service import (
 from safe_transaction_service.utils.redis import get_redis
 
 from ..exceptions import NodeConnectionException
-from ..models import ERC20Transfer, InternalTx, MultisigTransaction
+from ..models import (
+    ERC20Transfer,
+    SafeBalanceLedger,
+    SafeContract,
+    SafeLastStatus,
+    SafeMasterCopy,
+    SafeTokenBalance,
+)
+from .safe_data_version_service import (
+    SafeDataVersionService,
+    SafeDataVersionServiceProvider,
+)
 
 logger = logging.getLogger(__name__)
 
 
+# Errors returned by the nodes when state for the block requested was pruned or is not available yet
+MISSING_STATE_ERRORS = (
+    "missing trie node",
+    "header not found",
+    "state is not available",
+    "state histories haven't been fully indexed yet",
+)
+
+
+def is_missing_state_error(exc: Exception) -> bool:
+    """
+    :param exc:
+    :return: `True` if node could not answer because it has no state for the block requested
+    """
+    message = str(exc).lower()
+    return any(error in message for error in MISSING_STATE_ERRORS)
+
+
 class BalanceServiceException(Exception):
     pass
 
@@ -72,8 +105,15 @@ class BalanceWithFiat(Balance):
 class BalanceServiceProvider:
     def __new__(cls):
         if not hasattr(cls, "instance"):
+            from django.conf import settings
+
             cls.instance = BalanceService(
-                EthereumClientProvider(), PriceServiceProvider(), get_redis()
+                EthereumClientProvider(),
+                PriceServiceProvider(),
+                get_redis(),
+                SafeDataVersionServiceProvider(),
+                use_balances_ledger=settings.ETH_BALANCES_LEDGER,
+                eth_reorg_blocks=settings.ETH_REORG_BLOCKS,
             )
         return cls.instance
 
@@ -85,12 +125,30 @@ class BalanceServiceProvider:
 
 class BalanceService:
     def __init__(
-        self, ethereum_client: EthereumClient, price_service: PriceService, redis: Redis
+        self,
+        ethereum_client: EthereumClient,
+        price_service: PriceService,
+        redis: Redis,
+        safe_data_version_service: SafeDataVersionService,
+        use_balances_ledger: bool = False,
+        eth_reorg_blocks: int = 10,
     ):
+        """
+        :param ethereum_client:
+        :param price_service:
+        :param redis:
+        :param safe_data_version_service:
+        :param use_balances_ledger: Get balances from `SafeTokenBalance` instead of querying the node
+        :param eth_reorg_blocks: Ledgers are only reconciled for Safes indexed up to `eth_reorg_blocks` from the
+            current block, as nodes not storing historical state (non archive nodes) prune older states
+        """
         self.ethereum_client = ethereum_client
         self.ethereum_network = self.ethereum_client.get_network()
         self.price_service = price_service
         self.redis = redis
+        self.safe_data_version_service = safe_data_version_service
+        self.use_balances_ledger = use_balances_ledger
+        self.eth_reorg_blocks = eth_reorg_blocks
         self.cache_token_info = TTLCache(
             maxsize=4096, ttl=60 * 30
         )  # 2 hours of caching
@@ -152,19 +210,11 @@ class BalanceService:
         for one hour
         """
 
-        # Cache based on the number of erc20 events and the ether transferred, and also check outgoing ether
-        # transactions that will not emit events on non L2 networks
-        events_sending_eth = (
-            MultisigTransaction.objects.ether_transfers()
-            .executed()
-            .filter(safe=safe_address)
-            .count()
+        # Cache based on the data version of the Safe, incremented when the Safe has new transfers or executions
+        data_version = self.safe_data_version_service.get_version(safe_address)
+        cache_key = (
+            f"balances:{safe_address}:{only_trusted}:{exclude_spam}:{data_version}"
         )
-        number_erc20_events = ERC20Transfer.objects.to_or_from(safe_address).count()
-        number_eth_events = InternalTx.objects.ether_txs_for_address(
-            safe_address
-        ).count()
-        cache_key = f"balances:{safe_address}:{only_trusted}:{exclude_spam}:{number_erc20_events}:{number_eth_events}:{events_sending_eth}"
         if balances := django_cache.get(cache_key):
             return balances
         else:
@@ -188,20 +238,27 @@ class BalanceService:
             safe_address
         ), f"Not valid address {safe_address} for getting balances"
 
-        all_erc20_addresses = ERC20Transfer.objects.tokens_used_by_address(safe_address)
-        for address in all_erc20_addresses:
-            # Store tokens in database if not present
-            self.get_token_info(address)  # This is cached
-        erc20_addresses = self._filter_addresses(
-            all_erc20_addresses, only_trusted, exclude_spam
-        )
-
-        try:
-            raw_balances = self.ethereum_client.erc20.get_balances(
-                safe_address, erc20_addresses
+        if self.use_balances_ledger:
+            raw_balances = self._get_raw_balances_from_ledger(
+                safe_address, only_trusted, exclude_spam
+            )
+        else:
+            all_erc20_addresses = ERC20Transfer.objects.tokens_used_by_address(
+                safe_address
+            )
+            for address in all_erc20_addresses:
+                # Store tokens in database if not present
+                self.get_token_info(address)  # This is cached
+            erc20_addresses = self._filter_addresses(
+                all_erc20_addresses, only_trusted, exclude_spam
             )
-        except (IOError, ValueError) as exc:
-            raise NodeConnectionException from exc
+
+            try:
+                raw_balances = self.ethereum_client.erc20.get_balances(
+                    safe_address, erc20_addresses
+                )
+            except (IOError, ValueError) as exc:
+                raise NodeConnectionException from exc
 
         balances = []
         for balance in raw_balances:
@@ -216,6 +273,184 @@ class BalanceService:
             balances.append(Balance(**balance))
         return balances
 
+    def _get_raw_balances_from_ledger(
+        self,
+        safe_address: ChecksumAddress,
+        only_trusted: bool = False,
+        exclude_spam: bool = False,
+    ) -> List[Dict[str, Any]]:
+        """
+        Ledger is built and reconciled the first time it's requested, after that no node queries are needed
+
+        :param safe_address:
+        :param only_trusted: If True, return balance only for trusted tokens
+        :param exclude_spam: If True, exclude spam tokens
+        :return: `{'token_address': str, 'balance': int}`. For ether, `token_address` is `None`
+        """
+        safe_balance_ledger = SafeBalanceLedger.objects.get_or_build(safe_address)
+        if not safe_balance_ledger.reconciled:
+            self.reconcile_balances(safe_address)
+
+        balances = {
+            safe_token_balance.token_address: safe_token_balance.balance
+            for safe_token_balance in SafeTokenBalance.objects.filter(safe=safe_address)
+        }
+        ether_balance = balances.pop(NULL_ADDRESS, 0)
+        # Every token used by the Safe is returned, even with no balance, same as when querying the node
+        all_erc20_addresses = set(balances)
+        for address in all_erc20_addresses:
+            # Store tokens in database if not present
+            self.get_token_info(address)  # This is cached
+        erc20_addresses = self._filter_addresses(
+            all_erc20_addresses, only_trusted, exclude_spam
+        )
+        return [{"token_address": None, "balance": ether_balance}] + [
+            {"token_address": address, "balance": balances.get(address, 0)}
+            for address in erc20_addresses
+        ]
+
+    def get_indexed_block_number(self, safe_address: ChecksumAddress) -> Optional[int]:
+        """
+        :param safe_address:
+        :return: Block number with every ERC20 and ether transfer for the Safe already indexed, `None` if
+            Safe is not indexed
+        """
+        try:
+            erc20_block_number = SafeContract.objects.values_list(
+                "erc20_block_number", flat=True
+            ).get(address=safe_address)
+        except SafeContract.DoesNotExist:
+            return None
+        # Ether transfers are indexed tracing the master copy of the Safe, so other master copies lagging
+        # behind (e.g. being reindexed) don't matter. If master copy is not known, all of them are considered
+        ether_block_number = None
+        if master_copy := (
+            SafeLastStatus.objects.filter(address=safe_address)
+            .values_list("master_copy", flat=True)
+            .first()
+        ):
+            ether_block_number = (
+                SafeMasterCopy.objects.filter(address=master_copy)
+                .values_list("tx_block_number", flat=True)
+                .first()
+            )
+        if ether_block_number is None:
+            ether_block_number = SafeMasterCopy.objects.aggregate(
+                block_number=Min("tx_block_number")
+            )["block_number"]
+        if ether_block_number is None:
+            return erc20_block_number
+        return min(erc20_block_number, ether_block_number)
+
+    def reconcile_balances(self, safe_address: ChecksumAddress) -> Optional[int]:
+        """
+        Compare ledger balances with the blockchain balances and store the difference as an adjustment, so
+        tokens not emitting standard events (e.g. `events_bugged` or rebasing tokens) and ether transfers not
+        traced are also accounted. Blockchain balances are queried for the last block indexed for the Safe,
+        so transfers not indexed yet are not accounted twice. State for that block is only queried if it's
+        inside the reorg window, so an archive node is not required
+
+        :param safe_address:
+        :return: Number of balances reconciled, `None` if ledger could not be reconciled
+        :raises: NodeConnectionException
+        """
+        block_number = self.get_indexed_block_number(safe_address)
+        if block_number is None:
+            logger.warning(
+                "Cannot reconcile balances for safe=%s, it's not indexed", safe_address
+            )
+            return None
+
+        try:
+            current_block_number = self.ethereum_client.current_block_number
+        except (IOError, ValueError) as exc:
+            raise NodeConnectionException from exc
+        if current_block_number - block_number > self.eth_reorg_blocks:
+            logger.info(
+                "Cannot reconcile balances for safe=%s, indexed block-number=%d is more than %d blocks "
+                "behind current block-number=%d",
+                safe_address,
+                block_number,
+                self.eth_reorg_blocks,
+                current_block_number,
+            )
+            return None
+
+        SafeBalanceLedger.objects.get_or_build(safe_address)
+        token_addresses = sorted(
+            set(
+                SafeTokenBalance.objects.filter(safe=safe_address)
+                .exclude(token_address=NULL_ADDRESS)
+                .values_list("token_address", flat=True)
+            )
+            | set(
+                Token.objects.filter(events_bugged=True).values_list(
+                    "address", flat=True
+                )
+            )
+        )
+        try:
+            blockchain_balances = [
+                self.ethereum_client.get_balance(
+                    safe_address, block_identifier=block_number
+                )
+            ] + self.ethereum_client.batch_call(
+                [
+                    get_erc20_contract(
+                        self.ethereum_client.w3, token_address
+                    ).functions.balanceOf(safe_address)
+                    for token_address in token_addresses
+                ],
+                raise_exception=False,
+                block_identifier=block_number,
+            )
+        except ValueError as exc:
+            if is_missing_state_error(exc):
+                logger.warning(
+                    "Cannot reconcile balances for safe=%s, node has no state for block-number=%d: %s",
+                    safe_address,
+                    block_number,
+                    exc,
+                )
+                return None
+            raise NodeConnectionException from exc
+        except IOError as exc:
+            raise NodeConnectionException from exc
+
+        token_addresses = [NULL_ADDRESS] + token_addresses
+        transfers_balances = SafeTokenBalance.objects.get_transfers_balances(
+            safe_address, token_addresses=token_addresses, block_number=block_number
+        )
+        reconciled = 0
+        with transaction.atomic():
+            for token_address, blockchain_balance in zip(
+                token_addresses, blockchain_balances
+            ):
+                if not isinstance(blockchain_balance, int):  # Not an ERC20 token
+                    continue
+                adjustment = blockchain_balance - transfers_balances.get(
+                    token_address, 0
+                )
+                # Only `adjustment` is updated, `transfers_balance` can be updated at the same time by the indexer
+                if (
+                    not SafeTokenBalance.objects.filter(
+                        safe=safe_address, token_address=token_address
+                    ).update(adjustment=adjustment)
+                    and adjustment
+                ):
+                    SafeTokenBalance.objects.create(
+                        safe=safe_address,
+                        token_address=token_address,
+                        transfers_balance=0,
+                        adjustment=adjustment,
+                    )
+                reconciled += 1
+            SafeBalanceLedger.objects.filter(address=safe_address).update(
+                reconciled=timezone.now(), reconciled_block_number=block_number
+            )
+        self.safe_data_version_service.increment_versions([safe_address])
+        return reconciled
+
     @cachedmethod(cache=operator.attrgetter("cache_token_info"))
     @cache_memoize(60 * 60, prefix="balances-get_token_info")  # 1 hour
     def get_token_info(
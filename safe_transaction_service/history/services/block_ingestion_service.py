@@ -0,0 +1,290 @@
+import logging
+import pickle
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from hexbytes import HexBytes
+from redis import Redis
+from web3.types import BlockData, LogReceipt
+
+from gnosis.eth import EthereumClient
+
+from safe_transaction_service.utils.redis import get_redis
+
+logger = logging.getLogger(__name__)
+
+
+class BlockIngestionServiceProvider:
+    def __new__(cls):
+        if not hasattr(cls, "instance"):
+            from django.conf import settings
+
+            tracing_enabled = bool(
+                settings.ETHEREUM_TRACING_NODE_URL and not settings.ETH_L2_NETWORK
+            )
+            node_url = (
+                settings.ETHEREUM_TRACING_NODE_URL
+                if tracing_enabled
+                else settings.ETHEREUM_NODE_URL
+            )
+            cls.instance = BlockIngestionService(
+                EthereumClient(node_url),
+                get_redis(),
+                tracing_enabled,
+                blocks_to_keep=settings.ETH_BLOCK_INGESTION_BLOCKS,
+            )
+        return cls.instance
+
+    @classmethod
+    def del_singleton(cls):
+        if hasattr(cls, "instance"):
+            del cls.instance
+
+
+class BlockIngestionService:
+    """
+    Follows the head of the chain fetching every new block once (header, every log and the traces if tracing
+    is enabled) and shares them using redis, so the indexers working near the chain tip don't request the same
+    data to the node again. Indexers must fall back to the node if data for a block is not available
+    """
+
+    KEY_PREFIX = "block-ingestion"
+    FETCH_RETRIES = (
+        3  # Times to fetch blocks again if a reorg happens while fetching them
+    )
+
+    def __init__(
+        self,
+        ethereum_client: EthereumClient,
+        redis: Redis,
+        tracing_enabled: bool,
+        blocks_to_keep: int = 20,
+        cache_timeout: int = 60 * 60,
+    ):
+        """
+        :param ethereum_client:
+        :param redis:
+        :param tracing_enabled: If `True`, `trace_block` will be ingested too
+        :param blocks_to_keep: Number of most recent blocks to keep ingested
+        :param cache_timeout: Seconds to keep the data of a block
+        """
+        self.ethereum_client = ethereum_client
+        self.redis = redis
+        self.tracing_enabled = tracing_enabled
+        self.blocks_to_keep = blocks_to_keep
+        self.cache_timeout = cache_timeout
+
+    def _get_key(self, kind: str, block_number: int) -> str:
+        return f"{self.KEY_PREFIX}:{kind}:{block_number}"
+
+    @property
+    def last_block_number_key(self) -> str:
+        return f"{self.KEY_PREFIX}:last-block-number"
+
+    def _get_many(self, kind: str, block_numbers: Sequence[int]) -> List[Optional[Any]]:
+        if not block_numbers:
+            return []
+        return [
+            None if value is None else pickle.loads(value)
+            for value in self.redis.mget(
+                [self._get_key(kind, block_number) for block_number in block_numbers]
+            )
+        ]
+
+    def get_last_block_number(self) -> Optional[int]:
+        """
+        :return: Last block number ingested, `None` if nothing was ingested
+        """
+        if last_block_number := self.redis.get(self.last_block_number_key):
+            return int(last_block_number)
+        return None
+
+    def get_blocks(self, block_numbers: Sequence[int]) -> List[Optional[BlockData]]:
+        """
+        :param block_numbers:
+        :return: Block headers, `None` for blocks not ingested
+        """
+        return self._get_many("block", block_numbers)
+
+    def get_logs(
+        self, from_block_number: int, to_block_number: int
+    ) -> Optional[List[LogReceipt]]:
+        """
+        :param from_block_number:
+        :param to_block_number:
+        :return: Every log between `from_block_number` and `to_block_number` (both included), sorted by
+            block number and log index. `None` if any of the blocks was not ingested
+        """
+        if (to_block_number - from_block_number) >= self.blocks_to_keep:
+            return None
+
+        logs: List[LogReceipt] = []
+        for block_logs in self._get_many(
+            "logs", range(from_block_number, to_block_number + 1)
+        ):
+            if block_logs is None:
+                return None
+            logs.extend(block_logs)
+        return logs
+
+    def get_traces(
+        self, block_numbers: Sequence[int]
+    ) -> Optional[List[List[Dict[str, Any]]]]:
+        """
+        :param block_numbers:
+        :return: `trace_block` result for every block. `None` if any of the blocks was not ingested
+        """
+        if not self.tracing_enabled or len(block_numbers) > self.blocks_to_keep:
+            return None
+
+        traces = self._get_many("traces", block_numbers)
+        if any(block_traces is None for block_traces in traces):
+            return None
+        return traces
+
+    def invalidate_from_block_number(self, block_number: int) -> int:
+        """
+        Remove ingested data for blocks greater or equal than `block_number`, for example when a reorg is detected
+
+        :param block_number:
+        :return: Number of keys removed
+        """
+        last_block_number = self.get_last_block_number()
+        if last_block_number is None or last_block_number < block_number:
+            return 0
+
+        keys = [
+            self._get_key(kind, number)
+            for number in range(
+                max(block_number, last_block_number - self.blocks_to_keep + 1),
+                last_block_number + 1,
+            )
+            for kind in ("block", "logs", "traces")
+        ]
+        pipe = self.redis.pipeline()
+        pipe.delete(*keys)
+        pipe.set(self.last_block_number_key, block_number - 1)
+        return pipe.execute()[0]
+
+    def _fetch_blocks(
+        self, block_numbers: Sequence[int]
+    ) -> Optional[
+        Tuple[List[BlockData], Dict[int, List[LogReceipt]], List[List[Dict[str, Any]]]]
+    ]:
+        """
+        Blocks, logs and traces are fetched using different requests, so a reorg between them could mix data
+        from different chains. Every log and trace is checked against the hash of the fetched block, and
+        everything is fetched again if they don't match
+
+        :param block_numbers: Consecutive block numbers
+        :return: Tuple with the blocks, the logs for every block number and the traces for every block (empty
+            if tracing is not enabled). `None` if blocks could not be retrieved or chain kept changing
+        """
+        from_block_number, to_block_number = block_numbers[0], block_numbers[-1]
+        for _ in range(self.FETCH_RETRIES):
+            blocks = self.ethereum_client.get_blocks(block_numbers)
+            if any(block is None for block in blocks):
+                logger.warning(
+                    "Cannot retrieve every block from-block=%d to-block=%d",
+                    from_block_number,
+                    to_block_number,
+                )
+                return None
+
+            block_hashes = {
+                block["number"]: HexBytes(block["hash"]) for block in blocks
+            }
+            consistent = all(
+                block["parentHash"] == previous_block["hash"]
+                for previous_block, block in zip(blocks, blocks[1:])
+            )
+            block_logs: Dict[int, List[LogReceipt]] = defaultdict(list)
+            if consistent:
+                for log in self.ethereum_client.slow_w3.eth.get_logs(
+                    {"fromBlock": from_block_number, "toBlock": to_block_number}
+                ):
+                    if HexBytes(log["blockHash"]) != block_hashes.get(
+                        log["blockNumber"]
+                    ):
+                        consistent = False
+                        break
+                    block_logs[log["blockNumber"]].append(dict(log))
+
+            traces = []
+            if consistent and self.tracing_enabled:
+                traces = self.ethereum_client.parity.trace_blocks(block_numbers)
+                consistent = all(
+                    HexBytes(trace["blockHash"]) == block_hashes[block_number]
+                    for block_number, block_traces in zip(block_numbers, traces)
+                    for trace in block_traces or []
+                    if trace.get("blockHash")
+                )
+
+            if consistent:
+                return blocks, block_logs, traces
+
+            logger.warning(
+                "Chain changed while fetching blocks from-block=%d to-block=%d, fetching them again",
+                from_block_number,
+                to_block_number,
+            )
+        return None
+
+    def ingest(self, confirmations: int = 1) -> int:
+        """
+        Fetch and store data for the blocks mined since the last call
+
+        :param confirmations: Don't ingest the last `confirmations` blocks, as they are more likely to be reorged
+        :return: Number of blocks ingested
+        """
+        to_block_number = self.ethereum_client.current_block_number - confirmations
+        last_block_number = self.get_last_block_number()
+        from_block_number = to_block_number - self.blocks_to_keep + 1
+        if last_block_number is not None:
+            from_block_number = max(from_block_number, last_block_number + 1)
+        from_block_number = max(from_block_number, 0)
+        if from_block_number > to_block_number:
+            return 0
+
+        block_numbers = list(range(from_block_number, to_block_number + 1))
+        if not (fetched_blocks := self._fetch_blocks(block_numbers)):
+            return 0
+        blocks, block_logs, traces = fetched_blocks
+
+        # Check that the chain of ingested blocks is not broken by a reorg
+        (previous_block,) = self.get_blocks([from_block_number - 1])
+        if previous_block and previous_block["hash"] != blocks[0]["parentHash"]:
+            logger.warning(
+                "Reorg detected ingesting block-number=%d, invalidating ingested blocks",
+                from_block_number,
+            )
+            self.invalidate_from_block_number(from_block_number - self.blocks_to_keep)
+            return 0
+
+        pipe = self.redis.pipeline()
+        for i, (block_number, block) in enumerate(zip(block_numbers, blocks)):
+            logs = sorted(block_logs[block_number], key=lambda log: log["logIndex"])
+            pipe.set(
+                self._get_key("block", block_number),
+                pickle.dumps(dict(block)),
+                ex=self.cache_timeout,
+            )
+            pipe.set(
+                self._get_key("logs", block_number),
+                pickle.dumps(logs),
+                ex=self.cache_timeout,
+            )
+            if self.tracing_enabled:
+                pipe.set(
+                    self._get_key("traces", block_number),
+                    pickle.dumps(traces[i]),
+                    ex=self.cache_timeout,
+                )
+        pipe.set(self.last_block_number_key, to_block_number)
+        pipe.execute()
+        logger.debug(
+            "Ingested blocks from-block=%d to-block=%d",
+            from_block_number,
+            to_block_number,
+        )
+        return len(block_numbers)
@@ -0,0 +1,318 @@
+import fcntl
+import logging
+import mmap
+import os
+import pickle
+import struct
+import threading
+import zlib
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+from hexbytes import HexBytes
+from web3.types import BlockData, TxData, TxReceipt
+
+from gnosis.eth import EthereumClient
+
+logger = logging.getLogger(__name__)
+
+
+class ChainDataCacheProvider:
+    def __new__(cls):
+        if not hasattr(cls, "instance"):
+            from django.conf import settings
+
+            cls.instance = ChainDataCache(
+                settings.ETH_CHAIN_DATA_CACHE_DIR, settings.ETH_REORG_BLOCKS
+            )
+        return cls.instance
+
+    @classmethod
+    def del_singleton(cls):
+        if hasattr(cls, "instance"):
+            cls.instance.close()
+            del cls.instance
+
+
+class ChainDataStore:
+    """
+    Append-only key/value store of immutable values. Two files are used:
+        - `{name}.dat`: zlib compressed pickled values, one after another.
+        - `{name}.idx`: fixed size entries with `key(32 bytes) | offset(8 bytes) | length(4 bytes)`.
+
+    Writers take an exclusive `flock` and append the value before its index entry, so readers (other processes
+    included) never see an index entry for an incomplete value. Data file is read using `mmap`
+    """
+
+    INDEX_ENTRY = struct.Struct(">32sQI")
+
+    def __init__(self, directory: str, name: str):
+        self.data_path = os.path.join(directory, f"{name}.dat")
+        self.index_path = os.path.join(directory, f"{name}.idx")
+        self.data_fd = os.open(self.data_path, os.O_RDWR | os.O_APPEND | os.O_CREAT)
+        self.index_fd = os.open(self.index_path, os.O_RDWR | os.O_APPEND | os.O_CREAT)
+        self.index: Dict[bytes, Tuple[int, int]] = {}
+        self.index_position = 0  # Bytes of the index file already loaded
+        self.mmap: Optional[mmap.mmap] = None
+        self.lock = threading.Lock()  # Indexers can run threads when pipelining
+
+    def close(self):
+        with self.lock:
+            if self.mmap:
+                self.mmap.close()
+                self.mmap = None
+            os.close(self.data_fd)
+            os.close(self.index_fd)
+
+    def _load_index(self):
+        """
+        Load index entries appended (by this or other process) since last load
+        """
+        index_size = os.fstat(self.index_fd).st_size
+        # Ignore partially written entries
+        index_size -= index_size % self.INDEX_ENTRY.size
+        if index_size <= self.index_position:
+            return
+
+        data = os.pread(
+            self.index_fd, index_size - self.index_position, self.index_position
+        )
+        for key, offset, length in self.INDEX_ENTRY.iter_unpack(data):
+            self.index[key] = (offset, length)
+        self.index_position = index_size
+
+    def _read(self, offset: int, length: int) -> Any:
+        if not self.mmap or len(self.mmap) < offset + length:
+            # Data file grew, map it again
+            if self.mmap:
+                self.mmap.close()
+            self.mmap = mmap.mmap(self.data_fd, 0, access=mmap.ACCESS_READ)
+        return pickle.loads(zlib.decompress(self.mmap[offset : offset + length]))
+
+    def __len__(self):
+        with self.lock:
+            self._load_index()
+            return len(self.index)
+
+    def get_many(self, keys: Sequence[bytes]) -> List[Optional[Any]]:
+        """
+        :param keys:
+        :return: Stored values, `None` for the keys not found
+        """
+        with self.lock:
+            self._load_index()
+            return [
+                self._read(*self.index[key]) if key in self.index else None
+                for key in keys
+            ]
+
+    def put_many(self, items: Sequence[Tuple[bytes, Any]]) -> int:
+        """
+        :param items: Tuples of `key` and `value`. Values for keys already stored are ignored
+        :return: Number of values stored
+        """
+        with self.lock:
+            fcntl.flock(self.index_fd, fcntl.LOCK_EX)
+            try:
+                self._load_index()
+                offset = os.fstat(self.data_fd).st_size
+                data = bytearray()
+                index_entries = bytearray()
+                new_entries: Dict[bytes, Tuple[int, int]] = {}
+                for key, value in items:
+                    if key in self.index or key in new_entries:
+                        continue
+                    compressed = zlib.compress(
+                        pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+                    )
+                    new_entries[key] = (offset + len(data), len(compressed))
+                    index_entries += self.INDEX_ENTRY.pack(
+                        key, offset + len(data), len(compressed)
+                    )
+                    data += compressed
+
+                if new_entries:
+                    os.write(self.data_fd, data)
+                    os.fsync(self.data_fd)
+                    os.write(self.index_fd, index_entries)
+                    self.index.update(new_entries)
+                    self.index_position += len(index_entries)
+                return len(new_entries)
+            finally:
+                fcntl.flock(self.index_fd, fcntl.LOCK_UN)
+
+
+class ChainDataCache:
+    """
+    Local cache of finalized chain data (blocks, transactions, receipts and transaction traces), so reindexing
+    doesn't request again to the node data already downloaded. Only data older than `eth_reorg_blocks` is stored,
+    so it never needs to be invalidated.
+
+    Methods mirror the `EthereumClient` ones and fall back to the provided `ethereum_client` for the elements
+    not cached
+    """
+
+    def __init__(self, directory: str, eth_reorg_blocks: int):
+        """
+        :param directory: Folder to store the cache files
+        :param eth_reorg_blocks: Blocks older than this are considered final
+        """
+        os.makedirs(directory, exist_ok=True)
+        self.eth_reorg_blocks = eth_reorg_blocks
+        # Highest block number known to be final, so the node is only asked for the current block number
+        # when elements newer than it are fetched
+        self.confirmed_block_number = 0
+        self.stores = {
+            name: ChainDataStore(directory, name)
+            for name in ("blocks", "txs", "receipts", "traces")
+        }
+
+    def close(self):
+        for store in self.stores.values():
+            store.close()
+
+    @staticmethod
+    def _get_tx_hash_key(tx_hash: Union[bytes, str]) -> bytes:
+        return bytes(HexBytes(tx_hash))
+
+    @staticmethod
+    def _get_block_number_key(block_number: int) -> bytes:
+        return block_number.to_bytes(32, "big")
+
+    def _get_or_fetch(
+        self,
+        store_name: str,
+        keys: Sequence[bytes],
+        elements_ids: Sequence[Any],
+        fetch_function: Callable[[Sequence[Any]], List[Optional[Any]]],
+        get_block_number: Callable[[Any], Optional[int]],
+        ethereum_client: EthereumClient,
+        current_block_number: Optional[int] = None,
+    ) -> List[Optional[Any]]:
+        """
+        :param store_name:
+        :param keys: Cache keys
+        :param elements_ids: Ids of the elements to pass to `fetch_function`, matching `keys`
+        :param fetch_function: Function to retrieve the missing elements from the node
+        :param get_block_number: Function to get the block number of a retrieved element
+        :param ethereum_client:
+        :param current_block_number: If not provided and it's needed, it will be requested to the node
+        :return: Elements, `None` if not found
+        """
+        store = self.stores[store_name]
+        elements = store.get_many(keys)
+        missing_positions = [
+            position for position, element in enumerate(elements) if element is None
+        ]
+        if not missing_positions:
+            return elements
+
+        fetched_elements = fetch_function(
+            [elements_ids[position] for position in missing_positions]
+        )
+        fetched_block_numbers = [
+            None if element is None else get_block_number(element)
+            for element in fetched_elements
+        ]
+        max_block_number = max(
+            filter(
+                lambda block_number: block_number is not None, fetched_block_numbers
+            ),
+            default=None,
+        )
+        if (
+            max_block_number is not None
+            and max_block_number > self.confirmed_block_number
+        ):
+            if current_block_number is None:
+                current_block_number = ethereum_client.current_block_number
+            self.confirmed_block_number = max(
+                self.confirmed_block_number,
+                current_block_number - self.eth_reorg_blocks,
+            )
+        confirmed_block_number = self.confirmed_block_number
+
+        items_to_store = []
+        for position, element, block_number in zip(
+            missing_positions, fetched_elements, fetched_block_numbers
+        ):
+            elements[position] = element
+            if block_number is not None and block_number <= confirmed_block_number:
+                items_to_store.append((keys[position], element))
+
+        if items_to_store:
+            store.put_many(items_to_store)
+        logger.debug(
+            "Chain data cache %s: %d hits, %d misses, %d stored",
+            store_name,
+            len(keys) - len(missing_positions),
+            len(missing_positions),
+            len(items_to_store),
+        )
+        return elements
+
+    def get_blocks(
+        self,
+        ethereum_client: EthereumClient,
+        block_numbers: Sequence[int],
+        current_block_number: Optional[int] = None,
+    ) -> List[Optional[BlockData]]:
+        return self._get_or_fetch(
+            "blocks",
+            [
+                self._get_block_number_key(block_number)
+                for block_number in block_numbers
+            ],
+            block_numbers,
+            ethereum_client.get_blocks,
+            lambda block: block["number"],
+            ethereum_client,
+            current_block_number=current_block_number,
+        )
+
+    def get_transactions(
+        self,
+        ethereum_client: EthereumClient,
+        tx_hashes: Sequence[Union[bytes, str]],
+        current_block_number: Optional[int] = None,
+    ) -> List[Optional[TxData]]:
+        return self._get_or_fetch(
+            "txs",
+            [self._get_tx_hash_key(tx_hash) for tx_hash in tx_hashes],
+            tx_hashes,
+            ethereum_client.get_transactions,
+            lambda tx: tx.get("blockNumber"),
+            ethereum_client,
+            current_block_number=current_block_number,
+        )
+
+    def get_transaction_receipts(
+        self,
+        ethereum_client: EthereumClient,
+        tx_hashes: Sequence[Union[bytes, str]],
+        current_block_number: Optional[int] = None,
+    ) -> List[Optional[TxReceipt]]:
+        return self._get_or_fetch(
+            "receipts",
+            [self._get_tx_hash_key(tx_hash) for tx_hash in tx_hashes],
+            tx_hashes,
+            ethereum_client.get_transaction_receipts,
+            lambda tx_receipt: tx_receipt.get("blockNumber"),
+            ethereum_client,
+            current_block_number=current_block_number,
+        )
+
+    def trace_transactions(
+        self,
+        ethereum_client: EthereumClient,
+        tx_hashes: Sequence[Union[bytes, str]],
+        current_block_number: Optional[int] = None,
+    ) -> List[List[Dict[str, Any]]]:
+        return self._get_or_fetch(
+            "traces",
+            [self._get_tx_hash_key(tx_hash) for tx_hash in tx_hashes],
+            tx_hashes,
+            ethereum_client.parity.trace_transactions,
+            lambda traces: traces[0].get("blockNumber") if traces else None,
+            ethereum_client,
+            current_block_number=current_block_number,
+        )
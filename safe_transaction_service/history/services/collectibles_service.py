@@ -2,8 +2,8 @@ import concurrent
 import logging
 import operator
 from dataclasses import dataclass, field
-from typing import Any, Dict, List, Optional, Sequence, Tuple
-from urllib.parse import urljoin
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+from urllib.parse import urljoin, urlparse
 
 from django.conf import settings
 from django.core.cache import cache as django_cache
@@ -26,7 +26,11 @@ from safe_transaction_service.utils.utils import chunks
 
 from ..clients import EnsClient
 from ..exceptions import NodeConnectionException
-from ..models import ERC721Transfer
+from ..models import CollectibleMetadata, ERC721Ownership
+from .safe_data_version_service import (
+    SafeDataVersionService,
+    SafeDataVersionServiceProvider,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -39,6 +43,10 @@ class MetadataRetrievalException(CollectiblesServiceException):
     pass
 
 
+class MetadataHostNotReachableException(MetadataRetrievalException):
+    pass
+
+
 def ipfs_to_http(uri: Optional[str]) -> Optional[str]:
     if uri and uri.startswith("ipfs://"):
         return urljoin(
@@ -119,7 +127,16 @@ class CollectibleWithMetadata(Collectible):
 class CollectiblesServiceProvider:
     def __new__(cls):
         if not hasattr(cls, "instance"):
-            cls.instance = CollectiblesService(EthereumClientProvider(), get_redis())
+            cls.instance = CollectiblesService(
+                EthereumClientProvider(),
+                get_redis(),
+                SafeDataVersionServiceProvider(),
+                metadata_max_connections=settings.COLLECTIBLES_METADATA_MAX_CONNECTIONS,
+                metadata_max_connections_per_host=settings.COLLECTIBLES_METADATA_MAX_CONNECTIONS_PER_HOST,
+                metadata_failing_host_timeout=settings.COLLECTIBLES_METADATA_FAILING_HOST_TIMEOUT,
+                metadata_failing_host_errors=settings.COLLECTIBLES_METADATA_FAILING_HOST_ERRORS,
+                metadata_failing_host_errors_window=settings.COLLECTIBLES_METADATA_FAILING_HOST_ERRORS_WINDOW,
+            )
 
         return cls.instance
 
@@ -135,41 +152,128 @@ class CollectiblesService:
         0.2 * 1024 * 1024
     )  # 0.2Mb is the maximum metadata size allowed
 
-    def __init__(self, ethereum_client: EthereumClient, redis: Redis):
+    def __init__(
+        self,
+        ethereum_client: EthereumClient,
+        redis: Redis,
+        safe_data_version_service: SafeDataVersionService,
+        metadata_max_connections: int = 100,
+        metadata_max_connections_per_host: int = 10,
+        metadata_failing_host_timeout: int = 60 * 10,
+        metadata_failing_host_errors: int = 5,
+        metadata_failing_host_errors_window: int = 60,
+    ):
+        """
+        :param ethereum_client:
+        :param redis:
+        :param safe_data_version_service:
+        :param metadata_max_connections: Max concurrent requests to retrieve metadata, shared by every caller
+        :param metadata_max_connections_per_host: Max concurrent requests to the same metadata host
+        :param metadata_failing_host_timeout: Seconds to skip metadata hosts not reachable
+        :param metadata_failing_host_errors: Connection errors for a host to consider it not reachable
+        :param metadata_failing_host_errors_window: Seconds to count connection errors for a host
+        """
         self.ethereum_client = ethereum_client
         self.ethereum_network = ethereum_client.get_network()
         self.redis = redis
+        self.safe_data_version_service = safe_data_version_service
         self.ens_service: EnsClient = EnsClient(self.ethereum_network.value)
+        self.metadata_failing_host_timeout = metadata_failing_host_timeout
+        self.metadata_failing_host_errors = metadata_failing_host_errors
+        self.metadata_failing_host_errors_window = metadata_failing_host_errors_window
+        self.http_session = self._prepare_http_session(
+            metadata_max_connections, metadata_max_connections_per_host
+        )
+        # Executor is shared, so a new pool of workers is not created for every request
+        self.metadata_executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=metadata_max_connections
+        )
 
-        self.cache_uri_metadata = TTLCache(
-            maxsize=4096, ttl=60 * 60 * 24
-        )  # 1 day of caching
         self.cache_token_info: TTLCache[str, Erc721InfoWithLogo] = TTLCache(
             maxsize=4096, ttl=60 * 30
         )  # 2 hours of caching
         self.cache_token_uri: Dict[Tuple[str, int], str] = {}
 
-    @cachedmethod(cache=operator.attrgetter("cache_uri_metadata"))
-    @cache_memoize(
-        60 * 60 * 24,
-        prefix="collectibles-_retrieve_metadata_from_uri",
-        cache_exceptions=(MetadataRetrievalException,),
-    )  # 1 day
+    def _prepare_http_session(
+        self, max_connections: int, max_connections_per_host: int
+    ) -> requests.Session:
+        """
+        Prepare http session with keep-alive connection pools for every host. When `max_connections_per_host`
+        connections to the same host are in use, next requests wait for a connection to be released
+
+        :param max_connections: Number of host pools to cache. It doesn't limit the number of connections, that
+            is done by the shared executor
+        :param max_connections_per_host: Max number of connections for every host pool
+        :return: `requests.Session`
+        """
+        session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(
+            pool_connections=max_connections,
+            pool_maxsize=max_connections_per_host,
+            pool_block=True,
+        )
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    def _get_failing_host_key(self, host: str) -> str:
+        return f"collectibles-failing-host:{host}"
+
+    def _get_failing_host_errors_key(self, host: str) -> str:
+        return f"collectibles-failing-host-errors:{host}"
+
+    def _add_failing_host_error(self, host: str) -> bool:
+        """
+        Count a connection error for a host. When `metadata_failing_host_errors` are counted in
+        `metadata_failing_host_errors_window` seconds, host is not requested for `metadata_failing_host_timeout`
+        seconds, as requests would wait for the timeout
+
+        :param host:
+        :return: `True` if host is not reachable, `False` otherwise
+        """
+        errors_key = self._get_failing_host_errors_key(host)
+        with self.redis.pipeline() as pipe:
+            # Window starts with the first error. `INCR` keeps the expiration
+            pipe.set(
+                errors_key, 0, ex=self.metadata_failing_host_errors_window, nx=True
+            )
+            pipe.incr(errors_key)
+            _, errors = pipe.execute()
+        if errors < self.metadata_failing_host_errors:
+            return False
+
+        with self.redis.pipeline() as pipe:
+            pipe.set(
+                self._get_failing_host_key(host),
+                1,
+                ex=self.metadata_failing_host_timeout,
+            )
+            pipe.delete(errors_key)
+            pipe.execute()
+        return True
+
     def _retrieve_metadata_from_uri(self, uri: str) -> Dict[Any, Any]:
         """
         Get metadata from uri. Maybe at some point support IPFS or another protocols. Currently just http/https is
         supported
         :param uri: Uri starting with the protocol, like http://example.org/token/3
         :return: Metadata as a decoded json
+        :raises: MetadataHostNotReachableException if host had too many connection errors recently
         """
         uri = ipfs_to_http(uri)
 
         if not uri or not uri.startswith("http"):
             raise MetadataRetrievalException(uri)
 
+        host = urlparse(uri).netloc
+        if self.redis.exists(self._get_failing_host_key(host)):
+            raise MetadataHostNotReachableException(
+                f"Host={host} for uri={uri} is not reachable"
+            )
+
         try:
             logger.debug("Getting metadata for uri=%s", uri)
-            with requests.get(uri, timeout=5, stream=True) as response:
+            with self.http_session.get(uri, timeout=5, stream=True) as response:
                 if not response.ok:
                     logger.debug("Cannot get metadata for uri=%s", uri)
                     raise MetadataRetrievalException(uri)
@@ -188,6 +292,10 @@ class CollectiblesService:
                 else:
                     logger.debug("Got metadata for uri=%s", uri)
                     return response.json()
+        except requests.exceptions.ConnectionError as e:
+            if self._add_failing_host_error(host):
+                logger.debug("Host=%s for uri=%s is not reachable", host, uri)
+            raise MetadataRetrievalException(uri) from e
         except (IOError, ValueError) as e:
             raise MetadataRetrievalException(uri) from e
 
@@ -288,9 +396,11 @@ class CollectiblesService:
         :return: Collectibles using the owner, addresses and the token_ids
         """
 
-        # Cache based on the number of erc721 events
-        number_erc721_events = ERC721Transfer.objects.to_or_from(safe_address).count()
-        cache_key = f"collectibles:{safe_address}:{only_trusted}:{exclude_spam}:{number_erc721_events}"
+        # Cache based on the data version of the Safe, incremented when the Safe has new transfers
+        data_version = self.safe_data_version_service.get_version(safe_address)
+        cache_key = (
+            f"collectibles:{safe_address}:{only_trusted}:{exclude_spam}:{data_version}"
+        )
         if collectibles := django_cache.get(cache_key):
             return collectibles
         else:
@@ -309,7 +419,7 @@ class CollectiblesService:
         :param exclude_spam: If True, exclude spam tokens
         :return: Collectibles using the owner, addresses and the token_ids
         """
-        unfiltered_addresses_with_token_ids = ERC721Transfer.objects.erc721_owned_by(
+        unfiltered_addresses_with_token_ids = ERC721Ownership.objects.owned_by(
             safe_address
         )
         for address, _ in unfiltered_addresses_with_token_ids:
@@ -339,6 +449,103 @@ class CollectiblesService:
 
         return collectibles
 
+    def retrieve_metadata(
+        self, collectibles: Sequence[Collectible]
+    ) -> List[Union[Dict[Any, Any], MetadataRetrievalException]]:
+        """
+        Retrieve metadata for the collectibles concurrently, using the shared executor
+
+        :param collectibles:
+        :return: Metadata in the same order as `collectibles`, the exception raised if it could not be retrieved
+        """
+        futures = [
+            self.metadata_executor.submit(self.get_metadata, collectible)
+            for collectible in collectibles
+        ]
+        collectibles_metadata = []
+        for collectible, future in zip(collectibles, futures):
+            try:
+                collectibles_metadata.append(future.result())
+            except MetadataRetrievalException as exc:
+                collectibles_metadata.append(exc)
+                logger.warning(
+                    f"Cannot retrieve token-uri={collectible.uri} "
+                    f"for token-address={collectible.address}"
+                )
+        return collectibles_metadata
+
+    def get_metadata_for_collectibles(
+        self, collectibles: Sequence[Collectible]
+    ) -> List[Optional[Dict[Any, Any]]]:
+        """
+        Get metadata stored on database. Metadata not stored is retrieved and stored
+
+        :param collectibles:
+        :return: Metadata in the same order as `collectibles`, `None` if it could not be retrieved
+        """
+        keys = [
+            (collectible.address, collectible.id, collectible.uri or "")
+            for collectible in collectibles
+        ]
+        collectibles_metadata = CollectibleMetadata.objects.get_metadata(keys)
+        collectibles_to_retrieve = {
+            key: collectible
+            for key, collectible in zip(keys, collectibles)
+            if key not in collectibles_metadata
+        }
+        if collectibles_to_retrieve:
+            max_uri_length = CollectibleMetadata._meta.get_field("uri").max_length
+            metadata_to_store = {}
+            for key, metadata in zip(
+                collectibles_to_retrieve.keys(),
+                self.retrieve_metadata(list(collectibles_to_retrieve.values())),
+            ):
+                if isinstance(metadata, MetadataRetrievalException):
+                    collectibles_metadata[key] = None
+                    if isinstance(metadata, MetadataHostNotReachableException):
+                        # Host was not requested, metadata will be retrieved when host is reachable again
+                        continue
+                else:
+                    collectibles_metadata[key] = metadata
+                if len(key[2]) <= max_uri_length:  # Probably a `data:` uri
+                    metadata_to_store[key] = collectibles_metadata[key]
+            CollectibleMetadata.objects.store_metadata(metadata_to_store)
+        return [collectibles_metadata[key] for key in keys]
+
+    def refresh_metadata(
+        self, collectibles_metadata: Sequence[CollectibleMetadata]
+    ) -> int:
+        """
+        Retrieve again metadata stored on database. If it cannot be retrieved, stored metadata is kept
+
+        :param collectibles_metadata:
+        :return: Number of elements with metadata retrieved
+        """
+        collectibles = [
+            Collectible(
+                "",
+                "",
+                "",
+                collectible_metadata.token_address,
+                int(collectible_metadata.token_id),
+                collectible_metadata.uri or None,
+            )
+            for collectible_metadata in collectibles_metadata
+        ]
+        refreshed = 0
+        for collectible_metadata, metadata in zip(
+            collectibles_metadata, self.retrieve_metadata(collectibles)
+        ):
+            if isinstance(metadata, MetadataHostNotReachableException):
+                # Host was not requested, element will be refreshed when host is reachable again
+                continue
+            elif not isinstance(metadata, MetadataRetrievalException):
+                collectible_metadata.metadata = metadata
+                refreshed += 1
+            # `modified` is always updated, so elements are not retried on every execution
+            collectible_metadata.save(update_fields=["metadata", "modified"])
+        return refreshed
+
     def get_collectibles_with_metadata(
         self, safe_address: str, only_trusted: bool = False, exclude_spam: bool = False
     ) -> List[CollectibleWithMetadata]:
@@ -349,40 +556,22 @@ class CollectiblesService:
         :param exclude_spam: If True, exclude spam tokens
         :return:
         """
-        collectibles_with_metadata: Dict[(str, int), CollectibleWithMetadata] = dict()
         collectibles = self.get_collectibles(
             safe_address, only_trusted=only_trusted, exclude_spam=exclude_spam
         )
-        with concurrent.futures.ThreadPoolExecutor(max_workers=30) as executor:
-            future_to_collectible = {
-                executor.submit(self.get_metadata, collectible): collectible
-                for collectible in collectibles
-            }
-            for future in concurrent.futures.as_completed(future_to_collectible):
-                collectible = future_to_collectible[future]
-                try:
-                    metadata = future.result()
-                except MetadataRetrievalException:
-                    metadata = {}
-                    logger.warning(
-                        f"Cannot retrieve token-uri={collectible.uri} "
-                        f"for token-address={collectible.address}"
-                    )
-
-                collectibles_with_metadata[
-                    collectible.address, collectible.id
-                ] = CollectibleWithMetadata(
-                    collectible.token_name,
-                    collectible.token_symbol,
-                    collectible.logo_uri,
-                    collectible.address,
-                    collectible.id,
-                    collectible.uri,
-                    metadata,
-                )
         return [
-            collectibles_with_metadata[collectible.address, collectible.id]
-            for collectible in collectibles
+            CollectibleWithMetadata(
+                collectible.token_name,
+                collectible.token_symbol,
+                collectible.logo_uri,
+                collectible.address,
+                collectible.id,
+                collectible.uri,
+                metadata or {},
+            )
+            for collectible, metadata in zip(
+                collectibles, self.get_metadata_for_collectibles(collectibles)
+            )
         ]
 
     @cachedmethod(cache=operator.attrgetter("cache_token_info"))
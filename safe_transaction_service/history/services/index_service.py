@@ -1,7 +1,8 @@
 import logging
-from typing import Collection, List, Optional, OrderedDict, Union
+from typing import Any, Collection, Dict, List, Optional, OrderedDict, Union
 
-from django.db import IntegrityError, transaction
+from django.conf import settings
+from django.db import transaction
 
 from eth_typing import ChecksumAddress
 from hexbytes import HexBytes
@@ -15,8 +16,15 @@ from ..models import (
     ModuleTransaction,
     MultisigConfirmation,
     MultisigTransaction,
+    SafeLastStatus,
     SafeStatus,
+    SafeStatusIntegrity,
+    SafeTimeline,
 )
+from .block_ingestion_service import BlockIngestionServiceProvider
+from .chain_data_cache import ChainDataCache, ChainDataCacheProvider
+from .safe_data_version_service import SafeDataVersionServiceProvider
+from .transaction_service import TransactionServiceProvider
 
 logger = logging.getLogger(__name__)
 
@@ -70,6 +78,45 @@ class IndexService:
         self.ethereum_client = ethereum_client
         self.eth_reorg_blocks = eth_reorg_blocks
         self.eth_l2_network = eth_l2_network
+        self.chain_data_cache: Optional[ChainDataCache] = (
+            ChainDataCacheProvider() if settings.ETH_CHAIN_DATA_CACHE_DIR else None
+        )
+
+    def _get_blocks_from_node(
+        self, block_numbers: List[int], current_block_number: Optional[int] = None
+    ) -> List[Optional[Dict[str, Any]]]:
+        if self.chain_data_cache:
+            return self.chain_data_cache.get_blocks(
+                self.ethereum_client,
+                block_numbers,
+                current_block_number=current_block_number,
+            )
+        return self.ethereum_client.get_blocks(block_numbers)
+
+    def _get_blocks(
+        self, block_numbers: List[int], current_block_number: Optional[int] = None
+    ) -> List[Optional[Dict[str, Any]]]:
+        """
+        :param block_numbers:
+        :param current_block_number: To prevent fetching it again
+        :return: Blocks, using the ones already fetched by the `BlockIngestionService` or stored in the
+            `ChainDataCache` if enabled
+        """
+        if not settings.ETH_BLOCK_INGESTION:
+            return self._get_blocks_from_node(block_numbers, current_block_number)
+
+        blocks = BlockIngestionServiceProvider().get_blocks(block_numbers)
+        missing_block_numbers = [
+            block_number
+            for block_number, block in zip(block_numbers, blocks)
+            if block is None
+        ]
+        if missing_block_numbers:
+            fetched_blocks = iter(
+                self._get_blocks_from_node(missing_block_numbers, current_block_number)
+            )
+            blocks = [block or next(fetched_blocks) for block in blocks]
+        return blocks
 
     def block_get_or_create_from_block_number(self, block_number: int):
         try:
@@ -128,13 +175,22 @@ class IndexService:
             return list(ethereum_txs_dict.values())
 
         self.ethereum_client = EthereumClientProvider()
+        # Read once, it's used for the chain data cache and to confirm blocks
+        current_block_number = self.ethereum_client.current_block_number
 
         # Get receipts for hashes not in db
+        if self.chain_data_cache:
+            fetched_tx_receipts = self.chain_data_cache.get_transaction_receipts(
+                self.ethereum_client,
+                tx_hashes_not_in_db,
+                current_block_number=current_block_number,
+            )
+        else:
+            fetched_tx_receipts = self.ethereum_client.get_transaction_receipts(
+                tx_hashes_not_in_db
+            )
         tx_receipts = []
-        for tx_hash, tx_receipt in zip(
-            tx_hashes_not_in_db,
-            self.ethereum_client.get_transaction_receipts(tx_hashes_not_in_db),
-        ):
+        for tx_hash, tx_receipt in zip(tx_hashes_not_in_db, fetched_tx_receipts):
             tx_receipt = tx_receipt or self.ethereum_client.get_transaction_receipt(
                 tx_hash
             )  # Retry fetching if failed
@@ -151,7 +207,14 @@ class IndexService:
                 tx_receipts.append(tx_receipt)
 
         # Get transactions for hashes not in db
-        fetched_txs = self.ethereum_client.get_transactions(tx_hashes_not_in_db)
+        if self.chain_data_cache:
+            fetched_txs = self.chain_data_cache.get_transactions(
+                self.ethereum_client,
+                tx_hashes_not_in_db,
+                current_block_number=current_block_number,
+            )
+        else:
+            fetched_txs = self.ethereum_client.get_transactions(tx_hashes_not_in_db)
         block_numbers = set()
         txs = []
         for tx_hash, tx in zip(tx_hashes_not_in_db, fetched_txs):
@@ -170,7 +233,7 @@ class IndexService:
             block_numbers.add(tx["blockNumber"])
             txs.append(tx)
 
-        blocks = self.ethereum_client.get_blocks(block_numbers)
+        blocks = self._get_blocks(list(block_numbers), current_block_number)
         block_dict = {}
         for block_number, block in zip(block_numbers, blocks):
             block = block or self.ethereum_client.get_block(
@@ -183,18 +246,12 @@ class IndexService:
             assert block_number == block["number"]
             block_dict[block["number"]] = block
 
-        # Create new transactions or update them if they have no receipt
-        current_block_number = self.ethereum_client.current_block_number
-        for tx, tx_receipt in zip(txs, tx_receipts):
-            block = block_dict.get(tx["blockNumber"])
-            confirmed = (
-                current_block_number - block["number"]
-            ) >= self.eth_reorg_blocks
-            ethereum_block: EthereumBlock = (
-                EthereumBlock.objects.get_or_create_from_block(
-                    block, confirmed=confirmed
-                )
-            )
+        # Create new blocks and transactions or update them if they have no receipt
+        ethereum_blocks = EthereumBlock.objects.get_or_create_from_blocks(
+            list(block_dict.values()), current_block_number - self.eth_reorg_blocks
+        )
+        for block_number, ethereum_block in ethereum_blocks.items():
+            block = block_dict[block_number]
             if HexBytes(ethereum_block.block_hash) != block["hash"]:
                 ethereum_block.set_not_confirmed()  # In case reorg was not detected
                 raise EthereumBlockHashMismatch(
@@ -202,17 +259,13 @@ class IndexService:
                     f"with hash={ethereum_block.block_hash} "
                     f'is not marching retrieved hash={block["hash"].hex()}'
                 )
-            try:
-                with transaction.atomic():
-                    ethereum_tx = EthereumTx.objects.create_from_tx_dict(
-                        tx, tx_receipt=tx_receipt, ethereum_block=ethereum_block
-                    )
-                ethereum_txs_dict[HexBytes(ethereum_tx.tx_hash).hex()] = ethereum_tx
-            except IntegrityError:  # Tx exists
-                ethereum_tx = EthereumTx.objects.get(tx_hash=tx["hash"])
-                # For txs stored before being mined
-                ethereum_tx.update_with_block_and_receipt(ethereum_block, tx_receipt)
-                ethereum_txs_dict[ethereum_tx.tx_hash] = ethereum_tx
+
+        for ethereum_tx in EthereumTx.objects.create_or_update_from_tx_dicts(
+            txs,
+            tx_receipts,
+            [ethereum_blocks[tx["blockNumber"]] for tx in txs],
+        ):
+            ethereum_txs_dict[HexBytes(ethereum_tx.tx_hash).hex()] = ethereum_tx
         return list(ethereum_txs_dict.values())
 
     @transaction.atomic
@@ -223,6 +276,14 @@ class IndexService:
         :param addresses:
         :return:
         """
+        # Invalidate first, so timelines are not updated when every transaction is removed
+        TransactionServiceProvider().del_safes_from_cache(addresses or None)
+        if addresses:
+            SafeDataVersionServiceProvider().increment_versions(addresses)
+        else:
+            SafeDataVersionServiceProvider().increment_epoch()
+        SafeTimeline.objects.invalidate(addresses or None)
+
         queryset = MultisigConfirmation.objects.filter(signature=None)
         if not addresses:
             logger.info("Remove onchain confirmations")
@@ -246,6 +307,8 @@ class IndexService:
         if addresses:
             queryset = queryset.filter(address__in=addresses)
         queryset.delete()
+        SafeStatusIntegrity.objects.invalidate(addresses or None)
+        SafeLastStatus.objects.invalidate(addresses or None)
 
         logger.info("Mark all internal txs decoded as not processed")
         queryset = InternalTxDecoded.objects.all()
@@ -1,13 +1,34 @@
 import logging
-from typing import Dict, Optional
+from typing import Dict, Optional, Set
 
+from django.conf import settings
 from django.db import models, transaction
 
 from hexbytes import HexBytes
 
 from gnosis.eth import EthereumClient, EthereumClientProvider
 
-from ..models import EthereumBlock, ProxyFactory, SafeContract, SafeMasterCopy
+from ..models import (
+    ERC20Transfer,
+    ERC721Ownership,
+    ERC721Transfer,
+    EthereumBlock,
+    InternalTx,
+    ModuleTransaction,
+    MultisigTransaction,
+    ProxyFactory,
+    SafeBalanceLedger,
+    SafeContract,
+    SafeLastStatus,
+    SafeMasterCopy,
+    SafeStatus,
+    SafeStatusIntegrity,
+    SafeTimeline,
+    SafeTimelineEntry,
+)
+from .block_ingestion_service import BlockIngestionServiceProvider
+from .safe_data_version_service import SafeDataVersionServiceProvider
+from .transaction_service import TransactionServiceProvider
 
 logger = logging.getLogger(__name__)
 
@@ -86,6 +107,31 @@ class ReorgService:
             )
         return updated
 
+    def get_addresses_from_block_number(self, block_number: int) -> Set[str]:
+        """
+        :param block_number:
+        :return: Addresses with transfers or executions on blocks `>= block_number`, the ones with data
+            removed in case of a reorg. Not every address is a Safe
+        """
+        addresses = set()
+        for model in (ERC20Transfer, ERC721Transfer, InternalTx):
+            for _from, to in model.objects.filter(
+                ethereum_tx__block__gte=block_number
+            ).values_list("_from", "to"):
+                addresses.update((_from, to))
+        addresses.update(
+            MultisigTransaction.objects.filter(
+                ethereum_tx__block__gte=block_number
+            ).values_list("safe", flat=True)
+        )
+        addresses.update(
+            ModuleTransaction.objects.filter(
+                internal_tx__ethereum_tx__block__gte=block_number
+            ).values_list("safe", flat=True)
+        )
+        addresses.discard(None)
+        return addresses
+
     @transaction.atomic
     def recover_from_reorg(self, first_reorg_block_number: int) -> int:
         """
@@ -102,7 +148,36 @@ class ReorgService:
                 **{field + "__gte": first_reorg_block_number}
             ).update(**{field: safe_reorg_block_number})
 
+        # `SafeStatus` will be removed with the blocks
+        SafeStatusIntegrity.objects.invalidate(
+            SafeStatus.objects.filter(
+                internal_tx__ethereum_tx__block__gte=first_reorg_block_number
+            )
+            .values_list("address", flat=True)
+            .distinct()
+        )
+        SafeLastStatus.objects.invalidate_from_block_number(first_reorg_block_number)
+        reorg_safe_addresses = list(
+            SafeTimelineEntry.objects.filter(block__gte=first_reorg_block_number)
+            .values_list("safe", flat=True)
+            .distinct()
+        )
+        TransactionServiceProvider().del_safes_from_cache(reorg_safe_addresses)
+        SafeDataVersionServiceProvider().increment_versions(
+            self.get_addresses_from_block_number(first_reorg_block_number)
+        )
+        SafeTimeline.objects.invalidate(reorg_safe_addresses)
+        SafeBalanceLedger.objects.invalidate_from_block_number(first_reorg_block_number)
+        reorg_erc721_tokens = ERC721Ownership.objects.get_tokens_from_block_number(
+            first_reorg_block_number
+        )
         EthereumBlock.objects.filter(number__gte=first_reorg_block_number).delete()
+        # Owners of ERC721 transferred on the removed blocks are taken from the remaining transfers
+        ERC721Ownership.objects.update_owners(reorg_erc721_tokens)
+        if settings.ETH_BLOCK_INGESTION:
+            BlockIngestionServiceProvider().invalidate_from_block_number(
+                first_reorg_block_number
+            )
         logger.warning(
             "Reorg of block-number=%d fixed, %d elements updated",
             first_reorg_block_number,
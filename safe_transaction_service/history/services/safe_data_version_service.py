@@ -0,0 +1,75 @@
+from typing import Iterable, Optional
+
+from django.db import transaction
+
+from redis import Redis
+
+from safe_transaction_service.utils.redis import get_redis
+
+from ..models import SafeContract
+
+
+class SafeDataVersionServiceProvider:
+    def __new__(cls):
+        if not hasattr(cls, "instance"):
+            cls.instance = SafeDataVersionService(get_redis())
+        return cls.instance
+
+    @classmethod
+    def del_singleton(cls):
+        if hasattr(cls, "instance"):
+            del cls.instance
+
+
+class SafeDataVersionService:
+    """
+    Keep a monotonically increasing data version for every Safe on redis, so caches for data derived from
+    the Safe history (balances, collectibles...) can use it on their keys instead of counting the events
+    on database. Version is incremented every time a Safe gets a transfer or an execution, and a global
+    epoch is incremented when data for any Safe could be removed (reprocessing). Keys don't expire, so only
+    versions for indexed Safes are stored
+    """
+
+    EPOCH_KEY = "safe-data-version"
+
+    def __init__(self, redis: Redis):
+        self.redis = redis
+
+    def get_key(self, address: str) -> str:
+        return f"{self.EPOCH_KEY}:{address}"
+
+    def get_version(self, address: str) -> str:
+        """
+        :param address:
+        :return: Data version for the Safe, to be used as part of a cache key
+        """
+        epoch, version = self.redis.mget(self.EPOCH_KEY, self.get_key(address))
+        return f"{int(epoch or 0)}:{int(version or 0)}"
+
+    def _increment_versions(self, addresses: Iterable[Optional[str]]) -> None:
+        if addresses := {address for address in addresses if address}:
+            # Transfers counterparties are not Safes
+            safe_addresses = SafeContract.objects.filter(
+                address__in=addresses
+            ).values_list("address", flat=True)
+            pipe = self.redis.pipeline()
+            for safe_address in safe_addresses:
+                pipe.incr(self.get_key(safe_address))
+            pipe.execute()
+
+    def increment_versions(self, addresses: Iterable[Optional[str]]) -> None:
+        """
+        Increment data version for the Safes when the current database transaction is committed, so a
+        version is never related to data not visible yet
+
+        :param addresses: Addresses with new transfers or executions. `None` values and addresses not
+            being a `SafeContract` are ignored
+        """
+        addresses = list(addresses)
+        transaction.on_commit(lambda: self._increment_versions(addresses))
+
+    def increment_epoch(self) -> None:
+        """
+        Invalidate data version for every Safe when the current database transaction is committed
+        """
+        transaction.on_commit(lambda: self.redis.incr(self.EPOCH_KEY))
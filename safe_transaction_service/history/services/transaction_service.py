@@ -1,17 +1,20 @@
-import copyreg
+import json
 import logging
-import pickle
+import time
+import uuid
 from collections import defaultdict
-from datetime import timedelta
+from itertools import islice
 from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
 
-from django.db.models import Case, F, OuterRef, QuerySet, Subquery, Value, When
-from django.utils import timezone
+from django.db import transaction
+from django.db.models import F, Q, QuerySet, Subquery
 
+from hexbytes import HexBytes
 from redis import Redis
+from redis.exceptions import WatchError
+from rest_framework.utils.encoders import JSONEncoder
 
 from gnosis.eth import EthereumClient, EthereumClientProvider
-from gnosis.eth.django.models import Uint256Field
 
 from safe_transaction_service.tokens.models import Token
 from safe_transaction_service.utils.redis import get_redis
@@ -20,10 +23,12 @@ from ..models import (
     ERC20Transfer,
     ERC721Transfer,
     EthereumTx,
-    EthereumTxCallType,
     InternalTx,
     ModuleTransaction,
     MultisigTransaction,
+    SafeTimeline,
+    SafeTimelineEntry,
+    SafeTimelineEntryType,
     TransferDict,
 )
 from ..serializers import (
@@ -42,7 +47,13 @@ class TransactionServiceException(Exception):
 class TransactionServiceProvider:
     def __new__(cls):
         if not hasattr(cls, "instance"):
-            cls.instance = TransactionService(EthereumClientProvider(), get_redis())
+            from django.conf import settings
+
+            cls.instance = TransactionService(
+                EthereumClientProvider(),
+                get_redis(),
+                cache_timeout=settings.TX_SERVICE_CACHE_TIMEOUT,
+            )
         return cls.instance
 
     @classmethod
@@ -52,56 +63,177 @@ class TransactionServiceProvider:
 
 
 class TransactionService:
-    def __init__(self, ethereum_client: EthereumClient, redis: Redis):
+    def __init__(
+        self,
+        ethereum_client: EthereumClient,
+        redis: Redis,
+        cache_timeout: int = 60 * 60 * 24,
+    ):
+        """
+        :param ethereum_client:
+        :param redis:
+        :param cache_timeout: Seconds to keep cached txs for a Safe if they are not updated
+        """
         self.ethereum_client = ethereum_client
         self.redis = redis
-        # Encode memoryview for redis
-        copyreg.pickle(memoryview, lambda val: (memoryview, (bytes(val),)))
+        self.cache_timeout = cache_timeout
 
     #  Cache methods ---------------------------------
-    def get_cache_key(self, safe_address: str, tx_hash: str):
-        return f"tx-service:{safe_address}:{tx_hash}"
+    # Serialized executed txs are stored on a redis hash per Safe, using the tx hash as the field (`SafeTxHash`
+    # for MultisigTransaction). Entries are removed when txs are modified and every entry stores its own
+    # expiration time, as the expiration of the hash is renewed every time a tx for the Safe is stored.
+    # Every Safe has a cache version changed when its txs are modified, txs are only stored if the version
+    # didn't change since they were read from database, so outdated txs are not stored after the invalidation
+    CACHE_GENERATION_KEY = "tx-service-generation"
+
+    def get_cache_key(self, safe_address: str) -> str:
+        return f"tx-service:{safe_address}"
+
+    def get_cache_version_key(self, safe_address: str) -> str:
+        return f"tx-service-version:{safe_address}"
+
+    @staticmethod
+    def _new_cache_version() -> str:
+        return uuid.uuid4().hex
+
+    def get_cache_version(self, safe_address: str) -> List[Optional[bytes]]:
+        """
+        :param safe_address:
+        :return: Cache version for the Safe, must be read before reading the txs from database
+        """
+        return self.redis.mget(
+            self.CACHE_GENERATION_KEY, self.get_cache_version_key(safe_address)
+        )
 
     def get_txs_from_cache(
         self, safe_address: str, hashes_to_search: Sequence[str]
-    ) -> List[Union[EthereumTx, MultisigTransaction, ModuleTransaction]]:
-        keys_to_search = [
-            self.get_cache_key(safe_address, hash_to_search)
-            for hash_to_search in hashes_to_search
-        ]
-        return [
-            pickle.loads(data) if data else None
-            for data in self.redis.mget(keys_to_search)
-        ]
+    ) -> List[Optional[Dict[str, Any]]]:
+        """
+        :param safe_address:
+        :param hashes_to_search:
+        :return: Serialized txs in the same order as `hashes_to_search`, `None` if not cached or expired
+        """
+        if not hashes_to_search:
+            return []
+        key = self.get_cache_key(safe_address)
+        fields = [HexBytes(tx_hash).hex() for tx_hash in hashes_to_search]
+        now = int(time.time())
+        serialized_txs = []
+        expired_fields = []
+        for field, data in zip(fields, self.redis.hmget(key, fields)):
+            if not data:
+                serialized_txs.append(None)
+                continue
+            expiration, serialized_tx = data.split(b"|", 1)
+            if int(expiration) <= now:
+                expired_fields.append(field)
+                serialized_txs.append(None)
+            else:
+                serialized_txs.append(json.loads(serialized_tx))
+        if expired_fields:
+            self.redis.hdel(key, *expired_fields)
+        return serialized_txs
 
     def store_txs_in_cache(
         self,
         safe_address: str,
-        hashes_with_txs: Tuple[
-            str, Union[EthereumTx, MultisigTransaction, ModuleTransaction]
-        ],
-    ):
+        hashes_with_serialized_txs: Sequence[Tuple[str, Dict[str, Any]]],
+        cache_version: List[Optional[bytes]],
+    ) -> bool:
         """
-        Store executed transactions older than 10 minutes, using `ethereum_tx_hash` as key (for
-        MultisigTransaction it will be `SafeTxHash`) and expire then in one hour
+        Store serialized transactions as compact JSON, prefixed by their expiration timestamp. Only executed txs
+        should be stored, as not executed txs depend on the current Safe configuration (e.g.
+        `confirmations_required`)
 
         :param safe_address:
-        :param hashes_with_txs:
+        :param hashes_with_serialized_txs: Tuples of tx hash (`SafeTxHash` for MultisigTransaction) and serialized tx
+        :param cache_version: Cache version for the Safe when txs were read from database, returned by
+            `get_cache_version`
+        :return: `True` if txs were stored, `False` if txs were modified meanwhile and they were not stored
         """
-        # Just store executed transactions older than 10 minutes
+        expiration = int(time.time()) + self.cache_timeout
         to_store = {
-            self.get_cache_key(safe_address, tx_hash): pickle.dumps(tx)
-            for tx_hash, tx in hashes_with_txs
-            if tx.execution_date
-            and (tx.execution_date + timedelta(minutes=10)) < timezone.now()
+            HexBytes(tx_hash).hex(): f"{expiration}|"
+            + json.dumps(serialized_tx, cls=JSONEncoder, separators=(",", ":"))
+            for tx_hash, serialized_tx in hashes_with_serialized_txs
         }
-        if to_store:
+        if not to_store:
+            return False
+
+        version_key = self.get_cache_version_key(safe_address)
+        with self.redis.pipeline() as pipe:
+            try:
+                pipe.watch(self.CACHE_GENERATION_KEY, version_key)
+                if pipe.mget(self.CACHE_GENERATION_KEY, version_key) != cache_version:
+                    return False
+                key = self.get_cache_key(safe_address)
+                pipe.multi()
+                pipe.hset(key, mapping=to_store)
+                pipe.expire(key, self.cache_timeout)
+                pipe.execute()
+                return True
+            except WatchError:  # Txs were modified while storing them
+                return False
+
+    def del_txs_from_cache(self, safe_addresses_with_hashes: Sequence[Tuple[str, str]]):
+        """
+        Remove cached txs when the transaction is committed, must be called when txs are modified
+
+        :param safe_addresses_with_hashes: Tuples of Safe address and tx hash (`SafeTxHash` for MultisigTransaction)
+        """
+        hashes_by_safe_address = defaultdict(set)
+        for safe_address, tx_hash in safe_addresses_with_hashes:
+            hashes_by_safe_address[safe_address].add(HexBytes(tx_hash).hex())
+
+        def del_txs():
             pipe = self.redis.pipeline()
-            pipe.mset(to_store)
-            for key in to_store.keys():
-                pipe.expire(key, 60 * 60)  # Expire in one hour
+            for safe_address, tx_hashes in hashes_by_safe_address.items():
+                pipe.hdel(self.get_cache_key(safe_address), *tx_hashes)
+                pipe.set(
+                    self.get_cache_version_key(safe_address),
+                    self._new_cache_version(),
+                    ex=self.cache_timeout,
+                )
             pipe.execute()
 
+        if hashes_by_safe_address:
+            transaction.on_commit(del_txs)
+
+    def del_safes_from_cache(self, safe_addresses: Optional[Sequence[str]] = None):
+        """
+        Remove every cached tx for the Safes when the transaction is committed, must be called when txs are
+        modified without using the ORM `save` (e.g. reorgs or reprocessing)
+
+        :param safe_addresses: If not provided, cached txs for every Safe are removed
+        """
+        if safe_addresses is not None:
+            safe_addresses = list(safe_addresses)
+
+        def del_safes():
+            # Version is changed before removing the txs, so txs read before cannot be stored after removing them
+            if safe_addresses is None:
+                self.redis.set(self.CACHE_GENERATION_KEY, self._new_cache_version())
+                keys = self.redis.scan_iter(self.get_cache_key("*"))
+            else:
+                pipe = self.redis.pipeline()
+                for safe_address in safe_addresses:
+                    pipe.set(
+                        self.get_cache_version_key(safe_address),
+                        self._new_cache_version(),
+                        ex=self.cache_timeout,
+                    )
+                pipe.execute()
+                keys = iter(
+                    [
+                        self.get_cache_key(safe_address)
+                        for safe_address in safe_addresses
+                    ]
+                )
+            while batch := list(islice(keys, 500)):
+                self.redis.delete(*batch)
+
+        transaction.on_commit(del_safes)
+
     # End of cache methods ----------------------------
 
     def get_all_tx_hashes(
@@ -121,6 +253,8 @@ class TransactionService:
           date the execution date of the transaction with the same nonce that has been executed should be taken.
           - Incoming and outgoing transfers or Eth/tokens must be under a multisig/module tx if triggered by one.
           Otherwise they should have their own entry in the list using a EthereumTx
+        Hashes are read from the `SafeTimeline` of the Safe, built the first time it's requested and kept
+        updated when transactions are stored
 
         :param safe_address:
         :param executed: By default `False`, all transactions are returned. With `True`, just txs executed are returned.
@@ -130,35 +264,8 @@ class TransactionService:
         sent by a delegate or indexed). With `False` all txs are returned
         :return: List with tx hashes sorted by date (newest first)
         """
-
-        # If tx is not mined, get the execution date of a tx mined with the same nonce
-        case = Case(
-            When(
-                ethereum_tx__block=None,
-                then=MultisigTransaction.objects.filter(
-                    safe=OuterRef("safe"), nonce=OuterRef("nonce")
-                )
-                .exclude(ethereum_tx__block=None)
-                .values("ethereum_tx__block__timestamp"),
-            ),
-            default=F("ethereum_tx__block__timestamp"),
-        )
-        multisig_safe_tx_ids = (
-            MultisigTransaction.objects.filter(safe=safe_address)
-            .annotate(
-                execution_date=case,
-                block=F("ethereum_tx__block_id"),
-                safe_nonce=F("nonce"),
-            )
-            .values(
-                "safe_tx_hash",  # Tricky, we will merge SafeTx hashes with EthereumTx hashes
-                "execution_date",
-                "created",
-                "block",
-                "safe_nonce",
-            )
-        )
-        # Block is needed to get stable ordering
+        SafeTimeline.objects.get_or_build(safe_address)
+        queryset = SafeTimelineEntry.objects.filter(safe=safe_address)
 
         if not queued:  # Filter out txs with nonce >= Safe nonce
             last_nonce_query = (
@@ -167,109 +274,29 @@ class TransactionService:
                 .order_by("-nonce")
                 .values("nonce")
             )
-            multisig_safe_tx_ids = multisig_safe_tx_ids.filter(
-                nonce__lte=Subquery(last_nonce_query[:1])
+            queryset = queryset.filter(
+                ~Q(entry_type=SafeTimelineEntryType.MULTISIG_TRANSACTION.value)
+                | Q(safe_nonce__lte=Subquery(last_nonce_query[:1]))
             )
 
         if trusted:  # Just show trusted transactions
-            multisig_safe_tx_ids = multisig_safe_tx_ids.filter(trusted=True)
-
-        if executed:
-            multisig_safe_tx_ids = multisig_safe_tx_ids.exclude(ethereum_tx__block=None)
-
-        # Get module txs
-        module_tx_ids = (
-            ModuleTransaction.objects.filter(safe=safe_address)
-            .annotate(
-                execution_date=F("internal_tx__ethereum_tx__block__timestamp"),
-                block=F("internal_tx__ethereum_tx__block_id"),
-                safe_nonce=Value(0, output_field=Uint256Field()),
-            )
-            .distinct()
-            .values(
-                "internal_tx__ethereum_tx_id",
-                "execution_date",
-                "created",
-                "block",
-                "safe_nonce",
-            )
-        )
-
-        multisig_hashes = (
-            MultisigTransaction.objects.filter(safe=safe_address)
-            .exclude(ethereum_tx=None)
-            .values("ethereum_tx_id")
-        )
-        module_hashes = ModuleTransaction.objects.filter(safe=safe_address).values(
-            "internal_tx__ethereum_tx_id"
-        )
-        multisig_and_module_hashes = multisig_hashes.union(module_hashes)
+            queryset = queryset.filter(trusted=True)
 
-        # Get incoming/outgoing tokens not included on Multisig or Module txs.
-        # Outgoing tokens can be triggered by another user after the Safe calls `approve`, that's why it will not
-        # always appear as a MultisigTransaction
-        erc20_tx_ids = (
-            ERC20Transfer.objects.to_or_from(safe_address)
-            .exclude(ethereum_tx__in=multisig_and_module_hashes)
-            .annotate(
-                execution_date=F("ethereum_tx__block__timestamp"),
-                created=F("ethereum_tx__block__timestamp"),
-                block=F("ethereum_tx__block_id"),
-                safe_nonce=Value(0, output_field=Uint256Field()),
-            )
-            .distinct()
-            .values(
-                "ethereum_tx_id", "execution_date", "created", "block", "safe_nonce"
-            )
-        )
-
-        erc721_tx_ids = (
-            ERC721Transfer.objects.to_or_from(safe_address)
-            .exclude(ethereum_tx__in=multisig_and_module_hashes)
-            .annotate(
-                execution_date=F("ethereum_tx__block__timestamp"),
-                created=F("ethereum_tx__block__timestamp"),
-                block=F("ethereum_tx__block_id"),
-                safe_nonce=Value(0, output_field=Uint256Field()),
-            )
-            .distinct()
-            .values(
-                "ethereum_tx_id", "execution_date", "created", "block", "safe_nonce"
-            )
-        )
-
-        # Get incoming txs not included on Multisig or Module txs
-        internal_tx_ids = (
-            InternalTx.objects.filter(
-                call_type=EthereumTxCallType.CALL.value,
-                value__gt=0,
-                to=safe_address,
-            )
-            .exclude(ethereum_tx__in=multisig_and_module_hashes)
-            .annotate(
-                execution_date=F("ethereum_tx__block__timestamp"),
-                created=F("ethereum_tx__block__timestamp"),
-                block=F("ethereum_tx__block_id"),
-                safe_nonce=Value(0, output_field=Uint256Field()),
-            )
-            .distinct()
-            .values(
-                "ethereum_tx_id", "execution_date", "created", "block", "safe_nonce"
-            )
-        )
+        if executed:  # Only Multisig txs can be not executed
+            queryset = queryset.exclude(block=None)
 
         # Tricky, we merge SafeTx hashes with EthereumTx hashes
-        queryset = (
-            multisig_safe_tx_ids.distinct()
-            .union(erc20_tx_ids)
-            .union(erc721_tx_ids)
-            .union(internal_tx_ids)
-            .union(module_tx_ids)
-            .order_by("-execution_date", "-safe_nonce", "block", "-created")
-        )
+        queryset = queryset.values(
+            "execution_date",
+            "created",
+            "block",
+            "safe_nonce",
+            safe_tx_hash=F("tx_hash"),
+        ).order_by("-execution_date", "-safe_nonce", "block", "-created")
         # Order by block because `block_number < NULL`, so txs mined will have preference,
         # and `created` to get always the same ordering with not executed transactions, as they will share
-        # the same `execution_date` that the mined tx
+        # the same `execution_date` that the mined tx. Ordering matches `SafeTimelineEntry` index, so only
+        # the requested page is read from database
         return queryset
 
     def get_all_txs_from_hashes(
@@ -282,7 +309,26 @@ class TransactionService:
         :param hashes_to_search:
         :return:
         """
-        cached_txs = {
+        return list(
+            dict.fromkeys(
+                tx
+                for _, tx in self._get_hashes_with_txs(safe_address, hashes_to_search)
+            )
+        )  # Sorted already by execution_date
+
+    def get_serialized_txs_from_hashes(
+        self, safe_address: str, hashes_to_search: Sequence[str]
+    ) -> List[Dict[str, Any]]:
+        """
+        Same as serializing the result of `get_all_txs_from_hashes`, but using the cache. Executed txs not cached
+        are stored
+
+        :param safe_address:
+        :param hashes_to_search:
+        :return: Serialized txs sorted as `hashes_to_search`
+        """
+        cache_version = self.get_cache_version(safe_address)
+        serialized_txs = {
             hash_to_search: cached_tx
             for hash_to_search, cached_tx in zip(
                 hashes_to_search,
@@ -293,12 +339,45 @@ class TransactionService:
         hashes_not_cached = [
             hash_to_search
             for hash_to_search in hashes_to_search
-            if hash_to_search not in cached_txs
+            if hash_to_search not in serialized_txs
+        ]
+        if hashes_not_cached:
+            hashes_with_txs = self._get_hashes_with_txs(safe_address, hashes_not_cached)
+            hashes_with_serialized_txs = list(
+                zip(
+                    [tx_hash for tx_hash, _ in hashes_with_txs],
+                    self.serialize_all_txs([tx for _, tx in hashes_with_txs]),
+                )
+            )
+            self.store_txs_in_cache(
+                safe_address,
+                [
+                    hash_with_serialized_tx
+                    for hash_with_serialized_tx, (_, tx) in zip(
+                        hashes_with_serialized_txs, hashes_with_txs
+                    )
+                    if tx.execution_date
+                ],
+                cache_version,
+            )
+            serialized_txs.update(hashes_with_serialized_txs)
+        return [
+            serialized_txs[hash_to_search]
+            for hash_to_search in dict.fromkeys(hashes_to_search)
         ]
+
+    def _get_hashes_with_txs(
+        self, safe_address: str, hashes_to_search: Sequence[str]
+    ) -> List[Tuple[str, Union[EthereumTx, MultisigTransaction, ModuleTransaction]]]:
+        """
+        :param safe_address:
+        :param hashes_to_search:
+        :return: Tuples of hash and transaction with its transfers, sorted as `hashes_to_search`
+        """
         multisig_txs = {
             multisig_tx.safe_tx_hash: multisig_tx
             for multisig_tx in MultisigTransaction.objects.filter(
-                safe=safe_address, safe_tx_hash__in=hashes_not_cached
+                safe=safe_address, safe_tx_hash__in=hashes_to_search
             )
             .with_confirmations_required()
             .prefetch_related("confirmations")
@@ -309,19 +388,19 @@ class TransactionService:
         module_txs = {
             module_tx.internal_tx.ethereum_tx_id: module_tx
             for module_tx in ModuleTransaction.objects.filter(
-                safe=safe_address, internal_tx__ethereum_tx__in=hashes_not_cached
+                safe=safe_address, internal_tx__ethereum_tx__in=hashes_to_search
             ).select_related("internal_tx")
         }
 
         plain_ethereum_txs = {
             ethereum_tx.tx_hash: ethereum_tx
             for ethereum_tx in EthereumTx.objects.filter(
-                tx_hash__in=hashes_not_cached
+                tx_hash__in=hashes_to_search
             ).select_related("block")
         }
 
         # We also need the in/out transfers for the MultisigTxs
-        all_hashes = hashes_not_cached + [
+        all_hashes = list(hashes_to_search) + [
             multisig_tx.ethereum_tx_id for multisig_tx in multisig_txs.values()
         ]
 
@@ -365,9 +444,6 @@ class TransactionService:
         def get_the_transaction(
             transaction_id: str,
         ) -> Optional[Union[MultisigTransaction, ModuleTransaction, EthereumTx]]:
-            if result := cached_txs.get(transaction_id):
-                return result
-
             multisig_tx: MultisigTransaction
             module_tx: ModuleTransaction
             plain_ethereum_tx: EthereumTx
@@ -393,14 +469,10 @@ class TransactionService:
                     "Tx not found, problem merging all transactions together"
                 )
 
-        hash_with_txs = [
+        return [
             (hash_to_search, get_the_transaction(hash_to_search))
             for hash_to_search in hashes_to_search
         ]
-        self.store_txs_in_cache(safe_address, hash_with_txs)
-        return list(
-            dict.fromkeys(tx for _, tx in hash_with_txs)
-        )  # Sorted already by execution_date
 
     def serialize_all_txs(
         self, models: List[Union[EthereumTx, MultisigTransaction, ModuleTransaction]]
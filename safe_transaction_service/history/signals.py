@@ -1,14 +1,18 @@
 import json
+from collections import defaultdict
 from datetime import timedelta
-from typing import Any, Dict, List, Type, Union
+from typing import Any, Dict, List, Sequence, Set, Tuple, Type, Union
 
+from django.conf import settings
 from django.db.models import Model
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 from django.utils import timezone
 
 from hexbytes import HexBytes
 
+from gnosis.eth.constants import NULL_ADDRESS
+
 from safe_transaction_service.notifications.tasks import send_notification_task
 from safe_transaction_service.utils.ethereum import get_ethereum_network
 
@@ -19,10 +23,14 @@ from .models import (
     ModuleTransaction,
     MultisigConfirmation,
     MultisigTransaction,
+    SafeBalanceLedger,
     SafeContract,
+    SafeTimeline,
     TokenTransfer,
     WebHookType,
+    post_bulk_save,
 )
+from .services import TransactionServiceProvider
 from .tasks import send_webhook_task
 
 
@@ -245,3 +253,272 @@ def process_webhook(
             if address := payload.get("address"):
                 send_webhook_task.delay(address, payload)
                 send_notification_task.apply_async(args=(address, payload), countdown=5)
+
+
+def update_safe_timelines(
+    sender: Type[Model],
+    instances: Sequence[
+        Union[
+            TokenTransfer,
+            InternalTx,
+            ModuleTransaction,
+            MultisigConfirmation,
+            MultisigTransaction,
+        ]
+    ],
+    created: bool,
+) -> None:
+    """
+    Keep `SafeTimeline` updated when transactions are stored, modified or removed (proposals, executions,
+    replacements, confirmations and transfers) and remove the modified txs from `TransactionService` cache.
+    Timelines are updated once for all the `instances`
+
+    :param sender:
+    :param instances:
+    :param created:
+    """
+    # Safe address -> (ethereum tx hashes, nonces) to update
+    changes: Dict[str, Tuple[Set[str], Set[int]]] = defaultdict(lambda: (set(), set()))
+    # Cached txs can only exist for Safes with a timeline built
+    safe_addresses_with_hashes: List[Tuple[str, str]] = []
+    transfer_ethereum_tx_hashes: Set[str] = set()
+    if sender == MultisigTransaction:
+        for instance in instances:
+            ethereum_tx_hashes, nonces = changes[instance.safe]
+            if instance.ethereum_tx_id:
+                ethereum_tx_hashes.add(instance.ethereum_tx_id)
+            nonces.add(instance.nonce)
+            safe_addresses_with_hashes.append((instance.safe, instance.safe_tx_hash))
+    elif sender == MultisigConfirmation:
+        for safe_address, safe_tx_hash, nonce in MultisigTransaction.objects.filter(
+            safe_tx_hash__in={
+                instance.multisig_transaction_id
+                for instance in instances
+                if instance.multisig_transaction_id
+            }
+        ).values_list("safe", "safe_tx_hash", "nonce"):
+            _, nonces = changes[safe_address]
+            # A new confirmation makes the `MultisigTransaction` trusted
+            if created:
+                nonces.add(nonce)
+            safe_addresses_with_hashes.append((safe_address, safe_tx_hash))
+    elif sender == ModuleTransaction:
+        for instance in instances:
+            ethereum_tx_hash = instance.internal_tx.ethereum_tx_id
+            changes[instance.safe][0].add(ethereum_tx_hash)
+            safe_addresses_with_hashes.append((instance.safe, ethereum_tx_hash))
+    else:  # Transfers, they are shown under the Multisig/Module tx if triggered by one
+        for instance in instances:
+            if sender == InternalTx:
+                # Just incoming ether is shown
+                addresses = [instance.to] if instance.is_ether_transfer else []
+            else:  # ERC20Transfer or ERC721Transfer
+                addresses = [instance._from, instance.to]
+            for address in addresses:
+                changes[address][0].add(instance.ethereum_tx_id)
+                safe_addresses_with_hashes.append((address, instance.ethereum_tx_id))
+                transfer_ethereum_tx_hashes.add(instance.ethereum_tx_id)
+
+    if not changes:
+        return
+
+    built_addresses = SafeTimeline.objects.update_entries(changes)
+    if built_addresses and transfer_ethereum_tx_hashes:
+        safe_addresses_with_hashes.extend(
+            MultisigTransaction.objects.filter(
+                ethereum_tx_id__in=transfer_ethereum_tx_hashes,
+                safe__in=built_addresses,
+            ).values_list("safe", "safe_tx_hash")
+        )
+    if safe_addresses_with_hashes := [
+        (safe_address, tx_hash)
+        for safe_address, tx_hash in safe_addresses_with_hashes
+        if safe_address in built_addresses
+    ]:
+        TransactionServiceProvider().del_txs_from_cache(safe_addresses_with_hashes)
+
+
+@receiver(
+    post_save,
+    sender=ModuleTransaction,
+    dispatch_uid="module_transaction.update_safe_timeline",
+)
+@receiver(
+    post_save,
+    sender=MultisigConfirmation,
+    dispatch_uid="multisig_confirmation.update_safe_timeline",
+)
+@receiver(
+    post_save,
+    sender=MultisigTransaction,
+    dispatch_uid="multisig_transaction.update_safe_timeline",
+)
+@receiver(
+    post_delete,
+    sender=MultisigTransaction,
+    dispatch_uid="multisig_transaction.delete_safe_timeline",
+)
+@receiver(
+    post_save, sender=ERC20Transfer, dispatch_uid="erc20_transfer.update_safe_timeline"
+)
+@receiver(
+    post_save,
+    sender=ERC721Transfer,
+    dispatch_uid="erc721_transfer.update_safe_timeline",
+)
+@receiver(post_save, sender=InternalTx, dispatch_uid="internal_tx.update_safe_timeline")
+def update_safe_timeline(
+    sender: Type[Model],
+    instance: Union[
+        TokenTransfer,
+        InternalTx,
+        ModuleTransaction,
+        MultisigConfirmation,
+        MultisigTransaction,
+    ],
+    **kwargs,
+) -> None:
+    """
+    Check `update_safe_timelines`. Objects stored in bulk are handled by `update_safe_timelines_in_bulk`.
+    Must be connected after `bind_confirmation`, as it can modify the `MultisigTransaction` without calling `save`
+    :param sender:
+    :param instance:
+    :param kwargs:
+    :return:
+    """
+    if not kwargs.get("bulk"):
+        update_safe_timelines(sender, [instance], kwargs.get("created", False))
+
+
+@receiver(
+    post_bulk_save,
+    sender=ModuleTransaction,
+    dispatch_uid="module_transaction.update_safe_timelines",
+)
+@receiver(
+    post_bulk_save,
+    sender=MultisigConfirmation,
+    dispatch_uid="multisig_confirmation.update_safe_timelines",
+)
+@receiver(
+    post_bulk_save,
+    sender=MultisigTransaction,
+    dispatch_uid="multisig_transaction.update_safe_timelines",
+)
+@receiver(
+    post_bulk_save,
+    sender=ERC20Transfer,
+    dispatch_uid="erc20_transfer.update_safe_timelines",
+)
+@receiver(
+    post_bulk_save,
+    sender=ERC721Transfer,
+    dispatch_uid="erc721_transfer.update_safe_timelines",
+)
+@receiver(
+    post_bulk_save, sender=InternalTx, dispatch_uid="internal_tx.update_safe_timelines"
+)
+def update_safe_timelines_in_bulk(
+    sender: Type[Model],
+    instances: Sequence[
+        Union[
+            TokenTransfer,
+            InternalTx,
+            ModuleTransaction,
+            MultisigConfirmation,
+            MultisigTransaction,
+        ]
+    ],
+    created: bool,
+    **kwargs,
+) -> None:
+    """
+    Check `update_safe_timelines`. Timelines are updated once for every batch of objects stored in bulk
+    :param sender:
+    :param instances:
+    :param created:
+    :param kwargs:
+    :return:
+    """
+    update_safe_timelines(sender, instances, created)
+
+
+def update_safe_balance_ledgers(
+    sender: Type[Model],
+    instances: Sequence[Union[ERC20Transfer, InternalTx]],
+) -> None:
+    """
+    Keep `SafeBalanceLedger` updated when ERC20 or ether transfers are stored. Balances are calculated again
+    once for every Safe and token involved on the `instances`
+
+    :param sender:
+    :param instances:
+    """
+    if not settings.ETH_BALANCES_LEDGER:
+        return
+
+    # Address -> token addresses transferred (`NULL_ADDRESS` for ether)
+    changes: Dict[str, Set[str]] = defaultdict(set)
+    for instance in instances:
+        if sender == InternalTx:
+            if not instance.is_ether_transfer:
+                continue
+            token_address = NULL_ADDRESS
+        else:
+            token_address = instance.address
+        for address in (instance._from, instance.to):
+            if address:
+                changes[address].add(token_address)
+
+    if changes:
+        SafeBalanceLedger.objects.update_balances(changes)
+
+
+@receiver(
+    post_save,
+    sender=ERC20Transfer,
+    dispatch_uid="erc20_transfer.update_safe_balance_ledger",
+)
+@receiver(
+    post_save, sender=InternalTx, dispatch_uid="internal_tx.update_safe_balance_ledger"
+)
+def update_safe_balance_ledger(
+    sender: Type[Model],
+    instance: Union[ERC20Transfer, InternalTx],
+    **kwargs,
+) -> None:
+    """
+    Check `update_safe_balance_ledgers`. Objects stored in bulk are handled by
+    `update_safe_balance_ledgers_in_bulk`
+    :param sender:
+    :param instance:
+    :param kwargs:
+    :return:
+    """
+    if not kwargs.get("bulk"):
+        update_safe_balance_ledgers(sender, [instance])
+
+
+@receiver(
+    post_bulk_save,
+    sender=ERC20Transfer,
+    dispatch_uid="erc20_transfer.update_safe_balance_ledgers",
+)
+@receiver(
+    post_bulk_save,
+    sender=InternalTx,
+    dispatch_uid="internal_tx.update_safe_balance_ledgers",
+)
+def update_safe_balance_ledgers_in_bulk(
+    sender: Type[Model],
+    instances: Sequence[Union[ERC20Transfer, InternalTx]],
+    **kwargs,
+) -> None:
+    """
+    Check `update_safe_balance_ledgers`. Ledgers are updated once for every batch of transfers stored in bulk
+    :param sender:
+    :param instances:
+    :param kwargs:
+    :return:
+    """
+    update_safe_balance_ledgers(sender, instances)
@@ -1,8 +1,13 @@
 import contextlib
+from datetime import timedelta
 from functools import cache
 from typing import Any, Dict, Optional
 from urllib.parse import urlparse
 
+from django.conf import settings
+from django.db.models import F, Q
+from django.utils import timezone
+
 import requests
 from celery import app
 from celery.utils.log import get_task_logger
@@ -12,6 +17,7 @@ from redis.exceptions import LockError
 from safe_transaction_service.utils.utils import close_gevent_db_connection
 
 from ..utils.tasks import LOCK_TIMEOUT, SOFT_TIMEOUT, only_one_running_task
+from .exceptions import NodeConnectionException
 from .indexers import (
     Erc20EventsIndexerProvider,
     FindRelevantElementsException,
@@ -20,8 +26,21 @@ from .indexers import (
 )
 from .indexers.safe_events_indexer import SafeEventsIndexerProvider
 from .indexers.tx_processor import SafeTxProcessor, SafeTxProcessorProvider
-from .models import EthereumBlock, InternalTxDecoded, SafeStatus, WebHook, WebHookType
+from .models import (
+    CollectibleMetadata,
+    EthereumBlock,
+    InternalTxDecoded,
+    SafeBalanceLedger,
+    SafeLastStatus,
+    SafeStatus,
+    SafeStatusIntegrity,
+    WebHook,
+    WebHookType,
+)
 from .services import (
+    BalanceServiceProvider,
+    BlockIngestionServiceProvider,
+    CollectiblesServiceProvider,
     IndexingException,
     IndexServiceProvider,
     ReorgService,
@@ -55,6 +74,20 @@ def index_erc20_events_task(self) -> Optional[int]:
             return number_events
 
 
+@app.shared_task(bind=True, soft_time_limit=SOFT_TIMEOUT, time_limit=LOCK_TIMEOUT)
+def ingest_new_blocks_task(self) -> Optional[int]:
+    """
+    Fetch new blocks once so they can be shared between indexers
+
+    :return: Number of blocks ingested
+    """
+    with contextlib.suppress(LockError):
+        with only_one_running_task(self):
+            number_blocks = BlockIngestionServiceProvider().ingest()
+            logger.debug("Ingested %d blocks", number_blocks)
+            return number_blocks
+
+
 @app.shared_task(
     bind=True,
 )
@@ -260,53 +293,70 @@ def process_decoded_internal_txs_for_safe_task(
                 "Start processing decoded internal txs for safe %s", safe_address
             )
             number_processed = 0
-            batch = 100  # Process at most 100 decoded transactions for a single Safe
+            # Process at most `batch` decoded transactions for a single Safe
+            batch = settings.ETH_INTERNAL_TXS_DECODED_PROCESS_BATCH
             tx_processor: SafeTxProcessor = SafeTxProcessorProvider()
             # Use slicing for memory issues
             while True:
                 # Check if something is wrong during indexing
-                last_safe_status = SafeStatus.objects.last_for_address(safe_address)
-                if last_safe_status and last_safe_status.is_corrupted():
-                    tx_processor.clear_cache()
-                    # Find first corrupted safe status
-                    previous_safe_status: Optional[SafeStatus] = None
-                    for safe_status in SafeStatus.objects.filter(
-                        address=safe_address
-                    ).sorted_reverse_by_mined():
-                        if safe_status.is_corrupted():
-                            message = (
-                                f"Safe-address={safe_address} A problem was found in SafeStatus "
-                                f"with nonce={safe_status.nonce} "
-                                f"on internal-tx-id={safe_status.internal_tx_id} "
-                                f"tx-hash={safe_status.internal_tx.ethereum_tx_id} "
-                            )
-                            logger.error(message)
-                            index_service = IndexServiceProvider()
-                            logger.info(
-                                "Safe-address=%s Processing traces again",
-                                safe_address,
-                            )
-                            if reindex_master_copies and previous_safe_status:
-                                block_number = previous_safe_status.block_number
-                                to_block_number = last_safe_status.block_number
-                                logger.info(
-                                    "Safe-address=%s Last known not corrupted SafeStatus with nonce=%d on block=%d , "
-                                    "reindexing until block=%d",
-                                    safe_address,
-                                    previous_safe_status.nonce,
-                                    block_number,
-                                    to_block_number,
-                                )
-                                reindex_master_copies_task.delay(
-                                    block_number, to_block_number
-                                )
-                            logger.info(
-                                "Safe-address=%s Processing traces again after reindexing",
-                                safe_address,
-                            )
-                            index_service.reprocess_addresses([safe_address])
-                            raise ValueError(message)
-                        previous_safe_status = safe_status
+                safe_status_integrity = SafeStatusIntegrity.objects.get_for_address(
+                    safe_address
+                )
+                if safe_status_integrity.is_corrupted():
+                    # First corrupted SafeStatus is the first one after the missing nonce
+                    first_gap = safe_status_integrity.first_gap
+                    safe_status = (
+                        SafeStatus.objects.filter(
+                            address=safe_address, nonce__gt=first_gap
+                        )
+                        .select_related("internal_tx")
+                        .sorted_reverse_by_mined()
+                        .first()
+                    )
+                    if not safe_status:
+                        # SafeStatus were removed without invalidating the record
+                        SafeStatusIntegrity.objects.build_for_address(safe_address)
+                        continue
+                    previous_safe_status: Optional[SafeStatus] = (
+                        SafeStatus.objects.filter(
+                            address=safe_address, nonce__lt=first_gap
+                        )
+                        .sorted_by_mined()
+                        .first()
+                    )
+                    message = (
+                        f"Safe-address={safe_address} A problem was found in SafeStatus "
+                        f"with nonce={safe_status.nonce} "
+                        f"on internal-tx-id={safe_status.internal_tx_id} "
+                        f"tx-hash={safe_status.internal_tx.ethereum_tx_id} "
+                    )
+                    logger.error(message)
+                    index_service = IndexServiceProvider()
+                    logger.info(
+                        "Safe-address=%s Processing traces again",
+                        safe_address,
+                    )
+                    if reindex_master_copies and previous_safe_status:
+                        last_safe_status = SafeLastStatus.objects.get_or_generate(
+                            safe_address
+                        )
+                        block_number = previous_safe_status.block_number
+                        to_block_number = last_safe_status.block_number
+                        logger.info(
+                            "Safe-address=%s Last known not corrupted SafeStatus with nonce=%d on block=%d , "
+                            "reindexing until block=%d",
+                            safe_address,
+                            previous_safe_status.nonce,
+                            block_number,
+                            to_block_number,
+                        )
+                        reindex_master_copies_task.delay(block_number, to_block_number)
+                    logger.info(
+                        "Safe-address=%s Processing traces again after reindexing",
+                        safe_address,
+                    )
+                    index_service.reprocess_addresses([safe_address])
+                    raise ValueError(message)
 
                 internal_txs_decoded = InternalTxDecoded.objects.pending_for_safe(
                     safe_address
@@ -318,7 +368,6 @@ def process_decoded_internal_txs_for_safe_task(
                 )
                 if not number_processed:
                     break
-                tx_processor.clear_cache()  # TODO Fix this properly
                 logger.info("Processed %d decoded transactions", number_processed)
             if number_processed:
                 logger.info(
@@ -348,6 +397,76 @@ def check_reorgs_task(self) -> Optional[int]:
                 return first_reorg_block_number
 
 
+@app.shared_task(bind=True, soft_time_limit=SOFT_TIMEOUT, time_limit=LOCK_TIMEOUT)
+def reconcile_balances_task(self, hours: int = 6, limit: int = 500) -> Optional[int]:
+    """
+    Reconcile balance ledgers with the blockchain, oldest reconciled first
+
+    :param hours: Reconcile ledgers not reconciled in the last `hours`
+    :param limit: Maximum number of ledgers to reconcile
+    :return: Number of ledgers reconciled
+    """
+    with contextlib.suppress(LockError):
+        with only_one_running_task(self):
+            balance_service = BalanceServiceProvider()
+            addresses = list(
+                SafeBalanceLedger.objects.filter(
+                    Q(reconciled=None)
+                    | Q(reconciled__lt=timezone.now() - timedelta(hours=hours))
+                )
+                .order_by(F("reconciled").asc(nulls_first=True))
+                .values_list("address", flat=True)[:limit]
+            )
+            reconciled = 0
+            for address in addresses:
+                try:
+                    if balance_service.reconcile_balances(address) is not None:
+                        reconciled += 1
+                except NodeConnectionException:
+                    logger.warning(
+                        "Cannot reconcile balances for safe=%s", address, exc_info=True
+                    )
+            if reconciled:
+                logger.info("Reconciled balances for %d Safes", reconciled)
+            return reconciled
+
+
+@app.shared_task(bind=True, soft_time_limit=SOFT_TIMEOUT, time_limit=LOCK_TIMEOUT)
+def refresh_collectibles_metadata_task(
+    self, days: int = 7, failed_hours: int = 1, limit: int = 500
+) -> Optional[int]:
+    """
+    Retrieve again stored collectibles metadata, oldest first
+
+    :param days: Refresh metadata not refreshed in the last `days`
+    :param failed_hours: Refresh metadata that could not be retrieved in the last `failed_hours`
+    :param limit: Maximum number of elements to refresh
+    :return: Number of elements with metadata retrieved
+    """
+    with contextlib.suppress(LockError):
+        with only_one_running_task(self):
+            now = timezone.now()
+            collectibles_metadata = list(
+                CollectibleMetadata.objects.filter(
+                    Q(modified__lt=now - timedelta(days=days))
+                    | Q(
+                        metadata__isnull=True,
+                        modified__lt=now - timedelta(hours=failed_hours),
+                    )
+                ).order_by("modified")[:limit]
+            )
+            refreshed = CollectiblesServiceProvider().refresh_metadata(
+                collectibles_metadata
+            )
+            if collectibles_metadata:
+                logger.info(
+                    "Refreshed metadata for %d of %d collectibles",
+                    refreshed,
+                    len(collectibles_metadata),
+                )
+            return refreshed
+
+
 @cache
 def get_webhook_http_session(webhook_url: str) -> requests.Session:
     logger.debug("Getting http session for url=%s", webhook_url)
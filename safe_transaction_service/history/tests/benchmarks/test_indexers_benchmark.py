@@ -0,0 +1,241 @@
+"""
+Throughput benchmarks for the indexing hot path, using `pytest-benchmark`. They run against a recording of
+real node JSON-RPC traffic, so no node is needed and results are comparable between runs.
+
+Skipped unless `BENCHMARK_RPC_RECORDING` is set. To create a recording, also set `BENCHMARK_NODE_URL` (a node
+with tracing enabled) and the block range and addresses to index:
+
+    BENCHMARK_RPC_RECORDING=recording.jsonl.gz BENCHMARK_NODE_URL=http://node:8545 \
+    BENCHMARK_FROM_BLOCK=13000000 BENCHMARK_TO_BLOCK=13001000 \
+    BENCHMARK_MASTER_COPIES=0x34CfAC646f301356fAa8B21e94227e3583Fe3F5F \
+    BENCHMARK_L2_MASTER_COPIES=0x3E5c63644E683549055b9Be8653de26E0B4CD36E \
+    BENCHMARK_SAFES=0x...,0x... pytest safe_transaction_service/history/tests/benchmarks
+
+Then run the benchmarks offline with just `BENCHMARK_RPC_RECORDING=recording.jsonl.gz`. Besides timings,
+`blocks_per_second`, `elements_per_second` and `queries_per_element` are reported as `extra_info`
+(use `--benchmark-json` to export them)
+"""
+import os
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Tuple
+
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+import pytest
+
+from gnosis.eth import EthereumClient, EthereumClientProvider
+
+from safe_transaction_service.utils.rpc_recording import (
+    JsonRpcRecorderServer,
+    JsonRpcRecording,
+    JsonRpcReplayServer,
+)
+
+from ...indexers import Erc20EventsIndexer, InternalTxIndexer, SafeEventsIndexer
+from ...indexers.tx_processor import SafeTxProcessor
+from ...models import InternalTxDecoded
+from ...services import IndexServiceProvider
+from ..factories import SafeContractFactory, SafeMasterCopyFactory
+
+RECORDING_PATH = os.environ.get("BENCHMARK_RPC_RECORDING")
+NODE_URL = os.environ.get("BENCHMARK_NODE_URL")
+ROUNDS = 1 if NODE_URL else int(os.environ.get("BENCHMARK_ROUNDS", 3))
+
+pytestmark = pytest.mark.skipif(
+    not RECORDING_PATH, reason="BENCHMARK_RPC_RECORDING is not set"
+)
+
+
+def _get_addresses_from_env(name: str):
+    return [address for address in os.environ.get(name, "").split(",") if address]
+
+
+@contextmanager
+def use_ethereum_client(ethereum_client: EthereumClient):
+    """
+    Services get the `EthereumClient` from `EthereumClientProvider` (e.g. `IndexService` when fetching txs,
+    receipts and blocks), so it's replaced to make every request go through the recording server
+    """
+    previous_ethereum_client = getattr(EthereumClientProvider, "instance", None)
+    EthereumClientProvider.instance = ethereum_client
+    IndexServiceProvider.del_singleton()
+    try:
+        IndexServiceProvider().ethereum_client = ethereum_client
+        yield ethereum_client
+    finally:
+        IndexServiceProvider.del_singleton()
+        if previous_ethereum_client is None:
+            del EthereumClientProvider.instance
+        else:
+            EthereumClientProvider.instance = previous_ethereum_client
+
+
+@pytest.fixture(scope="module")
+def rpc_client() -> Tuple[EthereumClient, Dict[str, Any]]:
+    """
+    :return: `EthereumClient` connected to a recording (or recorder) server and the recording metadata
+    """
+    if NODE_URL:
+        recording = JsonRpcRecording(
+            {
+                "from_block_number": int(os.environ["BENCHMARK_FROM_BLOCK"]),
+                "to_block_number": int(os.environ["BENCHMARK_TO_BLOCK"]),
+                "block_process_limit": int(
+                    os.environ.get("BENCHMARK_BLOCK_PROCESS_LIMIT", 1000)
+                ),
+                "master_copies": _get_addresses_from_env("BENCHMARK_MASTER_COPIES"),
+                "l2_master_copies": _get_addresses_from_env(
+                    "BENCHMARK_L2_MASTER_COPIES"
+                ),
+                "safes": _get_addresses_from_env("BENCHMARK_SAFES"),
+            }
+        )
+        with JsonRpcRecorderServer(recording, NODE_URL) as server:
+            with use_ethereum_client(EthereumClient(server.url)) as ethereum_client:
+                yield ethereum_client, recording.metadata
+        recording.save(RECORDING_PATH)
+    else:
+        recording = JsonRpcRecording.load(RECORDING_PATH)
+        with JsonRpcReplayServer(recording) as server:
+            with use_ethereum_client(EthereumClient(server.url)) as ethereum_client:
+                yield ethereum_client, recording.metadata
+
+
+def run_benchmark(
+    benchmark, function: Callable[[], int], metadata: Dict[str, Any]
+) -> int:
+    """
+    Run `function` on every round inside a transaction that is rolled back, so every round starts with the
+    same database state
+
+    :param benchmark: `pytest-benchmark` fixture
+    :param function: Returns the number of processed elements
+    :param metadata:
+    :return: Number of processed elements on the last round
+    """
+    result = {}
+
+    def target():
+        with CaptureQueriesContext(connection) as context, transaction.atomic():
+            result["elements"] = function()
+            transaction.set_rollback(True)
+        result["queries"] = len(context.captured_queries)
+
+    benchmark.pedantic(target, rounds=ROUNDS, iterations=1)
+    mean = benchmark.stats.stats.mean
+    number_blocks = metadata["to_block_number"] - metadata["from_block_number"] + 1
+    benchmark.extra_info.update(
+        {
+            "blocks": number_blocks,
+            "elements": result["elements"],
+            "queries": result["queries"],
+            "blocks_per_second": number_blocks / mean,
+            "elements_per_second": result["elements"] / mean,
+            "queries_per_element": result["queries"] / max(result["elements"], 1),
+        }
+    )
+    return result["elements"]
+
+
+def index_master_copies(
+    indexer_class, ethereum_client: EthereumClient, metadata: Dict[str, Any], l2: bool
+) -> int:
+    addresses = metadata["l2_master_copies" if l2 else "master_copies"]
+    for address in addresses:
+        SafeMasterCopyFactory(
+            address=address,
+            initial_block_number=metadata["from_block_number"],
+            tx_block_number=metadata["from_block_number"],
+            l2=l2,
+        )
+    indexer = indexer_class(
+        ethereum_client,
+        confirmations=0,
+        block_process_limit=metadata["block_process_limit"],
+        block_auto_process_limit=False,
+    )
+    return indexer.process_addresses_until_updated(
+        addresses, metadata["to_block_number"]
+    )
+
+
+@pytest.mark.django_db
+def test_internal_tx_indexer(benchmark, rpc_client):
+    ethereum_client, metadata = rpc_client
+    if not metadata["master_copies"]:
+        pytest.skip("No master copies recorded")
+
+    run_benchmark(
+        benchmark,
+        lambda: index_master_copies(
+            InternalTxIndexer, ethereum_client, metadata, l2=False
+        ),
+        metadata,
+    )
+
+
+@pytest.mark.django_db
+def test_safe_events_indexer(benchmark, rpc_client):
+    ethereum_client, metadata = rpc_client
+    if not metadata["l2_master_copies"]:
+        pytest.skip("No L2 master copies recorded")
+
+    run_benchmark(
+        benchmark,
+        lambda: index_master_copies(
+            SafeEventsIndexer, ethereum_client, metadata, l2=True
+        ),
+        metadata,
+    )
+
+
+@pytest.mark.django_db
+def test_erc20_events_indexer(benchmark, rpc_client):
+    ethereum_client, metadata = rpc_client
+    if not metadata["safes"]:
+        pytest.skip("No Safes recorded")
+
+    def index_safes() -> int:
+        for address in metadata["safes"]:
+            SafeContractFactory(
+                address=address, erc20_block_number=metadata["from_block_number"]
+            )
+        erc20_events_indexer = Erc20EventsIndexer(
+            ethereum_client,
+            confirmations=0,
+            block_process_limit=metadata["block_process_limit"],
+            block_auto_process_limit=False,
+        )
+        return erc20_events_indexer.process_addresses_until_updated(
+            metadata["safes"], metadata["to_block_number"]
+        )
+
+    run_benchmark(benchmark, index_safes, metadata)
+
+
+@pytest.mark.django_db
+def test_safe_tx_processor(benchmark, rpc_client):
+    ethereum_client, metadata = rpc_client
+    if not metadata["master_copies"]:
+        pytest.skip("No master copies recorded")
+
+    # Index traces outside of the benchmark, rounds only roll back the processing
+    index_master_copies(InternalTxIndexer, ethereum_client, metadata, l2=False)
+
+    def process_decoded_transactions() -> int:
+        safe_tx_processor = SafeTxProcessor(ethereum_client)
+        number_processed = 0
+        # Processing a `setup` makes the Safe indexed, so other transactions can be pending after that
+        while safe_addresses := list(
+            InternalTxDecoded.objects.safes_pending_to_be_processed()
+        ):
+            for safe_address in safe_addresses:
+                number_processed += len(
+                    safe_tx_processor.process_decoded_transactions(
+                        InternalTxDecoded.objects.pending_for_safe(safe_address)
+                    )
+                )
+        return number_processed
+
+    run_benchmark(benchmark, process_decoded_transactions, metadata)
@@ -27,6 +27,7 @@ from ..models import (
     ProxyFactory,
     SafeContract,
     SafeContractDelegate,
+    SafeLastStatus,
     SafeMasterCopy,
     SafeStatus,
     TokenTransfer,
@@ -305,6 +306,11 @@ class SafeStatusFactory(DjangoModelFactory):
     master_copy = factory.LazyFunction(lambda: Account.create().address)
 
 
+class SafeLastStatusFactory(SafeStatusFactory):
+    class Meta:
+        model = SafeLastStatus
+
+
 class WebHookFactory(DjangoModelFactory):
     class Meta:
         model = WebHook
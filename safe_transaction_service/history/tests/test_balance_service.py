@@ -6,16 +6,33 @@ from django.utils import timezone
 
 from eth_account import Account
 
+from gnosis.eth.constants import NULL_ADDRESS
 from gnosis.eth.tests.ethereum_test_case import EthereumTestCaseMixin
 from gnosis.eth.tests.utils import deploy_erc20
 
 from safe_transaction_service.tokens.models import Token
-from safe_transaction_service.tokens.services.price_service import PriceService
+from safe_transaction_service.tokens.services.price_service import (
+    PriceService,
+    PriceServiceProvider,
+)
 from safe_transaction_service.tokens.tests.factories import TokenFactory
+from safe_transaction_service.utils.redis import get_redis
 
-from ..services import BalanceServiceProvider
+from ..exceptions import NodeConnectionException
+from ..models import SafeBalanceLedger, SafeContract, SafeTokenBalance
+from ..services import (
+    BalanceService,
+    BalanceServiceProvider,
+    SafeDataVersionServiceProvider,
+)
 from ..services.balance_service import BalanceWithFiat
-from .factories import ERC20TransferFactory, SafeContractFactory
+from .factories import (
+    ERC20TransferFactory,
+    InternalTxFactory,
+    SafeContractFactory,
+    SafeLastStatusFactory,
+    SafeMasterCopyFactory,
+)
 
 
 class TestBalanceService(EthereumTestCaseMixin, TestCase):
@@ -222,3 +239,141 @@ class TestBalanceService(EthereumTestCaseMixin, TestCase):
         self.assertCountEqual(
             balance_service._filter_addresses(addresses, False, True), expected_address
         )
+
+    def test_get_balances_from_ledger(self):
+        balance_service = BalanceService(
+            self.ethereum_client,
+            PriceServiceProvider(),
+            get_redis(),
+            SafeDataVersionServiceProvider(),
+            use_balances_ledger=True,
+        )
+        safe_address = Account.create().address
+        value = 7
+        self.send_ether(safe_address, value)
+        tokens_value = int(12 * 1e18)
+        erc20 = deploy_erc20(self.w3, "Eurodollar", "EUD", safe_address, tokens_value)
+        # Transfer events were not indexed, balance will be found when reconciling
+        TokenFactory(address=erc20.address, events_bugged=True)
+
+        indexed_block_number = self.ethereum_client.current_block_number
+        SafeContractFactory(
+            address=safe_address, erc20_block_number=indexed_block_number
+        )
+        SafeMasterCopyFactory(tx_block_number=indexed_block_number + 10)
+        self.assertEqual(
+            balance_service.get_indexed_block_number(safe_address),
+            indexed_block_number,
+        )
+
+        balances = balance_service.get_balances(safe_address)
+        self.assertEqual(
+            [(balance.token_address, balance.balance) for balance in balances],
+            [(None, value), (erc20.address, tokens_value)],
+        )
+        self.assertEqual(
+            SafeBalanceLedger.objects.get(address=safe_address).reconciled_block_number,
+            indexed_block_number,
+        )
+
+        # New transfers update the ledger, no reconciliation is needed
+        with self.settings(ETH_BALANCES_LEDGER=True):
+            ERC20TransferFactory(address=erc20.address, _from=safe_address, value=2)
+            InternalTxFactory(to=safe_address, value=3)
+        with mock.patch.object(
+            BalanceService, "reconcile_balances", autospec=True
+        ) as reconcile_balances_mock:
+            balances = balance_service.get_balances(safe_address)
+            reconcile_balances_mock.assert_not_called()
+        self.assertEqual(
+            [(balance.token_address, balance.balance) for balance in balances],
+            [(None, value + 3), (erc20.address, tokens_value - 2)],
+        )
+
+        # Tokens used by the Safe are returned even if there's no balance left
+        token_address = Account.create().address
+        with self.settings(ETH_BALANCES_LEDGER=True):
+            ERC20TransferFactory(address=token_address, to=safe_address, value=4)
+            ERC20TransferFactory(address=token_address, _from=safe_address, value=4)
+        self.assertIn(
+            {"token_address": token_address, "balance": 0},
+            balance_service._get_raw_balances_from_ledger(safe_address),
+        )
+
+    def test_get_indexed_block_number(self):
+        balance_service = BalanceServiceProvider()
+        safe_address = Account.create().address
+        self.assertIsNone(balance_service.get_indexed_block_number(safe_address))
+
+        SafeContractFactory(address=safe_address, erc20_block_number=100)
+        self.assertEqual(balance_service.get_indexed_block_number(safe_address), 100)
+        safe_master_copy = SafeMasterCopyFactory(tx_block_number=90)
+        self.assertEqual(balance_service.get_indexed_block_number(safe_address), 90)
+
+        # Only the master copy of the Safe is considered if it's known
+        SafeLastStatusFactory(
+            address=safe_address,
+            master_copy=SafeMasterCopyFactory(tx_block_number=95).address,
+        )
+        self.assertEqual(balance_service.get_indexed_block_number(safe_address), 95)
+        safe_master_copy.tx_block_number = 80
+        safe_master_copy.save(update_fields=["tx_block_number"])
+        self.assertEqual(balance_service.get_indexed_block_number(safe_address), 95)
+
+    def test_reconcile_balances(self):
+        balance_service = BalanceService(
+            self.ethereum_client,
+            PriceServiceProvider(),
+            get_redis(),
+            SafeDataVersionServiceProvider(),
+            use_balances_ledger=True,
+            eth_reorg_blocks=10,
+        )
+        safe_address = Account.create().address
+        self.assertIsNone(balance_service.reconcile_balances(safe_address))
+
+        value = 7
+        self.send_ether(safe_address, value)
+        current_block_number = self.ethereum_client.current_block_number
+        SafeContractFactory(
+            address=safe_address, erc20_block_number=current_block_number - 11
+        )
+        SafeBalanceLedger.objects.get_or_build(safe_address)
+        # Indexed block is too old, state could be pruned on the node
+        self.assertIsNone(balance_service.reconcile_balances(safe_address))
+        self.assertIsNone(
+            SafeBalanceLedger.objects.get(address=safe_address).reconciled
+        )
+
+        SafeContract.objects.filter(address=safe_address).update(
+            erc20_block_number=current_block_number
+        )
+        with mock.patch.object(
+            type(self.ethereum_client),
+            "get_balance",
+            side_effect=ValueError(
+                {"code": -32000, "message": "missing trie node 8e3a (path )"}
+            ),
+        ):
+            self.assertIsNone(balance_service.reconcile_balances(safe_address))
+        with mock.patch.object(
+            type(self.ethereum_client),
+            "get_balance",
+            side_effect=ValueError({"code": -32000, "message": "execution reverted"}),
+        ):
+            with self.assertRaises(NodeConnectionException):
+                balance_service.reconcile_balances(safe_address)
+        self.assertIsNone(
+            SafeBalanceLedger.objects.get(address=safe_address).reconciled
+        )
+
+        self.assertEqual(balance_service.reconcile_balances(safe_address), 1)
+        self.assertEqual(
+            SafeTokenBalance.objects.get(
+                safe=safe_address, token_address=NULL_ADDRESS
+            ).balance,
+            value,
+        )
+        self.assertIsNotNone(
+            SafeBalanceLedger.objects.get(address=safe_address).reconciled
+        )
@@ -0,0 +1,100 @@
+from unittest import mock
+
+from django.test import TestCase
+
+from hexbytes import HexBytes
+
+from gnosis.eth.tests.ethereum_test_case import EthereumTestCaseMixin
+
+from safe_transaction_service.utils.redis import get_redis
+
+from ..services import BlockIngestionService
+
+
+class TestBlockIngestionService(EthereumTestCaseMixin, TestCase):
+    def setUp(self) -> None:
+        self.redis = get_redis()
+        self.redis.flushall()
+        self.block_ingestion_service = BlockIngestionService(
+            self.ethereum_client, self.redis, False, blocks_to_keep=5
+        )
+
+    def tearDown(self) -> None:
+        self.redis.flushall()
+
+    def test_ingest(self):
+        account = self.ethereum_test_account
+        erc20_contract = self.deploy_example_erc20(10, account.address)
+        tx_hash = self.ethereum_client.erc20.send_tokens(
+            self.ethereum_test_account.address, 1, erc20_contract.address, account.key
+        )
+        block_number = self.ethereum_client.get_transaction(tx_hash)["blockNumber"]
+
+        self.assertIsNone(self.block_ingestion_service.get_last_block_number())
+        self.assertIsNone(
+            self.block_ingestion_service.get_logs(block_number, block_number)
+        )
+        self.assertGreater(self.block_ingestion_service.ingest(confirmations=0), 0)
+        self.assertEqual(self.block_ingestion_service.ingest(confirmations=0), 0)
+        self.assertEqual(
+            self.block_ingestion_service.get_last_block_number(), block_number
+        )
+
+        logs = self.block_ingestion_service.get_logs(block_number, block_number)
+        self.assertEqual(len(logs), 1)
+        self.assertEqual(logs[0]["transactionHash"], tx_hash)
+        self.assertEqual(logs[0]["address"], erc20_contract.address)
+        (block,) = self.block_ingestion_service.get_blocks([block_number])
+        self.assertEqual(block["number"], block_number)
+        self.assertIsNone(
+            self.block_ingestion_service.get_logs(block_number - 10, block_number)
+        )
+        self.assertIsNone(self.block_ingestion_service.get_traces([block_number]))
+
+        self.block_ingestion_service.invalidate_from_block_number(block_number)
+        self.assertIsNone(
+            self.block_ingestion_service.get_logs(block_number, block_number)
+        )
+        self.assertEqual(
+            self.block_ingestion_service.get_last_block_number(), block_number - 1
+        )
+
+    def test_ingest_reorg_while_fetching(self):
+        account = self.ethereum_test_account
+        erc20_contract = self.deploy_example_erc20(10, account.address)
+        tx_hash = self.ethereum_client.erc20.send_tokens(
+            self.ethereum_test_account.address, 1, erc20_contract.address, account.key
+        )
+        block_number = self.ethereum_client.get_transaction(tx_hash)["blockNumber"]
+
+        # Logs are returned for a block from a different chain
+        get_logs = self.ethereum_client.slow_w3.eth.get_logs
+
+        def get_logs_from_other_chain(*args, **kwargs):
+            return [
+                {**log, "blockHash": HexBytes("0x" + "1" * 64)}
+                for log in get_logs(*args, **kwargs)
+            ]
+
+        with mock.patch.object(
+            self.ethereum_client.slow_w3.eth,
+            "get_logs",
+            side_effect=get_logs_from_other_chain,
+        ) as get_logs_mock:
+            self.assertEqual(self.block_ingestion_service.ingest(confirmations=0), 0)
+            self.assertEqual(
+                get_logs_mock.call_count, self.block_ingestion_service.FETCH_RETRIES
+            )
+        self.assertIsNone(self.block_ingestion_service.get_last_block_number())
+
+        # Logs match the blocks after fetching them again
+        get_logs_results = iter([get_logs_from_other_chain, get_logs])
+        with mock.patch.object(
+            self.ethereum_client.slow_w3.eth,
+            "get_logs",
+            side_effect=lambda *args, **kwargs: next(get_logs_results)(*args, **kwargs),
+        ):
+            self.assertGreater(self.block_ingestion_service.ingest(confirmations=0), 0)
+        logs = self.block_ingestion_service.get_logs(block_number, block_number)
+        self.assertEqual(len(logs), 1)
+        self.assertEqual(logs[0]["transactionHash"], tx_hash)
@@ -0,0 +1,82 @@
+import tempfile
+from unittest.mock import MagicMock, PropertyMock
+
+from django.test import TestCase
+
+from eth_account import Account
+from hexbytes import HexBytes
+
+from ..services.chain_data_cache import ChainDataCache, ChainDataStore
+
+
+class TestChainDataCache(TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.chain_data_cache = ChainDataCache(self.directory.name, 10)
+
+    def tearDown(self) -> None:
+        self.chain_data_cache.close()
+        self.directory.cleanup()
+
+    def test_chain_data_store(self):
+        store = ChainDataStore(self.directory.name, "test")
+        key = Account.create().key
+        other_key = Account.create().key
+        self.assertEqual(store.get_many([key, other_key]), [None, None])
+        self.assertEqual(store.put_many([(key, {"a": HexBytes("0x12")})]), 1)
+        self.assertEqual(store.put_many([(key, {"a": HexBytes("0x12")})]), 0)
+        self.assertEqual(
+            store.get_many([key, other_key]), [{"a": HexBytes("0x12")}, None]
+        )
+
+        # Other process appending to the same files
+        other_store = ChainDataStore(self.directory.name, "test")
+        self.assertEqual(other_store.put_many([(other_key, [1, 2])]), 1)
+        self.assertEqual(len(other_store), 2)
+        self.assertEqual(
+            store.get_many([other_key, key]), [[1, 2], {"a": HexBytes("0x12")}]
+        )
+        store.close()
+        other_store.close()
+
+    def test_get_transaction_receipts(self):
+        tx_hashes = [Account.create().key.hex() for _ in range(3)]
+        tx_receipts = [
+            {"transactionHash": HexBytes(tx_hash), "blockNumber": block_number}
+            for tx_hash, block_number in zip(tx_hashes, [5, 95, 100])
+        ]
+        ethereum_client = MagicMock()
+        current_block_number_mock = PropertyMock(return_value=100)
+        type(ethereum_client).current_block_number = current_block_number_mock
+        ethereum_client.get_transaction_receipts.return_value = tx_receipts
+
+        self.assertEqual(
+            self.chain_data_cache.get_transaction_receipts(ethereum_client, tx_hashes),
+            tx_receipts,
+        )
+        ethereum_client.get_transaction_receipts.assert_called_once_with(tx_hashes)
+
+        # Only the receipt older than `eth_reorg_blocks` is cached
+        ethereum_client.get_transaction_receipts.reset_mock()
+        ethereum_client.get_transaction_receipts.return_value = tx_receipts[1:]
+        self.assertEqual(
+            self.chain_data_cache.get_transaction_receipts(ethereum_client, tx_hashes),
+            tx_receipts,
+        )
+        ethereum_client.get_transaction_receipts.assert_called_once_with(tx_hashes[1:])
+        # Current block number is requested only when elements newer than the confirmed block are fetched
+        self.assertEqual(current_block_number_mock.call_count, 2)
+        ethereum_client.get_transaction_receipts.reset_mock()
+        ethereum_client.get_transaction_receipts.return_value = tx_receipts[1:]
+        self.chain_data_cache.get_transaction_receipts(
+            ethereum_client, tx_hashes, current_block_number=105
+        )
+        self.assertEqual(current_block_number_mock.call_count, 2)
+        self.assertEqual(len(self.chain_data_cache.stores["receipts"]), 2)
+
+        # Not found elements are not cached
+        ethereum_client.get_blocks.return_value = [None]
+        self.assertEqual(
+            self.chain_data_cache.get_blocks(ethereum_client, [101]), [None]
+        )
+        self.assertEqual(len(self.chain_data_cache.stores["blocks"]), 0)
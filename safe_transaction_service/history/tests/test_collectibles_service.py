@@ -1,8 +1,10 @@
 from unittest import mock
 from unittest.mock import MagicMock
+from uuid import uuid4
 
-from django.test import TestCase
+from django.test import TestCase, override_settings
 
+import requests
 from eth_account import Account
 
 from gnosis.eth import EthereumClient
@@ -19,12 +21,15 @@ from safe_transaction_service.tokens.models import Token
 from safe_transaction_service.tokens.tests.factories import TokenFactory
 from safe_transaction_service.utils.redis import get_redis
 
-from ..services import CollectiblesService
+from ..models import CollectibleMetadata, ERC721Ownership
+from ..services import CollectiblesService, SafeDataVersionServiceProvider
 from ..services.collectibles_service import (
     Collectible,
     CollectiblesServiceProvider,
     CollectibleWithMetadata,
     Erc721InfoWithLogo,
+    MetadataHostNotReachableException,
+    MetadataRetrievalException,
     ipfs_to_http,
 )
 from .factories import ERC721TransferFactory
@@ -46,11 +51,13 @@ class TestCollectiblesService(EthereumTestCaseMixin, TestCase):
         try:
             ethereum_client = EthereumClient(mainnet_node)
             EthereumClientProvider.instance = ethereum_client
-            collectibles_service = CollectiblesService(ethereum_client, get_redis())
+            collectibles_service = CollectiblesService(
+                ethereum_client, get_redis(), SafeDataVersionServiceProvider()
+            )
 
             # Caches empty
             self.assertFalse(collectibles_service.cache_token_info)
-            self.assertFalse(collectibles_service.cache_uri_metadata)
+            self.assertEqual(CollectibleMetadata.objects.count(), 0)
 
             safe_address = "0xfF501B324DC6d78dC9F983f140B9211c3EdB4dc7"
             ens_address = "0x57f1887a8BF19b14fC0dF6Fd9B2acc9Af147eA85"
@@ -72,6 +79,7 @@ class TestCollectiblesService(EthereumTestCaseMixin, TestCase):
                 ERC721TransferFactory(
                     to=safe_address, address=erc721_address, token_id=token_id
                 )
+            ERC721Ownership.objects.update_owners(erc721_addresses)
 
             expected = [
                 Collectible(
@@ -181,7 +189,7 @@ class TestCollectiblesService(EthereumTestCaseMixin, TestCase):
 
             # Caches not empty
             self.assertTrue(collectibles_service.cache_token_info)
-            self.assertTrue(collectibles_service.cache_uri_metadata)
+            self.assertEqual(CollectibleMetadata.objects.count(), 2)
         finally:
             del EthereumClientProvider.instance
 
@@ -292,3 +300,95 @@ class TestCollectiblesService(EthereumTestCaseMixin, TestCase):
             collectibles_service._retrieve_metadata_from_uri(ipfs_address),
             expected_object,
         )
+
+    @override_settings(
+        COLLECTIBLES_METADATA_FAILING_HOST_ERRORS=3,
+        COLLECTIBLES_METADATA_FAILING_HOST_ERRORS_WINDOW=60,
+    )
+    def test_retrieve_metadata_from_failing_host(self):
+        CollectiblesServiceProvider.del_singleton()
+        collectibles_service = CollectiblesServiceProvider()
+        host = f"{uuid4().hex}.gnosis.io"
+        uri = f"https://{host}/metadata/1"
+        with mock.patch.object(
+            requests.Session, "get", side_effect=requests.exceptions.ConnectionError
+        ) as get_mock:
+            # Host is not flagged until there are enough connection errors
+            for call_count in range(1, 4):
+                with self.assertRaises(MetadataRetrievalException) as context:
+                    collectibles_service._retrieve_metadata_from_uri(uri)
+                self.assertNotIsInstance(
+                    context.exception, MetadataHostNotReachableException
+                )
+                self.assertEqual(get_mock.call_count, call_count)
+
+            # Host is not reachable, it will not be requested again
+            with self.assertRaisesMessage(
+                MetadataHostNotReachableException, "is not reachable"
+            ):
+                collectibles_service._retrieve_metadata_from_uri(
+                    uri.replace("/1", "/2")
+                )
+            self.assertEqual(get_mock.call_count, 3)
+
+            # Metadata not requested is not stored
+            token_address = Account.create().address
+            self.assertEqual(
+                collectibles_service.get_metadata_for_collectibles(
+                    [Collectible("", "", "", token_address, 1, uri)]
+                ),
+                [None],
+            )
+            self.assertEqual(get_mock.call_count, 3)
+            self.assertFalse(CollectibleMetadata.objects.exists())
+
+        CollectiblesServiceProvider.del_singleton()
+
+    @mock.patch.object(
+        CollectiblesService, "_retrieve_metadata_from_uri", autospec=True
+    )
+    def test_get_metadata_for_collectibles(
+        self, retrieve_metadata_from_uri_mock: MagicMock
+    ):
+        collectibles_service = CollectiblesServiceProvider()
+        token_address = Account.create().address
+        collectibles = [
+            Collectible("", "", "", token_address, 1, "https://gnosis.io/1"),
+            Collectible("", "", "", token_address, 2, "https://gnosis.io/2"),
+        ]
+        # Metadata is retrieved concurrently, so it's returned depending on the uri
+        available_metadata = {"https://gnosis.io/1": {"name": "Collectible 1"}}
+
+        def retrieve_metadata_from_uri(_, uri: str):
+            if uri not in available_metadata:
+                raise MetadataRetrievalException(uri)
+            return available_metadata[uri]
+
+        retrieve_metadata_from_uri_mock.side_effect = retrieve_metadata_from_uri
+        self.assertEqual(
+            collectibles_service.get_metadata_for_collectibles(collectibles),
+            [{"name": "Collectible 1"}, None],
+        )
+        self.assertEqual(CollectibleMetadata.objects.count(), 2)
+
+        # Metadata is taken from database
+        retrieve_metadata_from_uri_mock.reset_mock()
+        self.assertEqual(
+            collectibles_service.get_metadata_for_collectibles(collectibles),
+            [{"name": "Collectible 1"}, None],
+        )
+        retrieve_metadata_from_uri_mock.assert_not_called()
+
+        # Refresh keeps stored metadata if it cannot be retrieved
+        available_metadata.clear()
+        available_metadata["https://gnosis.io/2"] = {"name": "Collectible 2"}
+        self.assertEqual(
+            collectibles_service.refresh_metadata(
+                CollectibleMetadata.objects.order_by("token_id")
+            ),
+            1,
+        )
+        self.assertEqual(
+            collectibles_service.get_metadata_for_collectibles(collectibles),
+            [{"name": "Collectible 1"}, {"name": "Collectible 2"}],
+        )
@@ -3,10 +3,14 @@ from unittest import mock
 
 from django.test import TestCase
 
+from eth_account import Account
+from hexbytes import HexBytes
+
 from gnosis.eth.tests.ethereum_test_case import EthereumTestCaseMixin
 
 from ..indexers import Erc20EventsIndexer, Erc20EventsIndexerProvider
 from ..models import ERC20Transfer, EthereumTx
+from ..utils import bloom_contains_any, get_bloom_bits
 from .factories import SafeContractFactory
 
 
@@ -95,3 +99,37 @@ class TestErc20EventsIndexer(EthereumTestCaseMixin, TestCase):
             self.assertEqual(
                 erc20_events_indexer._process_decoded_element(event), original_event
             )
+
+    def test_get_block_ranges_using_bloom_filter(self):
+        erc20_events_indexer = Erc20EventsIndexerProvider()
+        account = self.ethereum_test_account
+        erc20_contract = self.deploy_example_erc20(10, account.address)
+        safe_contract = SafeContractFactory()
+        tx_hash = self.ethereum_client.erc20.send_tokens(
+            safe_contract.address, 1, erc20_contract.address, account.key
+        )
+        block_number = self.ethereum_client.get_transaction(tx_hash)["blockNumber"]
+        block = self.ethereum_client.get_block(block_number)
+        self.assertTrue(
+            bloom_contains_any(
+                block["logsBloom"], [get_bloom_bits(HexBytes(erc20_contract.address))]
+            )
+        )
+        self.assertFalse(
+            bloom_contains_any(
+                block["logsBloom"], [get_bloom_bits(HexBytes(Account.create().address))]
+            )
+        )
+
+        self.assertEqual(
+            erc20_events_indexer._get_block_ranges_using_bloom_filter(
+                [safe_contract.address], block_number - 1, block_number
+            ),
+            [(block_number, block_number)],
+        )
+        self.assertEqual(
+            erc20_events_indexer._get_block_ranges_using_bloom_filter(
+                [Account.create().address], block_number - 1, block_number
+            ),
+            [],
+        )
@@ -1,24 +1,32 @@
+import threading
 from unittest import mock
 from unittest.mock import MagicMock, PropertyMock
 
 from django.test import TestCase
 
+from hexbytes import HexBytes
+from web3 import Web3
+
 from gnosis.eth import EthereumClient
+from gnosis.eth.contracts import get_safe_V1_3_0_contract
 from gnosis.eth.ethereum_client import ParityManager
 
+from safe_transaction_service.utils.redis import get_redis
+
 from ..indexers import InternalTxIndexer, InternalTxIndexerProvider
 from ..indexers.internal_tx_indexer import InternalTxIndexerWithTraceBlock
 from ..indexers.tx_processor import SafeTxProcessorProvider
 from ..models import (
     EthereumBlock,
     EthereumTx,
+    EthereumTxCallType,
     InternalTx,
     InternalTxDecoded,
     SafeContract,
     SafeMasterCopy,
     SafeStatus,
 )
-from .factories import SafeMasterCopyFactory
+from .factories import InternalTxFactory, SafeMasterCopyFactory
 from .mocks.mocks_internal_tx_indexer import (
     block_result,
     trace_blocks_result,
@@ -164,6 +172,162 @@ class TestInternalTxIndexer(TestCase):
     def test_internal_tx_indexer(self):
         self._test_internal_tx_indexer()
 
+    @mock.patch.object(ParityManager, "trace_filter", autospec=True, return_value=[])
+    @mock.patch.object(
+        EthereumClient,
+        "current_block_number",
+        new_callable=PropertyMock,
+        return_value=2000,
+    )
+    def test_process_addresses_already_indexed(
+        self, current_block_number_mock: MagicMock, trace_filter_mock: MagicMock
+    ):
+        internal_tx_indexer = InternalTxIndexer(
+            EthereumClient(),
+            block_process_limit=100,
+            block_auto_process_limit=False,
+        )
+        lagging_master_copy = SafeMasterCopyFactory(tx_block_number=0)
+        almost_lagging_master_copy = SafeMasterCopyFactory(tx_block_number=50)
+        updated_master_copy = SafeMasterCopyFactory(tx_block_number=1500)
+        addresses = [
+            lagging_master_copy.address,
+            almost_lagging_master_copy.address,
+            updated_master_copy.address,
+        ]
+        self.assertEqual(
+            internal_tx_indexer.get_addresses_for_search(addresses, 101),
+            addresses[:2],
+        )
+
+        _, updated = internal_tx_indexer.process_addresses(addresses)
+        self.assertFalse(updated)
+        trace_filter_mock.assert_any_call(
+            internal_tx_indexer.ethereum_client.parity,
+            from_block=1,
+            to_block=101,
+            from_address=addresses[:2],
+        )
+        for safe_master_copy, expected_block_number in (
+            (lagging_master_copy, 101),
+            (almost_lagging_master_copy, 101),
+            (updated_master_copy, 1500),
+        ):
+            safe_master_copy.refresh_from_db()
+            self.assertEqual(safe_master_copy.tx_block_number, expected_block_number)
+
+    def test_update_block_process_limit(self):
+        internal_tx_indexer = InternalTxIndexer(
+            EthereumClient(),
+            block_process_limit=100,
+            block_process_limit_max=300,
+            block_process_limit_target_seconds=5.0,
+            block_process_limit_target_elements=1000,
+        )
+        internal_tx_indexer.update_block_process_limit(5.0, 10)  # On target
+        self.assertEqual(internal_tx_indexer.block_process_limit, 100)
+        internal_tx_indexer.update_block_process_limit(10.0, 10)
+        self.assertEqual(internal_tx_indexer.block_process_limit, 50)
+        internal_tx_indexer.update_block_process_limit(60.0, 10)  # Bounded to half
+        self.assertEqual(internal_tx_indexer.block_process_limit, 25)
+        internal_tx_indexer.update_block_process_limit(0.1, 10)  # Bounded to double
+        self.assertEqual(internal_tx_indexer.block_process_limit, 50)
+        internal_tx_indexer.update_block_process_limit(0.1, 1500)  # Too many elements
+        self.assertEqual(internal_tx_indexer.block_process_limit, 33)
+        for _ in range(5):
+            internal_tx_indexer.update_block_process_limit(0.1, 10)
+        self.assertEqual(internal_tx_indexer.block_process_limit, 300)  # Max
+
+        with self.settings(ETH_INDEXER_STORE_PROCESS_LIMIT=True):
+            internal_tx_indexer.set_block_process_limit(120)
+            self.assertEqual(internal_tx_indexer.get_stored_block_process_limit(), 120)
+            self.assertEqual(
+                InternalTxIndexer(EthereumClient()).block_process_limit, 120
+            )
+            # Stored value is bounded by `block_process_limit_max`
+            self.assertEqual(
+                InternalTxIndexer(
+                    EthereumClient(), block_process_limit_max=80
+                ).block_process_limit,
+                80,
+            )
+            get_redis().delete(internal_tx_indexer.block_process_limit_redis_key)
+
+    def test_internal_tx_indexer_pipelined(self):
+        self.internal_tx_indexer.pipeline_depth = 2
+        try:
+            self._test_internal_tx_indexer()
+        finally:
+            self.internal_tx_indexer.pipeline_depth = 0
+
+    @mock.patch.object(
+        EthereumClient,
+        "current_block_number",
+        new_callable=PropertyMock,
+        return_value=30,
+    )
+    def test_process_addresses_pipelined_overlap(
+        self, current_block_number_mock: MagicMock
+    ):
+        internal_tx_indexer = InternalTxIndexer(
+            EthereumClient(),
+            confirmations=0,
+            block_process_limit=10,
+            pipeline_depth=2,
+        )
+        safe_master_copy = SafeMasterCopyFactory(tx_block_number=0)
+        main_thread = threading.current_thread()
+        first_range_processing = threading.Event()
+        second_range_fetching = threading.Event()
+        limit_updated_on_threads = set()
+
+        def find_relevant_elements(
+            addresses, from_block_number, to_block_number, current_block_number=None
+        ):
+            if from_block_number > 1:
+                # Range is requested while the previous one is being processed
+                second_range_fetching.set()
+                self.assertTrue(first_range_processing.wait(timeout=10))
+            return [from_block_number]
+
+        def process_elements(elements):
+            if elements == [1]:
+                first_range_processing.set()
+                self.assertTrue(second_range_fetching.wait(timeout=10))
+            return elements
+
+        def update_block_process_limit(elapsed_seconds, number_elements):
+            limit_updated_on_threads.add(threading.current_thread())
+
+        with mock.patch.object(
+            internal_tx_indexer,
+            "find_relevant_elements",
+            side_effect=find_relevant_elements,
+        ) as find_relevant_elements_mock, mock.patch.object(
+            internal_tx_indexer, "process_elements", side_effect=process_elements
+        ), mock.patch.object(
+            internal_tx_indexer,
+            "update_block_process_limit",
+            side_effect=update_block_process_limit,
+        ):
+            self.assertEqual(
+                internal_tx_indexer.process_addresses_pipelined(
+                    [safe_master_copy.address]
+                ),
+                3,
+            )
+
+        self.assertTrue(first_range_processing.is_set())
+        self.assertTrue(second_range_fetching.is_set())
+        self.assertEqual(
+            [call.args[1:] for call in find_relevant_elements_mock.call_args_list],
+            [(1, 11), (12, 22), (23, 30)],
+        )
+        # Workers don't modify `block_process_limit`, only full ranges are used to adjust it
+        self.assertEqual(limit_updated_on_threads, {main_thread})
+        safe_master_copy.refresh_from_db()
+        self.assertEqual(safe_master_copy.tx_block_number, 30)
+
     @mock.patch.object(
         ParityManager, "trace_blocks", autospec=True, return_value=trace_blocks_result
     )
@@ -303,3 +467,37 @@ class TestInternalTxIndexer(TestCase):
         tx_processor.process_decoded_transactions(internal_txs_decoded)
         safe_contract.refresh_from_db()
         self.assertGreater(safe_contract.erc20_block_number, 0)
+
+    def test_get_internal_txs_to_decode(self):
+        data = HexBytes(
+            get_safe_V1_3_0_contract(Web3()).encodeABI(
+                fn_name="changeThreshold", args=[2]
+            )
+        )
+        internal_txs = [
+            InternalTxFactory(
+                ethereum_tx__status=1,
+                call_type=EthereumTxCallType.DELEGATE_CALL.value,
+                data=data,
+            )
+            for _ in range(3)
+        ]
+        internal_txs.append(InternalTxFactory(ethereum_tx__status=1, data=data))
+        InternalTxDecoded.objects.create(
+            internal_tx=internal_txs[0], function_name="changeThreshold", arguments={}
+        )
+
+        # Traces are not queried again
+        with self.assertNumQueries(1):
+            internal_txs_decoded = list(
+                self.internal_tx_indexer._get_internal_txs_to_decode(internal_txs)
+            )
+        self.assertEqual(
+            [
+                internal_tx_decoded.internal_tx
+                for internal_tx_decoded in internal_txs_decoded
+            ],
+            internal_txs[1:3],
+        )
+        self.assertEqual(internal_txs_decoded[0].function_name, "changeThreshold")
+        self.assertEqual(internal_txs_decoded[0].arguments, {"_threshold": 2})
@@ -0,0 +1,126 @@
+from django.test import TestCase
+
+import eth_abi
+from eth_account import Account
+from hexbytes import HexBytes
+from web3 import Web3
+
+from gnosis.eth.constants import ERC20_721_TRANSFER_TOPIC
+from gnosis.eth.contracts import get_safe_V1_3_0_contract
+
+from ..indexers.erc20_events_indexer import TRANSFER_EVENT_ABIS
+from ..indexers.log_decoder import LogDecoder
+
+
+class TestLogDecoder(TestCase):
+    def _get_log(self, topics, data: bytes = b""):
+        return {
+            "address": Account.create().address,
+            "blockHash": HexBytes(
+                "0x551a6e5ca972c453873898be696980d7ff65d27a6f80ddffab17591144c99e01"
+            ),
+            "blockNumber": 9205844,
+            "data": HexBytes(data).hex(),
+            "logIndex": 2,
+            "removed": False,
+            "topics": [HexBytes(topic) for topic in topics],
+            "transactionHash": HexBytes(
+                "0x7e4b2bb0ac5129552908e9c8433ea1746f76616188e8c3597a6bdce88d0b474c"
+            ),
+            "transactionIndex": 1,
+        }
+
+    def test_decode_log(self):
+        safe_contract = get_safe_V1_3_0_contract(Web3())
+        contract_events = [
+            safe_contract.events.AddedOwner(),
+            safe_contract.events.ChangedThreshold(),
+            safe_contract.events.ExecutionSuccess(),
+        ]
+        log_decoder = LogDecoder([event.abi for event in contract_events])
+        self.assertEqual(len(log_decoder.topics), 3)
+
+        owner = Account.create().address
+        added_owner_log = self._get_log(
+            [Web3.keccak(text="AddedOwner(address)")],
+            eth_abi.encode_single("address", owner),
+        )
+        execution_success_log = self._get_log(
+            [Web3.keccak(text="ExecutionSuccess(bytes32,uint256)")],
+            eth_abi.encode_abi(["bytes32", "uint256"], [b"\x02" * 32, 7]),
+        )
+        for contract_event, log in (
+            (contract_events[0], added_owner_log),
+            (contract_events[2], execution_success_log),
+        ):
+            decoded_log = log_decoder.decode_log(log)
+            self.assertEqual(decoded_log, contract_event.processLog(log))
+            self.assertEqual(log_decoder.decode_logs([log]), [decoded_log])
+        self.assertEqual(
+            log_decoder.decode_log(added_owner_log)["args"], {"owner": owner}
+        )
+
+        # Log fields are kept
+        decoded_log = log_decoder.decode_log(added_owner_log, include_log_fields=True)
+        self.assertEqual(decoded_log["topics"], added_owner_log["topics"])
+        self.assertEqual(decoded_log["event"], "AddedOwner")
+
+        # Same topic but different number of topics
+        dangling_log = self._get_log(
+            [
+                Web3.keccak(text="AddedOwner(address)"),
+                eth_abi.encode_single("address", owner),
+            ]
+        )
+        self.assertIsNone(log_decoder.decode_log(dangling_log))
+
+        # Not supported topic, no topics and not valid data
+        not_supported_log = self._get_log([ERC20_721_TRANSFER_TOPIC])
+        self.assertIsNone(log_decoder.decode_log(not_supported_log))
+        self.assertIsNone(log_decoder.decode_log(self._get_log([])))
+        not_valid_log = self._get_log(
+            [Web3.keccak(text="AddedOwner(address)")], b"\x01"
+        )
+        self.assertIsNone(log_decoder.decode_log(not_valid_log))
+        self.assertEqual(
+            log_decoder.decode_logs(
+                [not_supported_log, added_owner_log, dangling_log, not_valid_log]
+            ),
+            [log_decoder.decode_log(added_owner_log)],
+        )
+
+    def test_decode_transfer_logs(self):
+        log_decoder = LogDecoder(TRANSFER_EVENT_ABIS)
+        self.assertEqual(log_decoder.topics, [HexBytes(ERC20_721_TRANSFER_TOPIC)])
+        _from, to = Account.create().address, Account.create().address
+        from_topic = eth_abi.encode_single("address", _from)
+        to_topic = eth_abi.encode_single("address", to)
+
+        erc20_log = self._get_log(
+            [ERC20_721_TRANSFER_TOPIC, from_topic, to_topic],
+            eth_abi.encode_single("uint256", 10),
+        )
+        erc721_log = self._get_log(
+            [
+                ERC20_721_TRANSFER_TOPIC,
+                from_topic,
+                to_topic,
+                eth_abi.encode_single("uint256", 5),
+            ]
+        )
+        not_standard_log = self._get_log(
+            [ERC20_721_TRANSFER_TOPIC],
+            eth_abi.encode_abi(["address", "address", "uint256"], [_from, to, 3]),
+        )
+        decoded_logs = log_decoder.decode_logs(
+            [erc20_log, erc721_log, not_standard_log], include_log_fields=True
+        )
+        self.assertEqual(
+            [decoded_log["args"] for decoded_log in decoded_logs],
+            [
+                {"from": _from, "to": to, "value": 10},
+                {"from": _from, "to": to, "tokenId": 5},
+                {"from": _from, "to": to, "unknown": 3},
+            ],
+        )
+        self.assertEqual(decoded_logs[0]["topics"], erc20_log["topics"])
@@ -1,31 +1,40 @@
 import logging
 from datetime import timedelta
 
+from django.core.cache import cache
 from django.core.exceptions import ValidationError
 from django.db import IntegrityError
 from django.db.models import QuerySet
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.utils import timezone
 
 from eth_account import Account
+from hexbytes import HexBytes
 from web3 import Web3
 
+from gnosis.eth.constants import NULL_ADDRESS
 from gnosis.safe.safe_signature import SafeSignatureType
 
 from safe_transaction_service.contracts.tests.factories import ContractFactory
 
 from ..models import (
     ERC20Transfer,
+    ERC721Ownership,
     ERC721Transfer,
     EthereumBlock,
+    EthereumTx,
     EthereumTxCallType,
     InternalTx,
     InternalTxDecoded,
     MultisigConfirmation,
     MultisigTransaction,
+    SafeBalanceLedger,
     SafeContractDelegate,
+    SafeLastStatus,
     SafeMasterCopy,
     SafeStatus,
+    SafeStatusIntegrity,
+    SafeTokenBalance,
 )
 from .factories import (
     ERC20TransferFactory,
@@ -129,6 +138,36 @@ class TestModelMixins(TestCase):
             number,
         )
 
+    def test_bulk_copy_from_generator(self):
+        self.assertEqual(
+            InternalTx.objects.bulk_copy_from_generator(
+                (x for x in range(0)), ["ethereum_tx", "trace_address"]
+            ),
+            0,
+        )
+        number = 5
+        internal_txs = [InternalTxFactory(data=b"\\\t\n") for _ in range(number)]
+        pks = [internal_tx.pk for internal_tx in internal_txs]
+        InternalTx.objects.filter(pk__in=pks[2:]).delete()
+        for internal_tx in internal_txs:
+            internal_tx.pk = None
+
+        self.assertEqual(
+            InternalTx.objects.bulk_copy_from_generator(
+                (x for x in internal_txs),
+                ["ethereum_tx", "trace_address"],
+                batch_size=2,
+            ),
+            number,
+        )
+        self.assertEqual(InternalTx.objects.count(), number)
+        # Primary keys are populated, also for the rows already inserted
+        self.assertEqual([internal_tx.pk for internal_tx in internal_txs[:2]], pks[:2])
+        for internal_tx in internal_txs:
+            self.assertEqual(
+                bytes(InternalTx.objects.get(pk=internal_tx.pk).data), b"\\\t\n"
+            )
+
 
 class TestMultisigTransaction(TestCase):
     def test_multisig_transaction_owners(self):
@@ -225,8 +264,91 @@ class TestSafeMasterCopy(TestCase):
         self.assertIsNone(safe_master_copy.full_clean())
 
 
+class TestEthereumBlock(TestCase):
+    def test_get_or_create_from_blocks(self):
+        ethereum_block = EthereumBlockFactory()
+        blocks = [
+            {
+                "number": ethereum_block.number,
+                "gasLimit": ethereum_block.gas_limit,
+                "gasUsed": ethereum_block.gas_used,
+                "timestamp": int(ethereum_block.timestamp.timestamp()),
+                "hash": HexBytes(ethereum_block.block_hash),
+                "parentHash": HexBytes(ethereum_block.parent_hash),
+            },
+            {
+                "number": ethereum_block.number + 1,
+                "gasLimit": 8_000_000,
+                "gasUsed": 21_000,
+                "timestamp": 1636548296,
+                "hash": HexBytes(Web3.keccak(text="block-hash")),
+                "parentHash": HexBytes(ethereum_block.block_hash),
+            },
+        ]
+        ethereum_blocks = EthereumBlock.objects.get_or_create_from_blocks(
+            blocks, ethereum_block.number
+        )
+        self.assertEqual(EthereumBlock.objects.count(), 2)
+        self.assertEqual(ethereum_blocks[ethereum_block.number], ethereum_block)
+        new_ethereum_block = ethereum_blocks[ethereum_block.number + 1]
+        self.assertFalse(new_ethereum_block.confirmed)
+        self.assertEqual(HexBytes(new_ethereum_block.block_hash), blocks[1]["hash"])
+        self.assertEqual(new_ethereum_block.timestamp.timestamp(), 1636548296)
+
+
 class TestEthereumTx(TestCase):
-    pass
+    def test_create_or_update_from_tx_dicts(self):
+        ethereum_block = EthereumBlockFactory()
+        not_mined_ethereum_tx = EthereumTxFactory(block=None, gas_used=None)
+        txs = [
+            {
+                "hash": HexBytes(tx_hash),
+                "from": Account.create().address,
+                "gas": 100_000,
+                "gasPrice": 1,
+                "input": "0x1234",
+                "nonce": nonce,
+                "to": Account.create().address,
+                "value": 2**200,
+            }
+            for nonce, tx_hash in enumerate(
+                [not_mined_ethereum_tx.tx_hash, Web3.keccak(text="tx-hash").hex()]
+            )
+        ]
+        tx_receipts = [
+            {
+                "gasUsed": 21_000,
+                "logs": [
+                    {
+                        "address": Account.create().address,
+                        "data": '0x"\\',
+                        "topics": [HexBytes(Web3.keccak(text="topic"))],
+                    }
+                ],
+                "status": 1,
+                "transactionIndex": transaction_index,
+            }
+            for transaction_index in range(2)
+        ]
+        ethereum_txs = EthereumTx.objects.create_or_update_from_tx_dicts(
+            txs, tx_receipts, [ethereum_block, ethereum_block]
+        )
+        self.assertEqual(len(ethereum_txs), 2)
+        for ethereum_tx, tx, tx_receipt in zip(ethereum_txs, txs, tx_receipts):
+            db_ethereum_tx = EthereumTx.objects.get(tx_hash=ethereum_tx.tx_hash)
+            self.assertEqual(db_ethereum_tx.block_id, ethereum_block.number)
+            self.assertEqual(db_ethereum_tx.gas_used, 21_000)
+            self.assertEqual(
+                db_ethereum_tx.transaction_index, tx_receipt["transactionIndex"]
+            )
+            self.assertEqual(db_ethereum_tx.logs[0]["data"], '0x"\\')
+
+        # Not mined tx only gets updated with the block and receipt
+        db_ethereum_tx = EthereumTx.objects.get(tx_hash=not_mined_ethereum_tx.tx_hash)
+        self.assertEqual(db_ethereum_tx.value, not_mined_ethereum_tx.value)
+        db_ethereum_tx = EthereumTx.objects.get(tx_hash=txs[1]["hash"].hex())
+        self.assertEqual(db_ethereum_tx.value, 2**200)
+        self.assertEqual(bytes(db_ethereum_tx.data), HexBytes("0x1234"))
 
 
 class TestTokenTransfer(TestCase):
@@ -300,11 +422,9 @@ class TestTokenTransfer(TestCase):
         self.assertIsNone(incoming_token_1["_token_id"])
         self.assertIsNotNone(incoming_token_1["_value"])
 
-    def test_erc721_owned_by(self):
+    def test_erc721_ownership(self):
         random_address = Account.create().address
-        self.assertEqual(
-            ERC721Transfer.objects.erc721_owned_by(address=random_address), []
-        )
+        self.assertEqual(ERC721Ownership.objects.owned_by(random_address), [])
         erc721_transfer = ERC721TransferFactory(to=random_address)
         ERC721TransferFactory(
             _from=random_address, token_id=6
@@ -314,16 +434,41 @@ class TestTokenTransfer(TestCase):
         )  # Not appearing as it's not the owner
         ERC20TransferFactory(to=random_address)  # Not appearing as it's not an erc721
         self.assertEqual(
-            len(ERC721Transfer.objects.erc721_owned_by(address=random_address)), 1
+            ERC721Ownership.objects.update_owners(
+                ERC721Transfer.objects.values_list("address", "token_id")
+            ),
+            3,
         )
-        ERC721TransferFactory(
+        self.assertEqual(
+            ERC721Ownership.objects.owned_by(random_address),
+            [(erc721_transfer.address, erc721_transfer.token_id)],
+        )
+
+        # Send the token out
+        erc721_transfer_out = ERC721TransferFactory(
             _from=random_address,
             address=erc721_transfer.address,
             token_id=erc721_transfer.token_id,
-        )  # Send the token out
+        )
+        tokens = [(erc721_transfer.address, erc721_transfer.token_id)]
+        # Updating owners more than once for the same transfers is supported
+        for _ in range(2):
+            self.assertEqual(ERC721Ownership.objects.update_owners(tokens), 1)
+            self.assertEqual(ERC721Ownership.objects.owned_by(random_address), [])
+            self.assertEqual(
+                ERC721Ownership.objects.owned_by(erc721_transfer_out.to), tokens
+            )
+
+        # Reorg of the block with the transfer out
         self.assertEqual(
-            len(ERC721Transfer.objects.erc721_owned_by(address=random_address)), 0
+            ERC721Ownership.objects.get_tokens_from_block_number(
+                erc721_transfer_out.ethereum_tx.block_id
+            ),
+            set(tokens),
         )
+        erc721_transfer_out.ethereum_tx.block.delete()
+        self.assertEqual(ERC721Ownership.objects.update_owners(tokens), 1)
+        self.assertEqual(ERC721Ownership.objects.owned_by(random_address), tokens)
 
 
 class TestInternalTx(TestCase):
@@ -569,6 +714,156 @@ class TestSafeStatus(TestCase):
         another_safe_status = SafeStatusFactory(nonce=2, address=address)
         self.assertFalse(another_safe_status.is_corrupted())
 
+    def test_safe_last_status(self):
+        address = Account.create().address
+        self.assertIsNone(SafeLastStatus.objects.get_or_generate(address))
+        SafeStatusFactory(address=address, nonce=0)
+        safe_status = SafeStatusFactory(address=address, nonce=1, threshold=2)
+        safe_last_status = SafeLastStatus.objects.get_or_generate(address)
+        self.assertEqual(safe_last_status.internal_tx_id, safe_status.internal_tx_id)
+        self.assertEqual(safe_last_status.nonce, 1)
+        self.assertEqual(safe_last_status.threshold, 2)
+        self.assertEqual(safe_last_status.owners, safe_status.owners)
+        self.assertEqual(safe_last_status.block_number, safe_status.block_number)
+        self.assertEqual(
+            SafeLastStatus.get_fields_from_safe_status(
+                safe_last_status.get_safe_status()
+            ),
+            SafeLastStatus.get_fields_from_safe_status(safe_status),
+        )
+
+        # Already stored, so new SafeStatus are ignored until updated
+        new_safe_status = SafeStatusFactory(address=address, nonce=2)
+        self.assertEqual(SafeLastStatus.objects.get_or_generate(address).nonce, 1)
+        SafeLastStatus.objects.update_or_create_from_safe_status(new_safe_status)
+        self.assertEqual(SafeLastStatus.objects.get_or_generate(address).nonce, 2)
+        self.assertEqual(SafeLastStatus.objects.count(), 1)
+
+        # Removed on reorgs with the InternalTx
+        new_safe_status.internal_tx.delete()
+        self.assertEqual(SafeLastStatus.objects.count(), 0)
+        self.assertEqual(SafeLastStatus.objects.get_or_generate(address).nonce, 1)
+        self.assertEqual(SafeLastStatus.objects.invalidate([address]), 1)
+        self.assertEqual(SafeLastStatus.objects.count(), 0)
+
+    @override_settings(
+        CACHES={
+            "default": {
+                "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            }
+        }
+    )
+    def test_safe_last_status_addresses_for_owner(self):
+        owner_address = Account.create().address
+        self.assertEqual(
+            SafeLastStatus.objects.addresses_for_owner(owner_address), set()
+        )
+        safe_status = SafeStatusFactory(owners=[owner_address])
+        with self.captureOnCommitCallbacks(execute=True):
+            SafeLastStatus.objects.update_or_create_from_safe_status(safe_status)
+        self.assertEqual(
+            SafeLastStatus.objects.addresses_for_owner(owner_address),
+            {safe_status.address},
+        )
+
+        # Owners not modified, cache is not invalidated
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            SafeLastStatus.objects.update_or_create_from_safe_status(
+                SafeStatusFactory(address=safe_status.address, owners=[owner_address])
+            )
+        self.assertEqual(len(callbacks), 0)
+
+        # Owner removed
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            SafeLastStatus.objects.update_or_create_from_safe_status(
+                SafeStatusFactory(address=safe_status.address)
+            )
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(
+            SafeLastStatus.objects.addresses_for_owner(owner_address), set()
+        )
+
+        # Result for a query run before an invalidation is not used after it
+        with self.captureOnCommitCallbacks(execute=True):
+            SafeLastStatus.objects.update_or_create_from_safe_status(safe_status)
+        outdated_cache_key = SafeLastStatus.objects.get_owner_cache_key(owner_address)
+        with self.captureOnCommitCallbacks(execute=True):
+            SafeLastStatus.objects.update_or_create_from_safe_status(
+                SafeStatusFactory(address=safe_status.address)
+            )
+        cache.set(outdated_cache_key, {safe_status.address})
+        self.assertEqual(
+            SafeLastStatus.objects.addresses_for_owner(owner_address), set()
+        )
+
+        # Removing SafeLastStatus invalidates the owners
+        with self.captureOnCommitCallbacks(execute=True):
+            SafeLastStatus.objects.update_or_create_from_safe_status(safe_status)
+        self.assertEqual(
+            SafeLastStatus.objects.addresses_for_owner(owner_address),
+            {safe_status.address},
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(
+                SafeLastStatus.objects.invalidate([safe_status.address]), 1
+            )
+        self.assertEqual(
+            SafeLastStatus.objects.addresses_for_owner(owner_address), set()
+        )
+
+        for invalidate in (
+            lambda: SafeLastStatus.objects.invalidate(),
+            lambda: SafeLastStatus.objects.invalidate_from_block_number(
+                safe_status.internal_tx.ethereum_tx.block_id
+            ),
+        ):
+            with self.captureOnCommitCallbacks(execute=True):
+                SafeLastStatus.objects.update_or_create_from_safe_status(safe_status)
+            self.assertEqual(
+                SafeLastStatus.objects.addresses_for_owner(owner_address),
+                {safe_status.address},
+            )
+            with self.captureOnCommitCallbacks(execute=True):
+                self.assertEqual(invalidate(), 1)
+            self.assertEqual(
+                SafeLastStatus.objects.addresses_for_owner(owner_address), set()
+            )
+
+    def test_safe_status_integrity(self):
+        address = Account.create().address
+        safe_status_integrity = SafeStatusIntegrity.objects.get_for_address(address)
+        self.assertEqual(safe_status_integrity.contiguous_nonce, -1)
+        self.assertFalse(safe_status_integrity.is_corrupted())
+        self.assertIsNone(safe_status_integrity.first_gap)
+
+        SafeStatusFactory(nonce=0, address=address)
+        SafeStatusFactory(nonce=1, address=address)
+        SafeStatusFactory(nonce=1, address=address)
+        safe_status_3 = SafeStatusFactory(nonce=3, address=address)
+        self.assertTrue(safe_status_3.is_corrupted())
+        # Record must be invalidated if SafeStatus are not stored by the indexer
+        self.assertEqual(SafeStatusIntegrity.objects.invalidate([address]), 1)
+        safe_status_integrity = SafeStatusIntegrity.objects.get_for_address(address)
+        self.assertEqual(safe_status_integrity.contiguous_nonce, 1)
+        self.assertEqual(safe_status_integrity.nonces_after_gap, [3])
+        self.assertTrue(safe_status_integrity.is_corrupted())
+        self.assertEqual(safe_status_integrity.first_gap, 2)
+
+        safe_status_integrity = SafeStatusIntegrity.objects.add_nonces(
+            address, [5, 1, 2]
+        )
+        self.assertEqual(safe_status_integrity.contiguous_nonce, 3)
+        self.assertEqual(safe_status_integrity.nonces_after_gap, [5])
+        self.assertEqual(safe_status_integrity.first_gap, 4)
+        safe_status_integrity = SafeStatusIntegrity.objects.add_nonces(address, [4])
+        self.assertEqual(safe_status_integrity.contiguous_nonce, 5)
+        self.assertFalse(safe_status_integrity.is_corrupted())
+        self.assertEqual(
+            SafeStatusIntegrity.objects.get_for_addresses([address])[address],
+            safe_status_integrity,
+        )
+        self.assertFalse(safe_status_integrity.add_nonces([3, 5]))
+
     def test_safe_status_last_for_address(self):
         address = Account.create().address
         SafeStatusFactory(address=address, nonce=1)
@@ -1023,3 +1318,72 @@ class TestMultisigTransactions(TestCase):
             MultisigTransaction.objects.last_valid_transaction(safe_address),
             multisig_transaction_2,
         )
+
+
+class TestSafeBalanceLedger(TestCase):
+    def test_safe_balance_ledger(self):
+        safe_address = Account.create().address
+        token_address = Account.create().address
+        ERC20TransferFactory(address=token_address, to=safe_address, value=10)
+        ERC20TransferFactory(address=token_address, _from=safe_address, value=4)
+        InternalTxFactory(to=safe_address, value=7)
+        InternalTxFactory(
+            to=safe_address, value=5, call_type=EthereumTxCallType.DELEGATE_CALL.value
+        )  # Not an ether transfer
+        self.assertEqual(
+            SafeTokenBalance.objects.get_transfers_balances(safe_address),
+            {token_address: 6, NULL_ADDRESS: 7},
+        )
+
+        # Ledgers are only updated when built
+        self.assertFalse(
+            SafeBalanceLedger.objects.update_balances({safe_address: {token_address}})
+        )
+        # Ledger stored but not built yet (e.g. building was interrupted) is built again
+        SafeBalanceLedger.objects.create(address=safe_address)
+        self.assertFalse(SafeTokenBalance.objects.filter(safe=safe_address).exists())
+        self.assertTrue(SafeBalanceLedger.objects.get_or_build(safe_address).built)
+        self.assertEqual(
+            {
+                safe_token_balance.token_address: safe_token_balance.balance
+                for safe_token_balance in SafeTokenBalance.objects.filter(
+                    safe=safe_address
+                )
+            },
+            {token_address: 6, NULL_ADDRESS: 7},
+        )
+
+        with self.settings(ETH_BALANCES_LEDGER=True):
+            erc20_transfer = ERC20TransferFactory(
+                address=token_address, _from=safe_address, value=1
+            )
+            # Storing the same transfer again does not modify the ledger
+            erc20_transfer.save()
+            InternalTxFactory(_from=safe_address, value=2)
+        self.assertEqual(
+            SafeTokenBalance.objects.get(
+                safe=safe_address, token_address=token_address
+            ).balance,
+            5,
+        )
+        self.assertEqual(
+            SafeTokenBalance.objects.get(
+                safe=safe_address, token_address=NULL_ADDRESS
+            ).balance,
+            5,
+        )
+
+        # Reorg of a block with a transfer for the Safe
+        self.assertEqual(
+            SafeBalanceLedger.objects.invalidate_from_block_number(
+                erc20_transfer.ethereum_tx.block_id + 1000
+            ),
+            0,
+        )
+        self.assertEqual(
+            SafeBalanceLedger.objects.invalidate_from_block_number(
+                erc20_transfer.ethereum_tx.block_id
+            ),
+            1,
+        )
+        self.assertFalse(SafeTokenBalance.objects.filter(safe=safe_address).exists())
@@ -12,8 +12,9 @@ from ..models import (
     SafeContract,
     SafeMasterCopy,
 )
-from ..services import ReorgServiceProvider
+from ..services import ReorgServiceProvider, SafeDataVersionServiceProvider
 from .factories import (
+    ERC20TransferFactory,
     EthereumBlockFactory,
     EthereumTxFactory,
     ProxyFactoryFactory,
@@ -120,3 +121,39 @@ class TestReorgService(TestCase):
             safe_master_copy.tx_block_number,
             reorg_block - reorg_service.eth_reorg_rewind_blocks,
         )
+
+    def test_recover_from_reorg_data_versions(self):
+        reorg_service = ReorgServiceProvider()
+        safe_data_version_service = SafeDataVersionServiceProvider()
+        reorg_block = 2000
+        safe_address = SafeContractFactory().address
+        another_safe_address = SafeContractFactory().address
+        erc20_transfer = ERC20TransferFactory(
+            to=safe_address,
+            ethereum_tx=EthereumTxFactory(
+                block=EthereumBlockFactory(number=reorg_block + 1)
+            ),
+        )
+        ERC20TransferFactory(
+            to=another_safe_address,
+            ethereum_tx=EthereumTxFactory(
+                block=EthereumBlockFactory(number=reorg_block - 1)
+            ),
+        )
+        self.assertEqual(
+            reorg_service.get_addresses_from_block_number(reorg_block),
+            {erc20_transfer._from, safe_address},
+        )
+
+        version = safe_data_version_service.get_version(safe_address)
+        another_version = safe_data_version_service.get_version(another_safe_address)
+        with self.captureOnCommitCallbacks(execute=True):
+            reorg_service.recover_from_reorg(reorg_block)
+        # Only Safes with data removed are invalidated
+        self.assertNotEqual(
+            safe_data_version_service.get_version(safe_address), version
+        )
+        self.assertEqual(
+            safe_data_version_service.get_version(another_safe_address),
+            another_version,
+        )
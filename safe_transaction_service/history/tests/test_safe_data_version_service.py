@@ -0,0 +1,57 @@
+from django.test import TestCase
+
+from eth_account import Account
+
+from safe_transaction_service.utils.redis import get_redis
+
+from ..services import SafeDataVersionService
+from .factories import SafeContractFactory
+
+
+class TestSafeDataVersionService(TestCase):
+    def setUp(self) -> None:
+        self.redis = get_redis()
+        self.redis.flushall()
+        self.safe_data_version_service = SafeDataVersionService(self.redis)
+
+    def tearDown(self) -> None:
+        self.redis.flushall()
+
+    def test_increment_versions(self):
+        safe_address = SafeContractFactory().address
+        another_safe_address = SafeContractFactory().address
+        not_safe_address = Account.create().address
+        self.assertEqual(
+            self.safe_data_version_service.get_version(safe_address), "0:0"
+        )
+
+        # Versions are not incremented if database transaction is not committed
+        with self.captureOnCommitCallbacks(execute=False):
+            self.safe_data_version_service.increment_versions([safe_address])
+        self.assertEqual(
+            self.safe_data_version_service.get_version(safe_address), "0:0"
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.safe_data_version_service.increment_versions(
+                [safe_address, safe_address, not_safe_address, None]
+            )
+        self.assertEqual(
+            self.safe_data_version_service.get_version(safe_address), "0:1"
+        )
+        # Versions are only stored for Safes
+        self.assertFalse(
+            self.redis.exists(self.safe_data_version_service.get_key(not_safe_address))
+        )
+        self.assertEqual(
+            self.safe_data_version_service.get_version(another_safe_address), "0:0"
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.safe_data_version_service.increment_epoch()
+        self.assertEqual(
+            self.safe_data_version_service.get_version(safe_address), "1:1"
+        )
+        self.assertEqual(
+            self.safe_data_version_service.get_version(another_safe_address), "1:0"
+        )
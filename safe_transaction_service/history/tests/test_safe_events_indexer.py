@@ -21,7 +21,7 @@ from ..models import (
     MultisigTransaction,
     SafeStatus,
 )
-from .factories import SafeMasterCopyFactory
+from .factories import EthereumTxFactory, SafeMasterCopyFactory
 
 
 class TestSafeEventsIndexer(SafeTestCaseMixin, TestCase):
@@ -131,6 +131,82 @@ class TestSafeEventsIndexer(SafeTestCaseMixin, TestCase):
             self.safe_events_indexer.decode_elements([valid_event]), [expected_event]
         )
 
+    def test_process_decoded_elements(self):
+        proxy_factory_address = Account.create().address
+        master_copy_address = Account.create().address
+
+        def get_events(safe_address: str, proxy_creation_first: bool):
+            ethereum_tx = EthereumTxFactory()
+            safe_setup_event = {
+                "args": {
+                    "initiator": proxy_factory_address,
+                    "owners": [Account.create().address],
+                    "threshold": 1,
+                    "initializer": NULL_ADDRESS,
+                    "fallbackHandler": NULL_ADDRESS,
+                },
+                "event": "SafeSetup",
+                "address": safe_address,
+                "transactionHash": HexBytes(ethereum_tx.tx_hash),
+            }
+            proxy_creation_event = {
+                "args": {"proxy": safe_address, "singleton": master_copy_address},
+                "event": "ProxyCreation",
+                "address": proxy_factory_address,
+                "transactionHash": HexBytes(ethereum_tx.tx_hash),
+            }
+            events = (
+                [proxy_creation_event, safe_setup_event]
+                if proxy_creation_first
+                else [safe_setup_event, proxy_creation_event]
+            )
+            for log_index, event in enumerate(events):
+                event["logIndex"] = log_index + (10 if proxy_creation_first else 0)
+            return events
+
+        # Safe created with the ProxyFactory
+        safe_address = Account.create().address
+        events = get_events(safe_address, False)
+        self.assertEqual(
+            len(self.safe_events_indexer._process_decoded_elements(events)), 2
+        )
+        self.assertTrue(self.safe_events_indexer._is_setup_indexed(safe_address))
+        setup_internal_tx = InternalTx.objects.get(decoded_tx__function_name="setup")
+        self.assertEqual(setup_internal_tx.to, master_copy_address)
+        self.assertIsNone(setup_internal_tx.contract_address)
+        self.assertEqual(setup_internal_tx.trace_address, "1,0")
+        self.assertEqual(
+            InternalTx.objects.get(contract_address=safe_address).tx_type,
+            InternalTxType.CREATE.value,
+        )
+
+        # Processing must be idempotent, and same result as processing one by one
+        self.assertEqual(
+            len(self.safe_events_indexer._process_decoded_elements(events)), 0
+        )
+        for event in events:
+            self.assertIsNone(self.safe_events_indexer._process_decoded_element(event))
+        self.assertEqual(InternalTx.objects.count(), 2)
+        self.assertEqual(InternalTxDecoded.objects.count(), 1)
+
+        # Safe configured after being created. `ProxyCreation` internal tx is removed by `SafeSetup`
+        safe_address = Account.create().address
+        self.safe_events_indexer._process_decoded_elements(
+            get_events(safe_address, True)
+        )
+        self.assertFalse(self.safe_events_indexer._is_setup_indexed(safe_address))
+        internal_tx = InternalTx.objects.get(contract_address=safe_address)
+        self.assertEqual(internal_tx.decoded_tx.function_name, "setup")
+        self.assertEqual(internal_tx.trace_address, "11")
+
+        # Same result processing events one by one
+        safe_address = Account.create().address
+        for event in get_events(safe_address, True):
+            self.safe_events_indexer._process_decoded_element(event)
+        self.assertFalse(self.safe_events_indexer._is_setup_indexed(safe_address))
+        internal_tx = InternalTx.objects.get(contract_address=safe_address)
+        self.assertEqual(internal_tx.decoded_tx.function_name, "setup")
+
     def test_safe_events_indexer(self):
         owner_account_1 = self.ethereum_test_account
         owners = [owner_account_1.address]
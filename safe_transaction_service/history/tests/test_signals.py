@@ -1,9 +1,11 @@
 from datetime import timedelta
+from unittest import mock
 
 from django.db.models.signals import post_save
 from django.test import TestCase
 
 import factory
+from eth_account import Account
 
 from gnosis.eth import EthereumNetwork
 
@@ -12,14 +14,20 @@ from ..models import (
     InternalTx,
     MultisigConfirmation,
     MultisigTransaction,
+    SafeBalanceLedger,
+    SafeTimeline,
+    SafeTimelineEntry,
+    SafeTokenBalance,
     WebHookType,
 )
 from ..signals import build_webhook_payload, is_valid_webhook
 from .factories import (
     ERC20TransferFactory,
+    EthereumTxFactory,
     InternalTxFactory,
     MultisigConfirmationFactory,
     MultisigTransactionFactory,
+    SafeContractFactory,
 )
 
 
@@ -104,3 +112,63 @@ class TestSignals(TestCase):
         self.assertFalse(
             is_valid_webhook(multisig_tx.__class__, multisig_tx, created=False)
         )
+
+    def test_update_safe_balance_ledgers_in_bulk(self):
+        safe_address = Account.create().address
+        token_address = Account.create().address
+        SafeBalanceLedger.objects.build(safe_address)
+
+        erc20_transfers = [
+            ERC20TransferFactory.build(
+                address=token_address,
+                to=safe_address,
+                value=2,
+                ethereum_tx=EthereumTxFactory(),
+            )
+            for _ in range(3)
+        ]
+        with self.settings(ETH_BALANCES_LEDGER=True):
+            with mock.patch.object(
+                SafeTokenBalance.objects,
+                "get_transfers_balances",
+                wraps=SafeTokenBalance.objects.get_transfers_balances,
+            ) as get_transfers_balances_mock:
+                ERC20Transfer.objects.bulk_create(erc20_transfers)
+                # Balances are calculated once for the batch
+                get_transfers_balances_mock.assert_called_once_with(
+                    safe_address, token_addresses=[token_address]
+                )
+        self.assertEqual(
+            SafeTokenBalance.objects.get(
+                safe=safe_address, token_address=token_address
+            ).balance,
+            6,
+        )
+
+    def test_update_safe_timelines_in_bulk(self):
+        safe_address = SafeContractFactory().address
+        self.assertIsNone(SafeTimeline.objects.build(Account.create().address))
+        self.assertTrue(SafeTimeline.objects.build(safe_address).built)
+
+        erc20_transfers = [
+            ERC20TransferFactory.build(to=safe_address, ethereum_tx=EthereumTxFactory())
+            for _ in range(3)
+        ]
+        with mock.patch.object(
+            SafeTimeline.objects,
+            "update_entries",
+            wraps=SafeTimeline.objects.update_entries,
+        ) as update_entries_mock:
+            ERC20Transfer.objects.bulk_create(erc20_transfers)
+            # Timelines are updated once for the batch
+            update_entries_mock.assert_called_once()
+        self.assertEqual(SafeTimelineEntry.objects.filter(safe=safe_address).count(), 3)
+
+        with mock.patch.object(
+            SafeTimeline.objects,
+            "update_entries",
+            wraps=SafeTimeline.objects.update_entries,
+        ) as update_entries_mock:
+            ERC20TransferFactory(to=safe_address)
+            update_entries_mock.assert_called_once()
+        self.assertEqual(SafeTimelineEntry.objects.filter(safe=safe_address).count(), 4)
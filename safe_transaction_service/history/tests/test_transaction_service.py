@@ -1,11 +1,19 @@
+import time
 from datetime import timedelta
+from unittest import mock
 
 from django.test import TestCase
 from django.utils import timezone
 
 from eth_account import Account
 
-from ..models import EthereumTx, ModuleTransaction, MultisigTransaction
+from ..models import (
+    EthereumTx,
+    ModuleTransaction,
+    MultisigTransaction,
+    SafeTimeline,
+    SafeTimelineEntry,
+)
 from ..services.transaction_service import (
     TransactionService,
     TransactionServiceProvider,
@@ -14,6 +22,7 @@ from .factories import (
     ERC20TransferFactory,
     InternalTxFactory,
     ModuleTransactionFactory,
+    MultisigConfirmationFactory,
     MultisigTransactionFactory,
 )
 
@@ -208,6 +217,60 @@ class TestTransactionService(TestCase):
         self.assertEqual(transactions[0].nonce, 1)
         self.assertEqual(transactions[1].nonce, 0)
 
+    def test_get_all_tx_hashes_timeline(self):
+        transaction_service: TransactionService = self.transaction_service
+        safe_address = Account.create().address
+        erc20_transfer = ERC20TransferFactory(to=safe_address)
+        multisig_transaction_not_mined = MultisigTransactionFactory(
+            safe=safe_address, ethereum_tx=None, trusted=True
+        )
+
+        # Timeline is built the first time is requested
+        self.assertFalse(SafeTimeline.objects.filter(address=safe_address).exists())
+        expected_hashes = [
+            multisig_transaction_not_mined.safe_tx_hash,
+            erc20_transfer.ethereum_tx_id,
+        ]
+        queryset = transaction_service.get_all_tx_hashes(safe_address)
+        self.assertEqual(
+            [element["safe_tx_hash"] for element in queryset], expected_hashes
+        )
+        self.assertTrue(SafeTimeline.objects.filter(address=safe_address).exists())
+
+        # Transfer is shown inside the Multisig tx, and not mined tx takes the execution date of the mined one
+        multisig_transaction = MultisigTransactionFactory(
+            safe=safe_address,
+            nonce=multisig_transaction_not_mined.nonce,
+            ethereum_tx=erc20_transfer.ethereum_tx,
+            trusted=True,
+        )
+        queryset = transaction_service.get_all_tx_hashes(safe_address)
+        self.assertEqual(
+            [element["safe_tx_hash"] for element in queryset],
+            [
+                multisig_transaction.safe_tx_hash,
+                multisig_transaction_not_mined.safe_tx_hash,
+            ],
+        )
+        self.assertEqual(
+            [element["execution_date"] for element in queryset],
+            [erc20_transfer.ethereum_tx.block.timestamp] * 2,
+        )
+
+        # Transfer is shown again if Multisig tx is removed
+        multisig_transaction.delete()
+        queryset = transaction_service.get_all_tx_hashes(safe_address)
+        self.assertEqual(
+            [element["safe_tx_hash"] for element in queryset], expected_hashes
+        )
+
+        self.assertEqual(SafeTimeline.objects.invalidate([safe_address]), 1)
+        self.assertEqual(SafeTimelineEntry.objects.filter(safe=safe_address).count(), 0)
+        queryset = transaction_service.get_all_tx_hashes(safe_address)
+        self.assertEqual(
+            [element["safe_tx_hash"] for element in queryset], expected_hashes
+        )
+
     def test_get_all_txs_from_hashes(self):
         transaction_service: TransactionService = self.transaction_service
         safe_address = Account.create().address
@@ -236,15 +299,12 @@ class TestTransactionService(TestCase):
         )
         all_tx_hashes = list([q["safe_tx_hash"] for q in queryset])
 
-        self.assertEqual(len(self.transaction_service.redis.keys("*")), 0)
         all_txs = transaction_service.get_all_txs_from_hashes(
             safe_address, all_tx_hashes
         )
-        self.assertEqual(len(self.transaction_service.redis.keys("*")), 1)
-        all_txs = transaction_service.get_all_txs_from_hashes(
-            safe_address, all_tx_hashes
-        )  # Force caching
-        self.assertEqual(len(self.transaction_service.redis.keys("*")), 1)
+        self.assertEqual(
+            len(self.transaction_service.redis.keys("*")), 0
+        )  # Models are not cached
         self.assertEqual(len(all_txs), 6)
         tx_types = [
             MultisigTransaction,
@@ -308,3 +368,124 @@ class TestTransactionService(TestCase):
         self.assertEqual(len(all_txs_serialized), len(all_txs_2))
         for tx_serialized in all_txs_serialized:
             self.assertTrue(isinstance(tx_serialized, dict))
+
+    def test_get_serialized_txs_from_hashes(self):
+        transaction_service: TransactionService = self.transaction_service
+        safe_address = Account.create().address
+        multisig_transaction = MultisigTransactionFactory(
+            safe=safe_address, trusted=True
+        )
+        erc20_transfer_in = ERC20TransferFactory(to=safe_address)
+        not_executed_multisig_transaction = MultisigTransactionFactory(
+            safe=safe_address, trusted=True, ethereum_tx=None
+        )
+        cache_key = transaction_service.get_cache_key(safe_address)
+
+        all_tx_hashes = [
+            element["safe_tx_hash"]
+            for element in transaction_service.get_all_tx_hashes(safe_address)
+        ]
+        self.assertEqual(
+            all_tx_hashes,
+            [
+                not_executed_multisig_transaction.safe_tx_hash,
+                erc20_transfer_in.ethereum_tx_id,
+                multisig_transaction.safe_tx_hash,
+            ],
+        )
+        serialized_txs = transaction_service.get_serialized_txs_from_hashes(
+            safe_address, all_tx_hashes
+        )
+        self.assertEqual(len(serialized_txs), 3)
+        self.assertEqual(
+            serialized_txs[0]["safe_tx_hash"],
+            not_executed_multisig_transaction.safe_tx_hash,
+        )
+        self.assertEqual(serialized_txs[1]["tx_hash"], erc20_transfer_in.ethereum_tx_id)
+        self.assertEqual(
+            serialized_txs[2]["safe_tx_hash"], multisig_transaction.safe_tx_hash
+        )
+        # Not executed txs are not cached
+        self.assertEqual(transaction_service.redis.hlen(cache_key), 2)
+
+        cached_serialized_txs = transaction_service.get_serialized_txs_from_hashes(
+            safe_address, all_tx_hashes
+        )
+        self.assertEqual(
+            [serialized_tx["tx_type"] for serialized_tx in cached_serialized_txs],
+            [serialized_tx["tx_type"] for serialized_tx in serialized_txs],
+        )
+        self.assertEqual(
+            cached_serialized_txs[1]["transfers"][0]["type"], "ERC20_TRANSFER"
+        )
+
+        # A new confirmation removes the cached tx when committed
+        with self.captureOnCommitCallbacks(execute=True):
+            MultisigConfirmationFactory(
+                multisig_transaction=multisig_transaction,
+                multisig_transaction_hash=multisig_transaction.safe_tx_hash,
+            )
+            self.assertEqual(transaction_service.redis.hlen(cache_key), 2)
+        self.assertEqual(transaction_service.redis.hlen(cache_key), 1)
+        serialized_txs = transaction_service.get_serialized_txs_from_hashes(
+            safe_address, all_tx_hashes
+        )
+        self.assertEqual(
+            len(serialized_txs[2]["confirmations"]),
+            multisig_transaction.confirmations.count(),
+        )
+        self.assertEqual(transaction_service.redis.hlen(cache_key), 2)
+
+        # A new transfer for the Multisig tx removes the cached tx
+        with self.captureOnCommitCallbacks(execute=True):
+            ERC20TransferFactory(
+                to=safe_address, ethereum_tx=multisig_transaction.ethereum_tx
+            )
+        self.assertEqual(transaction_service.redis.hlen(cache_key), 1)
+        serialized_txs = transaction_service.get_serialized_txs_from_hashes(
+            safe_address, all_tx_hashes
+        )
+        self.assertEqual(len(serialized_txs[2]["transfers"]), 1)
+
+        # Cached txs expire even if txs for the Safe keep being cached
+        with mock.patch(
+            "safe_transaction_service.history.services.transaction_service.time.time",
+            return_value=time.time() + transaction_service.cache_timeout,
+        ):
+            self.assertEqual(
+                transaction_service.get_txs_from_cache(
+                    safe_address, [multisig_transaction.safe_tx_hash]
+                ),
+                [None],
+            )
+        self.assertEqual(transaction_service.redis.hlen(cache_key), 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            transaction_service.del_safes_from_cache([safe_address])
+        self.assertFalse(transaction_service.redis.exists(cache_key))
+
+        # Txs read from database before they are modified are not stored after the invalidation
+        cache_version = transaction_service.get_cache_version(safe_address)
+        serialized_tx = transaction_service.get_serialized_txs_from_hashes(
+            safe_address, [multisig_transaction.safe_tx_hash]
+        )[0]
+        with self.captureOnCommitCallbacks(execute=True):
+            transaction_service.del_txs_from_cache(
+                [(safe_address, multisig_transaction.safe_tx_hash)]
+            )
+        self.assertFalse(
+            transaction_service.store_txs_in_cache(
+                safe_address,
+                [(multisig_transaction.safe_tx_hash, serialized_tx)],
+                cache_version,
+            )
+        )
+        self.assertFalse(transaction_service.redis.exists(cache_key))
+        self.assertTrue(
+            transaction_service.store_txs_in_cache(
+                safe_address,
+                [(multisig_transaction.safe_tx_hash, serialized_tx)],
+                transaction_service.get_cache_version(safe_address),
+            )
+        )
+        self.assertEqual(transaction_service.redis.hlen(cache_key), 1)
@@ -17,7 +17,9 @@ from ..models import (
     MultisigConfirmation,
     MultisigTransaction,
     SafeContract,
+    SafeLastStatus,
     SafeStatus,
+    SafeStatusIntegrity,
 )
 from .factories import (
     EthereumTxFactory,
@@ -282,6 +284,168 @@ class TestSafeTxProcessor(TestCase):
                 SafeSignatureType.APPROVED_HASH.value,
             )
 
+    def test_process_decoded_transactions_replay(self):
+        tx_processor = self.tx_processor
+        safe_address = Account.create().address
+        owners = [Account.create().address for _ in range(3)]
+        internal_txs_decoded = [
+            InternalTxDecodedFactory(
+                function_name="setup",
+                owner=owners[0],
+                internal_tx___from=safe_address,
+            ),
+            InternalTxDecodedFactory(
+                function_name="addOwnerWithThreshold",
+                owner=owners[1],
+                internal_tx___from=safe_address,
+            ),
+            InternalTxDecodedFactory(
+                function_name="addOwnerWithThreshold",
+                owner=owners[2],
+                internal_tx___from=safe_address,
+            ),
+            InternalTxDecodedFactory(
+                function_name="execTransaction", internal_tx___from=safe_address
+            ),
+        ]
+        with mock.patch(
+            "safe_transaction_service.history.models.post_save.send"
+        ) as post_save_send_mock:
+            self.assertEqual(
+                tx_processor.process_decoded_transactions(internal_txs_decoded),
+                [True] * 4,
+            )
+            # Buffered models send the signals too
+            self.assertEqual(
+                [
+                    call.kwargs.get("sender") or call.args[0]
+                    for call in post_save_send_mock.call_args_list
+                ],
+                [SafeContract, MultisigTransaction, MultisigConfirmation],
+            )
+
+        # Every SafeStatus is a snapshot, not the same object modified
+        safe_statuses = SafeStatus.objects.filter(address=safe_address).order_by(
+            "internal_tx_id"
+        )
+        self.assertEqual(
+            [safe_status.owners for safe_status in safe_statuses],
+            [owners[:1], owners[:2], owners, owners],
+        )
+        self.assertEqual(
+            [safe_status.nonce for safe_status in safe_statuses], [0, 0, 0, 1]
+        )
+        self.assertEqual(
+            SafeStatusIntegrity.objects.get(address=safe_address).contiguous_nonce, 1
+        )
+        self.assertEqual(
+            SafeLastStatus.objects.get(address=safe_address).internal_tx_id,
+            safe_statuses.last().internal_tx_id,
+        )
+        multisig_transaction = MultisigTransaction.objects.get(safe=safe_address)
+        self.assertEqual(multisig_transaction.nonce, 0)
+        self.assertEqual(multisig_transaction.confirmations.count(), 1)
+
+        # Reprocess, transaction proposed but not executed must be updated
+        ethereum_tx_id = multisig_transaction.ethereum_tx_id
+        MultisigTransaction.objects.filter(pk=multisig_transaction.pk).update(
+            ethereum_tx=None
+        )
+        SafeStatus.objects.filter(address=safe_address).delete()
+        tx_processor.process_decoded_transactions(internal_txs_decoded)
+        multisig_transaction.refresh_from_db()
+        self.assertEqual(multisig_transaction.ethereum_tx_id, ethereum_tx_id)
+        self.assertEqual(
+            MultisigTransaction.objects.filter(safe=safe_address).count(), 1
+        )
+        self.assertEqual(MultisigConfirmation.objects.count(), 1)
+        self.assertEqual(SafeStatus.objects.filter(address=safe_address).count(), 4)
+
+    def test_process_decoded_transactions_replay_api_race(self):
+        tx_processor = self.tx_processor
+        safe_address = Account.create().address
+        owner = Account.create().address
+        internal_txs_decoded = [
+            InternalTxDecodedFactory(
+                function_name="setup",
+                owner=owner,
+                internal_tx___from=safe_address,
+            ),
+            InternalTxDecodedFactory(
+                function_name="execTransaction", internal_tx___from=safe_address
+            ),
+        ]
+
+        # Transaction and confirmation are proposed using the API after the replay retrieved the existing ones
+        multisig_transaction_bulk_create = MultisigTransaction.objects.bulk_create
+        multisig_confirmation_bulk_create = MultisigConfirmation.objects.bulk_create
+        api_signature = b"\x01" * 65
+
+        def propose_multisig_transaction(objs, *args, **kwargs):
+            objs = list(objs)
+            for obj in objs:
+                MultisigTransactionFactory(
+                    safe_tx_hash=obj.safe_tx_hash,
+                    safe=obj.safe,
+                    nonce=obj.nonce,
+                    ethereum_tx=None,
+                )
+            return multisig_transaction_bulk_create(objs, *args, **kwargs)
+
+        def propose_multisig_confirmation(objs, *args, **kwargs):
+            objs = list(objs)
+            for obj in objs:
+                MultisigConfirmationFactory(
+                    multisig_transaction=MultisigTransaction.objects.get(
+                        pk=obj.multisig_transaction_hash
+                    ),
+                    multisig_transaction_hash=obj.multisig_transaction_hash,
+                    owner=obj.owner,
+                    ethereum_tx=None,
+                    signature=api_signature,
+                    signature_type=SafeSignatureType.EOA.value,
+                )
+            return multisig_confirmation_bulk_create(objs, *args, **kwargs)
+
+        with mock.patch.object(
+            MultisigTransaction.objects,
+            "bulk_create",
+            side_effect=propose_multisig_transaction,
+        ), mock.patch.object(
+            MultisigConfirmation.objects,
+            "bulk_create",
+            side_effect=propose_multisig_confirmation,
+        ), mock.patch(
+            "safe_transaction_service.history.models.post_save.send"
+        ) as post_save_send_mock:
+            self.assertEqual(
+                tx_processor.process_decoded_transactions(internal_txs_decoded),
+                [True] * 2,
+            )
+            # Stored by the API, so they are updated
+            self.assertEqual(
+                [
+                    (call.kwargs.get("sender") or call.args[0], call.kwargs["created"])
+                    for call in post_save_send_mock.call_args_list
+                ],
+                [
+                    (SafeContract, True),
+                    (MultisigTransaction, False),
+                    (MultisigConfirmation, False),
+                ],
+            )
+
+        multisig_transaction = MultisigTransaction.objects.get(safe=safe_address)
+        self.assertEqual(
+            multisig_transaction.ethereum_tx_id,
+            internal_txs_decoded[1].internal_tx.ethereum_tx_id,
+        )
+        self.assertTrue(multisig_transaction.trusted)
+        multisig_confirmation = MultisigConfirmation.objects.get(
+            multisig_transaction_hash=multisig_transaction.safe_tx_hash
+        )
+        self.assertNotEqual(bytes(multisig_confirmation.signature), api_signature)
+
     def test_tx_processor_failed(self):
         tx_processor = self.tx_processor
         # Event for Safes < 1.1.1
@@ -41,6 +41,7 @@ from .factories import (
     MultisigTransactionFactory,
     SafeContractDelegateFactory,
     SafeContractFactory,
+    SafeLastStatusFactory,
     SafeMasterCopyFactory,
     SafeStatusFactory,
 )
@@ -204,9 +205,34 @@ class TestViews(SafeTestCaseMixin, APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data["count"], 1)
 
+    def test_all_transactions_keyset_pagination(self):
+        safe_address = Account.create().address
+        for _ in range(3):
+            MultisigTransactionFactory(safe=safe_address, trusted=True)
+        ModuleTransactionFactory(safe=safe_address)
+        ERC20TransferFactory(to=safe_address)
+        url = reverse("v1:history:all-transactions", args=(safe_address,))
+        response = self.client.get(url + "?limit=10")
+        self.assertEqual(response.data["count"], 5)
+        results = response.data["results"]
+
+        keyset_results = []
+        next_url = url + "?limit=2&cursor="
+        while next_url:
+            response = self.client.get(next_url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertNotIn("count", response.data)
+            self.assertLessEqual(len(response.data["results"]), 2)
+            keyset_results.extend(response.data["results"])
+            next_url = response.data["next"]
+        self.assertEqual(keyset_results, results)
+
+        response = self.client.get(url + "?cursor=not-valid")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
     def test_all_transactions_wrong_transfer_type_view(self):
         # No token in database, so we must trust the event
-        safe_address = Account.create().address
+        safe_address = SafeContractFactory().address
         erc20_transfer_out = ERC20TransferFactory(
             _from=safe_address
         )  # ERC20 event (with `value`)
@@ -253,7 +279,7 @@ class TestViews(SafeTestCaseMixin, APITestCase):
         self.assertIsNotNone(response.data["results"][0]["transfers"][0]["token_id"])
 
         # It should work with value=0
-        safe_address = Account.create().address
+        safe_address = SafeContractFactory().address
         erc20_transfer_out = ERC20TransferFactory(
             _from=safe_address, value=0
         )  # ERC20 event (with `value`)
@@ -2344,6 +2370,36 @@ class TestViews(SafeTestCaseMixin, APITestCase):
         for result in response.data["results"]:
             self.assertNotEqual(result["type"], TransferType.ETHER_TRANSFER.name)
 
+    def test_transfers_keyset_pagination(self):
+        safe_address = Account.create().address
+        ethereum_tx = EthereumTxFactory()
+        # Transfers on the same transaction are sorted using `log_index` and `trace_address`
+        ERC20TransferFactory(to=safe_address, ethereum_tx=ethereum_tx)
+        ERC20TransferFactory(_from=safe_address, ethereum_tx=ethereum_tx)
+        InternalTxFactory(to=safe_address, value=5, ethereum_tx=ethereum_tx)
+        ERC721TransferFactory(to=safe_address)
+        InternalTxFactory(_from=safe_address, value=3)
+        url = reverse("v1:history:transfers", args=(safe_address,))
+        response = self.client.get(url + "?limit=10")
+        self.assertEqual(response.data["count"], 5)
+        results = response.data["results"]
+
+        keyset_results = []
+        next_url = url + "?limit=2&cursor="
+        while next_url:
+            response = self.client.get(next_url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertNotIn("count", response.data)
+            keyset_results.extend(response.data["results"])
+            next_url = response.data["next"]
+        self.assertEqual(len(keyset_results), 5)
+        self.assertCountEqual(
+            [str(result) for result in keyset_results],
+            [str(result) for result in results],
+        )
+        block_numbers = [result["block_number"] for result in keyset_results]
+        self.assertEqual(block_numbers, sorted(block_numbers, reverse=True))
+
     def test_safe_creation_view(self):
         invalid_address = "0x2A"
         response = self.client.get(
@@ -2786,15 +2842,16 @@ class TestViews(SafeTestCaseMixin, APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data["safes"], [])
 
-        safe_status = SafeStatusFactory(owners=[owner_address])
+        safe_status = SafeLastStatusFactory(owners=[owner_address])
         response = self.client.get(
             reverse("v1:history:owners", args=(owner_address,)), format="json"
         )
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data["safes"], [safe_status.address])
 
-        safe_status_2 = SafeStatusFactory(owners=[owner_address])
-        SafeStatusFactory()  # Test that other SafeStatus don't appear
+        safe_status_2 = SafeLastStatusFactory(owners=[owner_address])
+        SafeLastStatusFactory()  # Test that other SafeLastStatus don't appear
+        SafeStatusFactory(owners=[owner_address])  # Not the current status
         response = self.client.get(
             reverse("v1:history:owners", args=(owner_address,)), format="json"
         )
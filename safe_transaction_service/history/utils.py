@@ -1,4 +1,6 @@
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Sequence, Union
+
+from eth_utils import keccak
 
 
 def clean_receipt_log(receipt_log: Dict[str, Any]) -> Optional[Dict[str, Any]]:
@@ -13,3 +15,29 @@ def clean_receipt_log(receipt_log: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         "topics": [topic.hex() for topic in receipt_log["topics"]],
     }
     return parsed_log
+
+
+def get_bloom_bits(value: bytes) -> int:
+    """
+    :param value: Address or topic
+    :return: Bits set on a 2048 bits bloom filter (like block `logsBloom`) for `value`
+    """
+    value_hash = keccak(value)
+    bits = 0
+    for i in range(0, 6, 2):
+        bits |= 1 << (int.from_bytes(value_hash[i : i + 2], "big") & 2047)
+    return bits
+
+
+def bloom_contains_any(bloom: Union[bytes, int], values_bits: Sequence[int]) -> bool:
+    """
+    :param bloom: Bloom filter (like block `logsBloom`)
+    :param values_bits: Result of `get_bloom_bits` for addresses or topics
+    :return: `True` if any of the values can be on the bloom filter, `False` if none of them is on the filter.
+        If `values_bits` is empty `True` is returned
+    """
+    if not values_bits:
+        return True
+    if isinstance(bloom, bytes):
+        bloom = int.from_bytes(bloom, "big")
+    return any(bloom & bits == bits for bits in values_bits)
@@ -42,8 +42,8 @@ from .models import (
     MultisigTransaction,
     SafeContract,
     SafeContractDelegate,
+    SafeLastStatus,
     SafeMasterCopy,
-    SafeStatus,
     TransferDict,
 )
 from .serializers import get_data_decoded_from_data
@@ -121,6 +121,13 @@ class AllTransactionsListView(ListAPIView):
         OrderingFilter,
     )
     pagination_class = pagination.SmallPagination
+    keyset_ordering = (
+        "-execution_date",
+        "-safe_nonce",
+        "block",
+        "-created",
+        "safe_tx_hash",
+    )  # Same ordering as `TransactionService.get_all_tx_hashes`, `safe_tx_hash` makes it unique
     serializer_class = (
         serializers.AllTransactionsSchemaSerializer
     )  # Just for docs, not used
@@ -188,8 +195,9 @@ class AllTransactionsListView(ListAPIView):
             return self.get_paginated_response([])
 
         all_tx_hashes = [element["safe_tx_hash"] for element in page]
-        all_txs = transaction_service.get_all_txs_from_hashes(safe, all_tx_hashes)
-        all_txs_serialized = transaction_service.serialize_all_txs(all_txs)
+        all_txs_serialized = transaction_service.get_serialized_txs_from_hashes(
+            safe, all_tx_hashes
+        )
         return self.get_paginated_response(all_txs_serialized)
 
     @swagger_auto_schema(
@@ -241,6 +249,7 @@ class SafeModuleTransactionListView(ListAPIView):
     filterset_class = filters.ModuleTransactionFilter
     ordering_fields = ["created"]
     pagination_class = pagination.DefaultPagination
+    keyset_ordering = ("-created", "internal_tx_id")
     serializer_class = serializers.SafeModuleTransactionResponseSerializer
 
     def get_queryset(self):
@@ -338,6 +347,7 @@ class SafeMultisigTransactionListView(ListAPIView):
     filterset_class = filters.MultisigTransactionFilter
     ordering_fields = ["nonce", "created", "modified"]
     pagination_class = pagination.DefaultPagination
+    keyset_ordering = ("-nonce", "-created", "safe_tx_hash")
 
     def get_queryset(self):
         return (
@@ -381,9 +391,10 @@ class SafeMultisigTransactionListView(ListAPIView):
             )
 
         response = super().get(request, *args, **kwargs)
-        response.data["count_unique_nonce"] = (
-            self.get_unique_nonce(address) if response.data["count"] else 0
-        )
+        if "count" in response.data:  # Counts are not calculated for keyset pagination
+            response.data["count_unique_nonce"] = (
+                self.get_unique_nonce(address) if response.data["count"] else 0
+            )
         return response
 
     @swagger_auto_schema(
@@ -770,6 +781,12 @@ class SafeTransferListView(ListAPIView):
     filterset_class = filters.TransferListFilter
     serializer_class = serializers.TransferWithTokenInfoResponseSerializer
     pagination_class = pagination.DefaultPagination
+    keyset_ordering = (
+        "-block_number",
+        "transaction_hash",
+        "_log_index",
+        "_trace_address",
+    )
 
     def add_tokens_to_transfers(self, transfers: TransferDict) -> TransferDict:
         tokens = {
@@ -786,6 +803,11 @@ class SafeTransferListView(ListAPIView):
             transfer["token"] = tokens.get(transfer["token_address"])
         return transfers
 
+    def filter_queryset(self, queryset):
+        # Union cannot be filtered, so keyset pagination is applied to every queryset
+        queryset = super().filter_queryset(queryset)
+        return self.paginator.filter_keyset_queryset(queryset, self.request, self)
+
     def get_transfers(self, address: str):
         erc20_queryset = self.filter_queryset(
             ERC20Transfer.objects.to_or_from(address).token_txs()
@@ -964,7 +986,6 @@ class OwnersView(APIView):
             422: "Owner address checksum not valid",
         }
     )
-    @method_decorator(cache_page(60 * 60))  # 1 hour
     def get(self, request, address, *args, **kwargs):
         """
         Return Safes where the address provided is an owner
@@ -979,7 +1000,7 @@ class OwnersView(APIView):
                 },
             )
 
-        safes_for_owner = SafeStatus.objects.addresses_for_owner(address)
+        safes_for_owner = SafeLastStatus.objects.addresses_for_owner(address)
         serializer = self.serializer_class(data={"safes": safes_for_owner})
         assert serializer.is_valid()
         return Response(status=status.HTTP_200_OK, data=serializer.data)
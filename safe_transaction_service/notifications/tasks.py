@@ -8,7 +8,7 @@ from safe_transaction_service.history.models import (
     MultisigConfirmation,
     MultisigTransaction,
     SafeContractDelegate,
-    SafeStatus,
+    SafeLastStatus,
     WebHookType,
 )
 from safe_transaction_service.utils.ethereum import get_ethereum_network
@@ -168,7 +168,7 @@ def send_notification_owner_task(address: str, safe_tx_hash: str) -> Tuple[int,
     assert safe_tx_hash, "Safe tx hash was not provided"
 
     try:
-        safe_status = SafeStatus.objects.last_for_address(address)
+        safe_status = SafeLastStatus.objects.get_or_generate(address)
 
         if not safe_status:
             logger.info("Cannot find threshold information for safe=%s", address)
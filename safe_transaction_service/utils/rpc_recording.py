@@ -0,0 +1,235 @@
+"""
+Record JSON-RPC traffic from a real node and replay it later, so indexing can be tested and benchmarked
+without a live node. Usage:
+
+    with JsonRpcRecorderServer(JsonRpcRecording(), "https://node") as server:
+        EthereumClient(server.url).get_blocks([1, 2])
+        server.recording.save("recording.jsonl.gz")
+
+    with JsonRpcReplayServer(JsonRpcRecording.load("recording.jsonl.gz")) as server:
+        EthereumClient(server.url).get_blocks([1, 2])  # Node is not called
+"""
+import gzip
+import json
+import logging
+import threading
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Union
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+JsonRpcRequest = Dict[str, Any]
+JsonRpcResponse = Dict[str, Any]
+
+
+class JsonRpcRecording:
+    """
+    JSON-RPC responses indexed by `method` and `params`. If the same request is recorded more than once
+    (e.g. `eth_blockNumber`), responses are replayed in the same order, repeating the last one
+    """
+
+    def __init__(self, metadata: Optional[Dict[str, Any]] = None):
+        """
+        :param metadata: Free form information stored with the recording, e.g. block range or addresses used
+        """
+        self.metadata = metadata or {}
+        self.responses: Dict[str, List[JsonRpcResponse]] = defaultdict(list)
+        self.positions: Dict[str, int] = defaultdict(int)
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return sum(len(responses) for responses in self.responses.values())
+
+    @staticmethod
+    def get_key(method: str, params: Any) -> str:
+        return json.dumps([method, params], sort_keys=True, separators=(",", ":"))
+
+    def add(self, request: JsonRpcRequest, response: JsonRpcResponse) -> None:
+        """
+        :param request:
+        :param response: `id` and `jsonrpc` fields are not stored
+        """
+        response = {
+            field: value
+            for field, value in response.items()
+            if field not in ("id", "jsonrpc")
+        }
+        with self.lock:
+            self.responses[
+                self.get_key(request["method"], request.get("params", []))
+            ].append(response)
+
+    def get(self, request: JsonRpcRequest) -> Optional[JsonRpcResponse]:
+        """
+        :param request:
+        :return: Recorded response for `request` with the `id` of the request, `None` if not recorded
+        """
+        key = self.get_key(request["method"], request.get("params", []))
+        with self.lock:
+            responses = self.responses.get(key)
+            if not responses:
+                return None
+            position = self.positions[key]
+            self.positions[key] = position + 1
+            response = responses[min(position, len(responses) - 1)]
+        return {"jsonrpc": "2.0", "id": request.get("id"), **response}
+
+    @staticmethod
+    def _open(path: str, mode: str):
+        if path.endswith(".gz"):
+            return gzip.open(path, mode + "t")
+        return open(path, mode)
+
+    def save(self, path: str) -> None:
+        """
+        Store recording as JSON lines, first line is the metadata. Use `.gz` extension to compress it
+        """
+        with self.lock, self._open(path, "w") as f:
+            f.write(json.dumps({"metadata": self.metadata}) + "\n")
+            for key, responses in self.responses.items():
+                method, params = json.loads(key)
+                f.write(
+                    json.dumps(
+                        {"method": method, "params": params, "responses": responses}
+                    )
+                    + "\n"
+                )
+
+    @classmethod
+    def load(cls, path: str) -> "JsonRpcRecording":
+        with cls._open(path, "r") as f:
+            recording = cls(json.loads(f.readline())["metadata"])
+            for line in f:
+                entry = json.loads(line)
+                recording.responses[
+                    cls.get_key(entry["method"], entry["params"])
+                ] = entry["responses"]
+        return recording
+
+
+class JsonRpcRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep alive connections, as `EthereumClient` does
+
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        response = self.server.process_payload(payload)
+        body = json.dumps(response).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug(format, *args)
+
+
+class JsonRpcServer(ThreadingHTTPServer, ABC):
+    """
+    Local JSON-RPC http server running on a separate thread. Use it as a context manager
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self, recording: JsonRpcRecording, host: str = "127.0.0.1", port: int = 0
+    ):
+        """
+        :param recording:
+        :param host:
+        :param port: `0` to use a random free port
+        """
+        super().__init__((host, port), JsonRpcRequestHandler)
+        self.recording = recording
+        self.thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self):
+        self.thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self.shutdown()
+        self.server_close()
+        self.thread.join()
+
+    @abstractmethod
+    def process_requests(
+        self, rpc_requests: List[JsonRpcRequest]
+    ) -> List[JsonRpcResponse]:
+        """
+        :param rpc_requests:
+        :return: Responses in the same order as `rpc_requests`
+        """
+        pass
+
+    def process_payload(
+        self, payload: Union[JsonRpcRequest, List[JsonRpcRequest]]
+    ) -> Union[JsonRpcResponse, List[JsonRpcResponse]]:
+        if isinstance(payload, list):
+            return self.process_requests(payload)
+        return self.process_requests([payload])[0]
+
+
+class JsonRpcRecorderServer(JsonRpcServer):
+    """
+    Proxy requests to a node and record them
+    """
+
+    def __init__(self, recording: JsonRpcRecording, node_url: str, **kwargs):
+        super().__init__(recording, **kwargs)
+        self.node_url = node_url
+        self.http_session = requests.Session()
+
+    def process_requests(
+        self, rpc_requests: List[JsonRpcRequest]
+    ) -> List[JsonRpcResponse]:
+        http_response = self.http_session.post(
+            self.node_url, json=rpc_requests, timeout=300
+        )
+        http_response.raise_for_status()
+        responses_by_id = {
+            response["id"]: response for response in http_response.json()
+        }
+        responses = []
+        for request in rpc_requests:
+            response = responses_by_id[request["id"]]
+            if "error" not in response:  # Don't record errors, request can be retried
+                self.recording.add(request, response)
+            responses.append(response)
+        return responses
+
+
+class JsonRpcReplayServer(JsonRpcServer):
+    """
+    Serve requests from a recording. Requests not recorded return a JSON-RPC error
+    """
+
+    def process_requests(
+        self, rpc_requests: List[JsonRpcRequest]
+    ) -> List[JsonRpcResponse]:
+        responses = []
+        for request in rpc_requests:
+            response = self.recording.get(request)
+            if response is None:
+                logger.warning(
+                    "Request method=%s params=%s was not recorded",
+                    request["method"],
+                    request.get("params"),
+                )
+                response = {
+                    "jsonrpc": "2.0",
+                    "id": request.get("id"),
+                    "error": {"code": -32000, "message": "Request was not recorded"},
+                }
+            responses.append(response)
+        return responses
@@ -0,0 +1,34 @@
+import os
+import tempfile
+
+from django.test import TestCase
+
+from gnosis.eth import EthereumClient
+from gnosis.eth.tests.ethereum_test_case import EthereumTestCaseMixin
+
+from ..rpc_recording import JsonRpcRecorderServer, JsonRpcRecording, JsonRpcReplayServer
+
+
+class TestRpcRecording(EthereumTestCaseMixin, TestCase):
+    def test_record_and_replay(self):
+        recording = JsonRpcRecording({"test": True})
+        with JsonRpcRecorderServer(
+            recording, self.ethereum_client.ethereum_node_url
+        ) as server:
+            ethereum_client = EthereumClient(server.url)
+            block_number = ethereum_client.current_block_number
+            blocks = ethereum_client.get_blocks([0, block_number])
+        self.assertGreaterEqual(len(recording), 3)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "recording.jsonl.gz")
+            recording.save(path)
+            recording = JsonRpcRecording.load(path)
+        self.assertEqual(recording.metadata, {"test": True})
+
+        with JsonRpcReplayServer(recording) as server:
+            ethereum_client = EthereumClient(server.url)
+            self.assertEqual(ethereum_client.current_block_number, block_number)
+            self.assertEqual(ethereum_client.get_blocks([0, block_number]), blocks)
+            with self.assertRaises(ValueError):  # Not recorded
+                ethereum_client.get_block(block_number + 1)